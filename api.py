@@ -0,0 +1,323 @@
+"""
+HTTP API for letter generation and dispatch (for the ATS and other integrations)
+
+    python run.py api --workers 4
+    uvicorn api:app --host 127.0.0.1 --port 8000 --workers 4
+
+Endpoints:
+    GET  /health                    liveness check
+    POST /letters/{letter}/html     render a letter as HTML
+    POST /letters/{letter}/pdf      render a letter as PDF
+    POST /sends                     queue an email carrying a letter
+    POST /packets                   queue a full-time hire's offer, appointment and welcome emails
+    GET  /jobs/{job_id}             poll a queued send
+    GET  /archive/{digest}          download an archived (sent) letter PDF
+    GET  /exports/letters.zip       stream a ZIP of letters (?letter=&start=&end=&cohort=)
+
+{letter} is offer, appointment, experience or revision and the request body is a
+candidate record (see core/letters.py). Sends are stored in a SQLite queue
+and PDFs in the on-disk cache, both in the data directory, so they are
+shared by every worker process. SMTP settings come from the environment
+(see core/mailer.email_config_from_env).
+
+A packet (core/packet.py) is sent as one email with both letters in one PDF
+(mode "single") or queued as a staged schedule of sends (mode "staged"); its
+job's message has the time spent in each stage.
+"""
+
+import logging
+import os
+import threading
+import time
+from contextlib import asynccontextmanager
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import HTMLResponse, StreamingResponse
+from pydantic import BaseModel
+
+from core.archive import LetterArchive
+from core.emails import welcome_email
+from core.employees import EmployeeStore
+from core.errors import InvalidCandidateError, OnboardingError, RenderTimeoutError
+from core.export import select_employees, stream_export
+from core.jobs import JobQueue
+from core.generators import template_version
+from core.letters import LETTER_TYPES, build_letter, letter_email
+from core.mailer import deliver_email, email_config_from_env
+from core.packet import PACKET_LETTERS, build_packet, schedule_packet, send_packet, stage_summary
+from core.pdf_cache import cached_pdf_path, render_pdf_spooled
+from core.pdf_size import letter_preset
+from core.spool import iter_chunks
+from core.search import index_letter
+from core.workers import submit_render
+from core.validation import validate_email
+
+load_dotenv()
+
+logger = logging.getLogger("api")
+
+# How often an idle worker polls the queue, and when a running job is presumed lost
+POLL_INTERVAL_SECONDS = 1.0
+STALE_JOB_SECONDS = 600
+
+# Employee status recorded after each kind of letter is delivered (revision letters leave it unchanged)
+SEND_STATUSES = {'offer': "offer_sent", 'appointment': "appointment_sent", 'experience': "certificate_issued"}
+
+class SendRequest(BaseModel):
+    candidate: Dict[str, Any]
+    to: str
+    cc: List[str] = []
+    subject: Optional[str] = None
+    body: Optional[str] = None
+
+class PacketRequest(BaseModel):
+    candidate: Dict[str, Any]
+    to: str
+    cc: List[str] = []
+    mode: str = "single"  # or "staged"
+    joining_form_url: Optional[str] = None
+    welcome_to: Optional[str] = None  # e.g. the official email address (staged mode)
+
+PACKET_MODES = ("single", "staged")
+
+def send_worker(queue, employees, archive, stop):
+    """Deliver queued sends until stop is set (one thread per API worker process)"""
+    while not stop.is_set():
+        try:
+            job = queue.claim()
+        except Exception:
+            logger.exception("Could not read the job queue")
+            job = None
+        if job is None:
+            stop.wait(POLL_INTERVAL_SECONDS)
+            continue
+
+        try:
+            if job['kind'] == "packet":
+                queue.finish(job['id'], True, run_packet(queue, employees, archive, job['payload']))
+                continue
+            if job['kind'] == "welcome":
+                deliver_welcome(job['payload'])
+                record_welcome(employees, job['payload'])
+                queue.finish(job['id'], True, "Email sent successfully!")
+                continue
+            sent = deliver(job['payload'])
+        except OnboardingError as e:
+            queue.finish(job['id'], False, str(e))
+        except Exception as e:
+            logger.exception("%s job %s crashed", job['kind'].capitalize(), job['id'])
+            queue.finish(job['id'], False, f"Unexpected error: {e}")
+        else:
+            queue.finish(job['id'], True, "Email sent successfully!")
+            with sent[0]:
+                record_send(employees, archive, job['payload'], *sent)
+
+def record_send(employees, archive, payload, pdf, filename, subject, html):
+    """Write a delivered letter back to the employee records, archive it and index it for search"""
+    candidate = payload['candidate']
+    letter = (candidate.get("letter") or "offer").strip().lower()
+    dates = {'start_date': candidate.get("start_date")}
+    if letter == "experience":
+        dates['exit_date'] = candidate.get("end_date")
+    status = SEND_STATUSES.get(letter)
+    try:
+        employees.record(
+            payload['to'], "API", status or f"{letter}_sent",
+            status=status,
+            name=candidate.get("name"),
+            title=candidate.get("title"),
+            position=candidate.get("position"),
+            employee_type=candidate.get("offer_type"),
+            **dates
+        )
+    except Exception:
+        logger.exception("Could not update the employee record for %s", payload['to'])
+    try:
+        digest = archive.put(pdf, letter, filename, payload['to'], payload['to'], subject, template_version(letter))
+    except Exception:
+        logger.exception("Could not archive the letter sent to %s", payload['to'])
+        return
+    index_letter(digest, letter, filename, html, candidate.get("name"), candidate.get("position"), subject,
+                 payload['to'], payload['to'])
+
+def deliver(payload):
+    """Render the letter and email it (raises core.errors exceptions)
+
+    Returns (pdf, filename, subject, html), where pdf is a spooled file the
+    caller closes.
+    """
+    candidate = payload['candidate']
+    html, filename = build_letter(candidate)
+    pdf = render_spooled(html, letter_preset((candidate.get("letter") or "offer").strip().lower()))
+
+    try:
+        subject, body = letter_email(candidate)
+        subject = payload.get('subject') or subject
+        deliver_email(
+            email_config_from_env(),
+            payload['to'],
+            payload['cc'],
+            subject,
+            payload.get('body') or body,
+            pdf,
+            f"{filename}.pdf",
+            phase="API"
+        )
+    except BaseException:
+        pdf.close()
+        raise
+    return pdf, f"{filename}.pdf", subject, html
+
+def deliver_welcome(payload):
+    """Send a scheduled welcome email (raises EmailDeliveryError)"""
+    subject, body = welcome_email(payload['name'], payload['joining_form_url'])
+    deliver_email(email_config_from_env(), payload['to'], payload['cc'], subject, body, phase="API",
+                  employee_email=payload.get('employee_email'))
+
+def record_welcome(employees, payload):
+    try:
+        employees.record(payload.get('employee_email') or payload['to'], "API", "welcomed", status="welcomed",
+                         name=payload['name'])
+    except Exception:
+        logger.exception("Could not update the employee record for %s", payload['to'])
+
+def run_packet(queue, employees, archive, payload):
+    """Render a packet and send it as one email or queue its staged schedule; returns the job's message"""
+    packet = build_packet(payload['candidate'], payload.get('joining_form_url'))
+    if payload['mode'] == "staged":
+        scheduled = schedule_packet(queue, packet, payload['to'], payload['cc'], payload.get('welcome_to'))
+        jobs = ", ".join(f"{item['stage']} {item['job_id']}" +
+                         (f" at {time.strftime('%Y-%m-%d %H:%M', time.localtime(item['run_at']))}"
+                          if item['run_at'] else " now")
+                         for item in scheduled)
+        return f"Scheduled: {jobs}. Stages: {stage_summary(packet)}"
+
+    subject, _, _ = send_packet(email_config_from_env(), packet, payload['to'], payload['cc'], phase="API")
+    for letter in PACKET_LETTERS:
+        document = packet['letters'][letter]
+        record_send(employees, archive, {'candidate': document['record'], 'to': payload['to']},
+                    document['pdf'], document['filename'], subject, document['html'])
+    record_welcome(employees, {'name': packet['name'], 'to': payload['to']})
+    return f"Email sent successfully! Stages: {stage_summary(packet)}"
+
+def render_spooled(html, preset):
+    """render_pdf_spooled with the render running in the render pool, under its time and memory limits"""
+    if not os.path.exists(cached_pdf_path(html, preset)):
+        # Fills the PDF cache, which the spooled file is copied from, without passing the PDF back here
+        submit_render(html, preset, cache_only=True).result()
+    return render_pdf_spooled(html, preset)
+
+@asynccontextmanager
+async def lifespan(app):
+    queue = JobQueue()
+    queue.requeue_stale(STALE_JOB_SECONDS)
+    employees = EmployeeStore()
+    archive = LetterArchive()
+    stop = threading.Event()
+    worker = threading.Thread(target=send_worker, args=(queue, employees, archive, stop), daemon=True)
+    worker.start()
+    app.state.queue = queue
+    app.state.employees = employees
+    app.state.archive = archive
+    yield
+    stop.set()
+    worker.join(timeout=5)
+    archive.close()
+
+app = FastAPI(title="Rapid Innovation Onboarding API", lifespan=lifespan)
+
+def render(letter, candidate):
+    if letter not in LETTER_TYPES:
+        raise HTTPException(status_code=404, detail=f"Unknown letter type: {letter}")
+    try:
+        return build_letter({**candidate, 'letter': letter})
+    except InvalidCandidateError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except OnboardingError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+def check_email(address):
+    if not validate_email(address, check_deliverability=False):
+        raise HTTPException(status_code=422, detail=f"Invalid email address: {address}")
+
+@app.get("/health")
+def health():
+    return {'status': "ok", 'time': time.time()}
+
+@app.post("/letters/{letter}/html", response_class=HTMLResponse)
+def render_html_letter(letter: str, candidate: Dict[str, Any]):
+    html, _ = render(letter, candidate)
+    return HTMLResponse(html)
+
+@app.post("/letters/{letter}/pdf")
+def render_pdf_letter(letter: str, candidate: Dict[str, Any]):
+    html, filename = render(letter, candidate)
+    try:
+        pdf = render_spooled(html, letter_preset(letter))
+    except RenderTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except OnboardingError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return StreamingResponse(
+        iter_chunks(pdf, close=True),
+        media_type="application/pdf",
+        headers={'Content-Disposition': f'attachment; filename="{filename}.pdf"'}
+    )
+
+@app.post("/sends", status_code=202)
+def queue_send(request: SendRequest):
+    letter = (request.candidate.get("letter") or "offer").strip().lower()
+    render(letter, request.candidate)  # Validate before queuing
+    check_email(request.to)
+    for address in request.cc:
+        check_email(address)
+
+    job_id = app.state.queue.enqueue("send", request.dict())
+    return {'job_id': job_id, 'status': "queued"}
+
+@app.post("/packets", status_code=202)
+def queue_packet(request: PacketRequest):
+    if request.mode not in PACKET_MODES:
+        raise HTTPException(status_code=422, detail=f"mode must be one of {', '.join(PACKET_MODES)}")
+    for letter in PACKET_LETTERS:
+        render(letter, {**request.candidate, 'offer_type': "Full-time Employee"})  # Validate before queuing
+    for address in [request.to, *request.cc] + ([request.welcome_to] if request.welcome_to else []):
+        check_email(address)
+
+    job_id = app.state.queue.enqueue("packet", request.dict())
+    return {'job_id': job_id, 'status': "queued"}
+
+@app.get("/jobs/{job_id}")
+def job_status(job_id: str):
+    job = app.state.queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.get("/archive/{digest}")
+def archived_letter(digest: str):
+    if len(digest) != 64 or any(c not in "0123456789abcdef" for c in digest):
+        raise HTTPException(status_code=404, detail="Letter not found")
+    try:
+        pdf = app.state.archive.open_blob(digest)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Letter not found")
+    return StreamingResponse(iter_chunks(pdf, close=True), media_type="application/pdf")
+
+@app.get("/exports/letters.zip")
+def export_letters_zip(letter: str, start: Optional[date] = None, end: Optional[date] = None,
+                       cohort: Optional[str] = None):
+    """ZIP of the letters for employees joining (or, for experience letters, exiting) in [start, end]"""
+    try:
+        select_employees(app.state.employees, letter, start, end, cohort)  # Validate before streaming starts
+    except InvalidCandidateError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    filename = f"{letter}_letters_{start or 'all'}_{end or 'all'}.zip"
+    return StreamingResponse(
+        stream_export(letter, start, end, cohort, employees=app.state.employees, archive=app.state.archive),
+        media_type="application/zip",
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
@@ -1,19 +1,48 @@
 import streamlit as st
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from email.mime.base import MIMEBase
-from email import encoders
-import base64
-from datetime import datetime, timedelta
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from datetime import date, datetime, timedelta
+import io
+import sqlite3
 import os
-from email_validator import validate_email as email_validate, EmailNotValidError
 from dotenv import load_dotenv
 import config
-import pdfkit
-import tempfile
-import io
-import weasyprint
+from core import pdf_cache
+from core.pdf_size import letter_preset
+from core.emails import (
+    offer_letter_email,
+    certificate_email,
+    initial_documents_email,
+    plain_text_email,
+    welcome_email,
+    background_verification_email,
+    manager_confirmation_email,
+    exit_notification_email,
+    asset_return_email,
+)
+from core.errors import OnboardingError
+from core.mailer import send_email
+from core.generators import (
+    generate_experience_letter,
+    generate_offer_letter_with_salary,
+    template_version,
+)
+from core.validation import validate_email, parse_cc_list
+from core.salary import DEFAULT_PF_CONTRIBUTION, SALARY_COMPONENTS, SALARY_LABELS, build_salary_data, solve_ctc_one
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from core.document_store import DocumentStore, estimate_size
+from core.paths import data_path
+from core.archive import LetterArchive
+from core.audit import get_audit_log
+from core.employees import EmployeeStore
+from core.exits import ASSET_TYPES, EXIT_STEP_LABELS, EXIT_STEPS, LAPTOP_TYPES, ExitTracker
+from core.export import export_letters
+from core.search import get_search_index, index_letter
+from core.errors import ImportFileError
+from core.importer import run_import
+from core.pipeline import STAGES, stage_label
+from core.warmup import prewarm_process
+from core.packet import PACKET_LETTERS, build_packet, send_packet, stage_summary
+from core.workers import submit_render
 
 # Load environment variables
 load_dotenv()
@@ -202,15 +231,6 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
-# Email validation function using email-validator
-def validate_email(email):
-    try:
-        # Validate and get info about the email
-        email_validate(email)
-        return True
-    except EmailNotValidError:
-        return False
-
 # Load email configuration from environment variables
 def load_email_config():
     return {
@@ -222,986 +242,244 @@ def load_email_config():
         'configured': bool(os.getenv('SMTP_SERVER') and os.getenv('SMTP_PASSWORD'))
     }
 
-def get_base64_image(image_path):
-    """Convert image to base64 string"""
-    try:
-        with open(image_path, "rb") as img_file:
-            return base64.b64encode(img_file.read()).decode()
-    except:
-        return ""  # Return empty string if image not found
-
-def convert_html_to_pdf(html_content):
-    """Convert HTML content to PDF bytes"""
-    # Try pdfkit first (requires wkhtmltopdf)
-    try:
-        # Configure pdfkit options for better PDF output
-        options = {
-            'page-size': 'A4',
-            'margin-top': '0.75in',
-            'margin-right': '0.75in',
-            'margin-bottom': '0.75in',
-            'margin-left': '0.75in',
-            'encoding': "UTF-8",
-            'no-outline': None,
-            'enable-local-file-access': None
-        }
-
-        # Convert HTML to PDF
-        pdf_bytes = pdfkit.from_string(html_content, False, options=options)
-        return pdf_bytes
-    except Exception as e:
-        st.warning(f"pdfkit failed: {str(e)}. Trying weasyprint as fallback...")
-
-        # Fallback to weasyprint
-        try:
-            html_doc = weasyprint.HTML(string=html_content)
-            pdf_bytes = html_doc.write_pdf()
-            return pdf_bytes
-        except Exception as e2:
-            st.error(f"Both PDF conversion methods failed. pdfkit: {str(e)}, weasyprint: {str(e2)}")
-            return None
+def render_in_background(html_content, preset, cache_only=False):
+    """PDF bytes rendered in the render pool (core/workers.py) while the page stays interactive
 
-def generate_offer_letter(offer_type, name, position, start_date, ctc=None):
-    """Generate HTML offer letter based on type"""
-
-    # Base64 encode images
-    header_img = get_base64_image(config.HEADER_IMAGE_PATH)
-    footer_img = get_base64_image(config.FOOTER_IMAGE_PATH)
-    signature_img = get_base64_image(config.SIGNATURE_IMAGE_PATH)
-
-    html_template = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="UTF-8">
-        <style>
-            @page {{
-                margin: 20px;
-                @top-left {{
-                    content: element(header);
-                }}
-                @bottom-center {{
-                    content: element(footer);
-                }}
-            }}
-            body {{
-                font-family: {config.DOCUMENT_STYLES['font_family']};
-                margin: 0;
-                padding: 20px;
-                font-size: 12px;
-            }}
-            .header {{
-                text-align: left;
-                margin-bottom: 30px;
-                position: running(header);
-            }}
-            .content {{
-                margin: 20px 0;
-                line-height: {config.DOCUMENT_STYLES['line_height']};
-            }}
-            .page-break {{ page-break-before: always; }}
-            .signature {{
-                margin-top: 50px;
-                text-align: left;
-                page-break-inside: avoid;
-            }}
-            .footer {{
-                text-align: center;
-                margin-top: 50px;
-                position: running(footer);
-                width: 100%;
-            }}
-            h1, h2 {{ color: {config.DOCUMENT_STYLES['primary_color']}; text-align: center; }}
-            .terms {{ margin: 20px 0; }}
-            .terms li {{ margin: 10px 0; }}
-            .acceptance-section {{
-                margin-top: 80px;
-                page-break-inside: avoid;
-            }}
-            .signature-line {{
-                border-bottom: 1px solid #000;
-                width: 200px;
-                margin: 20px 0;
-                height: 20px;
-            }}
-        </style>
-    </head>
-    <body>
-        <div class="header">
-            <img src="data:image/png;base64,{header_img}" style="max-width: 200px; height: auto;">
-        </div>
-
-        <div class="content">
-            <h2>OFFER LETTER</h2>
-            <p><strong>Date:</strong> {datetime.now().strftime('%d %B %Y')}</p>
-
-            <p><strong>Dear {name},</strong></p>
-
-            <p>We are pleased to offer you the position of <strong>{position}</strong> at {config.COMPANY_NAME}, starting on {start_date.strftime('%d %B %Y')}.</p>
-
-            {"<p><strong>Annual CTC:</strong> ₹{:,}</p>".format(ctc) if ctc else ""}
-
-            <div class="terms">
-                <h3>Terms and Conditions:</h3>
-                <ul>
-                    <li>This offer is contingent upon successful completion of background verification and reference checks.</li>
-                    <li>You will be required to sign our standard employment agreement and confidentiality agreement.</li>
-                    <li>Your employment will be subject to our company policies and procedures.</li>
-                    <li>This position includes standard company benefits as per our employee handbook.</li>
-                    <li>Probation period: {config.DEFAULT_PROBATION_PERIOD}</li>
-                    <li>Notice period: {config.DEFAULT_NOTICE_PERIOD_CONFIRMED} after confirmation</li>
-                    <li>You will be entitled to leaves as per company policy</li>
-                    <li>All company policies and guidelines must be followed</li>
-                </ul>
-            </div>
-
-            <div class="page-break"></div>
-
-            <p>Please confirm your acceptance of this offer by signing and returning this letter by {(datetime.now() + timedelta(days=7)).strftime('%d %B %Y')}.</p>
-
-            <p>We look forward to working with you and welcome you to the {config.COMPANY_NAME} family!</p>
-
-            <div class="acceptance-section">
-                <p><strong>I HAVE READ THIS OFFER CAREFULLY AND UNDERSTAND ITS TERMS. I HAVE COMPLETELY FILLED OUT THE EXHIBIT A TO THIS OFFER.</strong></p>
-
-                <p><strong>Dated:</strong></p>
-                <div class="signature-line"></div>
-                <p>(Signature of Employee)<br>({name})</p>
-
-                <p style="margin-top: 40px;"><strong>ACCEPTED AND AGREED TO:</strong></p>
-                <p>{config.COMPANY_NAME}</p>
-            </div>
-        </div>
-
-        <div class="signature">
-            <img src="data:image/png;base64,{signature_img}" style="max-width: 120px; height: auto;">
-            <p><strong>{config.HR_MANAGER_NAME}</strong><br>
-            {config.HR_MANAGER_TITLE}</p>
-        </div>
-
-        <div class="footer">
-            <img src="data:image/png;base64,{footer_img}" style="max-width: 100%; height: auto;">
-        </div>
-    </body>
-    </html>
+    A cached PDF is returned right away. Otherwise a Cancel button is shown
+    while the render runs: clicking it (or any other widget, or stopping the
+    app) interrupts this script run, which cancels the render. With
+    cache_only, the PDF only goes into the PDF cache and None is returned.
+    Raises OnboardingError, e.g. RenderTimeoutError for a render past its
+    time limit.
     """
-
-    return html_template
-
-def generate_experience_letter(employee_name, position, start_date, end_date, letter_type="standard"):
-    """Generate HTML experience letter or internship certificate"""
-
-    # Base64 encode images
-    header_img = get_base64_image(config.HEADER_IMAGE_PATH)
-    footer_img = get_base64_image(config.FOOTER_IMAGE_PATH)
-    signature_img = get_base64_image(config.SIGNATURE_IMAGE_PATH)
-
-    # Calculate duration
-    duration_months = (end_date.year - start_date.year) * 12 + (end_date.month - start_date.month)
-
-    # Determine pronouns based on title in employee_name
-    if employee_name.startswith("Mr."):
-        pronouns = {"he_she": "He", "his_her": "his", "his_her_cap": "His", "him_her": "him"}
-        clean_name = employee_name  # Keep Mr. in the name
-    elif employee_name.startswith("Ms."):
-        pronouns = {"he_she": "She", "his_her": "her", "his_her_cap": "Her", "him_her": "her"}
-        clean_name = employee_name  # Keep Ms. in the name
+    if cache_only:
+        if os.path.exists(pdf_cache.cached_pdf_path(html_content, preset)):
+            return None
     else:
-        # Fallback to neutral
-        pronouns = {"he_she": "They", "his_her": "their", "his_her_cap": "Their", "him_her": "them"}
-        clean_name = employee_name
-
-    if letter_type == "internship":
-        # Internship Certificate
-        content = f"""
-        <h3 style="text-align: center; margin: 40px 0; font-weight: bold;">To Whom It May Concern</h3>
-
-        <p style="margin: 30px 0; line-height: 1.8;">This letter is to certify that <strong>{clean_name}</strong> has completed {pronouns['his_her']} internship with Rapid Innovation. {pronouns['his_her_cap']} internship tenure was from <strong>{start_date.strftime('%B %d, %Y')}</strong> to <strong>{end_date.strftime('%B %d, %Y')}</strong>. {pronouns['he_she']} was working with us as an <strong>{position}</strong> and was actively & diligently involved in the projects and tasks assigned to {pronouns['him_her']}.</p>
-
-        <p style="margin: 30px 0; line-height: 1.8;">During this time, we found {pronouns['him_her']} to be punctual and hardworking.</p>
-
-        <p style="margin: 30px 0; line-height: 1.8;">We wish {pronouns['him_her']} a bright future.</p>
-
-        <p style="margin-top: 60px;">Sincerely,</p>
-        """
-    elif letter_type == "dues_not_settled":
-        # Experience Letter - Dues Not Settled
-        content = f"""
-        <h2 style="text-align: center; margin: 40px 0; font-weight: bold;">EXPERIENCE - CERTIFICATE</h2>
-        <h3 style="text-align: center; margin: 20px 0; font-weight: bold;">TO WHOMSOEVER IT MAY CONCERN</h3>
-
-        <p style="margin: 30px 0; line-height: 1.8;">This is to certify that <strong>{clean_name}</strong> worked as a <strong>{position}</strong> with Rapid Innovation from <strong>{start_date.strftime('%B %d, %Y')}</strong> to <strong>{end_date.strftime('%B %d, %Y')}</strong>.</p>
-
-        <p style="margin: 30px 0; line-height: 1.8;">During {pronouns['his_her']} employment with Rapid Innovation, we found {pronouns['his_her']} performance to be satisfactory. However, there are pending dues to be settled.</p>
-
-        <p style="margin: 30px 0; line-height: 1.8;">We wish {pronouns['him_her']} success in {pronouns['his_her']} future endeavors.</p>
+        pdf_bytes = pdf_cache.get_cached_pdf(html_content, preset)
+        if pdf_bytes is not None:
+            return pdf_bytes
 
-        <p style="margin-top: 60px;">Sincerely,</p>
-        """
-    else:
-        # Standard Experience Letter
-        content = f"""
-        <h2 style="text-align: center; margin: 40px 0; font-weight: bold;">EXPERIENCE - CERTIFICATE</h2>
-        <h3 style="text-align: center; margin: 20px 0; font-weight: bold;">TO WHOMSOEVER IT MAY CONCERN</h3>
-
-        <p style="margin: 30px 0; line-height: 1.8;">This is to certify that <strong>{clean_name}</strong> worked as a <strong>{position}</strong> with Rapid Innovation from <strong>{start_date.strftime('%B %d, %Y')}</strong> to <strong>{end_date.strftime('%B %d, %Y')}</strong>.</p>
-
-        <p style="margin: 30px 0; line-height: 1.8;">During {pronouns['his_her']} employment with Rapid Innovation, we found {pronouns['his_her']} performance to be satisfactory. All dues are settled.</p>
-
-        <p style="margin: 30px 0; line-height: 1.8;">We wish {pronouns['him_her']} success in {pronouns['his_her']} future endeavors.</p>
-
-        <p style="margin-top: 60px;">Sincerely,</p>
-        """
-
-    html_template = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="UTF-8">
-        <style>
-            @page {{
-                margin: 40px 40px 280px 40px;
-                @bottom-center {{
-                    content: element(footer);
-                }}
-            }}
-            body {{
-                font-family: {config.DOCUMENT_STYLES['font_family']};
-                margin: 0;
-                padding: 0;
-                font-size: 14px;
-                line-height: 1.6;
-                color: #333;
-                min-height: 100vh;
-            }}
-            .page-content {{
-                padding: 40px;
-                padding-bottom: 280px;
-            }}
-            .header {{
-                text-align: left;
-                margin-bottom: 40px;
-            }}
-            .name-date {{
-                display: flex;
-                justify-content: space-between;
-                align-items: flex-start;
-                margin: 30px 0 50px 0;
-                font-size: 14px;
-            }}
-            .employee-name {{
-                text-align: left;
-                font-weight: bold;
-            }}
-            .document-date {{
-                text-align: right;
-            }}
-            .content {{
-                margin: 40px 0;
-                text-align: justify;
-            }}
-            .signature {{
-                margin-top: 80px;
-                text-align: left;
-                page-break-inside: avoid;
-            }}
-            .footer {{
-                text-align: center;
-                position: running(footer);
-                width: 100%;
-                margin-top: 50px;
-            }}
-            h2 {{
-                color: #1e3c72;
-                font-weight: bold;
-                font-size: 18px;
-                margin: 40px 0 20px 0;
-            }}
-            h3 {{
-                color: #1e3c72;
-                font-weight: bold;
-                font-size: 14px;
-                margin: 20px 0 30px 0;
-            }}
-            p {{
-                margin: 20px 0;
-                text-align: justify;
-                font-size: 14px;
-                line-height: 1.8;
-            }}
-        </style>
-    </head>
-    <body>
-        <div class="page-content">
-            <div class="header">
-                <img src="data:image/png;base64,{header_img}" style="max-width: 150px; height: auto;">
-            </div>
-
-            <div class="name-date">
-                <div class="employee-name">{employee_name}</div>
-                <div class="document-date">{datetime.now().strftime('%d %B %Y')}</div>
-            </div>
-
-            <div class="content">
-                {content}
-            </div>
-
-            <div class="signature">
-                <img src="data:image/png;base64,{signature_img}" style="max-width: 120px; height: auto;">
-                <p><strong>Aarushi Sharma</strong><br>
-                Assistant Manager HR</p>
-            </div>
-        </div>
-
-        <div class="footer">
-            <img src="data:image/png;base64,{footer_img}" style="max-width: 100%; height: auto;">
-        </div>
-    </body>
-    </html>
+    job = submit_render(html_content, preset, cache_only=cache_only)
+    status = st.empty()
+    try:
+        with status.container():
+            st.button("✖️ Cancel", key=f"cancel_render_{job.id}")
+            progress = st.empty()
+        while True:
+            try:
+                return job.result(timeout=0.5)
+            except FuturesTimeoutError:
+                # Every update also lets Streamlit stop or rerun this script
+                progress.caption(f"⏳ Rendering PDF... {job.elapsed():.0f}s")
+    except BaseException:
+        job.cancel()
+        raise
+    finally:
+        status.empty()
+
+def convert_html_to_pdf(html_content, letter=None):
+    """Convert HTML content to PDF bytes with the letter's size preset, reporting failures in the UI (returns None)"""
+    try:
+        return render_in_background(html_content, letter_preset(letter))
+    except OnboardingError as e:
+        st.error(str(e))
+        return None
+
+def open_pdf(html_content, letter=None):
+    """convert_html_to_pdf as a spooled file for attaching to an email, or None (see core/spool.py)"""
+    preset = letter_preset(letter)
+    try:
+        # Fills the PDF cache, which the spooled file is copied from, without passing the PDF back here
+        render_in_background(html_content, preset, cache_only=True)
+        return pdf_cache.render_pdf_spooled(html_content, preset)
+    except OnboardingError as e:
+        st.error(str(e))
+        return None
+
+def send_configured_email(recipient_email, cc_emails, subject, body, attachment_data=None, attachment_name=None,
+                          employee_email=None):
+    """Send an email with the session's SMTP settings; returns (success, message)
+
+    The audit log records the current page as the phase, and employee_email
+    (default: the recipient) as the employee the email is about.
     """
-
-    return html_template
-
-def convert_text_to_html(processed_content):
-    """Convert plain text appointment letter content to HTML with proper formatting"""
-    html_content = ""
-    lines = processed_content.split('\n')
-
-    in_bullet_list = False
-    in_numbered_list = False
-
-    for i, line in enumerate(lines):
-        line = line.strip()
-
-        # Skip the first line (name and date) as it will be handled separately
-        if i == 0:
-            continue
-
-        if not line:
-            # Close any open lists before adding line break
-            if in_bullet_list:
-                html_content += "</ul>"
-                in_bullet_list = False
-            if in_numbered_list:
-                html_content += "</ol>"
-                in_numbered_list = False
-            html_content += "<br>"
-            continue
-
-        # Handle different types of content
-        if line.startswith("●"):
-            # Start bullet list if not already in one
-            if not in_bullet_list:
-                if in_numbered_list:
-                    html_content += "</ol>"
-                    in_numbered_list = False
-                html_content += "<ul>"
-                in_bullet_list = True
-            html_content += f"<li>{line[1:].strip()}</li>"
-
-        elif line == "Confidential":
-            if in_bullet_list:
-                html_content += "</ul>"
-                in_bullet_list = False
-            if in_numbered_list:
-                html_content += "</ol>"
-                in_numbered_list = False
-            html_content += f'<p class="confidential">{line}</p>'
-
-        elif line.startswith("Subject:"):
-            if in_bullet_list:
-                html_content += "</ul>"
-                in_bullet_list = False
-            if in_numbered_list:
-                html_content += "</ol>"
-                in_numbered_list = False
-            html_content += f"<p><strong>{line}</strong></p>"
-
-        elif line.startswith("Dear "):
-            if in_bullet_list:
-                html_content += "</ul>"
-                in_bullet_list = False
-            if in_numbered_list:
-                html_content += "</ol>"
-                in_numbered_list = False
-            html_content += f"<p>{line}</p>"
-
-        elif "TERMS AND CONDITIONS OF EMPLOYMENT" in line:
-            if in_bullet_list:
-                html_content += "</ul>"
-                in_bullet_list = False
-            if in_numbered_list:
-                html_content += "</ol>"
-                in_numbered_list = False
-            html_content += f"<h3>{line}</h3>"
-
-        elif "EMPLOYEE PROPRIETARY INFORMATION" in line or "NON-COMPETITION AND NON-SOLICITATION AGREEMENT" in line:
-            if in_bullet_list:
-                html_content += "</ul>"
-                in_bullet_list = False
-            if in_numbered_list:
-                html_content += "</ol>"
-                in_numbered_list = False
-            html_content += f"<h3>{line}</h3>"
-
-        elif line.startswith(("1.", "2.", "3.", "4.", "5.", "6.", "7.", "8.", "9.", "10.", "11.", "12.", "13.")):
-            # Handle numbered sections
-            if in_bullet_list:
-                html_content += "</ul>"
-                in_bullet_list = False
-            if not in_numbered_list:
-                html_content += "<ol>"
-                in_numbered_list = True
-            # Extract the content after the number
-            content = line.split(".", 1)[1].strip() if "." in line else line
-            html_content += f"<li><strong>{content}</strong></li>"
-
-        elif (line.endswith(":") and len(line) < 80) or line.isupper():
-            # Section headers
-            if in_bullet_list:
-                html_content += "</ul>"
-                in_bullet_list = False
-            if in_numbered_list:
-                html_content += "</ol>"
-                in_numbered_list = False
-            html_content += f"<h4>{line}</h4>"
-
-        elif line.startswith("(") and line.endswith(")"):
-            # Signature lines
-            if in_bullet_list:
-                html_content += "</ul>"
-                in_bullet_list = False
-            if in_numbered_list:
-                html_content += "</ol>"
-                in_numbered_list = False
-            html_content += f"<p style='text-align: center;'>{line}</p>"
-
-        elif "ACCEPTED AND AGREED TO:" in line or "Rapid Innovation" in line or "Assistant Manager HR" in line:
-            # Signature section
-            if in_bullet_list:
-                html_content += "</ul>"
-                in_bullet_list = False
-            if in_numbered_list:
-                html_content += "</ol>"
-                in_numbered_list = False
-            html_content += f"<p style='text-align: center;'><strong>{line}</strong></p>"
-
-        else:
-            # Regular paragraphs
-            if in_bullet_list:
-                html_content += "</ul>"
-                in_bullet_list = False
-            if in_numbered_list:
-                html_content += "</ol>"
-                in_numbered_list = False
-            html_content += f"<p>{line}</p>"
-
-    # Close any remaining open lists
-    if in_bullet_list:
-        html_content += "</ul>"
-    if in_numbered_list:
-        html_content += "</ol>"
-
-    return html_content
-
-def generate_offer_letter_with_salary(offer_type, candidate_name, position, start_date, salary_data=None):
-    """Generate offer letter with detailed salary table for full-time employees"""
-
-    # Base64 encode images
-    header_img = get_base64_image(config.HEADER_IMAGE_PATH)
-    footer_img = get_base64_image(config.FOOTER_IMAGE_PATH)
-    signature_img = get_base64_image(config.SIGNATURE_IMAGE_PATH)
-
-    # Generate salary table HTML if salary data is provided
-    salary_table_html = ""
-    if salary_data and offer_type == "Full-time Employee":
-        salary_table_html = f"""
-        <div style="margin: 20px 0;">
-            <h3 style="text-align: center; color: #1e3c72; margin-bottom: 15px;">COMPENSATION DETAILS (SALARY AND APPLICABLE BENEFITS)</h3>
-            <table style="width: 100%; border-collapse: collapse; margin: 20px 0; font-size: 11px;">
-                <tr style="background-color: #f8f9fa;">
-                    <td style="border: 1px solid #333; padding: 8px; font-weight: bold;">Employee Name</td>
-                    <td style="border: 1px solid #333; padding: 8px;">{candidate_name}</td>
-                    <td style="border: 1px solid #333; padding: 8px;"></td>
-                </tr>
-                <tr style="background-color: #f8f9fa;">
-                    <td style="border: 1px solid #333; padding: 8px; font-weight: bold;">Designation</td>
-                    <td style="border: 1px solid #333; padding: 8px;">{position}</td>
-                    <td style="border: 1px solid #333; padding: 8px;"></td>
-                </tr>
-                <tr style="background-color: #f8f9fa;">
-                    <td style="border: 1px solid #333; padding: 8px; font-weight: bold;">Date of Joining</td>
-                    <td style="border: 1px solid #333; padding: 8px;">{start_date.strftime('%d %B %Y')}</td>
-                    <td style="border: 1px solid #333; padding: 8px;"></td>
-                </tr>
-                <tr style="background-color: #e9ecef;">
-                    <td style="border: 1px solid #333; padding: 8px; font-weight: bold;">Particulars</td>
-                    <td style="border: 1px solid #333; padding: 8px; font-weight: bold; text-align: center;">Monthly</td>
-                    <td style="border: 1px solid #333; padding: 8px; font-weight: bold; text-align: center;">Annual</td>
-                </tr>
-                <tr>
-                    <td style="border: 1px solid #333; padding: 8px;">Basic Salary</td>
-                    <td style="border: 1px solid #333; padding: 8px; text-align: right;">{salary_data['basic_salary_monthly']:,}</td>
-                    <td style="border: 1px solid #333; padding: 8px; text-align: right;">{salary_data['basic_salary_annual']:,}</td>
-                </tr>
-                <tr>
-                    <td style="border: 1px solid #333; padding: 8px;">HRA</td>
-                    <td style="border: 1px solid #333; padding: 8px; text-align: right;">{salary_data['hra_monthly']:,}</td>
-                    <td style="border: 1px solid #333; padding: 8px; text-align: right;">{salary_data['hra_annual']:,}</td>
-                </tr>
-                <tr>
-                    <td style="border: 1px solid #333; padding: 8px;">Special Allowance</td>
-                    <td style="border: 1px solid #333; padding: 8px; text-align: right;">{salary_data['special_allowance_monthly']:,}</td>
-                    <td style="border: 1px solid #333; padding: 8px; text-align: right;">{salary_data['special_allowance_annual']:,}</td>
-                </tr>
-                <tr>
-                    <td style="border: 1px solid #333; padding: 8px;">Medical Allowance</td>
-                    <td style="border: 1px solid #333; padding: 8px; text-align: right;">{salary_data['medical_allowance_monthly']:,}</td>
-                    <td style="border: 1px solid #333; padding: 8px; text-align: right;">{salary_data['medical_allowance_annual']:,}</td>
-                </tr>
-                <tr>
-                    <td style="border: 1px solid #333; padding: 8px;">Books & Periodical</td>
-                    <td style="border: 1px solid #333; padding: 8px; text-align: right;">{salary_data['books_periodical_monthly']:,}</td>
-                    <td style="border: 1px solid #333; padding: 8px; text-align: right;">{salary_data['books_periodical_annual']:,}</td>
-                </tr>
-                <tr>
-                    <td style="border: 1px solid #333; padding: 8px;">Health Club Facility</td>
-                    <td style="border: 1px solid #333; padding: 8px; text-align: right;">{salary_data['health_club_monthly']:,}</td>
-                    <td style="border: 1px solid #333; padding: 8px; text-align: right;">{salary_data['health_club_annual']:,}</td>
-                </tr>
-                <tr>
-                    <td style="border: 1px solid #333; padding: 8px;">Internet & Telephone</td>
-                    <td style="border: 1px solid #333; padding: 8px; text-align: right;">{salary_data['internet_telephone_monthly']:,}</td>
-                    <td style="border: 1px solid #333; padding: 8px; text-align: right;">{salary_data['internet_telephone_annual']:,}</td>
-                </tr>
-                <tr style="background-color: #e9ecef; font-weight: bold;">
-                    <td style="border: 1px solid #333; padding: 8px;">Gross CTC</td>
-                    <td style="border: 1px solid #333; padding: 8px; text-align: right;">{salary_data['gross_ctc_monthly']:,}</td>
-                    <td style="border: 1px solid #333; padding: 8px; text-align: right;">{salary_data['gross_ctc_annual']:,}</td>
-                </tr>
-                <tr>
-                    <td style="border: 1px solid #333; padding: 8px;">PF Employer Contribution</td>
-                    <td style="border: 1px solid #333; padding: 8px; text-align: right;">{salary_data['pf_contribution_monthly']:,}</td>
-                    <td style="border: 1px solid #333; padding: 8px; text-align: right;">{salary_data['pf_contribution_annual']:,}</td>
-                </tr>
-                <tr style="background-color: #d4edda; font-weight: bold;">
-                    <td style="border: 1px solid #333; padding: 8px;">Total CTC</td>
-                    <td style="border: 1px solid #333; padding: 8px; text-align: right;">{salary_data['total_ctc_monthly']:,}</td>
-                    <td style="border: 1px solid #333; padding: 8px; text-align: right;">{salary_data['total_ctc_annual']:,}</td>
-                </tr>
-            </table>
-        </div>
-        """
-
-    # Generate offer letter content based on type
-    if offer_type == "Intern":
-        content = f"""
-        <p style="text-align: right; margin-bottom: 20px;"><strong>Date: {start_date.strftime('%d %B %Y')}</strong></p>
-
-        <h2 style="text-align: center; color: #1e3c72; margin: 30px 0;">Internship Letter</h2>
-
-        <p>Dear {candidate_name},</p>
-
-        <p>With reference to your application and subsequent discussion/interview, we are pleased to offer you the position of <strong>"{position}" Intern</strong> at Rapid Innovation.</p>
-
-        <p>Your internship will start from <strong>{start_date.strftime('%d %B %Y')}</strong> or on a mutually agreed date. This internship is a remote opportunity.</p>
-
-        <p>We are confident that you will be able to make a significant contribution to the success of our Company. Please ensure that you have a stable network connection and uninterrupted power supply at your place. This position is designated as remote until further notified by the management.</p>
-
-        <p>Please sign and share the scanned copy of this letter and return it to the HR Department to indicate your acceptance of this offer.</p>
-
-        <p>Sincerely,</p>
-        """
-    elif offer_type == "Full-time Employee":
-        # Page 1 content only
-        content = f"""
-        <p style="text-align: right; margin-bottom: 20px;"><strong>Date: {start_date.strftime('%d %B %Y')}</strong></p>
-
-        <h2 style="text-align: center; color: #1e3c72; margin: 30px 0;">Offer Letter</h2>
-
-        <p>Dear {candidate_name},</p>
-
-        <p>With reference to your application and subsequent discussion/interview, we are pleased to offer you the position of <strong>"{position}"</strong> at Rapid Innovation.</p>
-
-        <p>Your full time employment will start from <strong>{start_date.strftime('%d %B %Y')}</strong> or on before Wednesday. This offer is subjected to reference check, as provided by you.</p>
-
-        <p>In recognition of your contributions, we are pleased to inform you that your annual CTC will be <strong>Rs. {salary_data['total_ctc_annual']:,}/-</strong> (Rupees {number_to_words(salary_data['total_ctc_annual'])} Only) per annum.</p>
-
-        <p>Please note that we are attaching the pay structure with this offer letter.</p>
-        """
-
-        # Page 2 content
-        page2_content = f"""
-        {salary_table_html}
-
-        <p><strong>Please Note:</strong></p>
-        <p>The Company shall withhold from any amounts payable to you such taxes as may be required to withhold pursuant to applicable laws or regulation. In case of any under-withholding caused due to any wrong declaration by you, you shall be solely responsible to pay the necessary tax and any interest/penalty thereon.</p>
-
-        <p>For,<br>Rapid Innovation.</p>
-
-        <p>You will be on probation for a period of (3) Three Months from the date of your joining. Your performance will be assessed for confirmation on your parameters as per required for the time assessment.</p>
-
-        <p>We are confident that you will be able to make a significant contribution to the success of our Company. Please ensure that you have a stable network connection and uninterrupted power supply at your place. This position is designated as remote until further notified by the management.</p>
-
-        <p>Please sign and share the scanned copy of this letter and return it to the HR Department to indicate your acceptance of this offer.</p>
-
-        <p>Sincerely,</p>
-        """
-    else:  # Contractor
-        content = f"""
-        <p style="text-align: right; margin-bottom: 20px;"><strong>Date: {start_date.strftime('%d %B %Y')}</strong></p>
-
-        <h2 style="text-align: center; color: #1e3c72; margin: 30px 0;">Contract Letter</h2>
-
-        <p>Dear {candidate_name},</p>
-
-        <p>With reference to your application and subsequent discussion/interview, we are pleased to offer you the position of <strong>"{position}" Contractor</strong> at Rapid Innovation.</p>
-
-        <p>Your contract will start from <strong>{start_date.strftime('%d %B %Y')}</strong> or on a mutually agreed date. This contract is a remote opportunity.</p>
-
-        <p>We are confident that you will be able to make a significant contribution to the success of our Company. Please ensure that you have a stable network connection and uninterrupted power supply at your place. This position is designated as remote until further notified by the management.</p>
-
-        <p>Please sign and share the scanned copy of this letter and return it to the HR Department to indicate your acceptance of this offer.</p>
-
-        <p>Sincerely,</p>
-        """
-
-    # Create different templates based on offer type
-    if offer_type == "Full-time Employee":
-        # Full-time offer letter template with clean format (same as internship)
-        html_template = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="UTF-8">
-            <style>
-                @page {{
-                    margin: 40px 40px 120px 40px;
-                }}
-                body {{
-                    font-family: {config.DOCUMENT_STYLES['font_family']};
-                    margin: 0;
-                    padding: 0;
-                    line-height: {config.DOCUMENT_STYLES['line_height']};
-                    font-size: 12px;
-                    color: #333;
-                }}
-                .page-content {{
-                    padding: 20px;
-                    padding-bottom: 120px;
-                    min-height: calc(100vh - 240px);
-                }}
-                .header {{ text-align: left; margin-bottom: 30px; }}
-                .content {{ margin: 20px 0; }}
-                .signature {{ margin-top: 50px; text-align: left; page-break-inside: avoid; }}
-                .footer {{
-                    text-align: center;
-                    width: 100%;
-                    margin-top: 20px;
-                    page-break-inside: avoid;
-                }}
-                .footer-bottom {{
-                    text-align: center;
-                    width: 100%;
-                    margin-top: 180px;
-                    page-break-inside: avoid;
-                }}
-                h1, h2, h3 {{ color: {config.DOCUMENT_STYLES['primary_color']}; }}
-                p {{ text-align: justify; margin: 8px 0; line-height: 1.4; }}
-                table {{ border-collapse: collapse; width: 100%; margin: 20px 0; }}
-                td {{ border: 1px solid #333; padding: 8px; }}
-            </style>
-        </head>
-        <body>
-            <!-- Page 1 -->
-            <div class="page-content">
-                <div class="header">
-                    <img src="data:image/png;base64,{header_img}" style="max-width: 150px; height: auto;">
-                </div>
-
-                <div class="content">
-                    {content}
-                </div>
-
-                <div class="signature">
-                    <img src="data:image/png;base64,{signature_img}" style="max-width: 80px; height: auto;">
-                    <p><strong>Aarushi Sharma</strong><br>
-                    Assistant Manager HR</p>
-                    <br><br>
-                    <p style="text-align: right;"><strong>Accepted By</strong><br>
-                    {candidate_name}</p>
-                </div>
-
-                <div class="footer-bottom" style="margin-top: 470px;">
-                    <img src="data:image/png;base64,{footer_img}" style="max-width: 100%; height: auto;">
-                </div>
-            </div>
-
-            <!-- Page 2 -->
-            <div style="page-break-before: always;"></div>
-            <div class="page-content">
-                <div class="header">
-                    <img src="data:image/png;base64,{header_img}" style="max-width: 150px; height: auto;">
-                </div>
-
-                <div class="content">
-                    {page2_content}
-                </div>
-
-                <div class="signature">
-                    <img src="data:image/png;base64,{signature_img}" style="max-width: 80px; height: auto;">
-                    <p><strong>Aarushi Sharma</strong><br>
-                    Assistant Manager HR</p>
-                    <br><br>
-                    <p style="text-align: right;"><strong>Accepted By</strong><br>
-                    {candidate_name}</p>
-                </div>
-
-                <div class="footer">
-                    <img src="data:image/png;base64,{footer_img}" style="max-width: 100%; height: auto;">
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-    else:
-        # Internship letter template (existing clean format)
-        html_template = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="UTF-8">
-            <style>
-                @page {{
-                    margin: 40px 40px 500px 40px;
-                    @bottom-center {{
-                        content: element(footer);
-                    }}
-                }}
-                body {{
-                    font-family: {config.DOCUMENT_STYLES['font_family']};
-                    margin: 0;
-                    padding: 0;
-                    line-height: {config.DOCUMENT_STYLES['line_height']};
-                    font-size: 12px;
-                    color: #333;
-                    min-height: 100vh;
-                    position: relative;
-                }}
-                .page-content {{
-                    padding: 20px;
-                    padding-bottom: 500px;
-                }}
-                .header {{ text-align: left; margin-bottom: 30px; }}
-                .content {{ margin: 20px 0; }}
-                .signature {{ margin-top: 50px; text-align: left; page-break-inside: avoid; }}
-                .footer {{
-                    text-align: center;
-                    position: running(footer);
-                    width: 100%;
-                    margin-top: 50px;
-                }}
-                h1, h2, h3 {{ color: {config.DOCUMENT_STYLES['primary_color']}; }}
-                p {{ text-align: justify; margin: 8px 0; line-height: 1.4; }}
-                table {{ border-collapse: collapse; width: 100%; }}
-                td {{ border: 1px solid #333; padding: 8px; }}
-            </style>
-        </head>
-        <body>
-            <div class="page-content">
-                <div class="header">
-                    <img src="data:image/png;base64,{header_img}" style="max-width: 200px; height: auto;">
-                </div>
-
-                <div class="content">
-                    {content}
-                </div>
-
-                <div class="signature">
-                    <img src="data:image/png;base64,{signature_img}" style="max-width: 80px; height: auto;">
-                    <p><strong>Aarushi Sharma</strong><br>
-                    Assistant Manager HR</p>
-                    <br><br>
-                    <p style="text-align: right;"><strong>Accepted By</strong><br>
-                    {candidate_name}</p>
-                </div>
-            </div>
-
-            <div class="footer">
-                <img src="data:image/png;base64,{footer_img}" style="max-width: 100%; height: auto;">
-            </div>
-        </body>
-        </html>
-        """
-
-    return html_template
-
-def number_to_words(number):
-    """Convert number to words (simplified version)"""
-    # This is a simplified version - you might want to use a library like num2words for production
-    if number >= 100000:
-        lakhs = number // 100000
-        remainder = number % 100000
-        if remainder == 0:
-            return f"{lakhs} Lakh"
-        else:
-            return f"{lakhs} Lakh {remainder:,}"
-    else:
-        return f"{number:,}"
-
-def generate_appointment_letter(name, position, joining_date):
-    """Generate HTML appointment letter with content from appointment_letter.txt"""
-
-    # Read the appointment letter template
+    email_config = st.session_state.email_config
+    return send_email(
+        email_config['smtp_server'],
+        email_config['smtp_port'],
+        email_config['sender_email'],
+        email_config['sender_password'],
+        recipient_email,
+        cc_emails,
+        subject,
+        body,
+        attachment_data,
+        attachment_name,
+        phase=page.split(" ", 1)[-1],
+        employee_email=employee_email
+    )
+
+# Shared store for generated documents; session state only keeps their keys
+@st.cache_resource
+def get_document_store():
+    return DocumentStore(config.DOCUMENT_STORE_MAX_BYTES, config.DOCUMENT_STORE_TTL_SECONDS)
+
+# Fill the per-process caches (encoded images, compiled templates) once per server
+@st.cache_resource
+def prewarm_caches():
+    return prewarm_process()
+
+prewarm_caches()
+
+def get_session_id():
+    """Return the id of the current browser session"""
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx else "default"
+
+def store_document(state_key, content):
+    """Put a generated document in the shared store and remember its key in the session"""
+    store = get_document_store()
+    old_key = st.session_state.get(state_key)
+    new_key = store.put(content, owner=get_session_id())
+    if old_key and old_key != new_key:
+        store.release(old_key, get_session_id())
+    st.session_state[state_key] = new_key
+
+def load_document(state_key):
+    """Fetch the session's document from the shared store (None if it has expired)"""
+    key = st.session_state.get(state_key)
+    if not key:
+        return None
+    content = get_document_store().get(key)
+    if content is None:
+        st.session_state[state_key] = None
+    return content
+
+# Employee records shared by all phases, used to prefill forms
+@st.cache_resource
+def get_employee_store():
+    return EmployeeStore()
+
+def employee_prefill(key):
+    """Search box above a phase form; returns the chosen employee record ({} if none)"""
+    query = st.text_input("🔎 Prefill from employee records", key=f"{key}_lookup",
+                          placeholder="Start typing a name or email")
+    if not query:
+        return {}
+    matches = get_employee_store().lookup(query)
+    if not matches:
+        st.caption("No matching employees found.")
+        return {}
+    choice = st.selectbox("Employee", range(len(matches)), key=f"{key}_pick",
+                          format_func=lambda i: f"{matches[i]['name'] or '—'} <{matches[i]['email']}>")
+    return matches[choice]
+
+def prefill_date(employee, field):
+    """Stored ISO date for the field, or None (today) if unknown"""
+    value = employee.get(field)
+    return date.fromisoformat(value) if value else None
+
+def prefill_index(options, value):
+    return options.index(value) if value in options else 0
+
+def record_employee(email, phase, action, status=None, **fields):
+    """Write a phase result back to the employee records (a failure only shows a warning)"""
     try:
-        with open('appointment_letter.txt', 'r', encoding='utf-8') as file:
-            letter_content = file.read()
-    except FileNotFoundError:
-        st.error("appointment_letter.txt file not found!")
-        return ""
-
-    # Base64 encode images
-    header_img = get_base64_image(config.HEADER_IMAGE_PATH)
-    footer_img = get_base64_image(config.FOOTER_IMAGE_PATH)
-    signature_img = get_base64_image(config.SIGNATURE_IMAGE_PATH)
-
-    # Process the letter content to replace placeholders
-    processed_content = letter_content.replace("Naman Nagi", name)
-    processed_content = processed_content.replace("Associate Engineer", position)
-    processed_content = processed_content.replace("18th June 2025", joining_date.strftime('%d %B %Y'))
-
-    # Convert text to HTML with proper formatting
-    html_content = convert_text_to_html(processed_content)
-
-    html_template = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="UTF-8">
-        <style>
-            body {{
-                font-family: {config.DOCUMENT_STYLES['font_family']};
-                margin: 0;
-                padding: 20px;
-                line-height: {config.DOCUMENT_STYLES['line_height']};
-                font-size: 12px;
-                color: #333;
-            }}
-            .header {{ text-align: left; margin-bottom: 30px; }}
-            .content {{ margin: 20px 0; }}
-            .signature {{ margin-top: 50px; text-align: left; }}
-            .footer {{ text-align: center; margin-top: 50px; }}
-            h1, h2, h3 {{
-                color: {config.DOCUMENT_STYLES['primary_color']};
-                margin-top: 20px;
-                margin-bottom: 10px;
-                font-weight: bold;
-            }}
-            h4 {{
-                color: {config.DOCUMENT_STYLES['primary_color']};
-                margin-top: 15px;
-                margin-bottom: 8px;
-                font-weight: bold;
-                font-size: 13px;
-            }}
-            .confidential {{
-                text-align: right;
-                font-weight: bold;
-                margin-bottom: 10px;
-            }}
-            .date-header {{
-                text-align: right;
-                margin-bottom: 20px;
-            }}
-            ul {{
-                margin: 10px 0;
-                padding-left: 25px;
-                list-style-type: disc;
-            }}
-            ol {{
-                margin: 10px 0;
-                padding-left: 25px;
-                list-style-type: decimal;
-            }}
-            li {{
-                margin: 8px 0;
-                text-align: justify;
-                line-height: 1.4;
-            }}
-            p {{
-                text-align: justify;
-                margin: 8px 0;
-                line-height: 1.4;
-            }}
-            .signature-section {{
-                margin-top: 40px;
-                text-align: left;
-            }}
-            .signature-line {{
-                margin: 5px 0;
-            }}
-        </style>
-    </head>
-    <body>
-        <div class="header">
-            <img src="data:image/png;base64,{header_img}" style="max-width: 150px; height: auto;">
-        </div>
-
-        <div class="content">
-            {html_content}
-        </div>
-
-        <div class="signature">
-            <img src="data:image/png;base64,{signature_img}" style="max-width: 120px; height: auto;">
-            <p><strong>Aarushi Sharma</strong><br>
-            Assistant Manager HR</p>
-            <br><br>
-            <p style="text-align: right;"><strong>Accepted By</strong><br>
-            {name}</p>
-        </div>
-
-        <div class="footer">
-            <img src="data:image/png;base64,{footer_img}" style="max-width: 100%; height: auto;">
-        </div>
-    </body>
-    </html>
+        stage = get_employee_store().record(email, phase, action, status=status, **fields)
+    except (sqlite3.Error, ValueError) as e:
+        st.warning(f"⚠️ Could not update employee records: {e}")
+        return
+    if status and stage != status:
+        st.info(f"ℹ️ Employee stays at {stage_label(stage)}: it cannot move to {stage_label(status)} from there.")
+
+# Exit checklists and the asset inventory returns are matched against
+@st.cache_resource
+def get_exit_tracker():
+    return ExitTracker()
+
+def track_exit(email, step, detail=None):
+    """Tick an exit step off in the tracker (a failure only shows a warning)"""
+    if not email:
+        return
+    try:
+        get_exit_tracker().mark(email, step, detail)
+    except (sqlite3.Error, ValueError) as e:
+        st.warning(f"⚠️ Could not update the exit tracker: {e}")
+
+def show_exit_checklist(email):
+    """Exit progress and assets still held by an employee"""
+    tracker = get_exit_tracker()
+    exit_row = tracker.get(email)
+    held = tracker.held_by(email)
+    if not exit_row and not held:
+        return
+    if exit_row:
+        st.markdown("**Exit checklist:** " + " · ".join(
+            f"{'✅' if exit_row[f'{step}_at'] else '⬜'} {EXIT_STEP_LABELS[step]}" for step in EXIT_STEPS
+        ))
+    if held:
+        st.markdown("**Assets held:** " + ", ".join(
+            f"{asset['asset_type']} `{asset['serial']}` ({asset['status'].replace('_', ' ')})" for asset in held
+        ))
+
+# Archive of every sent or downloaded letter, for re-download and resend
+@st.cache_resource
+def get_letter_archive():
+    return LetterArchive()
+
+def archive_letter(pdf, letter_type, filename, employee_email, recipient=None, subject=None, version=None,
+                   html=None, name=None, position=None):
+    """Keep a copy of the letter (PDF bytes or a binary file) in the archive and the search index
+
+    A failure only shows a warning.
     """
-
-    return html_template
-
-# Email sending function
-def send_email(smtp_server, smtp_port, sender_email, sender_password, recipient_email, cc_emails, subject, body, attachment_data=None, attachment_name=None):
     try:
-        msg = MIMEMultipart()
-        msg['From'] = sender_email
-        msg['To'] = recipient_email
-        if cc_emails:
-            msg['Cc'] = ', '.join(cc_emails)
-        msg['Subject'] = subject
-
-        msg.attach(MIMEText(body, 'html'))
-
-        if attachment_data and attachment_name:
-            part = MIMEBase('application', 'octet-stream')
-            part.set_payload(attachment_data)
-            encoders.encode_base64(part)
-            part.add_header(
-                'Content-Disposition',
-                f'attachment; filename= {attachment_name}'
-            )
-            msg.attach(part)
-        
-        server = smtplib.SMTP(smtp_server, smtp_port)
-        server.starttls()
-        server.login(sender_email, sender_password)
-        
-        recipients = [recipient_email] + (cc_emails if cc_emails else [])
-        server.sendmail(sender_email, recipients, msg.as_string())
-        server.quit()
-        
-        return True, "Email sent successfully!"
-    except Exception as e:
-        return False, f"Error sending email: {str(e)}"
+        digest = get_letter_archive().put(pdf, letter_type, filename, employee_email, recipient, subject,
+                                          version or template_version(letter_type))
+    except (OSError, sqlite3.Error) as e:
+        st.warning(f"⚠️ Could not archive the letter: {e}")
+        return
+    index_letter(digest, letter_type, filename, html, name, position, subject, employee_email, recipient)
+
+def show_pipeline_dashboard():
+    """Employees per stage and those stuck in a stage for too long"""
+    store = get_employee_store()
+    counts = store.stage_counts()
+
+    st.markdown("### 📊 Pipeline Dashboard")
+    if not counts:
+        st.info("No employees in the pipeline yet. Sending emails from the phase pages adds them here.")
+        return
+
+    for row_start in range(0, len(STAGES), 5):
+        columns = st.columns(5)
+        for column, stage in zip(columns, STAGES[row_start:row_start + 5]):
+            column.metric(stage_label(stage), counts.get(stage, 0))
+
+    stuck_rows = []
+    now = datetime.now()
+    for stage in STAGES:
+        days = config.PIPELINE_STUCK_DAYS.get(stage)
+        if not days or not counts.get(stage):
+            continue
+        count, oldest = store.stuck(stage, days * 24 * 60 * 60)
+        for employee in oldest:
+            stuck_rows.append({
+                'Stage': stage_label(stage),
+                'Employee': employee['name'] or "—",
+                'Email': employee['email'],
+                'Days in Stage': (now - datetime.fromtimestamp(employee['status_changed_at'])).days,
+            })
+        if count > len(oldest):
+            stuck_rows.append({'Stage': stage_label(stage), 'Employee': f"... and {count - len(oldest)} more",
+                               'Email': "", 'Days in Stage': None})
+
+    if stuck_rows:
+        st.markdown("#### ⏳ Stuck Items")
+        st.dataframe(stuck_rows, use_container_width=True, hide_index=True)
+    else:
+        st.success("✅ Nobody is stuck in a stage.")
 
 # Sidebar for navigation
 st.sidebar.title("Navigation")
@@ -1213,9 +491,29 @@ page = st.sidebar.selectbox("Choose Process", [
     "📋 Phase 3: Appointment Letters",
     "🎯 Phase 4: Welcome & Onboarding",
     "🔍 Phase 5: Background Verification",
-    "🚪 Phase 6: Exit Process"
+    "🚪 Phase 6: Exit Process",
+    "🗄️ Letter Archive",
+    "📬 Email Audit Log",
+    "🔎 Search",
+    "📦 Assets & Exits"
 ])
 
+with st.sidebar.expander("🧠 Memory Report"):
+    report = get_document_store().report()
+    st.markdown(f"**Stored documents:** {report['documents']} "
+                f"({report['bytes'] / 1024:,.0f} KB of {report['max_bytes'] / 1024 / 1024:,.0f} MB)")
+    st.markdown(f"**Evictions:** {report['evictions']} (TTL {report['ttl_seconds'] // 60} min)")
+    st.markdown(f"**This session's state:** {estimate_size(dict(st.session_state)) / 1024:,.1f} KB")
+    if report['sessions']:
+        st.table([
+            {
+                'Session': session['session'][:8] + (" (you)" if session['session'] == get_session_id() else ""),
+                'Documents': session['documents'],
+                'KB': round(session['bytes'] / 1024, 1)
+            }
+            for session in report['sessions']
+        ])
+
 # Email configuration in session state
 if 'email_config' not in st.session_state:
     # Try to load from Streamlit secrets or environment variables
@@ -1236,6 +534,9 @@ if page == "🏠 Home":
     </div>
     """, unsafe_allow_html=True)
     
+    show_pipeline_dashboard()
+    st.markdown("---")
+    
     st.markdown("""
     This comprehensive onboarding automation system helps you manage the complete employee onboarding process:
     
@@ -1339,11 +640,7 @@ elif page == "📧 Email Configuration":
         
         if st.button("📤 Send Test Email"):
             if test_email and validate_email(test_email):
-                success, message = send_email(
-                    st.session_state.email_config['smtp_server'],
-                    st.session_state.email_config['smtp_port'],
-                    st.session_state.email_config['sender_email'],
-                    st.session_state.email_config['sender_password'],
+                success, message = send_configured_email(
                     test_email,
                     [],
                     "Test Email - Rapid Innovation Onboarding System",
@@ -1364,20 +661,62 @@ elif page == "📝 Phase 1: Initial Documents":
     </div>
     """, unsafe_allow_html=True)
     
+    with st.expander("📥 Bulk Import New Hires (CSV/XLSX)"):
+        st.markdown("Columns: **name**, **email** (required), position, employee_type, start_date, "
+                    "official_email, title, manager_name, manager_email, employee_code.")
+        import_file = st.file_uploader("New hires spreadsheet", type=['csv', 'xlsx'])
+        import_batch_size = st.number_input("Rows per transaction", min_value=50, max_value=10000, value=500, step=50)
+        check_domains = st.checkbox("Check that email domains accept mail (slower)")
+
+        if import_file and st.button("📥 Import"):
+            import_status = st.empty()
+            rejects_report = io.StringIO()
+
+            def show_import_progress(stats):
+                import_status.markdown(f"⏳ {stats['rows']:,} rows read, {stats['imported']:,} imported, "
+                                       f"{stats['rejected']:,} rejected")
+
+            try:
+                stats = run_import(import_file, get_employee_store(), batch_size=int(import_batch_size),
+                                   filename=import_file.name, report=rejects_report,
+                                   check_deliverability=check_domains, progress=show_import_progress)
+            except (ImportFileError, sqlite3.Error) as e:
+                import_status.empty()
+                st.error(f"❌ Import failed: {e}")
+            else:
+                import_status.empty()
+                st.success(f"✅ Imported {stats['imported']:,} of {stats['rows']:,} rows in "
+                           f"{stats['elapsed_seconds']:.1f}s ({stats['rows_per_second']:,.0f} rows/sec)")
+                if stats['rejected']:
+                    st.warning(f"⚠️ {stats['rejected']:,} rows were rejected: " +
+                               ", ".join(f"{field} ({count})" for field, count in sorted(stats['reasons'].items())))
+                    st.download_button(
+                        label="📥 Download Rejected Rows",
+                        data=rejects_report.getvalue(),
+                        file_name="rejected_rows.csv",
+                        mime="text/csv"
+                    )
+    
     if not st.session_state.email_config['configured']:
         st.warning("⚠️ Please configure email settings first in the Email Configuration section.")
         st.stop()
     
+    prefill = employee_prefill("initial_docs")
+    
     # Employee type selection
-    employee_type = st.selectbox("Select Employee Type", ["Intern", "Full-time Employee"])
+    employee_types = ["Intern", "Full-time Employee"]
+    employee_type = st.selectbox("Select Employee Type", employee_types,
+                                 index=prefill_index(employee_types, prefill.get('employee_type')))
     
     with st.form("initial_docs_form"):
         col1, col2 = st.columns(2)
         
         with col1:
-            employee_name = st.text_input("Employee Name*", placeholder="John Doe")
-            employee_email = st.text_input("Employee Email*", placeholder="john.doe@email.com")
-            position = st.text_input("Position/Designation*", placeholder="Software Engineer")
+            employee_name = st.text_input("Employee Name*", value=prefill.get('name') or "", placeholder="John Doe")
+            employee_email = st.text_input("Employee Email*", value=prefill.get('personal_email') or prefill.get('email', ""),
+                                           placeholder="john.doe@email.com")
+            position = st.text_input("Position/Designation*", value=prefill.get('position') or "",
+                                     placeholder="Software Engineer")
         
         with col2:
             cc_emails = st.text_area("CC Emails (one per line)", placeholder="hr@rapidinnovation.com\nmanager@rapidinnovation.com")
@@ -1388,63 +727,12 @@ elif page == "📝 Phase 1: Initial Documents":
             if employee_name and employee_email and position:
                 if validate_email(employee_email):
                     # Parse CC emails
-                    cc_list = [email.strip() for email in cc_emails.split('\n') if email.strip() and validate_email(email.strip())]
+                    cc_list = parse_cc_list(cc_emails)
                     
-                    # Generate email content based on employee type
-                    if employee_type == "Intern":
-                        subject = f'Rapid Innovation - Important Documents Required - "{position}" Intern'
-                        body = f"""
-                        <html>
-                        <body>
-                        <p>Hi {employee_name},</p>
-                        <p>Greetings from Rapid Innovation!!</p>
-                        <p>This is regarding your joining for the "{position}" Intern position at Rapid Innovation.</p>
-                        <p>As a part of our Employment Joining process, we would require soft copies of the below-mentioned documents:</p>
-                        <ol>
-                            <li>Educational Docs (10th, 12th, Graduation & Post Graduation Certificates)</li>
-                            <li>ID proofs (Aadhaar card, Passport, Driving license, PAN card)</li>
-                            <li>Passport-size photographs</li>
-                        </ol>
-                        <p>Also, please share your full name and address as per your documents.</p>
-                        <p>Feel free to get in touch with me in case of any queries or questions.</p>
-                        <br>
-                        <p>Thanks & Regards<br>
-                        Team HR<br>
-                        Rapid Innovation</p>
-                        </body>
-                        </html>
-                        """
-                    else:  # Full-time Employee
-                        subject = f'Rapid Innovation - Important Documents Required - {position}'
-                        body = f"""
-                        <html>
-                        <body>
-                        <p>Hi {employee_name},</p>
-                        <p>Greetings from Rapid Innovation!!</p>
-                        <p>This is regarding your joining for the "{position}" position at Rapid Innovation.</p>
-                        <p>As a part of our Employment Joining process, we would require soft copies of the below-mentioned documents:</p>
-                        <ul>
-                            <li>Educational Docs (10th, 12th, Graduation & Post Graduation Certificates)</li>
-                            <li>ID proofs (Aadhaar card, Passport, Driving license, PAN card)</li>
-                            <li>Resignation/relieving letters, the Last three Months of salary slips, Appointment letters, and offer letters from previous organizations.</li>
-                            <li>Passport-size photograph</li>
-                        </ul>
-                        <p>Also, please share your full name and address as per your documents.</p>
-                        <p>Feel free to get in touch with me in case of any queries or questions.</p>
-                        <br>
-                        <p>Thanks & Regards<br>
-                        Team HR<br>
-                        Rapid Innovation</p>
-                        </body>
-                        </html>
-                        """
+                    subject, body = initial_documents_email(employee_type, employee_name, position)
                     
                     # Send email
-                    success, message = send_email(
-                        st.session_state.email_config['smtp_server'],
-                        st.session_state.email_config['smtp_port'],
-                        st.session_state.email_config['sender_email'],
-                        st.session_state.email_config['sender_password'],
+                    success, message = send_configured_email(
                         employee_email,
                         cc_list,
                         subject,
@@ -1452,6 +740,9 @@ elif page == "📝 Phase 1: Initial Documents":
                     )
                     
                     if success:
+                        record_employee(employee_email, "Phase 1", "docs_requested", status="docs_requested",
+                                        name=employee_name, personal_email=employee_email,
+                                        employee_type=employee_type, position=position)
                         st.markdown('<div class="success-box">✅ Initial document request email sent successfully!</div>', 
                                   unsafe_allow_html=True)
                         
@@ -1484,21 +775,53 @@ elif page == "📄 Phase 2: Offer Letters":
     # Initialize session state for offer letter data
     if 'offer_letter_data' not in st.session_state:
         st.session_state.offer_letter_data = None
-    if 'offer_letter_html' not in st.session_state:
-        st.session_state.offer_letter_html = None
+    if 'offer_letter_key' not in st.session_state:
+        st.session_state.offer_letter_key = None
+
+    prefill = employee_prefill("offer_letter")
 
     # Offer letter type selection
-    offer_type = st.selectbox("Select Offer Type", ["Intern", "Full-time Employee", "Contractor"])
+    offer_types = ["Intern", "Full-time Employee", "Contractor"]
+    offer_type = st.selectbox("Select Offer Type", offer_types,
+                              index=prefill_index(offer_types, prefill.get('employee_type')))
+
+    if offer_type == "Full-time Employee":
+        with st.expander("🎯 Fill Salary from a Target CTC"):
+            col1, col2 = st.columns([2, 1])
+            with col1:
+                target_ctc = st.number_input("Target Annual CTC (₹)", min_value=0, value=500000, step=10000)
+            with col2:
+                st.markdown("<br>", unsafe_allow_html=True)
+                if st.button("🎯 Calculate Breakdown"):
+                    try:
+                        solved = solve_ctc_one(target_ctc)
+                        st.session_state.salary_defaults = solved
+                        # Drop the old widget values so the form picks up the new defaults
+                        for component in SALARY_COMPONENTS:
+                            st.session_state.pop(f"form_{component}", None)
+                        st.session_state.pop("form_pf", None)
+                    except OnboardingError as e:
+                        st.error(f"❌ {e}")
+            solved = st.session_state.get('salary_defaults')
+            if solved:
+                st.caption(f"Total CTC ₹{solved['total_ctc_annual']:,} per year "
+                           f"(Basic {config.SALARY_POLICY['basic_percent_of_ctc']}% of CTC, "
+                           f"HRA {config.SALARY_POLICY['hra_percent_of_basic']}% of Basic, "
+                           f"PF capped at ₹{config.SALARY_POLICY['pf_cap_monthly']:,}/month, see SALARY_POLICY in config.py)")
+
+    salary_defaults = st.session_state.get('salary_defaults') or {}
 
     with st.form("offer_letter_form"):
         st.markdown("### 📝 Basic Information")
         col1, col2 = st.columns(2)
 
         with col1:
-            candidate_name = st.text_input("Candidate Name*", placeholder="John Doe")
-            candidate_email = st.text_input("Candidate Email*", placeholder="john.doe@email.com")
-            position = st.text_input("Position/Designation*", placeholder="Software Engineer")
-            start_date = st.date_input("Start Date*")
+            candidate_name = st.text_input("Candidate Name*", value=prefill.get('name') or "", placeholder="John Doe")
+            candidate_email = st.text_input("Candidate Email*", value=prefill.get('personal_email') or prefill.get('email', ""),
+                                            placeholder="john.doe@email.com")
+            position = st.text_input("Position/Designation*", value=prefill.get('position') or "",
+                                     placeholder="Software Engineer")
+            start_date = st.date_input("Start Date*", value=prefill_date(prefill, 'start_date'))
 
         with col2:
             cc_emails = st.text_area("CC Emails (one per line)", placeholder="hr@rapidinnovation.com")
@@ -1512,50 +835,32 @@ elif page == "📄 Phase 2: Offer Letters":
 
             with col1:
                 st.markdown("**Monthly Amounts:**")
-                basic_salary_monthly = st.number_input("Basic Salary (Monthly)", min_value=0, value=19934, step=1)
-                hra_monthly = st.number_input("HRA (Monthly)", min_value=0, value=9967, step=1)
-                special_allowance_monthly = st.number_input("Special Allowance (Monthly)", min_value=0, value=4716, step=1)
-                medical_allowance_monthly = st.number_input("Medical Allowance (Monthly)", min_value=0, value=1250, step=1)
-                books_periodical_monthly = st.number_input("Books & Periodical (Monthly)", min_value=0, value=500, step=1)
-                health_club_monthly = st.number_input("Health Club Facility (Monthly)", min_value=0, value=1000, step=1)
-                internet_telephone_monthly = st.number_input("Internet & Telephone (Monthly)", min_value=0, value=2500, step=1)
-
-            with col2:
-                st.markdown("**Annual Amounts (Auto-calculated):**")
-                basic_salary_annual = basic_salary_monthly * 12
-                hra_annual = hra_monthly * 12
-                special_allowance_annual = special_allowance_monthly * 12
-                medical_allowance_annual = medical_allowance_monthly * 12
-                books_periodical_annual = books_periodical_monthly * 12
-                health_club_annual = health_club_monthly * 12
-                internet_telephone_annual = internet_telephone_monthly * 12
-
-                st.text_input("Basic Salary (Annual)", value=f"{basic_salary_annual:,}", disabled=True)
-                st.text_input("HRA (Annual)", value=f"{hra_annual:,}", disabled=True)
-                st.text_input("Special Allowance (Annual)", value=f"{special_allowance_annual:,}", disabled=True)
-                st.text_input("Medical Allowance (Annual)", value=f"{medical_allowance_annual:,}", disabled=True)
-                st.text_input("Books & Periodical (Annual)", value=f"{books_periodical_annual:,}", disabled=True)
-                st.text_input("Health Club Facility (Annual)", value=f"{health_club_annual:,}", disabled=True)
-                st.text_input("Internet & Telephone (Annual)", value=f"{internet_telephone_annual:,}", disabled=True)
+                monthly = {
+                    component: st.number_input(f"{SALARY_LABELS[component]} (Monthly)", min_value=0,
+                                               value=salary_defaults.get(f'{component}_monthly', default), step=1,
+                                               key=f"form_{component}")
+                    for component, default in SALARY_COMPONENTS.items()
+                }
 
             with col3:
                 st.markdown("**Totals & Deductions:**")
-                gross_ctc_monthly = (basic_salary_monthly + hra_monthly + special_allowance_monthly +
-                                   medical_allowance_monthly + books_periodical_monthly + health_club_monthly +
-                                   internet_telephone_monthly)
-                gross_ctc_annual = gross_ctc_monthly * 12
-
-                pf_contribution_monthly = st.number_input("PF Employer Contribution (Monthly)", min_value=0, value=1800, step=1)
-                pf_contribution_annual = pf_contribution_monthly * 12
+                pf_contribution_monthly = st.number_input("PF Employer Contribution (Monthly)", min_value=0,
+                                                          value=salary_defaults.get('pf_contribution_monthly',
+                                                                                    DEFAULT_PF_CONTRIBUTION),
+                                                          step=1, key="form_pf")
+                form_salary_data = build_salary_data(monthly, pf_contribution_monthly)
+
+                st.text_input("Gross CTC (Monthly)", value=f"{form_salary_data['gross_ctc_monthly']:,}", disabled=True)
+                st.text_input("Gross CTC (Annual)", value=f"{form_salary_data['gross_ctc_annual']:,}", disabled=True)
+                st.text_input("PF Contribution (Annual)", value=f"{form_salary_data['pf_contribution_annual']:,}", disabled=True)
+                st.text_input("Total CTC (Monthly)", value=f"{form_salary_data['total_ctc_monthly']:,}", disabled=True)
+                st.text_input("Total CTC (Annual)", value=f"{form_salary_data['total_ctc_annual']:,}", disabled=True)
 
-                total_ctc_monthly = gross_ctc_monthly + pf_contribution_monthly
-                total_ctc_annual = total_ctc_monthly * 12
-
-                st.text_input("Gross CTC (Monthly)", value=f"{gross_ctc_monthly:,}", disabled=True)
-                st.text_input("Gross CTC (Annual)", value=f"{gross_ctc_annual:,}", disabled=True)
-                st.text_input("PF Contribution (Annual)", value=f"{pf_contribution_annual:,}", disabled=True)
-                st.text_input("Total CTC (Monthly)", value=f"{total_ctc_monthly:,}", disabled=True)
-                st.text_input("Total CTC (Annual)", value=f"{total_ctc_annual:,}", disabled=True)
+            with col2:
+                st.markdown("**Annual Amounts (Auto-calculated):**")
+                for component in SALARY_COMPONENTS:
+                    st.text_input(f"{SALARY_LABELS[component]} (Annual)",
+                                  value=f"{form_salary_data[component + '_annual']:,}", disabled=True)
 
         submitted = st.form_submit_button("📄 Generate Offer Letter")
 
@@ -1563,33 +868,10 @@ elif page == "📄 Phase 2: Offer Letters":
             if candidate_name and candidate_email and position and start_date:
                 if validate_email(candidate_email):
                     # Parse CC emails
-                    cc_list = [email.strip() for email in cc_emails.split('\n') if email.strip() and validate_email(email.strip())]
+                    cc_list = parse_cc_list(cc_emails)
 
                     # Prepare salary data for full-time employees
-                    salary_data = None
-                    if offer_type == "Full-time Employee":
-                        salary_data = {
-                            'basic_salary_monthly': basic_salary_monthly,
-                            'basic_salary_annual': basic_salary_annual,
-                            'hra_monthly': hra_monthly,
-                            'hra_annual': hra_annual,
-                            'special_allowance_monthly': special_allowance_monthly,
-                            'special_allowance_annual': special_allowance_annual,
-                            'medical_allowance_monthly': medical_allowance_monthly,
-                            'medical_allowance_annual': medical_allowance_annual,
-                            'books_periodical_monthly': books_periodical_monthly,
-                            'books_periodical_annual': books_periodical_annual,
-                            'health_club_monthly': health_club_monthly,
-                            'health_club_annual': health_club_annual,
-                            'internet_telephone_monthly': internet_telephone_monthly,
-                            'internet_telephone_annual': internet_telephone_annual,
-                            'gross_ctc_monthly': gross_ctc_monthly,
-                            'gross_ctc_annual': gross_ctc_annual,
-                            'pf_contribution_monthly': pf_contribution_monthly,
-                            'pf_contribution_annual': pf_contribution_annual,
-                            'total_ctc_monthly': total_ctc_monthly,
-                            'total_ctc_annual': total_ctc_annual
-                        }
+                    salary_data = form_salary_data if offer_type == "Full-time Employee" else None
 
                     # Store offer letter data in session state
                     st.session_state.offer_letter_data = {
@@ -1603,9 +885,12 @@ elif page == "📄 Phase 2: Offer Letters":
                     }
 
                     # Generate offer letter HTML
-                    st.session_state.offer_letter_html = generate_offer_letter_with_salary(
+                    store_document('offer_letter_key', generate_offer_letter_with_salary(
                         offer_type, candidate_name, position, start_date, salary_data
-                    )
+                    ))
+                    record_employee(candidate_email, "Phase 2", "offer_generated",
+                                    name=candidate_name, personal_email=candidate_email,
+                                    employee_type=offer_type, position=position, start_date=start_date)
 
                     st.success("✅ Offer letter generated successfully! Please review below.")
                 else:
@@ -1614,14 +899,18 @@ elif page == "📄 Phase 2: Offer Letters":
                 st.error("Please fill in all required fields.")
 
     # Show preview and edit functionality if letter is generated
-    if st.session_state.offer_letter_html and st.session_state.offer_letter_data:
+    offer_letter_key = st.session_state.offer_letter_key
+    offer_letter_html = load_document('offer_letter_key')
+    if offer_letter_key and offer_letter_html is None:
+        st.warning("⚠️ The generated offer letter has expired. Please generate it again.")
+    if offer_letter_html and st.session_state.offer_letter_data:
         st.markdown("---")
 
         # Preview section
         with st.expander("📋 Offer Letter Preview", expanded=True):
             st.markdown("**Preview of your offer letter:**")
             # Display HTML preview in a container
-            st.markdown(st.session_state.offer_letter_html, unsafe_allow_html=True)
+            st.markdown(offer_letter_html, unsafe_allow_html=True)
 
         # Edit section for salary (only for full-time employees)
         if st.session_state.offer_letter_data['offer_type'] == "Full-time Employee":
@@ -1635,82 +924,39 @@ elif page == "📄 Phase 2: Offer Letters":
 
                 with col1:
                     st.markdown("**Monthly Amounts:**")
-                    new_basic_monthly = st.number_input("Basic Salary (Monthly)", min_value=0, value=salary_data['basic_salary_monthly'], step=1, key="edit_basic")
-                    new_hra_monthly = st.number_input("HRA (Monthly)", min_value=0, value=salary_data['hra_monthly'], step=1, key="edit_hra")
-                    new_special_monthly = st.number_input("Special Allowance (Monthly)", min_value=0, value=salary_data['special_allowance_monthly'], step=1, key="edit_special")
-                    new_medical_monthly = st.number_input("Medical Allowance (Monthly)", min_value=0, value=salary_data['medical_allowance_monthly'], step=1, key="edit_medical")
-                    new_books_monthly = st.number_input("Books & Periodical (Monthly)", min_value=0, value=salary_data['books_periodical_monthly'], step=1, key="edit_books")
-                    new_health_monthly = st.number_input("Health Club Facility (Monthly)", min_value=0, value=salary_data['health_club_monthly'], step=1, key="edit_health")
-                    new_internet_monthly = st.number_input("Internet & Telephone (Monthly)", min_value=0, value=salary_data['internet_telephone_monthly'], step=1, key="edit_internet")
+                    new_monthly = {
+                        component: st.number_input(f"{SALARY_LABELS[component]} (Monthly)", min_value=0,
+                                                   value=salary_data[component + '_monthly'], step=1,
+                                                   key=f"edit_{component}")
+                        for component in SALARY_COMPONENTS
+                    }
                     new_pf_monthly = st.number_input("PF Employer Contribution (Monthly)", min_value=0, value=salary_data['pf_contribution_monthly'], step=1, key="edit_pf")
+                    updated_salary_data = build_salary_data(new_monthly, new_pf_monthly)
 
                 with col2:
                     st.markdown("**Annual Amounts (Auto-calculated):**")
-                    new_basic_annual = new_basic_monthly * 12
-                    new_hra_annual = new_hra_monthly * 12
-                    new_special_annual = new_special_monthly * 12
-                    new_medical_annual = new_medical_monthly * 12
-                    new_books_annual = new_books_monthly * 12
-                    new_health_annual = new_health_monthly * 12
-                    new_internet_annual = new_internet_monthly * 12
-                    new_pf_annual = new_pf_monthly * 12
-
-                    st.text_input("Basic Salary (Annual)", value=f"{new_basic_annual:,}", disabled=True, key="show_basic_annual")
-                    st.text_input("HRA (Annual)", value=f"{new_hra_annual:,}", disabled=True, key="show_hra_annual")
-                    st.text_input("Special Allowance (Annual)", value=f"{new_special_annual:,}", disabled=True, key="show_special_annual")
-                    st.text_input("Medical Allowance (Annual)", value=f"{new_medical_annual:,}", disabled=True, key="show_medical_annual")
-                    st.text_input("Books & Periodical (Annual)", value=f"{new_books_annual:,}", disabled=True, key="show_books_annual")
-                    st.text_input("Health Club Facility (Annual)", value=f"{new_health_annual:,}", disabled=True, key="show_health_annual")
-                    st.text_input("Internet & Telephone (Annual)", value=f"{new_internet_annual:,}", disabled=True, key="show_internet_annual")
-                    st.text_input("PF Contribution (Annual)", value=f"{new_pf_annual:,}", disabled=True, key="show_pf_annual")
+                    for component in SALARY_COMPONENTS:
+                        st.text_input(f"{SALARY_LABELS[component]} (Annual)",
+                                      value=f"{updated_salary_data[component + '_annual']:,}", disabled=True,
+                                      key=f"show_{component}_annual")
+                    st.text_input("PF Contribution (Annual)", value=f"{updated_salary_data['pf_contribution_annual']:,}", disabled=True, key="show_pf_annual")
 
                 with col3:
                     st.markdown("**Totals:**")
-                    new_gross_monthly = (new_basic_monthly + new_hra_monthly + new_special_monthly +
-                                       new_medical_monthly + new_books_monthly + new_health_monthly +
-                                       new_internet_monthly)
-                    new_gross_annual = new_gross_monthly * 12
-                    new_total_monthly = new_gross_monthly + new_pf_monthly
-                    new_total_annual = new_total_monthly * 12
-
-                    st.text_input("Gross CTC (Monthly)", value=f"{new_gross_monthly:,}", disabled=True, key="show_gross_monthly")
-                    st.text_input("Gross CTC (Annual)", value=f"{new_gross_annual:,}", disabled=True, key="show_gross_annual")
-                    st.text_input("Total CTC (Monthly)", value=f"{new_total_monthly:,}", disabled=True, key="show_total_monthly")
-                    st.text_input("Total CTC (Annual)", value=f"{new_total_annual:,}", disabled=True, key="show_total_annual")
+                    st.text_input("Gross CTC (Monthly)", value=f"{updated_salary_data['gross_ctc_monthly']:,}", disabled=True, key="show_gross_monthly")
+                    st.text_input("Gross CTC (Annual)", value=f"{updated_salary_data['gross_ctc_annual']:,}", disabled=True, key="show_gross_annual")
+                    st.text_input("Total CTC (Monthly)", value=f"{updated_salary_data['total_ctc_monthly']:,}", disabled=True, key="show_total_monthly")
+                    st.text_input("Total CTC (Annual)", value=f"{updated_salary_data['total_ctc_annual']:,}", disabled=True, key="show_total_annual")
 
                 if st.button("🔄 Update Offer Letter"):
-                    # Update salary data
-                    updated_salary_data = {
-                        'basic_salary_monthly': new_basic_monthly,
-                        'basic_salary_annual': new_basic_annual,
-                        'hra_monthly': new_hra_monthly,
-                        'hra_annual': new_hra_annual,
-                        'special_allowance_monthly': new_special_monthly,
-                        'special_allowance_annual': new_special_annual,
-                        'medical_allowance_monthly': new_medical_monthly,
-                        'medical_allowance_annual': new_medical_annual,
-                        'books_periodical_monthly': new_books_monthly,
-                        'books_periodical_annual': new_books_annual,
-                        'health_club_monthly': new_health_monthly,
-                        'health_club_annual': new_health_annual,
-                        'internet_telephone_monthly': new_internet_monthly,
-                        'internet_telephone_annual': new_internet_annual,
-                        'gross_ctc_monthly': new_gross_monthly,
-                        'gross_ctc_annual': new_gross_annual,
-                        'pf_contribution_monthly': new_pf_monthly,
-                        'pf_contribution_annual': new_pf_annual,
-                        'total_ctc_monthly': new_total_monthly,
-                        'total_ctc_annual': new_total_annual
-                    }
-
                     # Update session state
                     st.session_state.offer_letter_data['salary_data'] = updated_salary_data
 
                     # Regenerate offer letter HTML
-                    st.session_state.offer_letter_html = generate_offer_letter_with_salary(
+                    store_document('offer_letter_key', generate_offer_letter_with_salary(
                         data['offer_type'], data['candidate_name'], data['position'],
                         data['start_date'], updated_salary_data
-                    )
+                    ))
 
                     st.success("✅ Offer letter updated successfully!")
                     st.rerun()
@@ -1721,10 +967,12 @@ elif page == "📄 Phase 2: Offer Letters":
 
         with col1:
             if st.button("📄 Download as PDF"):
-                pdf_bytes = convert_html_to_pdf(st.session_state.offer_letter_html)
+                pdf_bytes = convert_html_to_pdf(offer_letter_html, "offer")
                 if pdf_bytes:
                     data = st.session_state.offer_letter_data
                     pdf_filename = f"{data['offer_type'].lower().replace(' ', '_')}_letter_{data['candidate_name'].replace(' ', '_')}.pdf"
+                    archive_letter(pdf_bytes, "offer", pdf_filename, data['candidate_email'],
+                                   html=offer_letter_html, name=data['candidate_name'], position=data['position'])
                     st.download_button(
                         label="💾 Download PDF",
                         data=pdf_bytes,
@@ -1738,88 +986,31 @@ elif page == "📄 Phase 2: Offer Letters":
             if st.button("📧 Send Email with PDF"):
                 data = st.session_state.offer_letter_data
 
-                # Generate email content based on offer type
-                if data['offer_type'] == "Intern":
-                    subject = f'Rapid Innovation - Letter of Internship - "{data["position"]}" Intern'
-                    email_body = f"""
-                    <html>
-                    <body>
-                    <p>Hello {data['candidate_name']},</p>
-                    <p>Greetings from Rapid Innovation!!</p>
-                    <p>As discussed, we are pleased to extend the offer to you for the "{data['position']}" Intern position at Rapid Innovation Pvt. Ltd. - Remote, starting on {data['start_date'].strftime('%B %d, %Y')}.</p>
-                    <p>PFA the copy of the internship letter for your ready reference. Kindly revert with your acceptance by sending the duly signed copy of the letter.</p>
-                    <p>At Rapid Innovation, we provide every possible opportunity for the growth and development of our people, and we hope that you will also contribute to the growth of Rapid Innovation.</p>
-                    <p>We look forward to a lasting relationship between us.</p>
-                    <p>Best wishes for your new endeavors !!</p>
-                    <p>Please feel free to contact us if you have any queries.</p>
-                    <br>
-                    <p>Regards<br>
-                    Team HR<br>
-                    Rapid Innovation</p>
-                    </body>
-                    </html>
-                    """
-                elif data['offer_type'] == "Full-time Employee":
-                    subject = f'Rapid Innovation - Offer letter - {data["position"]}'
-                    email_body = f"""
-                    <html>
-                    <body>
-                    <p>Hello {data['candidate_name']},</p>
-                    <p>Greetings from Rapid Innovation !!</p>
-                    <p>We are pleased to extend the offer to you for the position of "{data['position']}" at Rapid Innovation, starting on or before {data['start_date'].strftime('%B %d, %Y')}.</p>
-                    <p>PFA the copy of the offer letter for your ready reference. Kindly revert with your acceptance by sending the duly signed copy of the letter. This opportunity is a permanent remote job.</p>
-                    <p>At Rapid Innovation, we provide every opportunity for the growth and development of our people, and we hope that you will also contribute to the growth of Rapid Innovation.</p>
-                    <p>We look forward to a lasting relationship between us.</p>
-                    <p>Best wishes for your new endeavors !!</p>
-                    <p>Please feel free to contact us if you have any queries.</p>
-                    <br>
-                    <p>Best regards,<br>
-                    Team HR<br>
-                    Rapid Innovation</p>
-                    </body>
-                    </html>
-                    """
-                else:  # Contractor
-                    subject = f'Rapid Innovation - Contractor\'s Agreement - {data["candidate_name"]}'
-                    email_body = f"""
-                    <html>
-                    <body>
-                    <p>Hello {data['candidate_name']},</p>
-                    <p>Greetings from Rapid Innovation.</p>
-                    <p>As discussed, we are pleased to extend the offer as a Contractor at Rapid Innovation, starting on or before {data['start_date'].strftime('%B %d, %Y')}.</p>
-                    <p>PFA the copy of the agreement for your ready reference. Kindly revert with your acceptance by sending the duly signed copy of the letter. This opportunity is a permanent remote job.</p>
-                    <p>At Rapid Innovation, we provide every possible opportunity for the growth and development of our people, and we hope that you will also contribute to its growth.</p>
-                    <p>We look forward to a long-lasting relationship between us.</p>
-                    <p>Best wishes for your new endeavors !!</p>
-                    <p>Please don't hesitate to contact us if you have any questions.</p>
-                    <br>
-                    <p>Thanks & Regards<br>
-                    Team HR<br>
-                    Rapid Innovation</p>
-                    </body>
-                    </html>
-                    """
+                subject, email_body = offer_letter_email(
+                    data['offer_type'], data['candidate_name'], data['position'], data['start_date']
+                )
 
                 # Convert HTML to PDF
-                pdf_bytes = convert_html_to_pdf(st.session_state.offer_letter_html)
-                if pdf_bytes:
+                pdf_file = open_pdf(offer_letter_html, "offer")
+                if pdf_file:
                     pdf_filename = f"{data['offer_type'].lower().replace(' ', '_')}_letter_{data['candidate_name'].replace(' ', '_')}.pdf"
 
                     # Send email with PDF attachment
-                    success, message = send_email(
-                        st.session_state.email_config['smtp_server'],
-                        st.session_state.email_config['smtp_port'],
-                        st.session_state.email_config['sender_email'],
-                        st.session_state.email_config['sender_password'],
+                    success, message = send_configured_email(
                         data['candidate_email'],
                         data['cc_list'],
                         subject,
                         email_body,
-                        pdf_bytes,
+                        pdf_file,
                         pdf_filename
                     )
 
                     if success:
+                        record_employee(data['candidate_email'], "Phase 2", "offer_sent", status="offer_sent",
+                                        start_date=data['start_date'])
+                        archive_letter(pdf_file, "offer", pdf_filename, data['candidate_email'],
+                                       data['candidate_email'], subject, html=offer_letter_html,
+                                       name=data['candidate_name'], position=data['position'])
                         st.markdown('<div class="success-box">✅ Offer letter sent successfully!</div>',
                                   unsafe_allow_html=True)
 
@@ -1833,9 +1024,42 @@ elif page == "📄 Phase 2: Offer Letters":
                             st.markdown(email_body, unsafe_allow_html=True)
                     else:
                         st.markdown(f'<div class="error-box">❌ {message}</div>', unsafe_allow_html=True)
+                    pdf_file.close()
                 else:
                     st.error("❌ Failed to generate PDF. Please check if wkhtmltopdf is installed.")
 
+        # Candidate packet: offer + appointment letter + welcome details in one go (full-time employees only)
+        if st.session_state.offer_letter_data['offer_type'] == "Full-time Employee":
+            with st.expander("📦 Candidate Packet (Offer + Appointment + Welcome)"):
+                st.markdown("Renders the offer and appointment letters side by side and sends both in one PDF, "
+                            "together with the welcome details and joining form link.")
+                packet_form_url = st.text_input("Joining Form URL", value=config.DEFAULT_JOINING_FORM_URL,
+                                                key="packet_joining_form_url")
+                if st.button("📦 Send Candidate Packet"):
+                    data = st.session_state.offer_letter_data
+                    candidate = {'name': data['candidate_name'], 'position': data['position'],
+                                 'start_date': data['start_date'].isoformat(), 'salary_data': data['salary_data']}
+                    try:
+                        with st.spinner("Rendering and sending the packet..."):
+                            packet = build_packet(candidate, packet_form_url)
+                            subject, _, packet_filename = send_packet(
+                                st.session_state.email_config, packet, data['candidate_email'], data['cc_list'],
+                                phase=page.split(" ", 1)[-1]
+                            )
+                    except OnboardingError as e:
+                        st.markdown(f'<div class="error-box">❌ {e}</div>', unsafe_allow_html=True)
+                    else:
+                        for letter in PACKET_LETTERS:
+                            document = packet['letters'][letter]
+                            archive_letter(document['pdf'], letter, document['filename'], data['candidate_email'],
+                                           data['candidate_email'], subject, html=document['html'],
+                                           name=data['candidate_name'], position=data['position'])
+                        record_employee(data['candidate_email'], "Phase 2", "packet_sent", status="welcomed",
+                                        start_date=data['start_date'])
+                        st.markdown(f'<div class="success-box">✅ Candidate packet sent with {packet_filename}!</div>',
+                                    unsafe_allow_html=True)
+                        st.caption(f"⏱️ {stage_summary(packet)}")
+
 elif page == "📋 Phase 3: Appointment Letters":
     st.markdown("""
     <div class="section-header">
@@ -1849,13 +1073,16 @@ elif page == "📋 Phase 3: Appointment Letters":
 
     st.info("Upload an appointment letter PDF and send it via email.")
 
+    prefill = employee_prefill("appointment")
+
     with st.form("appointment_email_form"):
         col1, col2 = st.columns(2)
 
         with col1:
             # PDF Upload
             uploaded_pdf = st.file_uploader("Upload Appointment Letter PDF*", type=['pdf'])
-            recipient_email = st.text_input("Recipient Email*", placeholder="employee@example.com")
+            recipient_email = st.text_input("Recipient Email*", value=prefill.get('personal_email') or prefill.get('email', ""),
+                                            placeholder="employee@example.com")
 
         with col2:
             subject = st.text_input("Email Subject*",
@@ -1881,36 +1108,31 @@ Rapid Innovation""", height=150)
             if uploaded_pdf and recipient_email and subject and email_body:
                 if validate_email(recipient_email):
                     # Parse CC emails
-                    cc_list = [email.strip() for email in cc_emails.split('\n') if email.strip() and validate_email(email.strip())]
+                    cc_list = parse_cc_list(cc_emails)
 
-                    # Read PDF file
-                    pdf_bytes = uploaded_pdf.read()
+                    # The uploaded PDF is attached and archived as a file, without another copy of it
+                    pdf_file = uploaded_pdf
                     pdf_filename = uploaded_pdf.name
 
-                    # Convert plain text email body to HTML format
-                    html_email_body = f"""
-                    <html>
-                    <body>
-                    {email_body.replace(chr(10), '<br>')}
-                    </body>
-                    </html>
-                    """
+                    html_email_body = plain_text_email(email_body)
 
                     # Send email with PDF attachment
-                    success, message = send_email(
-                        st.session_state.email_config['smtp_server'],
-                        st.session_state.email_config['smtp_port'],
-                        st.session_state.email_config['sender_email'],
-                        st.session_state.email_config['sender_password'],
+                    success, message = send_configured_email(
                         recipient_email,
                         cc_list,
                         subject,
                         html_email_body,
-                        pdf_bytes,
-                        pdf_filename
+                        pdf_file,
+                        pdf_filename,
+                        employee_email=prefill.get('email')
                     )
 
                     if success:
+                        record_employee(recipient_email, "Phase 3", "appointment_sent", status="appointment_sent",
+                                        detail=pdf_filename)
+                        archive_letter(pdf_file, "appointment", pdf_filename, prefill.get('email') or recipient_email,
+                                       recipient_email, subject, version="uploaded",
+                                       name=prefill.get('name'), position=prefill.get('position'))
                         st.markdown('<div class="success-box">✅ Appointment letter sent successfully!</div>',
                                   unsafe_allow_html=True)
 
@@ -1943,12 +1165,15 @@ elif page == "🎯 Phase 4: Welcome & Onboarding":
         st.warning("⚠️ Please configure email settings first in the Email Configuration section.")
         st.stop()
 
+    prefill = employee_prefill("welcome")
+
     with st.form("welcome_email_form"):
         col1, col2 = st.columns(2)
 
         with col1:
-            employee_name = st.text_input("Employee Name*", placeholder="John Doe")
-            employee_official_email = st.text_input("Official Email*", placeholder="john.doe@rapidinnovation.com")
+            employee_name = st.text_input("Employee Name*", value=prefill.get('name') or "", placeholder="John Doe")
+            employee_official_email = st.text_input("Official Email*", value=prefill.get('official_email') or "",
+                                                    placeholder="john.doe@rapidinnovation.com")
 
         with col2:
             cc_emails = st.text_area("CC Emails (one per line)", placeholder="hr@rapidinnovation.com")
@@ -1961,57 +1186,22 @@ elif page == "🎯 Phase 4: Welcome & Onboarding":
             if employee_name and employee_official_email:
                 if validate_email(employee_official_email):
                     # Parse CC emails
-                    cc_list = [email.strip() for email in cc_emails.split('\n') if email.strip() and validate_email(email.strip())]
+                    cc_list = parse_cc_list(cc_emails)
 
-                    # Generate email content
-                    subject = f'Welcome On Board - {employee_name}'
-                    email_body = f"""
-                    <html>
-                    <body>
-                    <p>Dear {employee_name},</p>
-
-                    <p>Greetings of the day !!</p>
-
-                    <p>We are happy to have you join our organization. We believe that you will be a great asset to our company.</p>
-
-                    <p>Again, Congratulations. We are thrilled to have you join the team and look forward to working with you.</p>
-
-                    <p>As a part of the process, I have attached a form link to this mail kindly fill out that form:</p>
-
-                    <p><a href="{joining_form_url}" target="_blank">{joining_form_url}</a></p>
-
-                    <h3>System Enrollment Information:</h3>
-                    <p>You will be enrolled in the following platforms:</p>
-                    <ul>
-                        <li><strong>Gmail/Email:</strong> Official company email ID (already created)</li>
-                        <li><strong>Slack:</strong> Communication and collaboration platform</li>
-                        <li><strong>TeamLogger:</strong> Time tracking and work management</li>
-                        <li><strong>Razorpay:</strong> Payment and expense management (if applicable)</li>
-                    </ul>
-
-                    <p>Please let me know if you have any questions.</p>
-
-                    <br>
-                    <p>Regards<br>
-                    Team HR<br>
-                    Rapid Innovation</p>
-                    </body>
-                    </html>
-                    """
+                    subject, email_body = welcome_email(employee_name, joining_form_url)
 
                     # Send email
-                    success, message = send_email(
-                        st.session_state.email_config['smtp_server'],
-                        st.session_state.email_config['smtp_port'],
-                        st.session_state.email_config['sender_email'],
-                        st.session_state.email_config['sender_password'],
+                    success, message = send_configured_email(
                         employee_official_email,
                         cc_list,
                         subject,
-                        email_body
+                        email_body,
+                        employee_email=prefill.get('email')
                     )
 
                     if success:
+                        record_employee(prefill.get('email') or employee_official_email, "Phase 4", "welcomed",
+                                        status="welcomed", name=employee_name, official_email=employee_official_email)
                         st.markdown('<div class="success-box">✅ Welcome email sent successfully!</div>',
                                   unsafe_allow_html=True)
 
@@ -2043,11 +1233,13 @@ elif page == "🔍 Phase 5: Background Verification":
 
     st.info("This phase is for experienced full-time employees only.")
 
+    prefill = employee_prefill("bgv")
+
     with st.form("bgv_email_form"):
         col1, col2 = st.columns(2)
 
         with col1:
-            employee_name = st.text_input("Employee Name*", placeholder="John Doe")
+            employee_name = st.text_input("Employee Name*", value=prefill.get('name') or "", placeholder="John Doe")
             previous_company_hr_email = st.text_input("Previous Company HR Email*", placeholder="hr@previouscompany.com")
             employee_id = st.text_input("Employee ID (if known)", placeholder="EMP001")
             designation = st.text_input("Previous Designation*", placeholder="Software Engineer")
@@ -2056,6 +1248,8 @@ elif page == "🔍 Phase 5: Background Verification":
             employment_period = st.text_input("Period of Employment*", placeholder="Jan 2020 - Dec 2022")
             reporting_manager = st.text_input("Reporting Manager", placeholder="Manager Name")
             cc_emails = st.text_area("CC Emails (one per line)", placeholder="hr@rapidinnovation.com")
+            employee_email = st.text_input("Employee Email (for records)", value=prefill.get('email', ""),
+                                           placeholder="john.doe@email.com")
 
         submitted = st.form_submit_button("🔍 Send BGV Email")
 
@@ -2063,112 +1257,25 @@ elif page == "🔍 Phase 5: Background Verification":
             if employee_name and previous_company_hr_email and designation and employment_period:
                 if validate_email(previous_company_hr_email):
                     # Parse CC emails
-                    cc_list = [email.strip() for email in cc_emails.split('\n') if email.strip() and validate_email(email.strip())]
-
-                    # Generate BGV email content
-                    subject = f'Employee Background Verification - {employee_name} - Rapid Innovation'
-                    email_body = f"""
-                    <html>
-                    <body>
-                    <p>Dear HR,</p>
-
-                    <p>I hope you are doing great !!</p>
-
-                    <p>This is about the Background Verification of "{employee_name}" who worked in your esteemed organization.</p>
-
-                    <p>Please find below, the form for Background verification. It would be very kind if you could spare a few minutes and verify the information provided by {employee_name}.</p>
-
-                    <table border="1" cellpadding="10" cellspacing="0" style="border-collapse: collapse; width: 100%; margin: 20px 0;">
-                        <tr style="background-color: #f2f2f2;">
-                            <th>Particulars</th>
-                            <th>Details provided by Candidate</th>
-                            <th>Details as per company records</th>
-                        </tr>
-                        <tr>
-                            <td><strong>Employee Name</strong></td>
-                            <td>{employee_name}</td>
-                            <td></td>
-                        </tr>
-                        <tr>
-                            <td><strong>Employee ID</strong></td>
-                            <td>{employee_id if employee_id else 'Please specify'}</td>
-                            <td></td>
-                        </tr>
-                        <tr>
-                            <td><strong>Designation</strong><br>(In case of a mismatch, please clarify with reason)</td>
-                            <td>{designation}</td>
-                            <td></td>
-                        </tr>
-                        <tr>
-                            <td><strong>Period of Employment</strong></td>
-                            <td>{employment_period}</td>
-                            <td></td>
-                        </tr>
-                        <tr>
-                            <td><strong>Reporting to</strong><br>(In case of a mismatch, please confirm if the employee ever reported to the stated supervisor-directly or indirectly)</td>
-                            <td>{reporting_manager if reporting_manager else 'Please specify'}</td>
-                            <td></td>
-                        </tr>
-                        <tr>
-                            <td><strong>Character & Conduct</strong></td>
-                            <td>Please specify</td>
-                            <td></td>
-                        </tr>
-                        <tr>
-                            <td><strong>Reason for Leaving</strong></td>
-                            <td>Please specify</td>
-                            <td></td>
-                        </tr>
-                        <tr>
-                            <td><strong>Eligible for rehire</strong><br>(If No, kindly specify the reason)</td>
-                            <td>Please specify</td>
-                            <td></td>
-                        </tr>
-                        <tr>
-                            <td><strong>Status of Exit Formalities</strong><br>(In case of pending; please specify from whose side- candidate or company)</td>
-                            <td>Please specify</td>
-                            <td></td>
-                        </tr>
-                        <tr>
-                            <td><strong>Are the Attached Documents Genuine?</strong><br>(If No, kindly Specify the reason – for e.g. is the document forged or fake or manipulated or any other reason)</td>
-                            <td>Attached</td>
-                            <td></td>
-                        </tr>
-                        <tr>
-                            <td><strong>Additional Comments</strong></td>
-                            <td>Please specify</td>
-                            <td></td>
-                        </tr>
-                        <tr>
-                            <td><strong>Name and Job title of the verifying Authority</strong></td>
-                            <td>Please specify</td>
-                            <td></td>
-                        </tr>
-                    </table>
-
-                    <p>Feel free to get in touch if you have any questions.</p>
-
-                    <br>
-                    <p>Regards<br>
-                    Team HR<br>
-                    Rapid Innovation</p>
-                    </body>
-                    </html>
-                    """
+                    cc_list = parse_cc_list(cc_emails)
+
+                    subject, email_body = background_verification_email(
+                        employee_name, employee_id, designation, employment_period, reporting_manager
+                    )
 
                     # Send email
-                    success, message = send_email(
-                        st.session_state.email_config['smtp_server'],
-                        st.session_state.email_config['smtp_port'],
-                        st.session_state.email_config['sender_email'],
-                        st.session_state.email_config['sender_password'],
+                    success, message = send_configured_email(
                         previous_company_hr_email,
                         cc_list,
                         subject,
-                        email_body
+                        email_body,
+                        employee_email=employee_email or None
                     )
 
                     if success:
+                        if employee_email:
+                            record_employee(employee_email, "Phase 5", "bgv_pending", status="bgv_pending",
+                                            detail=previous_company_hr_email, name=employee_name)
                         st.markdown('<div class="success-box">✅ Background verification email sent successfully!</div>',
                                   unsafe_allow_html=True)
 
@@ -2187,6 +1294,12 @@ elif page == "🔍 Phase 5: Background Verification":
             else:
                 st.error("Please fill in all required fields.")
 
+    if prefill.get('status') == "bgv_pending":
+        st.markdown("### ✅ Verification Result")
+        if st.button(f"✅ Mark BGV as cleared for {prefill['name'] or prefill['email']}"):
+            record_employee(prefill['email'], "Phase 5", "bgv_cleared", status="bgv_cleared")
+            st.success("✅ Background verification marked as cleared.")
+
 elif page == "🚪 Phase 6: Exit Process":
     st.markdown("""
     <div class="section-header">
@@ -2202,6 +1315,11 @@ elif page == "🚪 Phase 6: Exit Process":
     if 'exit_process_data' not in st.session_state:
         st.session_state.exit_process_data = {}
 
+    prefill = employee_prefill("exit")
+    exiting_email = prefill.get('official_email') or prefill.get('email', "")
+    if prefill:
+        show_exit_checklist(prefill['email'])
+
     # Exit process tabs
     tab1, tab2, tab3 = st.tabs(["📋 Phase 1: Initiation", "📦 Phase 2: Assets & Access", "📜 Phase 3: Certificates"])
 
@@ -2214,49 +1332,37 @@ elif page == "🚪 Phase 6: Exit Process":
                 col1, col2 = st.columns(2)
 
                 with col1:
-                    employee_name = st.text_input("Employee Name*", placeholder="John Doe")
-                    manager_name = st.text_input("Manager Name*", placeholder="Jane Smith")
-                    manager_email = st.text_input("Manager Email*", placeholder="jane@rapidinnovation.com")
+                    employee_name = st.text_input("Employee Name*", value=prefill.get('name') or "", placeholder="John Doe")
+                    manager_name = st.text_input("Manager Name*", value=prefill.get('manager_name') or "",
+                                                 placeholder="Jane Smith")
+                    manager_email = st.text_input("Manager Email*", value=prefill.get('manager_email') or "",
+                                                  placeholder="jane@rapidinnovation.com")
 
                 with col2:
-                    last_working_day = st.date_input("Last Working Day*")
+                    last_working_day = st.date_input("Last Working Day*", value=prefill_date(prefill, 'exit_date'))
                     cc_emails = st.text_area("CC Emails (one per line)", placeholder="hr@rapidinnovation.com")
 
                 if st.form_submit_button("📧 Send Manager Confirmation"):
                     if employee_name and manager_name and manager_email and last_working_day:
                         if validate_email(manager_email):
-                            cc_list = [email.strip() for email in cc_emails.split('\n') if email.strip() and validate_email(email.strip())]
-
-                            subject = f'Confirmation for proceeding with the Exit formalities - {employee_name}'
-                            email_body = f"""
-                            <html>
-                            <body>
-                            <p>Hi {manager_name},</p>
-                            <p>I hope you are doing well !!</p>
-                            <p>As you know, <strong>{last_working_day.strftime('%d %B %Y')}</strong> is the last working day of <strong>{employee_name}</strong>.</p>
-                            <p>Kindly let me know once all his knowledge transfer is done so that I can proceed with his exit formalities. These formalities include deactivating his official email ID (once deactivated cannot be restored) and removing him from Slack. Kindly let us know if the official mail data has to be transferred to any other account.</p>
-                            <p>Also please take care of any software he is using like the GitHub account, also please remove him from project groups.</p>
-                            <p>Please let me know in case of any queries.</p>
-                            <br>
-                            <p>Regards,<br>
-                            Team HR<br>
-                            Rapid Innovation</p>
-                            </body>
-                            </html>
-                            """
-
-                            success, message = send_email(
-                                st.session_state.email_config['smtp_server'],
-                                st.session_state.email_config['smtp_port'],
-                                st.session_state.email_config['sender_email'],
-                                st.session_state.email_config['sender_password'],
+                            cc_list = parse_cc_list(cc_emails)
+
+                            subject, email_body = manager_confirmation_email(employee_name, manager_name, last_working_day)
+
+                            success, message = send_configured_email(
                                 manager_email,
                                 cc_list,
                                 subject,
-                                email_body
+                                email_body,
+                                employee_email=prefill.get('email')
                             )
 
                             if success:
+                                if prefill:
+                                    record_employee(prefill['email'], "Exit", "manager_confirmation_sent",
+                                                    manager_name=manager_name, manager_email=manager_email,
+                                                    exit_date=last_working_day)
+                                    track_exit(prefill['email'], "manager_confirmed")
                                 st.success("✅ Manager confirmation email sent successfully!")
                             else:
                                 st.error(f"❌ Failed to send email: {message}")
@@ -2271,80 +1377,42 @@ elif page == "🚪 Phase 6: Exit Process":
                 col1, col2 = st.columns(2)
 
                 with col1:
-                    emp_name = st.text_input("Employee Name*", placeholder="John Doe", key="exit_emp_name")
-                    emp_email = st.text_input("Employee Email*", placeholder="john@rapidinnovation.com")
-                    emp_type = st.selectbox("Employee Type*", ["Intern", "Full-time Employee"])
+                    emp_name = st.text_input("Employee Name*", value=prefill.get('name') or "",
+                                             placeholder="John Doe", key="exit_emp_name")
+                    emp_email = st.text_input("Employee Email*", value=exiting_email, placeholder="john@rapidinnovation.com")
+                    emp_type = st.selectbox("Employee Type*", ["Intern", "Full-time Employee"],
+                                            index=prefill_index(["Intern", "Full-time Employee"], prefill.get('employee_type')))
 
                 with col2:
-                    lwd = st.date_input("Last Working Day*", key="exit_lwd")
-                    manager_email_transfer = st.text_input("Manager Email (for file transfer)", placeholder="manager@rapidinnovation.com")
+                    lwd = st.date_input("Last Working Day*", value=prefill_date(prefill, 'exit_date'), key="exit_lwd")
+                    manager_email_transfer = st.text_input("Manager Email (for file transfer)",
+                                                           value=prefill.get('manager_email') or "",
+                                                           placeholder="manager@rapidinnovation.com")
                     cc_emails_exit = st.text_area("CC Emails (one per line)", placeholder="hr@rapidinnovation.com", key="exit_cc")
 
                 if st.form_submit_button("📧 Send Exit Notification"):
                     if emp_name and emp_email and emp_type and lwd:
                         if validate_email(emp_email):
-                            cc_list = [email.strip() for email in cc_emails_exit.split('\n') if email.strip() and validate_email(email.strip())]
-
-                            subject = f'Exit Formalities - {emp_name} - {lwd.strftime("%d %B %Y")}'
-
-                            if emp_type == "Intern":
-                                email_body = f"""
-                                <html>
-                                <body>
-                                <p>Hi {emp_name},</p>
-                                <p>This is to confirm that your last working day at Rapid Innovation is <strong>{lwd.strftime('%A, %d %B %Y')}</strong>.</p>
-                                <p>You are requested to please look into the following points:</p>
-                                <ol>
-                                    <li>Please change all the communication addresses, if any are provided as the company's address.</li>
-                                    <li>Your invoices will be considered as payslips.</li>
-                                    <li>Please refer to the following Link to the exit feedback form and submit your valuable feedback on or before your last working day.</li>
-                                    <li>Also, refer to the internship Letter signed by you at the time of Joining Rapid Innovation so that you can adhere to all the clauses mentioned in it.</li>
-                                    <li>Kindly move all the files to a folder in the drive and provide ownership to {manager_email_transfer if manager_email_transfer else "your manager's email ID"}</li>
-                                </ol>
-                                <p>Your full and final settlement will be processed within 30-45 days from your last working day. HR will be sending the FNF statement to your email ID.</p>
-                                <br>
-                                <p>Regards<br>
-                                Team HR</p>
-                                </body>
-                                </html>
-                                """
-                            else:
-                                email_body = f"""
-                                <html>
-                                <body>
-                                <p>Hi {emp_name},</p>
-                                <p>This is to confirm that your last working day at Rapid Innovation is <strong>{lwd.strftime('%A, %d %B %Y')}</strong>.</p>
-                                <p>You are requested to please look into the following points:</p>
-                                <ol>
-                                    <li>Please change all the communication addresses, if any are provided as the company's address.</li>
-                                    <li>All your payslips are available on Razorpay; we expect you to download them and take them with you.</li>
-                                    <li>Please ensure to submit all company belongings to the people concerned on the last working day, like a laptop, bag, mouse, headphones, and dongle (if any).</li>
-                                    <li>If you wish to withdraw your PF amount, you can do that on the online PF portal. (People having less than 6 months of experience with us will not be eligible to withdraw the PF amount)</li>
-                                    <li>Please refer to the following Link to the exit feedback form and submit your valuable feedback on or before your last working day.</li>
-                                    <li>Also, refer to the Appointment Letter signed by you at the time of Joining Rapid Innovation so that you can adhere to all the clauses mentioned in it.</li>
-                                    <li>Kindly move all the files to a folder in the drive and provide ownership to {manager_email_transfer if manager_email_transfer else "your manager's email ID"}</li>
-                                </ol>
-                                <p>Your full and final settlement will be processed within 30-45 days from your last working day. HR will be sending the FNF statement to your email ID.</p>
-                                <br>
-                                <p>Regards<br>
-                                Team HR<br>
-                                Rapid Innovation</p>
-                                </body>
-                                </html>
-                                """
-
-                            success, message = send_email(
-                                st.session_state.email_config['smtp_server'],
-                                st.session_state.email_config['smtp_port'],
-                                st.session_state.email_config['sender_email'],
-                                st.session_state.email_config['sender_password'],
+                            cc_list = parse_cc_list(cc_emails_exit)
+
+                            subject, email_body = exit_notification_email(emp_name, emp_type, lwd, manager_email_transfer)
+
+                            success, message = send_configured_email(
                                 emp_email,
                                 cc_list,
                                 subject,
-                                email_body
+                                email_body,
+                                employee_email=prefill.get('email')
                             )
 
                             if success:
+                                record_employee(prefill.get('email') or emp_email, "Exit", "exit_initiated",
+                                                status="exit_initiated", name=emp_name, employee_type=emp_type,
+                                                exit_date=lwd, manager_email=manager_email_transfer)
+                                try:
+                                    get_exit_tracker().start(prefill.get('email') or emp_email, emp_name, lwd)
+                                except (sqlite3.Error, ValueError) as e:
+                                    st.warning(f"⚠️ Could not update the exit tracker: {e}")
                                 st.success("✅ Exit notification email sent successfully!")
                             else:
                                 st.error(f"❌ Failed to send email: {message}")
@@ -2362,12 +1430,18 @@ elif page == "🚪 Phase 6: Exit Process":
                 col1, col2 = st.columns(2)
 
                 with col1:
-                    asset_emp_name = st.text_input("Employee Name*", placeholder="John Doe", key="asset_emp_name")
-                    asset_emp_email = st.text_input("Employee Email*", placeholder="john@rapidinnovation.com", key="asset_emp_email")
-                    asset_emp_personal_email = st.text_input("Personal Email*", placeholder="john.personal@gmail.com")
+                    asset_emp_name = st.text_input("Employee Name*", value=prefill.get('name') or "",
+                                                   placeholder="John Doe", key="asset_emp_name")
+                    asset_emp_email = st.text_input("Employee Email*", value=exiting_email,
+                                                    placeholder="john@rapidinnovation.com", key="asset_emp_email")
+                    asset_emp_personal_email = st.text_input("Personal Email*", value=prefill.get('personal_email') or "",
+                                                             placeholder="john.personal@gmail.com")
 
                 with col2:
-                    asset_type = st.selectbox("Asset Type*", ["Macbook", "Windows Laptop", "Other"])
+                    held_types = [asset['asset_type'] for asset in get_exit_tracker().held_by(prefill['email'], True)] if prefill else []
+                    asset_type = st.selectbox("Asset Type*", ["Macbook", "Windows Laptop", "Other"],
+                                              index=prefill_index(["Macbook", "Windows Laptop", "Other"],
+                                                                  held_types[0] if held_types else None))
                     return_address = st.text_area("Return Address*", value="Hotel North 39, Junas Wada, near River Bridge, Mandrem, Goa 403524")
                     contact_person = st.text_input("Contact Person", value="Armond Fernandes")
                     contact_number = st.text_input("Contact Number", value="9823268663")
@@ -2375,45 +1449,23 @@ elif page == "🚪 Phase 6: Exit Process":
                 if st.form_submit_button("📦 Send Asset Return Email"):
                     if asset_emp_name and asset_emp_email and asset_emp_personal_email and asset_type:
                         if validate_email(asset_emp_email) and validate_email(asset_emp_personal_email):
-                            subject = "Asset Dispatch Details"
-                            email_body = f"""
-                            <html>
-                            <body>
-                            <p>Hello {asset_emp_name},</p>
-                            <p>We hope you are doing well !!</p>
-                            <p>You are requested to return the company-owned <strong>{asset_type}</strong>.</p>
-                            <p><strong>Details of the Dispatch:</strong></p>
-                            <ul>
-                                <li><strong>Name:</strong> {contact_person}</li>
-                                <li><strong>Address:</strong> {return_address}</li>
-                                <li><strong>Contact Number:</strong> {contact_number}</li>
-                            </ul>
-                            <p><strong>Please note:</strong></p>
-                            <ol>
-                                <li>We will proceed with your FNF settlement once we will receive the company's assets in good condition.</li>
-                                <li>Kindly attach a photo or video of the device before dispatching it to the address above. {"Please take insurance in case of Macbook." if asset_type == "Macbook" else ""}</li>
-                            </ol>
-                            <p>Please reach out to us in case of any queries.</p>
-                            <br>
-                            <p>Thanks & Regards<br>
-                            Team HR<br>
-                            Rapid Innovation</p>
-                            </body>
-                            </html>
-                            """
-
-                            success, message = send_email(
-                                st.session_state.email_config['smtp_server'],
-                                st.session_state.email_config['smtp_port'],
-                                st.session_state.email_config['sender_email'],
-                                st.session_state.email_config['sender_password'],
+                            subject, email_body = asset_return_email(
+                                asset_emp_name, asset_type, contact_person, return_address, contact_number
+                            )
+
+                            success, message = send_configured_email(
                                 asset_emp_email,
                                 [asset_emp_personal_email],  # CC to personal email
                                 subject,
-                                email_body
+                                email_body,
+                                employee_email=prefill.get('email')
                             )
 
                             if success:
+                                record_employee(prefill.get('email') or asset_emp_email, "Exit", "asset_return_requested",
+                                                detail=asset_type, name=asset_emp_name,
+                                                personal_email=asset_emp_personal_email)
+                                track_exit(prefill.get('email') or asset_emp_email, "asset_request_sent")
                                 st.success("✅ Asset return email sent successfully!")
                             else:
                                 st.error(f"❌ Failed to send email: {message}")
@@ -2422,6 +1474,12 @@ elif page == "🚪 Phase 6: Exit Process":
                     else:
                         st.error("Please fill in all required fields.")
 
+            if prefill.get('status') == "exit_initiated":
+                if st.button(f"📦 Mark assets as returned by {prefill['name'] or prefill['email']}"):
+                    record_employee(prefill['email'], "Exit", "assets_returned", status="assets_returned")
+                    track_exit(prefill['email'], "assets_returned")
+                    st.success("✅ Assets marked as returned.")
+
         # Access Removal Checklist
         with st.expander("🔐 Access Removal Checklist"):
             st.markdown("### 🔐 Remove All Credentials from All Platforms")
@@ -2452,6 +1510,7 @@ elif page == "🚪 Phase 6: Exit Process":
                         checked_platforms.append(platform)
 
                 if checked_platforms:
+                    track_exit(prefill.get('email'), "access_removed", ", ".join(checked_platforms))
                     st.success(f"✅ Access removed from: {', '.join(checked_platforms)}")
                 else:
                     st.warning("⚠️ No platforms selected for access removal.")
@@ -2465,10 +1524,14 @@ elif page == "🚪 Phase 6: Exit Process":
                 col1, col2 = st.columns(2)
 
                 with col1:
-                    cert_title = st.selectbox("Title*", ["Mr.", "Ms."], key="cert_title")
-                    cert_emp_name = st.text_input("Employee Name*", placeholder="John Doe", key="cert_emp_name")
-                    cert_emp_email = st.text_input("Personal Email*", placeholder="john.personal@gmail.com", key="cert_emp_email")
-                    cert_position = st.text_input("Position*", placeholder="Software Engineer", key="cert_position")
+                    cert_title = st.selectbox("Title*", ["Mr.", "Ms."], key="cert_title",
+                                              index=prefill_index(["Mr.", "Ms."], prefill.get('title')))
+                    cert_emp_name = st.text_input("Employee Name*", value=prefill.get('name') or "",
+                                                  placeholder="John Doe", key="cert_emp_name")
+                    cert_emp_email = st.text_input("Personal Email*", value=prefill.get('personal_email') or "",
+                                                   placeholder="john.personal@gmail.com", key="cert_emp_email")
+                    cert_position = st.text_input("Position*", value=prefill.get('position') or "",
+                                                  placeholder="Software Engineer", key="cert_position")
 
                 with col2:
                     # Set default dates - 1 year ago to today
@@ -2477,13 +1540,13 @@ elif page == "🚪 Phase 6: Exit Process":
 
                     cert_start_date = st.date_input(
                         "Employment Start Date*",
-                        value=default_start.date(),
+                        value=prefill_date(prefill, 'start_date') or default_start.date(),
                         help="Select the date when the employee started working",
                         key="cert_start_date"
                     )
                     cert_end_date = st.date_input(
                         "Employment End Date*",
-                        value=default_end.date(),
+                        value=prefill_date(prefill, 'exit_date') or default_end.date(),
                         help="Select the date when the employee's employment ended",
                         key="cert_end_date"
                     )
@@ -2501,16 +1564,10 @@ elif page == "🚪 Phase 6: Exit Process":
                             # Determine letter type
                             if cert_type == "Internship Certificate":
                                 letter_type = "internship"
-                                subject = f"Rapid Innovation - Internship Certificate - {cert_emp_name}"
-                                email_intro = "PFA: Internship Certificate"
                             elif cert_type == "Experience Letter (Dues Not Settled)":
                                 letter_type = "dues_not_settled"
-                                subject = f"Rapid Innovation - Experience Letter - {cert_emp_name}"
-                                email_intro = "PFA, your Experience Letter."
                             else:
                                 letter_type = "standard"
-                                subject = f"Rapid Innovation - Experience Letter - {cert_emp_name}"
-                                email_intro = "PFA, your Experience Letter."
 
                             # Generate certificate HTML
                             certificate_html = generate_experience_letter(
@@ -2522,16 +1579,20 @@ elif page == "🚪 Phase 6: Exit Process":
                             )
 
                             # Store in session state for preview
-                            st.session_state.certificate_html = certificate_html
+                            store_document('certificate_key', certificate_html)
+                            record_employee(prefill.get('email') or cert_emp_email, "Exit", "certificate_generated",
+                                            detail=letter_type, title=cert_title, name=cert_emp_name,
+                                            personal_email=cert_emp_email, position=cert_position,
+                                            start_date=cert_start_date, exit_date=cert_end_date)
                             st.session_state.certificate_data = {
+                                'record_email': prefill.get('email') or cert_emp_email,
                                 'name': cert_emp_name,
                                 'email': cert_emp_email,
                                 'position': cert_position,
                                 'start_date': cert_start_date,
                                 'end_date': cert_end_date,
                                 'type': cert_type,
-                                'subject': subject,
-                                'email_intro': email_intro
+                                'letter_type': letter_type
                             }
 
                             st.success("✅ Certificate generated successfully! See preview below.")
@@ -2541,12 +1602,13 @@ elif page == "🚪 Phase 6: Exit Process":
                         st.error("Please fill in all required fields.")
 
         # Certificate Preview and Send
-        if 'certificate_html' in st.session_state and 'certificate_data' in st.session_state:
+        certificate_html = load_document('certificate_key')
+        if certificate_html and 'certificate_data' in st.session_state:
             st.markdown("---")
 
             # Preview
             with st.expander("📋 Certificate Preview", expanded=True):
-                st.markdown(st.session_state.certificate_html, unsafe_allow_html=True)
+                st.markdown(certificate_html, unsafe_allow_html=True)
 
             # Download and Send Options
             st.markdown("### 📥 Download & Send Options")
@@ -2554,7 +1616,7 @@ elif page == "🚪 Phase 6: Exit Process":
 
             with col1:
                 if st.button("📄 Download as PDF", key="cert_download"):
-                    pdf_bytes = convert_html_to_pdf(st.session_state.certificate_html)
+                    pdf_bytes = convert_html_to_pdf(certificate_html, "experience")
                     if pdf_bytes:
                         # Simplify filename based on certificate type
                         data = st.session_state.certificate_data
@@ -2565,6 +1627,8 @@ elif page == "🚪 Phase 6: Exit Process":
                         else:
                             filename = "experience_letter.pdf"
 
+                        archive_letter(pdf_bytes, "experience", filename, data['record_email'],
+                                       html=certificate_html, name=data['name'], position=data['position'])
                         st.download_button(
                             label="💾 Download PDF",
                             data=pdf_bytes,
@@ -2578,24 +1642,11 @@ elif page == "🚪 Phase 6: Exit Process":
                 if st.button("📧 Send Email with PDF", key="cert_send"):
                     data = st.session_state.certificate_data
 
-                    email_body = f"""
-                    <html>
-                    <body>
-                    <p>Hi {data['name']},</p>
-                    <p>I hope you are doing well.</p>
-                    <p>{data['email_intro']}</p>
-                    <p>Kindly reach out to us if you have any concerns.</p>
-                    <br>
-                    <p>Thanks & Regards<br>
-                    Team HR<br>
-                    Rapid Innovation</p>
-                    </body>
-                    </html>
-                    """
+                    subject, email_body = certificate_email(data['name'], data['letter_type'])
 
                     # Convert HTML to PDF
-                    pdf_bytes = convert_html_to_pdf(st.session_state.certificate_html)
-                    if pdf_bytes:
+                    pdf_file = open_pdf(certificate_html, "experience")
+                    if pdf_file:
                         # Simplify filename based on certificate type
                         if "internship" in data['type'].lower():
                             pdf_filename = "internship_certificate.pdf"
@@ -2605,26 +1656,398 @@ elif page == "🚪 Phase 6: Exit Process":
                             pdf_filename = "experience_letter.pdf"
 
                         # Send email with PDF attachment
-                        success, message = send_email(
-                            st.session_state.email_config['smtp_server'],
-                            st.session_state.email_config['smtp_port'],
-                            st.session_state.email_config['sender_email'],
-                            st.session_state.email_config['sender_password'],
+                        success, message = send_configured_email(
                             data['email'],
                             [],  # No CC for certificates
-                            data['subject'],
+                            subject,
                             email_body,
-                            pdf_bytes,
-                            pdf_filename
+                            pdf_file,
+                            pdf_filename,
+                            employee_email=data['record_email']
                         )
 
                         if success:
+                            record_employee(data['record_email'], "Exit", "certificate_issued",
+                                            status="certificate_issued", detail=pdf_filename)
+                            track_exit(data['record_email'], "certificate_issued")
+                            archive_letter(pdf_file, "experience", pdf_filename, data['record_email'],
+                                           data['email'], subject, html=certificate_html,
+                                           name=data['name'], position=data['position'])
                             st.success("✅ Certificate sent successfully!")
                         else:
                             st.error(f"❌ Failed to send email: {message}")
+                        pdf_file.close()
                     else:
                         st.error("❌ Failed to generate PDF.")
 
+elif page == "🗄️ Letter Archive":
+    st.markdown("""
+    <div class="section-header">
+        <h2>🗄️ Letter Archive</h2>
+    </div>
+    """, unsafe_allow_html=True)
+
+    archive = get_letter_archive()
+    stats = archive.stats()
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Archived Letters", stats['letters'])
+    col2.metric("Stored PDFs", stats['blobs'])
+    col3.metric("Saved by Deduplication", f"{stats['saved_bytes'] / 1024:,.0f} KB")
+
+    prefill = employee_prefill("archive")
+    letters = archive.for_employee(prefill['email']) if prefill else archive.recent()
+
+    if not letters:
+        st.info("No archived letters yet. Letters are archived when they are sent or downloaded as PDF.")
+    else:
+        st.dataframe([
+            {
+                'Date': datetime.fromtimestamp(letter['created_at']).strftime('%d %b %Y %H:%M'),
+                'Letter': letter['letter_type'].title(),
+                'File': letter['filename'],
+                'Employee': letter['employee_email'],
+                'Sent To': letter['recipient'] or "(downloaded)",
+                'Template': letter['template_version'],
+            }
+            for letter in letters
+        ], use_container_width=True, hide_index=True)
+
+        choice = st.selectbox(
+            "Select a letter", range(len(letters)),
+            format_func=lambda i: f"{letters[i]['filename']} - "
+                                  f"{datetime.fromtimestamp(letters[i]['created_at']).strftime('%d %b %Y %H:%M')}"
+        )
+        letter = letters[choice]
+        pdf_bytes = archive.get(letter['digest'])
+
+        if pdf_bytes is None:
+            st.error("❌ The archived PDF file is missing.")
+        else:
+            st.download_button(
+                label="💾 Download PDF",
+                data=pdf_bytes,
+                file_name=letter['filename'],
+                mime="application/pdf"
+            )
+
+            with st.form("archive_resend_form"):
+                st.markdown("### 📧 Resend")
+                resend_to = st.text_input("Recipient Email*", value=letter['recipient'] or letter['employee_email'] or "")
+                resend_subject = st.text_input("Email Subject*", value=letter['subject'] or f"{letter['letter_type'].title()} Letter - Rapid Innovation")
+                resend_message = st.text_area("Email Message*", value="""Dear Employee,
+
+Please find attached a copy of your letter as requested.
+
+Best regards,
+HR Team
+Rapid Innovation""", height=150)
+
+                if st.form_submit_button("📤 Resend Letter"):
+                    if not st.session_state.email_config['configured']:
+                        st.warning("⚠️ Please configure email settings first in the Email Configuration section.")
+                    elif resend_to and resend_subject and resend_message:
+                        if validate_email(resend_to):
+                            success, message = send_configured_email(
+                                resend_to,
+                                [],
+                                resend_subject,
+                                plain_text_email(resend_message),
+                                pdf_bytes,
+                                letter['filename'],
+                                employee_email=letter['employee_email']
+                            )
+                            if success:
+                                archive_letter(pdf_bytes, letter['letter_type'], letter['filename'],
+                                               letter['employee_email'], resend_to, resend_subject,
+                                               letter['template_version'])
+                                st.success("✅ Letter resent successfully!")
+                            else:
+                                st.error(f"❌ Failed to send email: {message}")
+                        else:
+                            st.error("Please enter a valid recipient email address.")
+                    else:
+                        st.error("Please fill in all required fields.")
+
+    with st.expander("🗜️ Export Letters as ZIP"):
+        st.write("Letters for everyone joining (or, for experience letters, leaving) in a date range. "
+                 "Archived letters are reused; missing ones are rendered from the employee records.")
+        with st.form("archive_export_form"):
+            col1, col2 = st.columns(2)
+            with col1:
+                export_letter = st.selectbox("Letter", ["offer", "appointment", "experience"],
+                                             format_func=lambda letter: letter.title())
+                export_cohort = st.selectbox("Cohort", ["All", "Intern", "Full-time Employee", "Contractor"])
+            with col2:
+                export_start = st.date_input("From", value=datetime.now().date() - timedelta(days=90))
+                export_end = st.date_input("To", value=datetime.now().date())
+            export_submitted = st.form_submit_button("🗜️ Build ZIP")
+
+        if export_submitted:
+            export_dir = data_path("exports")
+            os.makedirs(export_dir, exist_ok=True)
+            export_file = os.path.join(export_dir, f"{export_letter}_letters_{export_start}_{export_end}.zip")
+            with st.spinner("Building the ZIP..."):
+                try:
+                    export_stats = export_letters(
+                        export_file, export_letter, export_start, export_end,
+                        None if export_cohort == "All" else export_cohort,
+                        employees=get_employee_store(), archive=archive
+                    )
+                except (OSError, OnboardingError) as e:
+                    st.error(f"❌ Could not export letters: {e}")
+                    export_stats = None
+
+            if export_stats:
+                st.success(f"✅ {export_stats['archived'] + export_stats['rendered']}/{export_stats['employees']} "
+                           f"letters ({export_stats['archived']} from the archive, {export_stats['rendered']} rendered) "
+                           f"in {export_stats['elapsed_seconds']:.1f}s")
+                if export_stats['skipped'] or export_stats['failed']:
+                    st.warning(f"⚠️ {export_stats['skipped']} skipped and {export_stats['failed']} failed, "
+                               "see manifest.csv in the ZIP for the reasons.")
+                with open(export_file, "rb") as f:
+                    st.download_button(
+                        label="💾 Download ZIP",
+                        data=f,
+                        file_name=os.path.basename(export_file),
+                        mime="application/zip"
+                    )
+
+elif page == "📬 Email Audit Log":
+    st.markdown("""
+    <div class="section-header">
+        <h2>📬 Email Audit Log</h2>
+    </div>
+    """, unsafe_allow_html=True)
+
+    st.info("Every email sent by this system, one row per send attempt. The log cannot be edited.")
+
+    prefill = employee_prefill("audit")
+    col1, col2 = st.columns(2)
+    with col1:
+        audit_start = st.date_input("From", value=datetime.now().date() - timedelta(days=30))
+    with col2:
+        audit_end = st.date_input("To", value=datetime.now().date())
+
+    audit_log = get_audit_log()
+    entries = audit_log.query(employee_email=prefill.get('email'), start=audit_start, end=audit_end)
+    if audit_log.dropped:
+        st.warning(f"⚠️ {audit_log.dropped} send attempts could not be written to the log since the app started; "
+                   "the server log lists them.")
+
+    if not entries:
+        st.info("No emails found for these filters.")
+    else:
+        failed = sum(1 for entry in entries if not entry['success'])
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Send Attempts", len(entries))
+        col2.metric("Failed", failed)
+        col3.metric("Avg SMTP Latency", f"{sum(entry['latency_ms'] for entry in entries) / len(entries):,.0f} ms")
+
+        st.dataframe([
+            {
+                'Sent': datetime.fromtimestamp(entry['sent_at']).strftime('%d %b %Y %H:%M:%S'),
+                'Phase': entry['phase'],
+                'Employee': entry['employee_email'],
+                'To': entry['recipient'],
+                'CC': entry['cc'],
+                'Subject': entry['subject'],
+                'Attachment': entry['attachment_name'],
+                'Status': "✅" if entry['success'] else "❌",
+                'SMTP Response': entry['smtp_response'],
+                'Latency (ms)': round(entry['latency_ms']),
+            }
+            for entry in entries
+        ], use_container_width=True, hide_index=True)
+
+        st.download_button(
+            label="📥 Export CSV",
+            data=audit_log.export_csv(entries),
+            file_name=f"email_audit_{audit_start}_{audit_end}.csv",
+            mime="text/csv"
+        )
+
+elif page == "🔎 Search":
+    st.markdown("""
+    <div class="section-header">
+        <h2>🔎 Search Letters & Emails</h2>
+    </div>
+    """, unsafe_allow_html=True)
+
+    search_index = get_search_index()
+    counts = search_index.count()
+    st.info(f"Searching {counts['letter']:,} letters and {counts['email']:,} emails. "
+            'Words match as prefixes and must all appear; use "quotes" for an exact phrase.')
+
+    search_text = st.text_input("Search", placeholder='e.g. priya "software engineer"')
+    col1, col2 = st.columns(2)
+    with col1:
+        search_kind = st.radio("Documents", ["All", "Letters", "Emails"], horizontal=True)
+    with col2:
+        search_field = st.selectbox("Match in", ["Anywhere", "Name", "Position", "Subject", "Body", "Email Address"])
+
+    if search_text:
+        kind = {'All': None, 'Letters': "letter", 'Emails': "email"}[search_kind]
+        field = {'Anywhere': None, 'Email Address': "people"}.get(search_field, search_field.lower())
+        started = datetime.now()
+        results = search_index.search(search_text, kind=kind, field=field)
+        elapsed_ms = (datetime.now() - started).total_seconds() * 1000
+
+        st.caption(f"{len(results)} result(s) in {elapsed_ms:,.0f} ms")
+        for result in results:
+            icon = "📄" if result['kind'] == "letter" else "📧"
+            title = result['subject'] or result['filename'] or "(no subject)"
+            when = datetime.fromtimestamp(result['created_at']).strftime('%d %b %Y %H:%M')
+            st.markdown(f"{icon} **{title}** · {result['name'] or result['employee_email'] or ''} "
+                        f"{'· ' + result['position'] + ' ' if result['position'] else ''}· {when}")
+            st.markdown(f"> {result['snippet']}")
+
+        letters = [result for result in results if result['kind'] == "letter" and result['ref']]
+        if letters:
+            choice = st.selectbox(
+                "Download a letter", range(len(letters)),
+                format_func=lambda i: f"{letters[i]['filename']} - {letters[i]['name'] or letters[i]['employee_email']}"
+            )
+            pdf_bytes = get_letter_archive().get(letters[choice]['ref'])
+            if pdf_bytes is None:
+                st.error("❌ The archived PDF file is missing.")
+            else:
+                st.download_button("💾 Download PDF", data=pdf_bytes, file_name=letters[choice]['filename'],
+                                   mime="application/pdf")
+
+elif page == "📦 Assets & Exits":
+    st.markdown("""
+    <div class="section-header">
+        <h2>📦 Assets & Exit Tracker</h2>
+    </div>
+    """, unsafe_allow_html=True)
+
+    tracker = get_exit_tracker()
+    counts = tracker.inventory_counts()
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("In Stock", counts['in_stock'])
+    col2.metric("Assigned", counts['assigned'])
+    col3.metric("Due Back", counts['return_pending'])
+    col4.metric("Lost", counts['lost'])
+
+    def exit_rows(exits):
+        return [
+            {
+                'Employee': exit_row['name'] or exit_row['employee_email'],
+                'Email': exit_row['employee_email'],
+                'Last Working Day': exit_row['last_working_day'],
+                **{EXIT_STEP_LABELS[step]: "✅" if exit_row[f"{step}_at"] else "⬜" for step in EXIT_STEPS},
+            }
+            for exit_row in exits
+        ]
+
+    def asset_rows(assets):
+        return [
+            {
+                'Serial': asset['serial'],
+                'Type': asset['asset_type'],
+                'Description': asset['description'],
+                'Holder': asset['holder_email'],
+                'Status': asset['status'].replace('_', ' ').title(),
+            }
+            for asset in assets
+        ]
+
+    tab1, tab2, tab3 = st.tabs(["🔎 Queries", "📥 Record Returns", "🗃️ Inventory"])
+
+    with tab1:
+        query = st.selectbox("Show", [
+            "Open exits",
+            "Unreturned laptops",
+            "All unreturned assets",
+            "Exits pending certificates",
+            "Exits pending asset returns",
+        ])
+        if query == "Open exits":
+            rows = exit_rows(tracker.open_exits())
+        elif query == "Unreturned laptops":
+            rows = asset_rows(tracker.unreturned(LAPTOP_TYPES))
+        elif query == "All unreturned assets":
+            rows = asset_rows(tracker.unreturned())
+        elif query == "Exits pending certificates":
+            rows = exit_rows(tracker.pending("certificate_issued"))
+        else:
+            rows = exit_rows(tracker.pending("assets_returned"))
+
+        if rows:
+            st.dataframe(rows, use_container_width=True, hide_index=True)
+        else:
+            st.success("✅ Nothing to show.")
+
+    with tab2:
+        st.write("Enter the serial numbers of the items received (one per line, e.g. from a barcode scanner). "
+                 "Each is matched to its holder and their exit is closed once nothing is left to return.")
+        with st.form("asset_returns_form"):
+            serials = st.text_area("Serial Numbers", placeholder="C02XK0AAJGH5\nPF2ABCDE")
+            returns_submitted = st.form_submit_button("📥 Record Returns")
+
+        if returns_submitted:
+            for serial, asset, settled, error in tracker.record_returns([line.strip() for line in serials.splitlines() if line.strip()]):
+                if error:
+                    st.error(f"❌ {serial}: {error}")
+                    continue
+                st.success(f"✅ {asset['asset_type']} {asset['serial']} returned by {asset['holder_email']}")
+                if settled:
+                    record_employee(asset['holder_email'], "Exit", "assets_returned", status="assets_returned")
+                    st.info(f"📦 {asset['holder_email']} has returned everything.")
+
+        st.markdown("#### No serial at hand?")
+        prefill = employee_prefill("asset_return")
+        if prefill:
+            with st.form("asset_return_by_holder_form"):
+                return_type = st.selectbox("Asset Type", ["Any"] + ASSET_TYPES)
+                if st.form_submit_button("📥 Record Return"):
+                    try:
+                        asset, settled = tracker.record_return(
+                            holder_email=prefill['email'], asset_type=None if return_type == "Any" else return_type
+                        )
+                    except (sqlite3.Error, ValueError) as e:
+                        st.error(f"❌ {e}")
+                    else:
+                        st.success(f"✅ {asset['asset_type']} {asset['serial']} returned by {asset['holder_email']}")
+                        if settled:
+                            record_employee(asset['holder_email'], "Exit", "assets_returned", status="assets_returned")
+                            st.info(f"📦 {asset['holder_email']} has returned everything.")
+
+    with tab3:
+        with st.form("asset_add_form"):
+            st.markdown("### ➕ Add or Assign an Asset")
+            col1, col2 = st.columns(2)
+            with col1:
+                new_serial = st.text_input("Serial Number*")
+                new_type = st.selectbox("Asset Type*", ASSET_TYPES)
+            with col2:
+                new_description = st.text_input("Description", placeholder="MacBook Pro 14\" M3, 16 GB")
+                new_holder = st.text_input("Assign To (employee email)", placeholder="Leave empty to keep in stock")
+            if st.form_submit_button("💾 Save"):
+                try:
+                    if tracker.asset(new_serial):
+                        asset = tracker.assign(new_serial, new_holder)
+                    else:
+                        asset = tracker.add_asset(new_serial, new_type, new_description or None, new_holder or None)
+                except (sqlite3.Error, ValueError) as e:
+                    st.error(f"❌ {e}")
+                else:
+                    st.success(f"✅ {asset['serial']} is {asset['status'].replace('_', ' ')}"
+                               f"{' to ' + asset['holder_email'] if asset['holder_email'] else ''}.")
+
+        lookup = st.text_input("🔎 Look up a serial number")
+        if lookup.strip():
+            asset = tracker.asset(lookup)
+            if asset:
+                st.dataframe(asset_rows([asset]), use_container_width=True, hide_index=True)
+                if asset['status'] in ("assigned", "return_pending") and st.button("Write off as lost"):
+                    if tracker.mark_lost(asset['serial']):
+                        record_employee(asset['holder_email'], "Exit", "assets_returned", status="assets_returned",
+                                        detail=f"{asset['serial']} written off")
+                    st.success(f"✅ {asset['serial']} marked as lost.")
+            else:
+                st.info("No asset with this serial number.")
+
 # Footer
 st.markdown("---")
 st.markdown("""
@@ -47,3 +47,86 @@ DOCUMENT_STYLES = {
     "font_family": "Arial, sans-serif",
     "line_height": "1.6"
 }
+
+# Generated Document Store (shared by all sessions, see core/document_store.py)
+DOCUMENT_STORE_MAX_BYTES = 64 * 1024 * 1024
+DOCUMENT_STORE_TTL_SECONDS = 60 * 60
+
+# Salary policy used to split a target annual CTC into components (core/salary.py solve_ctc).
+# Special Allowance takes whatever is left; if the target is too low for the fixed
+# reimbursements, they are reduced from the last one up.
+SALARY_POLICY = {
+    "basic_percent_of_ctc": 48,
+    "hra_percent_of_basic": 50,
+    "fixed_monthly": {
+        "medical_allowance": 1250,
+        "books_periodical": 500,
+        "health_club": 1000,
+        "internet_telephone": 2500,
+    },
+    "pf_percent_of_basic": 12,
+    "pf_cap_monthly": 1800,
+}
+
+# Local data (job queue, PDF cache, ...), relative to the project directory
+DATA_DIR = "data"
+PDF_CACHE_MAX_BYTES = 256 * 1024 * 1024
+# Rendered PDFs and outgoing emails larger than this are spooled to disk (see core/spool.py)
+SPOOL_MAX_MEMORY_BYTES = 4 * 1024 * 1024
+
+# PDF size presets (see core/pdf_size.py). Images embedded in a letter are scaled down to
+# image_max_width pixels and stored as PNG (lossless) or JPEG at jpeg_quality; the rendered PDF
+# then has identical objects (repeated images) merged, page streams Flate-compressed at
+# flate_level and, with strip_metadata, its producer/creator metadata removed.
+PDF_PRESETS = {
+    "original": {},  # As rendered (also used for the separately cached pages of a letter)
+    "standard": {
+        "image_max_width": 1200, "image_format": "PNG",
+        "dedupe_objects": True, "flate_level": 9, "strip_metadata": True,
+    },
+    "compact": {
+        "image_max_width": 600, "image_format": "JPEG", "jpeg_quality": 80,
+        "dedupe_objects": True, "flate_level": 9, "strip_metadata": True,
+    },
+}
+# Preset for each letter type; other PDFs use PDF_DEFAULT_PRESET
+PDF_LETTER_PRESETS = {
+    "offer": "standard",
+    "appointment": "standard",
+    "experience": "standard",
+    "revision": "standard",
+}
+PDF_DEFAULT_PRESET = "standard"
+
+# Worker processes shared by the app and the API for rendering several PDFs at once (see core/workers.py)
+RENDER_POOL_WORKERS = 4
+# Limits per PDF render: wall-clock and CPU seconds per document, and memory (data segment) per render
+# worker or wkhtmltopdf process. Render workers are replaced after RENDER_WORKER_MAX_JOBS renders, or
+# once one grows past RENDER_WORKER_MAX_RSS_MB (a leak), and run at a lower CPU priority
+# (RENDER_WORKER_NICE, also used by batch workers) so the app stays responsive under load.
+RENDER_TIMEOUT_SECONDS = 60
+RENDER_CPU_LIMIT_SECONDS = 60
+RENDER_MEMORY_LIMIT_MB = 2048
+RENDER_WORKER_MAX_JOBS = 100
+RENDER_WORKER_MAX_RSS_MB = 1024
+RENDER_WORKER_NICE = 10
+
+# Candidate packets (see core/packet.py). A staged packet sends the offer letter right away,
+# the appointment letter PACKET_APPOINTMENT_DELAY_HOURS later and the welcome email at
+# PACKET_WELCOME_HOUR (local time) on the start date.
+PACKET_APPOINTMENT_DELAY_HOURS = 24
+PACKET_WELCOME_HOUR = 9
+
+# Letter archive blobs: "files" (one file per PDF) or "packs" (append-only pack files, see core/packstore.py)
+ARCHIVE_STORAGE = "files"
+ARCHIVE_PACK_MAX_BYTES = 512 * 1024 * 1024
+
+# Pipeline dashboard: days in a stage after which an employee counts as stuck
+PIPELINE_STUCK_DAYS = {
+    "docs_requested": 7,
+    "offer_sent": 7,
+    "appointment_sent": 14,
+    "bgv_pending": 14,
+    "exit_initiated": 30,
+    "assets_returned": 14,
+}
@@ -0,0 +1,33 @@
+"""
+Streamlit-independent building blocks of the onboarding system
+
+Everything under core can be imported without starting the UI, so the
+Streamlit app, the batch CLI, the API service and worker processes share
+the same code. Failures are raised as core.errors exceptions rather than
+reported to a UI.
+
+    generators  HTML for offer/appointment/experience letters
+    renderer    HTML -> PDF
+    mailer      SMTP delivery
+    emails      subjects and bodies of every email the app sends
+"""
+
+from core.errors import (
+    EmailDeliveryError,
+    ImportFileError,
+    InvalidCandidateError,
+    OnboardingError,
+    PdfRenderError,
+    RenderAbortedError,
+    RenderCancelledError,
+    RenderTimeoutError,
+    TemplateNotFoundError,
+)
+from core.generators import (
+    generate_appointment_letter,
+    generate_experience_letter,
+    generate_offer_letter,
+    generate_offer_letter_with_salary,
+)
+from core.mailer import deliver_email
+from core.renderer import render_pdf
@@ -0,0 +1,215 @@
+"""
+Content-addressed archive of every generated letter
+
+Each PDF is stored once under the SHA-256 of its bytes
+(data/archive/<first 2 hex chars>/<digest>.pdf), so sending or downloading
+the same letter again adds a metadata row but no new file. The metadata
+(employee, letter type, template version, recipient, time) lives in
+data/archive.db and lets HR re-download or resend a letter without
+rendering it again.
+
+With ARCHIVE_STORAGE = "packs" in config.py new PDFs are appended to pack
+files instead (see core/packstore.py); letters stored as loose files before
+the switch stay readable until `python run.py archive pack` moves them.
+"""
+
+import os
+import sqlite3
+import tempfile
+import time
+from contextlib import closing
+
+from config import ARCHIVE_PACK_MAX_BYTES, ARCHIVE_STORAGE
+from core.packstore import PackStore
+from core.paths import data_path
+from core.spool import copy_data, data_digest
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS letters (
+    id INTEGER PRIMARY KEY,
+    digest TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    letter_type TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    employee_email TEXT,
+    recipient TEXT,
+    subject TEXT,
+    template_version TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_letters_employee ON letters (employee_email, created_at);
+CREATE INDEX IF NOT EXISTS idx_letters_digest ON letters (digest);
+CREATE INDEX IF NOT EXISTS idx_letters_created ON letters (created_at);
+"""
+
+class FileBlobStore:
+    """One file per blob: <directory>/<first 2 hex chars>/<digest>.pdf"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _blob_path(self, digest):
+        return os.path.join(self.directory, digest[:2], digest + ".pdf")
+
+    def put(self, digest, data):
+        """Write the blob (bytes or a binary file) unless an identical one is already stored; returns True if written"""
+        path = self._blob_path(digest)
+        if os.path.exists(path):
+            return False
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            copy_data(data, f)
+        os.replace(tmp_path, path)
+        return True
+
+    def get(self, digest):
+        try:
+            with open(self._blob_path(digest), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def open(self, digest):
+        return open(self._blob_path(digest), "rb")
+
+    def remove(self, digest):
+        try:
+            os.remove(self._blob_path(digest))
+        except FileNotFoundError:
+            pass
+
+    def __contains__(self, digest):
+        return os.path.exists(self._blob_path(digest))
+
+    def __iter__(self):
+        """Stored digests (pack files and other subdirectories are skipped)"""
+        for prefix in sorted(os.listdir(self.directory)):
+            subdirectory = os.path.join(self.directory, prefix)
+            if len(prefix) != 2 or not os.path.isdir(subdirectory):
+                continue
+            for name in sorted(os.listdir(subdirectory)):
+                if name.endswith(".pdf"):
+                    yield name[:-4]
+
+    def scan(self):
+        """(digest, bytes) for every stored blob"""
+        for digest in self:
+            data = self.get(digest)
+            if data is not None:
+                yield digest, data
+
+class LetterArchive:
+    """PDF blobs stored once by content hash, plus one metadata row per archived letter"""
+
+    def __init__(self, path=None, blob_dir=None, storage=None):
+        self.path = path or data_path("archive.db")
+        self.blob_dir = blob_dir or data_path("archive")
+        self.files = FileBlobStore(self.blob_dir)
+        self.packs = None
+        if (storage or ARCHIVE_STORAGE) == "packs":
+            self.packs = PackStore(os.path.join(self.blob_dir, "packs"), ARCHIVE_PACK_MAX_BYTES)
+        with closing(self._connect()) as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _stores(self):
+        """Where to look for a blob: packs first when enabled, then loose files"""
+        return [store for store in (self.packs, self.files) if store is not None]
+
+    def put(self, pdf, letter_type, filename, employee_email=None, recipient=None,
+            subject=None, template_version=None):
+        """Archive a letter (PDF bytes or a binary file) and return its digest"""
+        digest, size = data_digest(pdf)
+        if digest not in self.files:
+            (self.packs or self.files).put(digest, pdf)
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT INTO letters (digest, size, letter_type, filename, employee_email, recipient, "
+                "subject, template_version, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (digest, size, letter_type, filename, (employee_email or "").strip().lower() or None,
+                 recipient, subject, template_version, time.time())
+            )
+        return digest
+
+    def get(self, digest):
+        """PDF bytes for a digest, or None if it is not archived"""
+        for store in self._stores():
+            data = store.get(digest)
+            if data is not None:
+                return data
+        return None
+
+    def entry(self, entry_id):
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT * FROM letters WHERE id = ?", (entry_id,)).fetchone()
+        return dict(row) if row else None
+
+    def for_employee(self, employee_email, limit=50):
+        """Letters archived for an employee, newest first"""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT * FROM letters WHERE employee_email = ? ORDER BY created_at DESC LIMIT ?",
+                ((employee_email or "").strip().lower(), limit)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def open_blob(self, digest):
+        """Binary file object for an archived PDF, for streaming it without reading it whole"""
+        for store in self._stores():
+            if digest in store:
+                return store.open(digest)
+        raise FileNotFoundError(digest)
+
+    def latest(self, employee_emails, letter_type):
+        """The most recently archived letter of a type for an employee, or None
+
+        employee_emails is one address or several (e.g. an employee's personal
+        and official addresses), since letters are archived under either.
+        """
+        if isinstance(employee_emails, str):
+            employee_emails = [employee_emails]
+        emails = sorted({e.strip().lower() for e in employee_emails if e})
+        if not emails:
+            return None
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                f"SELECT * FROM letters WHERE employee_email IN ({', '.join('?' * len(emails))}) "
+                "AND letter_type = ? ORDER BY created_at DESC LIMIT 1",
+                emails + [letter_type]
+            ).fetchone()
+        return dict(row) if row else None
+
+    def recent(self, limit=50):
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT * FROM letters ORDER BY created_at DESC LIMIT ?", (limit,)).fetchall()
+        return [dict(row) for row in rows]
+
+    def close(self):
+        """Release the pack index connections (a no-op with loose files)"""
+        if self.packs is not None:
+            self.packs.close()
+
+    def stats(self):
+        """Letters archived, distinct PDFs stored and bytes saved by deduplication"""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT COUNT(*) AS letters, COALESCE(SUM(size), 0) AS letter_bytes, "
+                "COUNT(DISTINCT digest) AS blobs FROM letters"
+            ).fetchone()
+            stored = conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM (SELECT DISTINCT digest, size FROM letters)"
+            ).fetchone()[0]
+        return {
+            'letters': row['letters'],
+            'blobs': row['blobs'],
+            'stored_bytes': stored,
+            'saved_bytes': row['letter_bytes'] - stored,
+        }
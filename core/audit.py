@@ -0,0 +1,221 @@
+"""
+Append-only audit log of every outbound email
+
+core/mailer.deliver_email records one row per send attempt: phase, employee,
+recipients, subject, attachment name and hash, SMTP response and latency.
+Rows are handed to a background writer thread and inserted in batches, so
+logging adds no noticeable latency to bulk sends. A batch that fails while the
+database is busy is retried with backoff, then written row by row so one bad
+row cannot lose the rest; rows that still fail are counted and handed back by
+flush(). Triggers reject UPDATE and DELETE, so the log can only grow.
+"""
+
+import atexit
+import csv
+import io
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from datetime import datetime, time as dt_time
+
+from core.paths import data_path
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS email_audit (
+    id INTEGER PRIMARY KEY,
+    sent_at REAL NOT NULL,
+    phase TEXT,
+    employee_email TEXT,
+    sender TEXT,
+    recipient TEXT NOT NULL,
+    cc TEXT,
+    subject TEXT,
+    attachment_name TEXT,
+    attachment_sha256 TEXT,
+    attachment_bytes INTEGER,
+    success INTEGER NOT NULL,
+    smtp_response TEXT,
+    latency_ms REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_email_audit_employee ON email_audit (employee_email, sent_at);
+CREATE INDEX IF NOT EXISTS idx_email_audit_sent_at ON email_audit (sent_at);
+CREATE TRIGGER IF NOT EXISTS trg_email_audit_no_update BEFORE UPDATE ON email_audit
+BEGIN
+    SELECT RAISE(ABORT, 'email_audit is append-only');
+END;
+CREATE TRIGGER IF NOT EXISTS trg_email_audit_no_delete BEFORE DELETE ON email_audit
+BEGIN
+    SELECT RAISE(ABORT, 'email_audit is append-only');
+END;
+"""
+
+COLUMNS = [
+    "sent_at", "phase", "employee_email", "sender", "recipient", "cc", "subject", "attachment_name",
+    "attachment_sha256", "attachment_bytes", "success", "smtp_response", "latency_ms",
+]
+INSERT_SQL = f"INSERT INTO email_audit ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+
+WRITE_ATTEMPTS = 4           # batch attempts while the database is locked or busy
+RETRY_DELAY_SECONDS = 0.2    # doubled after every failed attempt
+
+def _timestamp(value, end_of_day=False):
+    """Accept epoch seconds, datetimes or dates (a date as the end of that day if end_of_day)"""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    if not isinstance(value, datetime):
+        value = datetime.combine(value, dt_time.max if end_of_day else dt_time.min)
+    return value.timestamp()
+
+class EmailAuditLog:
+    """Append-only email log with a background writer that inserts rows in batches"""
+
+    def __init__(self, path=None, batch_size=100, flush_interval=0.5):
+        self.path = path or data_path("email_audit.db")
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._dropped = []
+        self.dropped = 0  # rows that could not be written since the log was opened
+        with closing(self._connect()) as conn:
+            conn.executescript(SCHEMA)
+        self._writer = threading.Thread(target=self._write_loop, name="email-audit-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def log(self, **entry):
+        """Queue one send attempt for writing; never blocks on the database"""
+        entry.setdefault("sent_at", time.time())
+        self._queue.put(tuple(entry.get(column) for column in COLUMNS))
+
+    def flush(self):
+        """Wait until every queued entry has been handled
+
+        Returns the entries (as dicts) that could not be written since the last flush.
+        """
+        self._queue.join()
+        with self._lock:
+            dropped, self._dropped = self._dropped, []
+        return [dict(zip(COLUMNS, row)) for row in dropped]
+
+    def _insert(self, conn, rows):
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(INSERT_SQL, rows)
+            conn.execute("COMMIT")
+        except Exception:
+            try:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+            except sqlite3.Error:
+                logger.exception("Could not roll back the email audit write")
+            raise
+
+    def _write_batch(self, conn, batch):
+        """Write a batch, retrying with backoff while the database is busy and
+        then row by row; returns the rows that could not be written"""
+        delay = RETRY_DELAY_SECONDS
+        for attempt in range(1, WRITE_ATTEMPTS + 1):
+            try:
+                self._insert(conn, batch)
+                return []
+            except sqlite3.OperationalError as exc:
+                # Locked, busy or I/O errors can pass; anything else fails the same way again
+                if attempt == WRITE_ATTEMPTS:
+                    break
+                logger.warning("Email audit write failed (%s), retrying in %.1fs", exc, delay)
+                time.sleep(delay)
+                delay *= 2
+            except Exception:
+                break
+        logger.warning("Could not write %d email audit entries as a batch, writing them one by one", len(batch))
+        failed = []
+        for row in batch:
+            try:
+                self._insert(conn, [row])
+            except Exception:
+                logger.exception("Dropped email audit entry: %r", row)
+                failed.append(row)
+        return failed
+
+    def _write_loop(self):
+        with closing(self._connect()) as conn:
+            while True:
+                batch = [self._queue.get()]
+                deadline = time.monotonic() + self.flush_interval
+                while len(batch) < self.batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(self._queue.get(timeout=remaining))
+                    except queue.Empty:
+                        break
+                try:
+                    failed = self._write_batch(conn, batch)
+                except Exception:
+                    # Keep the writer alive: a thread that dies here would leave flush() waiting forever
+                    logger.exception("Could not write %d email audit entries", len(batch))
+                    failed = batch
+                if failed:
+                    with self._lock:
+                        self._dropped.extend(failed)
+                        self.dropped += len(failed)
+                for _ in batch:
+                    self._queue.task_done()
+
+    def query(self, employee_email=None, start=None, end=None, limit=1000):
+        """Send attempts for an employee and/or date range, newest first
+
+        start and end are epoch seconds, datetimes or dates (end dates are inclusive).
+        """
+        self._queue.join()
+        conditions, params = [], []
+        if employee_email:
+            conditions.append("employee_email = ?")
+            params.append(employee_email.strip().lower())
+        if start is not None:
+            conditions.append("sent_at >= ?")
+            params.append(_timestamp(start))
+        if end is not None:
+            conditions.append("sent_at <= ?")
+            params.append(_timestamp(end, end_of_day=True))
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                f"SELECT * FROM email_audit {where} ORDER BY sent_at DESC LIMIT ?", params + [limit]
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def export_csv(self, rows):
+        """CSV text for rows returned by query, with readable timestamps"""
+        output = io.StringIO()
+        writer = csv.writer(output)
+        writer.writerow(COLUMNS)
+        for row in rows:
+            values = dict(row)
+            values['sent_at'] = datetime.fromtimestamp(values['sent_at']).isoformat(timespec="seconds")
+            writer.writerow([values.get(column) for column in COLUMNS])
+        return output.getvalue()
+
+_audit_log = None
+_audit_log_lock = threading.Lock()
+
+def get_audit_log():
+    """The process-wide audit log (created on first use, flushed at exit)"""
+    global _audit_log
+    with _audit_log_lock:
+        if _audit_log is None:
+            _audit_log = EmailAuditLog()
+            atexit.register(_audit_log.flush)
+        return _audit_log
@@ -0,0 +1,190 @@
+"""
+Headless batch generation of letters from a CSV/JSON list of candidates
+
+See core/letters.py for the candidate record format. PDFs are rendered a
+chunk of candidates at a time in one engine session (core/renderer.py
+render_pdfs); session=False renders each document separately instead.
+"""
+
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+from core.generators import generate_experience_letter
+from core.letters import attach_salary_data, build_letter
+from core.pdf_size import letter_preset, optimize_pdf, preset_options, shrink_images
+from core.renderer import render_pdf, render_pdfs
+from core.workers import init_worker
+
+# Most documents rendered in one engine session (bounds a worker's memory and temp files)
+RENDER_SESSION_SIZE = 200
+
+def load_candidates(path):
+    """Read candidate records from a .csv or .json file"""
+    if path.lower().endswith(".json"):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            data = data.get("candidates", [])
+        return data
+
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        return list(csv.DictReader(f))
+
+def render_candidate(job):
+    """Worker entry point: render one candidate and write it to the output directory"""
+    index, candidate, output_dir, output_format = job
+    result = {'index': index, 'letter': candidate.get("letter") or "offer", 'name': candidate.get("name")}
+    started = time.perf_counter()
+
+    try:
+        html, filename = build_letter(candidate)
+        html_done = time.perf_counter()
+        result['html_seconds'] = html_done - started
+
+        if output_format == "html":
+            data = html.encode("utf-8")
+        else:
+            options = preset_options(letter_preset(result['letter']))
+            data = optimize_pdf(render_pdf(shrink_images(html, options)), options)
+        result['pdf_seconds'] = time.perf_counter() - html_done
+
+        path = os.path.join(output_dir, f"{index:05d}_{filename}.{output_format}")
+        with open(path, "wb") as f:
+            f.write(data)
+
+        result.update({'ok': True, 'path': path, 'bytes': len(data)})
+    except Exception as e:
+        result.update({'ok': False, 'error': str(e)})
+
+    result['seconds'] = time.perf_counter() - started
+    return result
+
+def render_chunk(jobs):
+    """Worker entry point: render a chunk of candidates, with all their PDFs in one engine session"""
+    results, built = [], []
+    for index, candidate, output_dir, _ in jobs:
+        result = {'index': index, 'letter': candidate.get("letter") or "offer", 'name': candidate.get("name")}
+        started = time.perf_counter()
+        try:
+            html, filename = build_letter(candidate)
+            options = preset_options(letter_preset(result['letter']))
+            built.append((result, shrink_images(html, options), options,
+                          os.path.join(output_dir, f"{index:05d}_{filename}.pdf")))
+        except Exception as e:
+            result.update({'ok': False, 'error': str(e)})
+        result['html_seconds'] = result['seconds'] = time.perf_counter() - started
+        results.append(result)
+
+    started = time.perf_counter()
+    rendered = render_pdfs(html for _, html, _, _ in built)
+    # The session is shared, so each document is charged an equal part of it
+    pdf_seconds = (time.perf_counter() - started) / len(built) if built else 0.0
+    for (result, _, options, path), data in zip(built, rendered):
+        result['pdf_seconds'] = pdf_seconds
+        result['seconds'] += pdf_seconds
+        if isinstance(data, Exception):
+            result.update({'ok': False, 'error': str(data)})
+            continue
+        try:
+            data = optimize_pdf(data, options)
+            with open(path, "wb") as f:
+                f.write(data)
+            result.update({'ok': True, 'path': path, 'bytes': len(data)})
+        except Exception as e:
+            result.update({'ok': False, 'error': str(e)})
+    return results
+
+def _chunks(jobs, size):
+    return [jobs[i:i + size] for i in range(0, len(jobs), size)]
+
+def run_batch(candidates, output_dir, workers=None, output_format="pdf", progress=None, session=True):
+    """Render all candidates across a process pool and return throughput stats
+
+    progress, if given, is called with each per-document result as it finishes.
+    With session (the default), each worker renders its chunk of PDFs in one
+    engine session instead of starting the engine for every document.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    candidates = attach_salary_data(candidates)
+    jobs = [(i, c, output_dir, output_format) for i, c in enumerate(candidates, start=1)]
+    results = []
+
+    def finished(result):
+        results.append(result)
+        if progress:
+            progress(result)
+
+    started = time.perf_counter()
+    chunksize = max(1, len(jobs) // (workers * 4))
+    if session and output_format == "pdf":
+        chunks = _chunks(jobs, min(chunksize, RENDER_SESSION_SIZE))
+        if workers == 1:
+            for chunk in chunks:
+                for result in render_chunk(chunk):
+                    finished(result)
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as executor:
+                for chunk_results in executor.map(render_chunk, chunks):
+                    for result in chunk_results:
+                        finished(result)
+    elif workers == 1:
+        for job in jobs:
+            finished(render_candidate(job))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as executor:
+            for result in executor.map(render_candidate, jobs, chunksize=chunksize):
+                finished(result)
+    elapsed = time.perf_counter() - started
+
+    succeeded = [r for r in results if r['ok']]
+    by_letter = {}
+    for r in succeeded:
+        by_letter[r['letter']] = by_letter.get(r['letter'], 0) + 1
+
+    return {
+        'total': len(results),
+        'succeeded': len(succeeded),
+        'failed': [r for r in results if not r['ok']],
+        'by_letter': by_letter,
+        'workers': workers,
+        'elapsed_seconds': elapsed,
+        'documents_per_second': len(succeeded) / elapsed if elapsed else 0.0,
+        'bytes_written': sum(r['bytes'] for r in succeeded),
+        'html_seconds': sum(r['html_seconds'] for r in succeeded),
+        'pdf_seconds': sum(r['pdf_seconds'] for r in succeeded),
+    }
+
+def benchmark(count=200):
+    """Render count internship certificates one at a time and in one engine session (raises PdfRenderError)"""
+    documents = [
+        generate_experience_letter(f"Intern {i}", "Software Engineering Intern", date(2025, 1, 6), date(2025, 6, 30),
+                                   "internship")
+        for i in range(1, count + 1)
+    ]
+
+    started = time.perf_counter()
+    single = [render_pdf(html) for html in documents]
+    single_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    rendered = render_pdfs(documents)
+    session_seconds = time.perf_counter() - started
+    for data in rendered:
+        if isinstance(data, Exception):
+            raise data
+
+    return {
+        'documents': count,
+        'single_seconds': single_seconds,
+        'session_seconds': session_seconds,
+        'single_per_second': count / single_seconds if single_seconds else 0.0,
+        'session_per_second': count / session_seconds if session_seconds else 0.0,
+        'speedup': single_seconds / session_seconds if session_seconds else 0.0,
+        'single_bytes': sum(len(data) for data in single),
+        'session_bytes': sum(len(data) for data in rendered),
+    }
@@ -0,0 +1,120 @@
+"""
+Shared store for generated documents (offer letters, certificates, ...)
+
+Generated HTML embeds the header, footer and signature images as base64, so a
+single letter is several hundred KB. Instead of keeping a copy in every
+user's session state, documents are stored once per process here and the
+session only keeps the short key returned by put().
+"""
+
+import hashlib
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+class DocumentStore:
+    """Size-bounded, TTL-evicting document store shared by all sessions"""
+
+    def __init__(self, max_bytes, ttl_seconds):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._size = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    def put(self, content, owner=None):
+        """Store content and return its key (identical content is stored once)"""
+        key = hashlib.sha256(content.encode("utf-8")).hexdigest()[:16]
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = {
+                    'content': content,
+                    'size': sys.getsizeof(content),
+                    'owners': set(),
+                    'created': now,
+                }
+                self._entries[key] = entry
+                self._size += entry['size']
+            entry['expires'] = now + self.ttl_seconds
+            if owner is not None:
+                entry['owners'].add(owner)
+            self._entries.move_to_end(key)
+            self._evict(now, keep=key)
+
+        return key
+
+    def get(self, key):
+        """Return stored content, or None if the key expired or was evicted"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry['expires'] <= now:
+                self._drop(key)
+                return None
+            entry['expires'] = now + self.ttl_seconds
+            self._entries.move_to_end(key)
+            return entry['content']
+
+    def release(self, key, owner):
+        """Forget that owner references key; unreferenced documents are dropped"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            entry['owners'].discard(owner)
+            if not entry['owners']:
+                self._drop(key)
+
+    def report(self):
+        """Summarise store usage overall and per owning session"""
+        now = time.monotonic()
+        with self._lock:
+            self._evict(now)
+            sessions = {}
+            for entry in self._entries.values():
+                for owner in entry['owners']:
+                    stats = sessions.setdefault(owner, {'session': owner, 'documents': 0, 'bytes': 0})
+                    stats['documents'] += 1
+                    stats['bytes'] += entry['size']
+
+            return {
+                'documents': len(self._entries),
+                'bytes': self._size,
+                'max_bytes': self.max_bytes,
+                'ttl_seconds': self.ttl_seconds,
+                'evictions': self._evictions,
+                'sessions': sorted(sessions.values(), key=lambda s: s['bytes'], reverse=True),
+            }
+
+    def _drop(self, key):
+        entry = self._entries.pop(key)
+        self._size -= entry['size']
+
+    def _evict(self, now, keep=None):
+        # Expired entries first, then least recently used until under budget
+        for key in [k for k, e in self._entries.items() if e['expires'] <= now and k != keep]:
+            self._drop(key)
+            self._evictions += 1
+
+        while self._size > self.max_bytes and len(self._entries) > 1:
+            key = next(iter(self._entries))
+            if key == keep:
+                self._entries.move_to_end(key)
+                key = next(iter(self._entries))
+            self._drop(key)
+            self._evictions += 1
+
+def estimate_size(value):
+    """Rough deep size in bytes of a session state value"""
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple, set)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    return sys.getsizeof(value)
@@ -0,0 +1,479 @@
+"""
+Subjects and HTML bodies of every email the onboarding system sends
+
+Each function returns (subject, html_body), except plain_text_email which
+only wraps a body typed in the UI.
+"""
+
+# Certificate letter_type -> (subject title, first line of the email)
+CERTIFICATE_EMAILS = {
+    "internship": ("Internship Certificate", "PFA: Internship Certificate"),
+    "dues_not_settled": ("Experience Letter", "PFA, your Experience Letter."),
+    "standard": ("Experience Letter", "PFA, your Experience Letter."),
+}
+
+def offer_letter_email(offer_type, candidate_name, position, start_date):
+    """Subject and HTML body for the email that carries an offer letter"""
+    if offer_type == "Intern":
+        subject = f'Rapid Innovation - Letter of Internship - "{position}" Intern'
+        email_body = f"""
+        <html>
+        <body>
+        <p>Hello {candidate_name},</p>
+        <p>Greetings from Rapid Innovation!!</p>
+        <p>As discussed, we are pleased to extend the offer to you for the "{position}" Intern position at Rapid Innovation Pvt. Ltd. - Remote, starting on {start_date.strftime('%B %d, %Y')}.</p>
+        <p>PFA the copy of the internship letter for your ready reference. Kindly revert with your acceptance by sending the duly signed copy of the letter.</p>
+        <p>At Rapid Innovation, we provide every possible opportunity for the growth and development of our people, and we hope that you will also contribute to the growth of Rapid Innovation.</p>
+        <p>We look forward to a lasting relationship between us.</p>
+        <p>Best wishes for your new endeavors !!</p>
+        <p>Please feel free to contact us if you have any queries.</p>
+        <br>
+        <p>Regards<br>
+        Team HR<br>
+        Rapid Innovation</p>
+        </body>
+        </html>
+        """
+    elif offer_type == "Full-time Employee":
+        subject = f'Rapid Innovation - Offer letter - {position}'
+        email_body = f"""
+        <html>
+        <body>
+        <p>Hello {candidate_name},</p>
+        <p>Greetings from Rapid Innovation !!</p>
+        <p>We are pleased to extend the offer to you for the position of "{position}" at Rapid Innovation, starting on or before {start_date.strftime('%B %d, %Y')}.</p>
+        <p>PFA the copy of the offer letter for your ready reference. Kindly revert with your acceptance by sending the duly signed copy of the letter. This opportunity is a permanent remote job.</p>
+        <p>At Rapid Innovation, we provide every opportunity for the growth and development of our people, and we hope that you will also contribute to the growth of Rapid Innovation.</p>
+        <p>We look forward to a lasting relationship between us.</p>
+        <p>Best wishes for your new endeavors !!</p>
+        <p>Please feel free to contact us if you have any queries.</p>
+        <br>
+        <p>Best regards,<br>
+        Team HR<br>
+        Rapid Innovation</p>
+        </body>
+        </html>
+        """
+    else:  # Contractor
+        subject = f'Rapid Innovation - Contractor\'s Agreement - {candidate_name}'
+        email_body = f"""
+        <html>
+        <body>
+        <p>Hello {candidate_name},</p>
+        <p>Greetings from Rapid Innovation.</p>
+        <p>As discussed, we are pleased to extend the offer as a Contractor at Rapid Innovation, starting on or before {start_date.strftime('%B %d, %Y')}.</p>
+        <p>PFA the copy of the agreement for your ready reference. Kindly revert with your acceptance by sending the duly signed copy of the letter. This opportunity is a permanent remote job.</p>
+        <p>At Rapid Innovation, we provide every possible opportunity for the growth and development of our people, and we hope that you will also contribute to its growth.</p>
+        <p>We look forward to a long-lasting relationship between us.</p>
+        <p>Best wishes for your new endeavors !!</p>
+        <p>Please don't hesitate to contact us if you have any questions.</p>
+        <br>
+        <p>Thanks & Regards<br>
+        Team HR<br>
+        Rapid Innovation</p>
+        </body>
+        </html>
+        """
+
+    return subject, email_body
+
+def certificate_email(name, letter_type):
+    """Subject and HTML body for the email that carries an experience letter/certificate"""
+    title, email_intro = CERTIFICATE_EMAILS.get(letter_type, CERTIFICATE_EMAILS["standard"])
+    subject = f"Rapid Innovation - {title} - {name}"
+    email_body = f"""
+    <html>
+    <body>
+    <p>Hi {name},</p>
+    <p>I hope you are doing well.</p>
+    <p>{email_intro}</p>
+    <p>Kindly reach out to us if you have any concerns.</p>
+    <br>
+    <p>Thanks & Regards<br>
+    Team HR<br>
+    Rapid Innovation</p>
+    </body>
+    </html>
+    """
+
+    return subject, email_body
+
+def appointment_letter_email(name):
+    """Subject and HTML body for the email that carries an appointment letter"""
+    subject = "Appointment Letter - Rapid Innovation"
+    email_body = f"""
+    <html>
+    <body>
+    <p>Dear {name},</p>
+    <p>Please find attached your appointment letter for your position at Rapid Innovation.</p>
+    <p>We are excited to have you join our team!</p>
+    <br>
+    <p>Best regards,<br>
+    HR Team<br>
+    Rapid Innovation</p>
+    </body>
+    </html>
+    """
+
+    return subject, email_body
+
+def revision_letter_email(name, effective_date):
+    """Subject and HTML body for the email that carries a salary revision letter"""
+    subject = f"Rapid Innovation - Salary Revision Letter - {name}"
+    email_body = f"""
+    <html>
+    <body>
+    <p>Dear {name},</p>
+    <p>Greetings from Rapid Innovation!</p>
+    <p>PFA your salary revision letter, effective {effective_date.strftime('%B %d, %Y')}. Kindly go through it and reach out to us if you have any questions.</p>
+    <p>Thank you for your contribution to Rapid Innovation.</p>
+    <br>
+    <p>Best regards,<br>
+    Team HR<br>
+    Rapid Innovation</p>
+    </body>
+    </html>
+    """
+
+    return subject, email_body
+
+def initial_documents_email(employee_type, employee_name, position):
+    """Subject and HTML body of the Phase 1 document request email"""
+    if employee_type == "Intern":
+        subject = f'Rapid Innovation - Important Documents Required - "{position}" Intern'
+        body = f"""
+        <html>
+        <body>
+        <p>Hi {employee_name},</p>
+        <p>Greetings from Rapid Innovation!!</p>
+        <p>This is regarding your joining for the "{position}" Intern position at Rapid Innovation.</p>
+        <p>As a part of our Employment Joining process, we would require soft copies of the below-mentioned documents:</p>
+        <ol>
+            <li>Educational Docs (10th, 12th, Graduation & Post Graduation Certificates)</li>
+            <li>ID proofs (Aadhaar card, Passport, Driving license, PAN card)</li>
+            <li>Passport-size photographs</li>
+        </ol>
+        <p>Also, please share your full name and address as per your documents.</p>
+        <p>Feel free to get in touch with me in case of any queries or questions.</p>
+        <br>
+        <p>Thanks & Regards<br>
+        Team HR<br>
+        Rapid Innovation</p>
+        </body>
+        </html>
+        """
+    else:  # Full-time Employee
+        subject = f'Rapid Innovation - Important Documents Required - {position}'
+        body = f"""
+        <html>
+        <body>
+        <p>Hi {employee_name},</p>
+        <p>Greetings from Rapid Innovation!!</p>
+        <p>This is regarding your joining for the "{position}" position at Rapid Innovation.</p>
+        <p>As a part of our Employment Joining process, we would require soft copies of the below-mentioned documents:</p>
+        <ul>
+            <li>Educational Docs (10th, 12th, Graduation & Post Graduation Certificates)</li>
+            <li>ID proofs (Aadhaar card, Passport, Driving license, PAN card)</li>
+            <li>Resignation/relieving letters, the Last three Months of salary slips, Appointment letters, and offer letters from previous organizations.</li>
+            <li>Passport-size photograph</li>
+        </ul>
+        <p>Also, please share your full name and address as per your documents.</p>
+        <p>Feel free to get in touch with me in case of any queries or questions.</p>
+        <br>
+        <p>Thanks & Regards<br>
+        Team HR<br>
+        Rapid Innovation</p>
+        </body>
+        </html>
+        """
+
+    return subject, body
+
+def plain_text_email(email_body):
+    """Wrap a plain text message typed in the UI as an HTML email body"""
+    html_email_body = f"""
+    <html>
+    <body>
+    {email_body.replace(chr(10), '<br>')}
+    </body>
+    </html>
+    """
+
+    return html_email_body
+
+def welcome_email(employee_name, joining_form_url):
+    """Subject and HTML body of the Phase 4 welcome email"""
+    subject = f'Welcome On Board - {employee_name}'
+    email_body = f"""
+    <html>
+    <body>
+    <p>Dear {employee_name},</p>
+
+    <p>Greetings of the day !!</p>
+
+    <p>We are happy to have you join our organization. We believe that you will be a great asset to our company.</p>
+
+    <p>Again, Congratulations. We are thrilled to have you join the team and look forward to working with you.</p>
+
+    <p>As a part of the process, I have attached a form link to this mail kindly fill out that form:</p>
+
+    <p><a href="{joining_form_url}" target="_blank">{joining_form_url}</a></p>
+
+    <h3>System Enrollment Information:</h3>
+    <p>You will be enrolled in the following platforms:</p>
+    <ul>
+        <li><strong>Gmail/Email:</strong> Official company email ID (already created)</li>
+        <li><strong>Slack:</strong> Communication and collaboration platform</li>
+        <li><strong>TeamLogger:</strong> Time tracking and work management</li>
+        <li><strong>Razorpay:</strong> Payment and expense management (if applicable)</li>
+    </ul>
+
+    <p>Please let me know if you have any questions.</p>
+
+    <br>
+    <p>Regards<br>
+    Team HR<br>
+    Rapid Innovation</p>
+    </body>
+    </html>
+    """
+
+    return subject, email_body
+
+def packet_email(candidate_name, position, start_date, joining_form_url):
+    """Subject and HTML body of the single email that carries a whole candidate packet"""
+    subject = f'Rapid Innovation - Offer & Appointment Letters - "{position}" - {candidate_name}'
+    email_body = f"""
+    <html>
+    <body>
+    <p>Dear {candidate_name},</p>
+
+    <p>Greetings from Rapid Innovation!!</p>
+
+    <p>We are pleased to extend the offer to you for the "{position}" position at Rapid Innovation Pvt. Ltd., starting on {start_date.strftime('%B %d, %Y')}.</p>
+
+    <p>PFA your onboarding packet with your offer letter and your appointment letter. Kindly revert with your acceptance by sending the duly signed copy of the letters.</p>
+
+    <p>As a part of the joining process, kindly fill out the form below:</p>
+
+    <p><a href="{joining_form_url}" target="_blank">{joining_form_url}</a></p>
+
+    <h3>System Enrollment Information:</h3>
+    <p>On your first day you will be enrolled in the following platforms:</p>
+    <ul>
+        <li><strong>Gmail/Email:</strong> Official company email ID</li>
+        <li><strong>Slack:</strong> Communication and collaboration platform</li>
+        <li><strong>TeamLogger:</strong> Time tracking and work management</li>
+        <li><strong>Razorpay:</strong> Payment and expense management (if applicable)</li>
+    </ul>
+
+    <p>We are thrilled to have you join the team and look forward to working with you.</p>
+
+    <br>
+    <p>Regards<br>
+    Team HR<br>
+    Rapid Innovation</p>
+    </body>
+    </html>
+    """
+
+    return subject, email_body
+
+def background_verification_email(employee_name, employee_id, designation, employment_period, reporting_manager):
+    """Subject and HTML body of the Phase 5 email to the previous employer's HR"""
+    subject = f'Employee Background Verification - {employee_name} - Rapid Innovation'
+    email_body = f"""
+    <html>
+    <body>
+    <p>Dear HR,</p>
+
+    <p>I hope you are doing great !!</p>
+
+    <p>This is about the Background Verification of "{employee_name}" who worked in your esteemed organization.</p>
+
+    <p>Please find below, the form for Background verification. It would be very kind if you could spare a few minutes and verify the information provided by {employee_name}.</p>
+
+    <table border="1" cellpadding="10" cellspacing="0" style="border-collapse: collapse; width: 100%; margin: 20px 0;">
+        <tr style="background-color: #f2f2f2;">
+            <th>Particulars</th>
+            <th>Details provided by Candidate</th>
+            <th>Details as per company records</th>
+        </tr>
+        <tr>
+            <td><strong>Employee Name</strong></td>
+            <td>{employee_name}</td>
+            <td></td>
+        </tr>
+        <tr>
+            <td><strong>Employee ID</strong></td>
+            <td>{employee_id if employee_id else 'Please specify'}</td>
+            <td></td>
+        </tr>
+        <tr>
+            <td><strong>Designation</strong><br>(In case of a mismatch, please clarify with reason)</td>
+            <td>{designation}</td>
+            <td></td>
+        </tr>
+        <tr>
+            <td><strong>Period of Employment</strong></td>
+            <td>{employment_period}</td>
+            <td></td>
+        </tr>
+        <tr>
+            <td><strong>Reporting to</strong><br>(In case of a mismatch, please confirm if the employee ever reported to the stated supervisor-directly or indirectly)</td>
+            <td>{reporting_manager if reporting_manager else 'Please specify'}</td>
+            <td></td>
+        </tr>
+        <tr>
+            <td><strong>Character & Conduct</strong></td>
+            <td>Please specify</td>
+            <td></td>
+        </tr>
+        <tr>
+            <td><strong>Reason for Leaving</strong></td>
+            <td>Please specify</td>
+            <td></td>
+        </tr>
+        <tr>
+            <td><strong>Eligible for rehire</strong><br>(If No, kindly specify the reason)</td>
+            <td>Please specify</td>
+            <td></td>
+        </tr>
+        <tr>
+            <td><strong>Status of Exit Formalities</strong><br>(In case of pending; please specify from whose side- candidate or company)</td>
+            <td>Please specify</td>
+            <td></td>
+        </tr>
+        <tr>
+            <td><strong>Are the Attached Documents Genuine?</strong><br>(If No, kindly Specify the reason – for e.g. is the document forged or fake or manipulated or any other reason)</td>
+            <td>Attached</td>
+            <td></td>
+        </tr>
+        <tr>
+            <td><strong>Additional Comments</strong></td>
+            <td>Please specify</td>
+            <td></td>
+        </tr>
+        <tr>
+            <td><strong>Name and Job title of the verifying Authority</strong></td>
+            <td>Please specify</td>
+            <td></td>
+        </tr>
+    </table>
+
+    <p>Feel free to get in touch if you have any questions.</p>
+
+    <br>
+    <p>Regards<br>
+    Team HR<br>
+    Rapid Innovation</p>
+    </body>
+    </html>
+    """
+
+    return subject, email_body
+
+def manager_confirmation_email(employee_name, manager_name, last_working_day):
+    """Subject and HTML body of the exit confirmation email to the manager"""
+    subject = f'Confirmation for proceeding with the Exit formalities - {employee_name}'
+    email_body = f"""
+    <html>
+    <body>
+    <p>Hi {manager_name},</p>
+    <p>I hope you are doing well !!</p>
+    <p>As you know, <strong>{last_working_day.strftime('%d %B %Y')}</strong> is the last working day of <strong>{employee_name}</strong>.</p>
+    <p>Kindly let me know once all his knowledge transfer is done so that I can proceed with his exit formalities. These formalities include deactivating his official email ID (once deactivated cannot be restored) and removing him from Slack. Kindly let us know if the official mail data has to be transferred to any other account.</p>
+    <p>Also please take care of any software he is using like the GitHub account, also please remove him from project groups.</p>
+    <p>Please let me know in case of any queries.</p>
+    <br>
+    <p>Regards,<br>
+    Team HR<br>
+    Rapid Innovation</p>
+    </body>
+    </html>
+    """
+
+    return subject, email_body
+
+def exit_notification_email(emp_name, emp_type, lwd, manager_email_transfer):
+    """Subject and HTML body of the exit formalities email to the employee"""
+    subject = f'Exit Formalities - {emp_name} - {lwd.strftime("%d %B %Y")}'
+
+    if emp_type == "Intern":
+        email_body = f"""
+        <html>
+        <body>
+        <p>Hi {emp_name},</p>
+        <p>This is to confirm that your last working day at Rapid Innovation is <strong>{lwd.strftime('%A, %d %B %Y')}</strong>.</p>
+        <p>You are requested to please look into the following points:</p>
+        <ol>
+            <li>Please change all the communication addresses, if any are provided as the company's address.</li>
+            <li>Your invoices will be considered as payslips.</li>
+            <li>Please refer to the following Link to the exit feedback form and submit your valuable feedback on or before your last working day.</li>
+            <li>Also, refer to the internship Letter signed by you at the time of Joining Rapid Innovation so that you can adhere to all the clauses mentioned in it.</li>
+            <li>Kindly move all the files to a folder in the drive and provide ownership to {manager_email_transfer if manager_email_transfer else "your manager's email ID"}</li>
+        </ol>
+        <p>Your full and final settlement will be processed within 30-45 days from your last working day. HR will be sending the FNF statement to your email ID.</p>
+        <br>
+        <p>Regards<br>
+        Team HR</p>
+        </body>
+        </html>
+        """
+    else:
+        email_body = f"""
+        <html>
+        <body>
+        <p>Hi {emp_name},</p>
+        <p>This is to confirm that your last working day at Rapid Innovation is <strong>{lwd.strftime('%A, %d %B %Y')}</strong>.</p>
+        <p>You are requested to please look into the following points:</p>
+        <ol>
+            <li>Please change all the communication addresses, if any are provided as the company's address.</li>
+            <li>All your payslips are available on Razorpay; we expect you to download them and take them with you.</li>
+            <li>Please ensure to submit all company belongings to the people concerned on the last working day, like a laptop, bag, mouse, headphones, and dongle (if any).</li>
+            <li>If you wish to withdraw your PF amount, you can do that on the online PF portal. (People having less than 6 months of experience with us will not be eligible to withdraw the PF amount)</li>
+            <li>Please refer to the following Link to the exit feedback form and submit your valuable feedback on or before your last working day.</li>
+            <li>Also, refer to the Appointment Letter signed by you at the time of Joining Rapid Innovation so that you can adhere to all the clauses mentioned in it.</li>
+            <li>Kindly move all the files to a folder in the drive and provide ownership to {manager_email_transfer if manager_email_transfer else "your manager's email ID"}</li>
+        </ol>
+        <p>Your full and final settlement will be processed within 30-45 days from your last working day. HR will be sending the FNF statement to your email ID.</p>
+        <br>
+        <p>Regards<br>
+        Team HR<br>
+        Rapid Innovation</p>
+        </body>
+        </html>
+        """
+
+    return subject, email_body
+
+def asset_return_email(asset_emp_name, asset_type, contact_person, return_address, contact_number):
+    """Subject and HTML body of the asset dispatch email"""
+    subject = "Asset Dispatch Details"
+    email_body = f"""
+    <html>
+    <body>
+    <p>Hello {asset_emp_name},</p>
+    <p>We hope you are doing well !!</p>
+    <p>You are requested to return the company-owned <strong>{asset_type}</strong>.</p>
+    <p><strong>Details of the Dispatch:</strong></p>
+    <ul>
+        <li><strong>Name:</strong> {contact_person}</li>
+        <li><strong>Address:</strong> {return_address}</li>
+        <li><strong>Contact Number:</strong> {contact_number}</li>
+    </ul>
+    <p><strong>Please note:</strong></p>
+    <ol>
+        <li>We will proceed with your FNF settlement once we will receive the company's assets in good condition.</li>
+        <li>Kindly attach a photo or video of the device before dispatching it to the address above. {"Please take insurance in case of Macbook." if asset_type == "Macbook" else ""}</li>
+    </ol>
+    <p>Please reach out to us in case of any queries.</p>
+    <br>
+    <p>Thanks & Regards<br>
+    Team HR<br>
+    Rapid Innovation</p>
+    </body>
+    </html>
+    """
+
+    return subject, email_body
@@ -0,0 +1,366 @@
+"""
+SQLite-backed store of employees, shared by every phase
+
+Each phase writes back what it learned about the employee (name, emails,
+position, dates) and what it did, so later phases can prefill their forms.
+An employee is identified by any of their email addresses: the one they were
+first contacted on, their official email or their personal email.
+
+Lookups go through indexes on the email columns, status and joining/exit
+dates, and each thread keeps its own open connection, so they stay well under
+a millisecond with tens of thousands of employees.
+
+Status is the employee's pipeline stage (see core/pipeline.py) and only
+changes along allowed transitions. The number of employees in each stage is
+kept in stage_counts by triggers, so the dashboard never scans the table.
+
+Type-ahead lookups (lookup()) are served from an in-memory prefix index (see
+core/lookup.py) that this store keeps up to date on every write.
+"""
+
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from datetime import date
+
+from core.lookup import BULK_THRESHOLD, EmployeeLookup
+from core.paths import data_path
+from core.pipeline import can_transition
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS employees (
+    id INTEGER PRIMARY KEY,
+    email TEXT NOT NULL UNIQUE,
+    official_email TEXT,
+    personal_email TEXT,
+    name TEXT COLLATE NOCASE,
+    title TEXT,
+    employee_type TEXT,
+    position TEXT,
+    employee_code TEXT,
+    manager_name TEXT,
+    manager_email TEXT,
+    start_date TEXT,
+    exit_date TEXT,
+    status TEXT,
+    status_changed_at REAL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS employee_events (
+    id INTEGER PRIMARY KEY,
+    employee_id INTEGER NOT NULL REFERENCES employees (id),
+    phase TEXT NOT NULL,
+    action TEXT NOT NULL,
+    detail TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_employee_events_employee ON employee_events (employee_id, created_at);
+"""
+
+INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_employees_official_email ON employees (official_email);
+CREATE INDEX IF NOT EXISTS idx_employees_personal_email ON employees (personal_email);
+CREATE INDEX IF NOT EXISTS idx_employees_name ON employees (name);
+DROP INDEX IF EXISTS idx_employees_status;
+CREATE INDEX IF NOT EXISTS idx_employees_stage ON employees (status, status_changed_at);
+CREATE INDEX IF NOT EXISTS idx_employees_start_date ON employees (start_date);
+CREATE INDEX IF NOT EXISTS idx_employees_exit_date ON employees (exit_date);
+CREATE INDEX IF NOT EXISTS idx_employees_updated_at ON employees (updated_at);
+"""
+
+# Per-stage employee counts, maintained on every write
+STAGE_COUNTS = """
+CREATE TABLE IF NOT EXISTS stage_counts (
+    status TEXT PRIMARY KEY,
+    count INTEGER NOT NULL
+);
+CREATE TRIGGER IF NOT EXISTS trg_employees_stage_insert AFTER INSERT ON employees
+WHEN NEW.status IS NOT NULL
+BEGIN
+    INSERT INTO stage_counts (status, count) VALUES (NEW.status, 1)
+    ON CONFLICT (status) DO UPDATE SET count = count + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_employees_stage_update AFTER UPDATE OF status ON employees
+WHEN OLD.status IS NOT NEW.status
+BEGIN
+    UPDATE stage_counts SET count = count - 1 WHERE status = OLD.status;
+    INSERT INTO stage_counts (status, count) SELECT NEW.status, 1 WHERE NEW.status IS NOT NULL
+    ON CONFLICT (status) DO UPDATE SET count = count + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_employees_stage_delete AFTER DELETE ON employees
+WHEN OLD.status IS NOT NULL
+BEGIN
+    UPDATE stage_counts SET count = count - 1 WHERE status = OLD.status;
+END;
+"""
+
+FIELDS = [
+    "official_email", "personal_email", "name", "title", "employee_type", "position",
+    "employee_code", "manager_name", "manager_email", "start_date", "exit_date", "status",
+]
+EMAIL_FIELDS = ["email", "official_email", "personal_email", "manager_email"]
+
+def normalize(field, value):
+    """Store emails lowercased and dates as ISO strings; blank values count as missing"""
+    if value is None:
+        return None
+    if isinstance(value, date):
+        return value.isoformat()
+    value = str(value).strip()
+    if not value:
+        return None
+    return value.lower() if field in EMAIL_FIELDS else value
+
+class EmployeeStore:
+    """Employees keyed by email, with indexed lookups and a log of phase events"""
+
+    def __init__(self, path=None):
+        self.path = path or data_path("employees.db")
+        self._local = threading.local()
+        self._lookup = None
+        self._lookup_lock = threading.Lock()
+        with closing(sqlite3.connect(self.path)) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            self._migrate(conn)
+            conn.executescript(INDEXES)
+
+    def _migrate(self, conn):
+        """Bring databases created by older versions up to the current schema"""
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(employees)")}
+        if "status_changed_at" not in columns:
+            conn.execute("ALTER TABLE employees ADD COLUMN status_changed_at REAL")
+            conn.execute("UPDATE employees SET status_changed_at = updated_at WHERE status IS NOT NULL")
+            conn.commit()
+
+        has_counts = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'stage_counts'"
+        ).fetchone()
+        conn.executescript(STAGE_COUNTS)
+        if not has_counts:
+            conn.execute(
+                "INSERT INTO stage_counts (status, count) "
+                "SELECT status, COUNT(*) FROM employees WHERE status IS NOT NULL GROUP BY status"
+            )
+            conn.commit()
+
+    def _conn(self):
+        """This thread's connection (opened once and reused for fast lookups)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def _find(self, conn, email):
+        return conn.execute(
+            "SELECT id, status FROM employees WHERE email = ?1 "
+            "UNION ALL SELECT id, status FROM employees WHERE official_email = ?1 "
+            "UNION ALL SELECT id, status FROM employees WHERE personal_email = ?1 LIMIT 1",
+            (email,)
+        ).fetchone()
+
+    def _find_id(self, conn, email):
+        row = self._find(conn, email)
+        return row['id'] if row else None
+
+    def _upsert(self, conn, email, fields):
+        """Insert or update; returns (employee id, status after the write)"""
+        values = {k: normalize(k, v) for k, v in fields.items() if k in FIELDS}
+        values = {k: v for k, v in values.items() if v is not None}
+        target = values.pop("status", None)
+        now = time.time()
+
+        row = self._find(conn, email)
+        current = row['status'] if row else None
+        if target and target != current and can_transition(current, target):
+            values['status'] = target
+            values['status_changed_at'] = now
+        status = values.get('status', current)
+
+        if row is None:
+            columns = ["email", "created_at", "updated_at"] + list(values)
+            cur = conn.execute(
+                f"INSERT INTO employees ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                [email, now, now] + list(values.values())
+            )
+            return cur.lastrowid, status
+
+        assignments = "".join(f", {k} = ?" for k in values)
+        conn.execute(
+            f"UPDATE employees SET updated_at = ?{assignments} WHERE id = ?",
+            [now] + list(values.values()) + [row['id']]
+        )
+        return row['id'], status
+
+    def upsert(self, email, **fields):
+        """Create or update the employee with this email; blank fields keep their stored value
+
+        A status is only applied if the pipeline allows moving to it from the
+        employee's current stage.
+        """
+        email = normalize("email", email)
+        if not email:
+            raise ValueError("An employee needs an email address")
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            employee_id, _ = self._upsert(conn, email, fields)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        self._update_lookup([employee_id])
+        return employee_id
+
+    def record(self, email, phase, action, detail=None, **fields):
+        """Write back the result of a phase: update the employee and log the event in one transaction
+
+        Returns the employee's stage after the write, which differs from the
+        requested status if that transition is not allowed.
+        """
+        email = normalize("email", email)
+        if not email:
+            raise ValueError("An employee needs an email address")
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            employee_id, status = self._upsert(conn, email, fields)
+            conn.execute(
+                "INSERT INTO employee_events (employee_id, phase, action, detail, created_at) VALUES (?, ?, ?, ?, ?)",
+                (employee_id, phase, action, detail, time.time())
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        self._update_lookup([employee_id])
+        return status
+
+    def record_many(self, entries, phase, action, detail=None):
+        """record() for many (email, fields) pairs in a single transaction; returns the count"""
+        conn = self._conn()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            events = []
+            for email, fields in entries:
+                employee_id, _ = self._upsert(conn, normalize("email", email), fields)
+                events.append((employee_id, phase, action, detail, now))
+            conn.executemany(
+                "INSERT INTO employee_events (employee_id, phase, action, detail, created_at) VALUES (?, ?, ?, ?, ?)",
+                events
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        self._update_lookup([event[0] for event in events])
+        return len(events)
+
+    def get(self, employee_id):
+        row = self._conn().execute("SELECT * FROM employees WHERE id = ?", (employee_id,)).fetchone()
+        return dict(row) if row else None
+
+    def find_by_email(self, email):
+        """Look up an employee by any of their email addresses"""
+        email = normalize("email", email)
+        if not email:
+            return None
+        employee_id = self._find_id(self._conn(), email)
+        return self.get(employee_id) if employee_id is not None else None
+
+    def search(self, text, limit=10):
+        """Employees whose name or email starts with text, most recently updated first"""
+        text = (text or "").strip()
+        if not text:
+            return []
+        prefix = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        rows = self._conn().execute(
+            "SELECT * FROM employees WHERE id IN ("
+            "  SELECT id FROM employees WHERE name LIKE ?1 ESCAPE '\\'"
+            "  UNION SELECT id FROM employees WHERE email >= ?2 AND email < ?3"
+            ") ORDER BY updated_at DESC LIMIT ?4",
+            (prefix, text.lower(), text.lower() + "\uffff", limit)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def lookup(self, text, limit=10):
+        """search() from the in-memory prefix index (built on first use), for type-ahead fields"""
+        with self._lookup_lock:
+            if self._lookup is None:
+                self._lookup = EmployeeLookup(self)
+        return self._lookup.search(text, limit)
+
+    def _update_lookup(self, employee_ids):
+        if self._lookup is None:
+            return
+        if len(employee_ids) > BULK_THRESHOLD:
+            self._lookup.invalidate()
+            return
+        rows = self._conn().execute(
+            f"SELECT * FROM employees WHERE id IN ({', '.join('?' * len(employee_ids))})", employee_ids
+        ).fetchall()
+        self._lookup.apply(dict(row) for row in rows)
+
+    def changed_since(self, timestamp):
+        """Employees updated at or after timestamp (every employee if None)"""
+        if timestamp is None:
+            rows = self._conn().execute("SELECT * FROM employees").fetchall()
+        else:
+            rows = self._conn().execute("SELECT * FROM employees WHERE updated_at >= ?", (timestamp,)).fetchall()
+        return [dict(row) for row in rows]
+
+    def by_status(self, status, limit=100):
+        """Employees in a stage, longest waiting first"""
+        rows = self._conn().execute(
+            "SELECT * FROM employees WHERE status = ? ORDER BY status_changed_at LIMIT ?", (status, limit)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def stage_counts(self):
+        """{stage: number of employees} from the trigger-maintained aggregate"""
+        rows = self._conn().execute("SELECT status, count FROM stage_counts WHERE count > 0").fetchall()
+        return {row['status']: row['count'] for row in rows}
+
+    def stuck(self, status, older_than_seconds, limit=20):
+        """(count, oldest employees) in a stage for longer than older_than_seconds"""
+        cutoff = time.time() - older_than_seconds
+        conn = self._conn()
+        count = conn.execute(
+            "SELECT COUNT(*) FROM employees WHERE status = ? AND status_changed_at < ?", (status, cutoff)
+        ).fetchone()[0]
+        rows = conn.execute(
+            "SELECT * FROM employees WHERE status = ? AND status_changed_at < ? ORDER BY status_changed_at LIMIT ?",
+            (status, cutoff, limit)
+        ).fetchall()
+        return count, [dict(row) for row in rows]
+
+    def joining_between(self, start, end):
+        rows = self._conn().execute(
+            "SELECT * FROM employees WHERE start_date BETWEEN ? AND ? ORDER BY start_date",
+            (normalize("start_date", start), normalize("start_date", end))
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def exiting_between(self, start, end):
+        rows = self._conn().execute(
+            "SELECT * FROM employees WHERE exit_date BETWEEN ? AND ? ORDER BY exit_date",
+            (normalize("exit_date", start), normalize("exit_date", end))
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def events(self, employee_id):
+        rows = self._conn().execute(
+            "SELECT phase, action, detail, created_at FROM employee_events WHERE employee_id = ? ORDER BY created_at",
+            (employee_id,)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def count(self):
+        return self._conn().execute("SELECT COUNT(*) FROM employees").fetchone()[0]
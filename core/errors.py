@@ -0,0 +1,34 @@
+"""
+Exceptions raised by the core library
+
+The UI, the batch CLI and the API catch these and report them in their own
+way (st.error, a failed row, an HTTP status) instead of the core printing
+anything itself.
+"""
+
+class OnboardingError(Exception):
+    """Base class for all errors raised by core"""
+
+class InvalidCandidateError(OnboardingError, ValueError):
+    """A candidate record is missing fields or has invalid values"""
+
+class TemplateNotFoundError(OnboardingError):
+    """A letter template file (e.g. appointment_letter.txt) is missing"""
+
+class PdfRenderError(OnboardingError):
+    """No PDF backend could convert the HTML"""
+
+class RenderAbortedError(PdfRenderError):
+    """A PDF render was stopped before it finished (see core/workers.py)"""
+
+class RenderTimeoutError(RenderAbortedError):
+    """A PDF render ran past its wall-clock or CPU time limit"""
+
+class RenderCancelledError(RenderAbortedError):
+    """A PDF render was cancelled, e.g. from the UI"""
+
+class EmailDeliveryError(OnboardingError):
+    """The SMTP server rejected or could not deliver an email"""
+
+class ImportFileError(OnboardingError):
+    """A bulk import file could not be read"""
@@ -0,0 +1,349 @@
+"""
+Exit tracker and company asset inventory
+
+Every exit gets one row in exits recording when each step of Phase 6 was
+done (see EXIT_STEPS). Company assets (laptops, monitors, ...) are tracked
+by serial number with their current holder and status:
+
+    in_stock -> assigned -> return_pending -> returned
+                                           -> lost
+
+Starting an exit moves everything the employee holds to return_pending.
+Returns are recorded by serial number, or by holder and asset type when the
+serial is not at hand, and matched to the asset automatically; once an
+exiting employee has nothing left to return their exit is marked
+assets_returned.
+
+Both tables live in data/exits.db. Assets are indexed by serial, holder and
+status/type, and partial indexes cover exits still waiting for their assets
+or certificate, so questions like "unreturned laptops" or "exits pending
+certificates" never scan the tables.
+"""
+
+import sqlite3
+import time
+from contextlib import closing
+from datetime import date
+
+from core.paths import data_path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS assets (
+    id INTEGER PRIMARY KEY,
+    serial TEXT NOT NULL UNIQUE,
+    asset_type TEXT NOT NULL,
+    description TEXT,
+    holder_email TEXT,
+    status TEXT NOT NULL DEFAULT 'in_stock',
+    assigned_at REAL,
+    returned_at REAL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_assets_holder ON assets (holder_email, status);
+CREATE INDEX IF NOT EXISTS idx_assets_status ON assets (status, asset_type);
+
+CREATE TABLE IF NOT EXISTS exits (
+    employee_email TEXT PRIMARY KEY,
+    name TEXT,
+    last_working_day TEXT,
+    initiated_at REAL,
+    manager_confirmed_at REAL,
+    asset_request_sent_at REAL,
+    assets_returned_at REAL,
+    access_removed_at REAL,
+    access_removed TEXT,
+    certificate_issued_at REAL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_exits_pending_assets ON exits (last_working_day)
+    WHERE assets_returned_at IS NULL;
+CREATE INDEX IF NOT EXISTS idx_exits_pending_certificate ON exits (last_working_day)
+    WHERE certificate_issued_at IS NULL;
+"""
+
+EXIT_STEPS = [
+    "initiated",
+    "manager_confirmed",
+    "asset_request_sent",
+    "assets_returned",
+    "access_removed",
+    "certificate_issued",
+]
+EXIT_STEP_LABELS = {
+    "initiated": "🚪 Initiated",
+    "manager_confirmed": "👔 Manager Confirmed",
+    "asset_request_sent": "📧 Asset Return Requested",
+    "assets_returned": "📦 Assets Returned",
+    "access_removed": "🔐 Access Removed",
+    "certificate_issued": "📜 Certificate Issued",
+}
+ASSET_STATUSES = ["in_stock", "assigned", "return_pending", "returned", "lost"]
+ASSET_TYPES = ["Macbook", "Windows Laptop", "Monitor", "Phone", "Accessory", "Other"]
+LAPTOP_TYPES = ["Macbook", "Windows Laptop"]
+
+def normalize_serial(serial):
+    serial = (serial or "").strip().upper()
+    if not serial:
+        raise ValueError("An asset needs a serial number")
+    return serial
+
+def _email(email):
+    email = (email or "").strip().lower()
+    if not email:
+        raise ValueError("An email address is required")
+    return email
+
+class ExitTracker:
+    """Per-employee exit checklist plus the asset inventory it checks returns against"""
+
+    def __init__(self, path=None):
+        self.path = path or data_path("exits.db")
+        with closing(self._connect()) as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _touch_exit(self, conn, email, now, **fields):
+        """Create the exit row if needed and set fields that are given"""
+        fields = {k: v.isoformat() if isinstance(v, date) else v for k, v in fields.items() if v is not None}
+        conn.execute("INSERT OR IGNORE INTO exits (employee_email, updated_at) VALUES (?, ?)", (email, now))
+        assignments = "".join(f", {k} = ?" for k in fields)
+        conn.execute(f"UPDATE exits SET updated_at = ?{assignments} WHERE employee_email = ?",
+                     [now] + list(fields.values()) + [email])
+
+    def _settle_if_returned(self, conn, email, now):
+        """Mark the exit's assets as returned once the employee holds nothing still to return; True if so"""
+        outstanding = conn.execute(
+            "SELECT COUNT(*) FROM assets WHERE holder_email = ? AND status IN ('assigned', 'return_pending')",
+            (email,)
+        ).fetchone()[0]
+        if outstanding:
+            return False
+        cur = conn.execute(
+            "UPDATE exits SET assets_returned_at = ?, updated_at = ? "
+            "WHERE employee_email = ? AND initiated_at IS NOT NULL AND assets_returned_at IS NULL",
+            (now, now, email)
+        )
+        return cur.rowcount > 0
+
+    def _run(self, work):
+        """Run work(conn, now) in one write transaction and return its result"""
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = work(conn, time.time())
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return result
+
+    # Exits
+
+    def start(self, email, name=None, last_working_day=None):
+        """Start (or update) an exit; everything the employee holds becomes due for return"""
+        email = _email(email)
+
+        def work(conn, now):
+            self._touch_exit(conn, email, now, name=name, last_working_day=last_working_day)
+            conn.execute(
+                "UPDATE exits SET initiated_at = ? WHERE employee_email = ? AND initiated_at IS NULL", (now, email)
+            )
+            conn.execute(
+                "UPDATE assets SET status = 'return_pending', updated_at = ? WHERE holder_email = ? AND status = 'assigned'",
+                (now, email)
+            )
+            self._settle_if_returned(conn, email, now)
+
+        self._run(work)
+        return self.get(email)
+
+    def mark(self, email, step, detail=None):
+        """Record that an exit step was done (the exit is created if it was not started here)"""
+        if step not in EXIT_STEPS:
+            raise ValueError(f"step must be one of {', '.join(EXIT_STEPS)}, got {step!r}")
+        email = _email(email)
+        fields = {f"{step}_at": time.time()}
+        if step == "access_removed" and detail:
+            fields['access_removed'] = detail
+
+        def work(conn, now):
+            self._touch_exit(conn, email, now, **fields)
+            if step == "assets_returned":
+                conn.execute(
+                    "UPDATE assets SET status = 'returned', returned_at = ?, updated_at = ? "
+                    "WHERE holder_email = ? AND status IN ('assigned', 'return_pending')",
+                    (now, now, email)
+                )
+
+        self._run(work)
+
+    def get(self, email):
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT * FROM exits WHERE employee_email = ?", (_email(email),)).fetchone()
+        return dict(row) if row else None
+
+    def pending(self, step, limit=200):
+        """Started exits where step is not done yet, soonest last working day first"""
+        if step not in EXIT_STEPS:
+            raise ValueError(f"step must be one of {', '.join(EXIT_STEPS)}, got {step!r}")
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                f"SELECT * FROM exits WHERE {step}_at IS NULL AND initiated_at IS NOT NULL "
+                "ORDER BY last_working_day LIMIT ?",
+                (limit,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def open_exits(self, limit=200):
+        """Exits still waiting for their assets or certificate"""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT * FROM exits WHERE assets_returned_at IS NULL AND initiated_at IS NOT NULL "
+                "UNION SELECT * FROM exits WHERE certificate_issued_at IS NULL AND initiated_at IS NOT NULL "
+                "ORDER BY last_working_day LIMIT ?",
+                (limit,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    # Assets
+
+    def add_asset(self, serial, asset_type, description=None, holder_email=None):
+        """Add an asset to the inventory, optionally assigned to someone straight away"""
+        serial = normalize_serial(serial)
+        now = time.time()
+        holder = _email(holder_email) if holder_email else None
+        with closing(self._connect()) as conn:
+            try:
+                conn.execute(
+                    "INSERT INTO assets (serial, asset_type, description, holder_email, status, assigned_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (serial, asset_type, description, holder, "assigned" if holder else "in_stock",
+                     now if holder else None, now)
+                )
+            except sqlite3.IntegrityError:
+                raise ValueError(f"An asset with serial {serial} is already in the inventory")
+        return self.asset(serial)
+
+    def assign(self, serial, holder_email):
+        """Hand an in-stock or returned asset to an employee"""
+        serial = normalize_serial(serial)
+        holder = _email(holder_email)
+
+        def work(conn, now):
+            cur = conn.execute(
+                "UPDATE assets SET holder_email = ?, status = 'assigned', assigned_at = ?, returned_at = NULL, "
+                "updated_at = ? WHERE serial = ? AND status IN ('in_stock', 'returned')",
+                (holder, now, now, serial)
+            )
+            if not cur.rowcount:
+                asset = conn.execute("SELECT status, holder_email FROM assets WHERE serial = ?", (serial,)).fetchone()
+                if asset is None:
+                    raise ValueError(f"No asset with serial {serial}")
+                raise ValueError(f"{serial} is {asset['status'].replace('_', ' ')} ({asset['holder_email']})")
+
+        self._run(work)
+        return self.asset(serial)
+
+    def asset(self, serial):
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT * FROM assets WHERE serial = ?", (normalize_serial(serial),)).fetchone()
+        return dict(row) if row else None
+
+    def held_by(self, email, outstanding_only=False):
+        """Assets an employee holds (only those still to be returned if outstanding_only)"""
+        statuses = ("assigned", "return_pending") if outstanding_only else ("assigned", "return_pending", "lost")
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                f"SELECT * FROM assets WHERE holder_email = ? AND status IN ({', '.join('?' * len(statuses))}) "
+                "ORDER BY asset_type, serial",
+                (_email(email),) + statuses
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def unreturned(self, asset_types=None, limit=500):
+        """Assets due back from exiting employees, optionally only some types (e.g. LAPTOP_TYPES)"""
+        conditions, params = ["status = 'return_pending'"], []
+        if asset_types:
+            conditions.append(f"asset_type IN ({', '.join('?' * len(asset_types))})")
+            params.extend(asset_types)
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                f"SELECT * FROM assets WHERE {' AND '.join(conditions)} ORDER BY updated_at LIMIT ?",
+                params + [limit]
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def inventory_counts(self):
+        """Number of assets in each status"""
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT status, COUNT(*) FROM assets GROUP BY status").fetchall()
+        counts = dict.fromkeys(ASSET_STATUSES, 0)
+        counts.update({status: count for status, count in rows})
+        return counts
+
+    def record_return(self, serial=None, holder_email=None, asset_type=None):
+        """Match a returned item to its asset and mark it returned
+
+        Give the serial number, or the holder (and asset type if they hold
+        more than one thing). Returns (asset, settled) where settled is True
+        if this was the last item the employee had to return. Raises
+        ValueError if nothing or more than one asset matches.
+        """
+        if serial:
+            conditions, params = ["serial = ?"], [normalize_serial(serial)]
+        elif holder_email:
+            conditions, params = ["holder_email = ?"], [_email(holder_email)]
+            if asset_type:
+                conditions.append("asset_type = ?")
+                params.append(asset_type)
+        else:
+            raise ValueError("Give the serial number or the employee who returned the asset")
+
+        def work(conn, now):
+            matches = conn.execute(
+                f"SELECT * FROM assets WHERE {' AND '.join(conditions)} AND status IN ('assigned', 'return_pending')",
+                params
+            ).fetchall()
+            if not matches:
+                raise ValueError(f"No outstanding asset matches {serial or ' / '.join(filter(None, [holder_email, asset_type]))}")
+            if len(matches) > 1:
+                serials = ", ".join(row['serial'] for row in matches)
+                raise ValueError(f"{len(matches)} outstanding assets match ({serials}); give the serial number")
+            asset = dict(matches[0])
+            conn.execute(
+                "UPDATE assets SET status = 'returned', returned_at = ?, updated_at = ? WHERE id = ?",
+                (now, now, asset['id'])
+            )
+            asset.update(status="returned", returned_at=now)
+            return asset, self._settle_if_returned(conn, asset['holder_email'], now)
+
+        return self._run(work)
+
+    def record_returns(self, serials):
+        """record_return for a list of scanned serials; returns (serial, asset, settled, error) for each"""
+        results = []
+        for serial in serials:
+            try:
+                asset, settled = self.record_return(serial=serial)
+                results.append((serial, asset, settled, None))
+            except ValueError as e:
+                results.append((serial, None, False, str(e)))
+        return results
+
+    def mark_lost(self, serial):
+        """Write an asset off as lost; returns True if it was the holder's last outstanding item"""
+        serial = normalize_serial(serial)
+
+        def work(conn, now):
+            row = conn.execute("SELECT holder_email FROM assets WHERE serial = ?", (serial,)).fetchone()
+            if row is None:
+                raise ValueError(f"No asset with serial {serial}")
+            conn.execute("UPDATE assets SET status = 'lost', updated_at = ? WHERE serial = ?", (now, serial))
+            return bool(row['holder_email']) and self._settle_if_returned(conn, row['holder_email'], now)
+
+        return self._run(work)
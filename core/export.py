@@ -0,0 +1,263 @@
+"""
+Streaming ZIP export of letters for a filtered set of employees
+
+    python run.py export --letter offer --from 2024-01-01 --to 2024-03-31 -o q1_offers.zip
+    GET /exports/letters.zip?letter=experience&start=2024-01-01&cohort=Intern
+
+Employees are selected from the employee store by letter type and date range
+(joining date for offer and appointment letters, exit date for experience
+letters), optionally narrowed to one cohort (employee type). Letters already
+in the archive are copied into the ZIP straight from their blob files; missing
+ones are rendered in the shared render pool (core/workers.py), under its time,
+memory and cancellation limits, then archived and written in order.
+Entries are stored uncompressed (PDFs barely compress) and written one at a
+time, so memory stays flat however large the export is, and the ZIP can be
+written to an unseekable stream such as an HTTP response.
+
+Every ZIP ends with manifest.csv listing each employee and where their letter
+came from (archived, rendered, skipped or failed).
+"""
+
+import csv
+import io
+import queue
+import re
+import shutil
+import threading
+import time
+import zipfile
+from collections import deque
+from contextlib import closing
+
+import config
+from core.archive import LetterArchive
+from core.employees import EmployeeStore
+from core.errors import InvalidCandidateError, OnboardingError
+from core.generators import template_version
+from core.letters import OFFER_TYPES, build_letter, parse_date
+from core.pdf_size import letter_preset
+from core.search import index_letter
+from core.workers import submit_render
+
+MANIFEST_COLUMNS = ["employee_id", "name", "email", "file", "source", "reason"]
+EARLIEST, LATEST = "0001-01-01", "9999-12-31"
+CHUNK_BYTES = 64 * 1024
+# Letters that can be exported for a joining or exit date range
+LETTER_TYPES = ("offer", "appointment", "experience")
+
+def select_employees(store, letter, start=None, end=None, cohort=None):
+    """Employees whose joining (offer, appointment) or exit (experience) date is in [start, end]"""
+    if letter not in LETTER_TYPES:
+        raise InvalidCandidateError(f"letter must be one of {', '.join(LETTER_TYPES)}, got {letter!r}")
+    if cohort and cohort not in OFFER_TYPES:
+        raise InvalidCandidateError(f"cohort must be one of {', '.join(OFFER_TYPES)}, got {cohort!r}")
+    start = parse_date(start, "start") if isinstance(start, str) else start
+    end = parse_date(end, "end") if isinstance(end, str) else end
+    between = store.exiting_between if letter == "experience" else store.joining_between
+    employees = between(start or EARLIEST, end or LATEST)
+    if cohort:
+        employees = [e for e in employees if e['employee_type'] == cohort]
+    return employees
+
+def employee_candidate(employee, letter):
+    """Candidate record (see core/letters.py) for rendering an employee's letter from their stored details"""
+    employee_type = employee['employee_type'] or ""
+    return {
+        'letter': letter,
+        'name': employee['name'],
+        'title': employee['title'],
+        'position': employee['position'],
+        'start_date': employee['start_date'],
+        'end_date': employee['exit_date'],
+        'offer_type': employee_type,
+        'certificate_type': "internship" if employee_type == "Intern" else "standard",
+    }
+
+def start_render(job):
+    """Build one employee's letter and submit its render: (employee id, filename, html, RenderJob or error)"""
+    employee_id, candidate = job
+    try:
+        html, filename = build_letter(candidate)
+        return employee_id, f"{filename}.pdf", html, submit_render(html, letter_preset(candidate['letter']))
+    except Exception as e:
+        return employee_id, None, None, str(e)
+
+def finish_render(started):
+    """(employee id, filename, html, pdf_bytes, error) once a start_render result has finished"""
+    employee_id, filename, html, job = started
+    if isinstance(job, str):
+        return employee_id, None, None, None, job
+    try:
+        return employee_id, filename, html, job.result(), None
+    except OnboardingError as e:
+        return employee_id, None, None, None, str(e)
+
+def _entry_name(employee, filename):
+    safe_name = re.sub(r"[^\w.-]+", "_", filename)
+    return f"{employee['id']:06d}_{safe_name}"
+
+def _render_all(jobs, workers):
+    """Yield finish_render results in job order, with up to workers renders in flight in the render pool
+
+    Renders still in flight when the export stops (e.g. it was cancelled) are cancelled.
+    """
+    pending = deque()
+    try:
+        for job in jobs:
+            pending.append(start_render(job))
+            if len(pending) >= workers:
+                yield finish_render(pending.popleft())
+        while pending:
+            yield finish_render(pending.popleft())
+    finally:
+        for *_, job in pending:
+            if not isinstance(job, str):
+                job.cancel()
+
+def export_letters(output, letter, start=None, end=None, cohort=None, workers=None,
+                   employees=None, archive=None, progress=None):
+    """Write a ZIP of every selected employee's letter to output and return stats
+
+    output is a path or a binary file object (it need not be seekable).
+    workers is how many renders are kept in flight in the render pool
+    (default: twice config.RENDER_POOL_WORKERS, so no worker waits for the next letter).
+    progress, if given, is called with each manifest row as it is written.
+    """
+    employees = employees or EmployeeStore()
+    own_archive = archive is None
+    archive = archive or LetterArchive()
+    workers = workers or config.RENDER_POOL_WORKERS * 2
+    version = template_version(letter)
+    by_id = {}
+    manifest = []
+    stats = {'employees': 0, 'archived': 0, 'rendered': 0, 'skipped': 0, 'failed': 0, 'bytes': 0}
+    started = time.perf_counter()
+
+    def add(employee, filename, source, reason=""):
+        row = {
+            'employee_id': employee['id'], 'name': employee['name'], 'email': employee['email'],
+            'file': filename or "", 'source': source, 'reason': reason,
+        }
+        manifest.append(row)
+        stats[source] += 1
+        if progress:
+            progress(row)
+
+    try:
+        with zipfile.ZipFile(output, "w", compression=zipfile.ZIP_STORED) as zf:
+            jobs = []
+            for employee in select_employees(employees, letter, start, end, cohort):
+                stats['employees'] += 1
+                entry = archive.latest(
+                    [employee['email'], employee['official_email'], employee['personal_email']], letter
+                )
+                if entry:
+                    name = _entry_name(employee, entry['filename'])
+                    try:
+                        with archive.open_blob(entry['digest']) as src, zf.open(name, "w") as dst:
+                            shutil.copyfileobj(src, dst, CHUNK_BYTES)
+                    except FileNotFoundError:
+                        pass  # Metadata without a blob: render the letter again below
+                    else:
+                        stats['bytes'] += entry['size']
+                        add(employee, name, "archived")
+                        continue
+                if letter == "offer" and (employee['employee_type'] or "Full-time Employee") == "Full-time Employee":
+                    add(employee, None, "skipped", "full-time offer letters need salary details, which are not stored")
+                    continue
+                by_id[employee['id']] = employee
+                jobs.append((employee['id'], employee_candidate(employee, letter)))
+
+            with closing(_render_all(jobs, workers)) as renders:
+                for employee_id, filename, html, pdf_bytes, error in renders:
+                    employee = by_id[employee_id]
+                    if error:
+                        add(employee, None, "failed", error)
+                        continue
+                    name = _entry_name(employee, filename)
+                    zf.writestr(name, pdf_bytes)
+                    digest = archive.put(pdf_bytes, letter, filename, employee['email'], template_version=version)
+                    index_letter(digest, letter, filename, html, employee['name'], employee['position'],
+                                 employee_email=employee['email'])
+                    stats['bytes'] += len(pdf_bytes)
+                    add(employee, name, "rendered")
+
+            with zf.open("manifest.csv", "w") as f:
+                text = io.TextIOWrapper(f, encoding="utf-8", newline="")
+                writer = csv.DictWriter(text, MANIFEST_COLUMNS)
+                writer.writeheader()
+                writer.writerows(manifest)
+                text.flush()
+                text.detach()
+    finally:
+        if own_archive:
+            archive.close()
+
+    stats['elapsed_seconds'] = time.perf_counter() - started
+    return stats
+
+class ExportCancelled(Exception):
+    """The consumer of a streamed export went away"""
+
+class _ChunkWriter(io.RawIOBase):
+    """Unseekable file object that hands every write to a bounded queue"""
+
+    def __init__(self, chunks, cancelled):
+        self.chunks = chunks
+        self.cancelled = cancelled
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        chunk = bytes(data)
+        _put_chunk(self.chunks, self.cancelled, chunk)
+        return len(chunk)
+
+def _put_chunk(chunks, cancelled, chunk):
+    """Put chunk on the queue, raising ExportCancelled instead of waiting for a consumer that has gone"""
+    while True:
+        if cancelled.is_set():
+            raise ExportCancelled()
+        try:
+            chunks.put(chunk, timeout=0.5)
+            return
+        except queue.Full:
+            continue
+
+def stream_export(letter, start=None, end=None, cohort=None, workers=None, employees=None, archive=None):
+    """Yield the export ZIP in chunks as it is built (e.g. for an HTTP streaming response)
+
+    The ZIP is written on a background thread into a small queue, so at most a
+    few chunks are held at once; closing the generator early cancels the export.
+    """
+    chunks = queue.Queue(maxsize=16)
+    cancelled = threading.Event()
+    failure = []
+    done = object()
+
+    def produce():
+        try:
+            with io.BufferedWriter(_ChunkWriter(chunks, cancelled), CHUNK_BYTES) as output:
+                export_letters(output, letter, start, end, cohort, workers, employees, archive)
+        except ExportCancelled:
+            return
+        except Exception as e:
+            failure.append(e)
+        try:
+            _put_chunk(chunks, cancelled, done)
+        except ExportCancelled:
+            pass
+
+    thread = threading.Thread(target=produce, name="letter-export", daemon=True)
+    thread.start()
+    try:
+        while True:
+            chunk = chunks.get()
+            if chunk is done:
+                break
+            yield chunk
+    finally:
+        cancelled.set()
+    if failure:
+        raise failure[0]
@@ -0,0 +1,1170 @@
+"""
+HTML generators for offer letters, appointment letters and experience certificates
+
+This module only depends on the standard library and config, so it can be
+imported from Streamlit, the batch CLI or worker processes without any UI
+side effects. Problems are raised as core.errors exceptions.
+"""
+
+import base64
+import hashlib
+import os
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+import config
+from core.errors import TemplateNotFoundError
+from core.paths import resolve_path
+from core.renderer import PAGE_BREAK
+
+APPOINTMENT_LETTER_PATH = resolve_path("appointment_letter.txt")
+
+@lru_cache(maxsize=None)
+def get_base64_image(image_path):
+    """Convert image to base64 string (cached per process, images never change at runtime)"""
+    try:
+        with open(resolve_path(image_path), "rb") as img_file:
+            return base64.b64encode(img_file.read()).decode()
+    except:
+        return ""  # Return empty string if image not found
+
+def generate_offer_letter(offer_type, name, position, start_date, ctc=None):
+    """Generate HTML offer letter based on type"""
+
+    # Base64 encode images
+    header_img = get_base64_image(config.HEADER_IMAGE_PATH)
+    footer_img = get_base64_image(config.FOOTER_IMAGE_PATH)
+    signature_img = get_base64_image(config.SIGNATURE_IMAGE_PATH)
+
+    html_template = f"""
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <meta charset="UTF-8">
+        <style>
+            @page {{
+                margin: 20px;
+                @top-left {{
+                    content: element(header);
+                }}
+                @bottom-center {{
+                    content: element(footer);
+                }}
+            }}
+            body {{
+                font-family: {config.DOCUMENT_STYLES['font_family']};
+                margin: 0;
+                padding: 20px;
+                font-size: 12px;
+            }}
+            .header {{
+                text-align: left;
+                margin-bottom: 30px;
+                position: running(header);
+            }}
+            .content {{
+                margin: 20px 0;
+                line-height: {config.DOCUMENT_STYLES['line_height']};
+            }}
+            .page-break {{ page-break-before: always; }}
+            .signature {{
+                margin-top: 50px;
+                text-align: left;
+                page-break-inside: avoid;
+            }}
+            .footer {{
+                text-align: center;
+                margin-top: 50px;
+                position: running(footer);
+                width: 100%;
+            }}
+            h1, h2 {{ color: {config.DOCUMENT_STYLES['primary_color']}; text-align: center; }}
+            .terms {{ margin: 20px 0; }}
+            .terms li {{ margin: 10px 0; }}
+            .acceptance-section {{
+                margin-top: 80px;
+                page-break-inside: avoid;
+            }}
+            .signature-line {{
+                border-bottom: 1px solid #000;
+                width: 200px;
+                margin: 20px 0;
+                height: 20px;
+            }}
+        </style>
+    </head>
+    <body>
+        <div class="header">
+            <img src="data:image/png;base64,{header_img}" style="max-width: 200px; height: auto;">
+        </div>
+
+        <div class="content">
+            <h2>OFFER LETTER</h2>
+            <p><strong>Date:</strong> {datetime.now().strftime('%d %B %Y')}</p>
+
+            <p><strong>Dear {name},</strong></p>
+
+            <p>We are pleased to offer you the position of <strong>{position}</strong> at {config.COMPANY_NAME}, starting on {start_date.strftime('%d %B %Y')}.</p>
+
+            {"<p><strong>Annual CTC:</strong> ₹{:,}</p>".format(ctc) if ctc else ""}
+
+            <div class="terms">
+                <h3>Terms and Conditions:</h3>
+                <ul>
+                    <li>This offer is contingent upon successful completion of background verification and reference checks.</li>
+                    <li>You will be required to sign our standard employment agreement and confidentiality agreement.</li>
+                    <li>Your employment will be subject to our company policies and procedures.</li>
+                    <li>This position includes standard company benefits as per our employee handbook.</li>
+                    <li>Probation period: {config.DEFAULT_PROBATION_PERIOD}</li>
+                    <li>Notice period: {config.DEFAULT_NOTICE_PERIOD_CONFIRMED} after confirmation</li>
+                    <li>You will be entitled to leaves as per company policy</li>
+                    <li>All company policies and guidelines must be followed</li>
+                </ul>
+            </div>
+
+            <div class="page-break"></div>
+
+            <p>Please confirm your acceptance of this offer by signing and returning this letter by {(datetime.now() + timedelta(days=7)).strftime('%d %B %Y')}.</p>
+
+            <p>We look forward to working with you and welcome you to the {config.COMPANY_NAME} family!</p>
+
+            <div class="acceptance-section">
+                <p><strong>I HAVE READ THIS OFFER CAREFULLY AND UNDERSTAND ITS TERMS. I HAVE COMPLETELY FILLED OUT THE EXHIBIT A TO THIS OFFER.</strong></p>
+
+                <p><strong>Dated:</strong></p>
+                <div class="signature-line"></div>
+                <p>(Signature of Employee)<br>({name})</p>
+
+                <p style="margin-top: 40px;"><strong>ACCEPTED AND AGREED TO:</strong></p>
+                <p>{config.COMPANY_NAME}</p>
+            </div>
+        </div>
+
+        <div class="signature">
+            <img src="data:image/png;base64,{signature_img}" style="max-width: 120px; height: auto;">
+            <p><strong>{config.HR_MANAGER_NAME}</strong><br>
+            {config.HR_MANAGER_TITLE}</p>
+        </div>
+
+        <div class="footer">
+            <img src="data:image/png;base64,{footer_img}" style="max-width: 100%; height: auto;">
+        </div>
+    </body>
+    </html>
+    """
+
+    return html_template
+
+def generate_experience_letter(employee_name, position, start_date, end_date, letter_type="standard"):
+    """Generate HTML experience letter or internship certificate"""
+
+    # Base64 encode images
+    header_img = get_base64_image(config.HEADER_IMAGE_PATH)
+    footer_img = get_base64_image(config.FOOTER_IMAGE_PATH)
+    signature_img = get_base64_image(config.SIGNATURE_IMAGE_PATH)
+
+    # Calculate duration
+    duration_months = (end_date.year - start_date.year) * 12 + (end_date.month - start_date.month)
+
+    # Determine pronouns based on title in employee_name
+    if employee_name.startswith("Mr."):
+        pronouns = {"he_she": "He", "his_her": "his", "his_her_cap": "His", "him_her": "him"}
+        clean_name = employee_name  # Keep Mr. in the name
+    elif employee_name.startswith("Ms."):
+        pronouns = {"he_she": "She", "his_her": "her", "his_her_cap": "Her", "him_her": "her"}
+        clean_name = employee_name  # Keep Ms. in the name
+    else:
+        # Fallback to neutral
+        pronouns = {"he_she": "They", "his_her": "their", "his_her_cap": "Their", "him_her": "them"}
+        clean_name = employee_name
+
+    if letter_type == "internship":
+        # Internship Certificate
+        content = f"""
+        <h3 style="text-align: center; margin: 40px 0; font-weight: bold;">To Whom It May Concern</h3>
+
+        <p style="margin: 30px 0; line-height: 1.8;">This letter is to certify that <strong>{clean_name}</strong> has completed {pronouns['his_her']} internship with Rapid Innovation. {pronouns['his_her_cap']} internship tenure was from <strong>{start_date.strftime('%B %d, %Y')}</strong> to <strong>{end_date.strftime('%B %d, %Y')}</strong>. {pronouns['he_she']} was working with us as an <strong>{position}</strong> and was actively & diligently involved in the projects and tasks assigned to {pronouns['him_her']}.</p>
+
+        <p style="margin: 30px 0; line-height: 1.8;">During this time, we found {pronouns['him_her']} to be punctual and hardworking.</p>
+
+        <p style="margin: 30px 0; line-height: 1.8;">We wish {pronouns['him_her']} a bright future.</p>
+
+        <p style="margin-top: 60px;">Sincerely,</p>
+        """
+    elif letter_type == "dues_not_settled":
+        # Experience Letter - Dues Not Settled
+        content = f"""
+        <h2 style="text-align: center; margin: 40px 0; font-weight: bold;">EXPERIENCE - CERTIFICATE</h2>
+        <h3 style="text-align: center; margin: 20px 0; font-weight: bold;">TO WHOMSOEVER IT MAY CONCERN</h3>
+
+        <p style="margin: 30px 0; line-height: 1.8;">This is to certify that <strong>{clean_name}</strong> worked as a <strong>{position}</strong> with Rapid Innovation from <strong>{start_date.strftime('%B %d, %Y')}</strong> to <strong>{end_date.strftime('%B %d, %Y')}</strong>.</p>
+
+        <p style="margin: 30px 0; line-height: 1.8;">During {pronouns['his_her']} employment with Rapid Innovation, we found {pronouns['his_her']} performance to be satisfactory. However, there are pending dues to be settled.</p>
+
+        <p style="margin: 30px 0; line-height: 1.8;">We wish {pronouns['him_her']} success in {pronouns['his_her']} future endeavors.</p>
+
+        <p style="margin-top: 60px;">Sincerely,</p>
+        """
+    else:
+        # Standard Experience Letter
+        content = f"""
+        <h2 style="text-align: center; margin: 40px 0; font-weight: bold;">EXPERIENCE - CERTIFICATE</h2>
+        <h3 style="text-align: center; margin: 20px 0; font-weight: bold;">TO WHOMSOEVER IT MAY CONCERN</h3>
+
+        <p style="margin: 30px 0; line-height: 1.8;">This is to certify that <strong>{clean_name}</strong> worked as a <strong>{position}</strong> with Rapid Innovation from <strong>{start_date.strftime('%B %d, %Y')}</strong> to <strong>{end_date.strftime('%B %d, %Y')}</strong>.</p>
+
+        <p style="margin: 30px 0; line-height: 1.8;">During {pronouns['his_her']} employment with Rapid Innovation, we found {pronouns['his_her']} performance to be satisfactory. All dues are settled.</p>
+
+        <p style="margin: 30px 0; line-height: 1.8;">We wish {pronouns['him_her']} success in {pronouns['his_her']} future endeavors.</p>
+
+        <p style="margin-top: 60px;">Sincerely,</p>
+        """
+
+    html_template = f"""
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <meta charset="UTF-8">
+        <style>
+            @page {{
+                margin: 40px 40px 280px 40px;
+                @bottom-center {{
+                    content: element(footer);
+                }}
+            }}
+            body {{
+                font-family: {config.DOCUMENT_STYLES['font_family']};
+                margin: 0;
+                padding: 0;
+                font-size: 14px;
+                line-height: 1.6;
+                color: #333;
+                min-height: 100vh;
+            }}
+            .page-content {{
+                padding: 40px;
+                padding-bottom: 280px;
+            }}
+            .header {{
+                text-align: left;
+                margin-bottom: 40px;
+            }}
+            .name-date {{
+                display: flex;
+                justify-content: space-between;
+                align-items: flex-start;
+                margin: 30px 0 50px 0;
+                font-size: 14px;
+            }}
+            .employee-name {{
+                text-align: left;
+                font-weight: bold;
+            }}
+            .document-date {{
+                text-align: right;
+            }}
+            .content {{
+                margin: 40px 0;
+                text-align: justify;
+            }}
+            .signature {{
+                margin-top: 80px;
+                text-align: left;
+                page-break-inside: avoid;
+            }}
+            .footer {{
+                text-align: center;
+                position: running(footer);
+                width: 100%;
+                margin-top: 50px;
+            }}
+            h2 {{
+                color: #1e3c72;
+                font-weight: bold;
+                font-size: 18px;
+                margin: 40px 0 20px 0;
+            }}
+            h3 {{
+                color: #1e3c72;
+                font-weight: bold;
+                font-size: 14px;
+                margin: 20px 0 30px 0;
+            }}
+            p {{
+                margin: 20px 0;
+                text-align: justify;
+                font-size: 14px;
+                line-height: 1.8;
+            }}
+        </style>
+    </head>
+    <body>
+        <div class="page-content">
+            <div class="header">
+                <img src="data:image/png;base64,{header_img}" style="max-width: 150px; height: auto;">
+            </div>
+
+            <div class="name-date">
+                <div class="employee-name">{employee_name}</div>
+                <div class="document-date">{datetime.now().strftime('%d %B %Y')}</div>
+            </div>
+
+            <div class="content">
+                {content}
+            </div>
+
+            <div class="signature">
+                <img src="data:image/png;base64,{signature_img}" style="max-width: 120px; height: auto;">
+                <p><strong>Aarushi Sharma</strong><br>
+                Assistant Manager HR</p>
+            </div>
+        </div>
+
+        <div class="footer">
+            <img src="data:image/png;base64,{footer_img}" style="max-width: 100%; height: auto;">
+        </div>
+    </body>
+    </html>
+    """
+
+    return html_template
+
+def convert_text_to_html(processed_content):
+    """Convert plain text appointment letter content to HTML with proper formatting"""
+    html_content = ""
+    lines = processed_content.split('\n')
+
+    in_bullet_list = False
+    in_numbered_list = False
+
+    for i, line in enumerate(lines):
+        line = line.strip()
+
+        # Skip the first line (name and date) as it will be handled separately
+        if i == 0:
+            continue
+
+        if not line:
+            # Close any open lists before adding line break
+            if in_bullet_list:
+                html_content += "</ul>"
+                in_bullet_list = False
+            if in_numbered_list:
+                html_content += "</ol>"
+                in_numbered_list = False
+            html_content += "<br>"
+            continue
+
+        # Handle different types of content
+        if line.startswith("●"):
+            # Start bullet list if not already in one
+            if not in_bullet_list:
+                if in_numbered_list:
+                    html_content += "</ol>"
+                    in_numbered_list = False
+                html_content += "<ul>"
+                in_bullet_list = True
+            html_content += f"<li>{line[1:].strip()}</li>"
+
+        elif line == "Confidential":
+            if in_bullet_list:
+                html_content += "</ul>"
+                in_bullet_list = False
+            if in_numbered_list:
+                html_content += "</ol>"
+                in_numbered_list = False
+            html_content += f'<p class="confidential">{line}</p>'
+
+        elif line.startswith("Subject:"):
+            if in_bullet_list:
+                html_content += "</ul>"
+                in_bullet_list = False
+            if in_numbered_list:
+                html_content += "</ol>"
+                in_numbered_list = False
+            html_content += f"<p><strong>{line}</strong></p>"
+
+        elif line.startswith("Dear "):
+            if in_bullet_list:
+                html_content += "</ul>"
+                in_bullet_list = False
+            if in_numbered_list:
+                html_content += "</ol>"
+                in_numbered_list = False
+            html_content += f"<p>{line}</p>"
+
+        elif "TERMS AND CONDITIONS OF EMPLOYMENT" in line:
+            if in_bullet_list:
+                html_content += "</ul>"
+                in_bullet_list = False
+            if in_numbered_list:
+                html_content += "</ol>"
+                in_numbered_list = False
+            html_content += f"<h3>{line}</h3>"
+
+        elif "EMPLOYEE PROPRIETARY INFORMATION" in line or "NON-COMPETITION AND NON-SOLICITATION AGREEMENT" in line:
+            if in_bullet_list:
+                html_content += "</ul>"
+                in_bullet_list = False
+            if in_numbered_list:
+                html_content += "</ol>"
+                in_numbered_list = False
+            html_content += f"<h3>{line}</h3>"
+
+        elif line.startswith(("1.", "2.", "3.", "4.", "5.", "6.", "7.", "8.", "9.", "10.", "11.", "12.", "13.")):
+            # Handle numbered sections
+            if in_bullet_list:
+                html_content += "</ul>"
+                in_bullet_list = False
+            if not in_numbered_list:
+                html_content += "<ol>"
+                in_numbered_list = True
+            # Extract the content after the number
+            content = line.split(".", 1)[1].strip() if "." in line else line
+            html_content += f"<li><strong>{content}</strong></li>"
+
+        elif (line.endswith(":") and len(line) < 80) or line.isupper():
+            # Section headers
+            if in_bullet_list:
+                html_content += "</ul>"
+                in_bullet_list = False
+            if in_numbered_list:
+                html_content += "</ol>"
+                in_numbered_list = False
+            html_content += f"<h4>{line}</h4>"
+
+        elif line.startswith("(") and line.endswith(")"):
+            # Signature lines
+            if in_bullet_list:
+                html_content += "</ul>"
+                in_bullet_list = False
+            if in_numbered_list:
+                html_content += "</ol>"
+                in_numbered_list = False
+            html_content += f"<p style='text-align: center;'>{line}</p>"
+
+        elif "ACCEPTED AND AGREED TO:" in line or "Rapid Innovation" in line or "Assistant Manager HR" in line:
+            # Signature section
+            if in_bullet_list:
+                html_content += "</ul>"
+                in_bullet_list = False
+            if in_numbered_list:
+                html_content += "</ol>"
+                in_numbered_list = False
+            html_content += f"<p style='text-align: center;'><strong>{line}</strong></p>"
+
+        else:
+            # Regular paragraphs
+            if in_bullet_list:
+                html_content += "</ul>"
+                in_bullet_list = False
+            if in_numbered_list:
+                html_content += "</ol>"
+                in_numbered_list = False
+            html_content += f"<p>{line}</p>"
+
+    # Close any remaining open lists
+    if in_bullet_list:
+        html_content += "</ul>"
+    if in_numbered_list:
+        html_content += "</ol>"
+
+    return html_content
+
+# Per-letter slots of the offer letter templates (see _offer_chrome)
+OFFER_SLOTS = ("content", "page2_content", "candidate_name")
+
+# Page 2 of the full-time offer letter after the salary table
+OFFER_TERMS_HTML = """
+
+        <p><strong>Please Note:</strong></p>
+        <p>The Company shall withhold from any amounts payable to you such taxes as may be required to withhold pursuant to applicable laws or regulation. In case of any under-withholding caused due to any wrong declaration by you, you shall be solely responsible to pay the necessary tax and any interest/penalty thereon.</p>
+
+        <p>For,<br>Rapid Innovation.</p>
+
+        <p>You will be on probation for a period of (3) Three Months from the date of your joining. Your performance will be assessed for confirmation on your parameters as per required for the time assessment.</p>
+
+        <p>We are confident that you will be able to make a significant contribution to the success of our Company. Please ensure that you have a stable network connection and uninterrupted power supply at your place. This position is designated as remote until further notified by the management.</p>
+
+        <p>Please sign and share the scanned copy of this letter and return it to the HR Department to indicate your acceptance of this offer.</p>
+
+        <p>Sincerely,</p>
+        """
+
+@lru_cache(maxsize=256)
+def _salary_table_fragment(candidate_name, position, start_date, salary_items):
+    """Salary table of a full-time offer letter (cached: only rebuilt when the salary or candidate changes)"""
+    salary_data = dict(salary_items)
+    return f"""
+        <div style="margin: 20px 0;">
+            <h3 style="text-align: center; color: #1e3c72; margin-bottom: 15px;">COMPENSATION DETAILS (SALARY AND APPLICABLE BENEFITS)</h3>
+            <table style="width: 100%; border-collapse: collapse; margin: 20px 0; font-size: 11px;">
+                <tr style="background-color: #f8f9fa;">
+                    <td style="border: 1px solid #333; padding: 8px; font-weight: bold;">Employee Name</td>
+                    <td style="border: 1px solid #333; padding: 8px;">{candidate_name}</td>
+                    <td style="border: 1px solid #333; padding: 8px;"></td>
+                </tr>
+                <tr style="background-color: #f8f9fa;">
+                    <td style="border: 1px solid #333; padding: 8px; font-weight: bold;">Designation</td>
+                    <td style="border: 1px solid #333; padding: 8px;">{position}</td>
+                    <td style="border: 1px solid #333; padding: 8px;"></td>
+                </tr>
+                <tr style="background-color: #f8f9fa;">
+                    <td style="border: 1px solid #333; padding: 8px; font-weight: bold;">Date of Joining</td>
+                    <td style="border: 1px solid #333; padding: 8px;">{start_date.strftime('%d %B %Y')}</td>
+                    <td style="border: 1px solid #333; padding: 8px;"></td>
+                </tr>
+                <tr style="background-color: #e9ecef;">
+                    <td style="border: 1px solid #333; padding: 8px; font-weight: bold;">Particulars</td>
+                    <td style="border: 1px solid #333; padding: 8px; font-weight: bold; text-align: center;">Monthly</td>
+                    <td style="border: 1px solid #333; padding: 8px; font-weight: bold; text-align: center;">Annual</td>
+                </tr>
+                <tr>
+                    <td style="border: 1px solid #333; padding: 8px;">Basic Salary</td>
+                    <td style="border: 1px solid #333; padding: 8px; text-align: right;">{salary_data['basic_salary_monthly']:,}</td>
+                    <td style="border: 1px solid #333; padding: 8px; text-align: right;">{salary_data['basic_salary_annual']:,}</td>
+                </tr>
+                <tr>
+                    <td style="border: 1px solid #333; padding: 8px;">HRA</td>
+                    <td style="border: 1px solid #333; padding: 8px; text-align: right;">{salary_data['hra_monthly']:,}</td>
+                    <td style="border: 1px solid #333; padding: 8px; text-align: right;">{salary_data['hra_annual']:,}</td>
+                </tr>
+                <tr>
+                    <td style="border: 1px solid #333; padding: 8px;">Special Allowance</td>
+                    <td style="border: 1px solid #333; padding: 8px; text-align: right;">{salary_data['special_allowance_monthly']:,}</td>
+                    <td style="border: 1px solid #333; padding: 8px; text-align: right;">{salary_data['special_allowance_annual']:,}</td>
+                </tr>
+                <tr>
+                    <td style="border: 1px solid #333; padding: 8px;">Medical Allowance</td>
+                    <td style="border: 1px solid #333; padding: 8px; text-align: right;">{salary_data['medical_allowance_monthly']:,}</td>
+                    <td style="border: 1px solid #333; padding: 8px; text-align: right;">{salary_data['medical_allowance_annual']:,}</td>
+                </tr>
+                <tr>
+                    <td style="border: 1px solid #333; padding: 8px;">Books & Periodical</td>
+                    <td style="border: 1px solid #333; padding: 8px; text-align: right;">{salary_data['books_periodical_monthly']:,}</td>
+                    <td style="border: 1px solid #333; padding: 8px; text-align: right;">{salary_data['books_periodical_annual']:,}</td>
+                </tr>
+                <tr>
+                    <td style="border: 1px solid #333; padding: 8px;">Health Club Facility</td>
+                    <td style="border: 1px solid #333; padding: 8px; text-align: right;">{salary_data['health_club_monthly']:,}</td>
+                    <td style="border: 1px solid #333; padding: 8px; text-align: right;">{salary_data['health_club_annual']:,}</td>
+                </tr>
+                <tr>
+                    <td style="border: 1px solid #333; padding: 8px;">Internet & Telephone</td>
+                    <td style="border: 1px solid #333; padding: 8px; text-align: right;">{salary_data['internet_telephone_monthly']:,}</td>
+                    <td style="border: 1px solid #333; padding: 8px; text-align: right;">{salary_data['internet_telephone_annual']:,}</td>
+                </tr>
+                <tr style="background-color: #e9ecef; font-weight: bold;">
+                    <td style="border: 1px solid #333; padding: 8px;">Gross CTC</td>
+                    <td style="border: 1px solid #333; padding: 8px; text-align: right;">{salary_data['gross_ctc_monthly']:,}</td>
+                    <td style="border: 1px solid #333; padding: 8px; text-align: right;">{salary_data['gross_ctc_annual']:,}</td>
+                </tr>
+                <tr>
+                    <td style="border: 1px solid #333; padding: 8px;">PF Employer Contribution</td>
+                    <td style="border: 1px solid #333; padding: 8px; text-align: right;">{salary_data['pf_contribution_monthly']:,}</td>
+                    <td style="border: 1px solid #333; padding: 8px; text-align: right;">{salary_data['pf_contribution_annual']:,}</td>
+                </tr>
+                <tr style="background-color: #d4edda; font-weight: bold;">
+                    <td style="border: 1px solid #333; padding: 8px;">Total CTC</td>
+                    <td style="border: 1px solid #333; padding: 8px; text-align: right;">{salary_data['total_ctc_monthly']:,}</td>
+                    <td style="border: 1px solid #333; padding: 8px; text-align: right;">{salary_data['total_ctc_annual']:,}</td>
+                </tr>
+            </table>
+        </div>
+        """
+
+@lru_cache(maxsize=256)
+def _offer_content(offer_type, candidate_name, position, start_date, total_ctc_annual=None):
+    """Page 1 body of an offer letter"""
+    if offer_type == "Intern":
+        content = f"""
+        <p style="text-align: right; margin-bottom: 20px;"><strong>Date: {start_date.strftime('%d %B %Y')}</strong></p>
+
+        <h2 style="text-align: center; color: #1e3c72; margin: 30px 0;">Internship Letter</h2>
+
+        <p>Dear {candidate_name},</p>
+
+        <p>With reference to your application and subsequent discussion/interview, we are pleased to offer you the position of <strong>"{position}" Intern</strong> at Rapid Innovation.</p>
+
+        <p>Your internship will start from <strong>{start_date.strftime('%d %B %Y')}</strong> or on a mutually agreed date. This internship is a remote opportunity.</p>
+
+        <p>We are confident that you will be able to make a significant contribution to the success of our Company. Please ensure that you have a stable network connection and uninterrupted power supply at your place. This position is designated as remote until further notified by the management.</p>
+
+        <p>Please sign and share the scanned copy of this letter and return it to the HR Department to indicate your acceptance of this offer.</p>
+
+        <p>Sincerely,</p>
+        """
+    elif offer_type == "Full-time Employee":
+        # Page 1 content only
+        content = f"""
+        <p style="text-align: right; margin-bottom: 20px;"><strong>Date: {start_date.strftime('%d %B %Y')}</strong></p>
+
+        <h2 style="text-align: center; color: #1e3c72; margin: 30px 0;">Offer Letter</h2>
+
+        <p>Dear {candidate_name},</p>
+
+        <p>With reference to your application and subsequent discussion/interview, we are pleased to offer you the position of <strong>"{position}"</strong> at Rapid Innovation.</p>
+
+        <p>Your full time employment will start from <strong>{start_date.strftime('%d %B %Y')}</strong> or on before Wednesday. This offer is subjected to reference check, as provided by you.</p>
+
+        <p>In recognition of your contributions, we are pleased to inform you that your annual CTC will be <strong>Rs. {total_ctc_annual:,}/-</strong> (Rupees {number_to_words(total_ctc_annual)} Only) per annum.</p>
+
+        <p>Please note that we are attaching the pay structure with this offer letter.</p>
+        """
+
+    else:  # Contractor
+        content = f"""
+        <p style="text-align: right; margin-bottom: 20px;"><strong>Date: {start_date.strftime('%d %B %Y')}</strong></p>
+
+        <h2 style="text-align: center; color: #1e3c72; margin: 30px 0;">Contract Letter</h2>
+
+        <p>Dear {candidate_name},</p>
+
+        <p>With reference to your application and subsequent discussion/interview, we are pleased to offer you the position of <strong>"{position}" Contractor</strong> at Rapid Innovation.</p>
+
+        <p>Your contract will start from <strong>{start_date.strftime('%d %B %Y')}</strong> or on a mutually agreed date. This contract is a remote opportunity.</p>
+
+        <p>We are confident that you will be able to make a significant contribution to the success of our Company. Please ensure that you have a stable network connection and uninterrupted power supply at your place. This position is designated as remote until further notified by the management.</p>
+
+        <p>Please sign and share the scanned copy of this letter and return it to the HR Department to indicate your acceptance of this offer.</p>
+
+        <p>Sincerely,</p>
+        """
+    return content
+
+@lru_cache(maxsize=None)
+def _offer_chrome(offer_type):
+    """The offer letter template for a type, split around OFFER_SLOTS
+
+    Styles, images and signature blocks are formatted once per process;
+    composing a letter only joins the static parts with the slot values.
+    """
+    # Base64 encode images
+    header_img = get_base64_image(config.HEADER_IMAGE_PATH)
+    footer_img = get_base64_image(config.FOOTER_IMAGE_PATH)
+    signature_img = get_base64_image(config.SIGNATURE_IMAGE_PATH)
+
+    # Placeholders, split out below
+    content, page2_content, candidate_name = (f"\x00{slot}\x00" for slot in OFFER_SLOTS)
+
+    # Create different templates based on offer type
+    if offer_type == "Full-time Employee":
+        # Full-time offer letter template with clean format (same as internship)
+        html_template = f"""
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <meta charset="UTF-8">
+            <style>
+                @page {{
+                    margin: 40px 40px 120px 40px;
+                }}
+                body {{
+                    font-family: {config.DOCUMENT_STYLES['font_family']};
+                    margin: 0;
+                    padding: 0;
+                    line-height: {config.DOCUMENT_STYLES['line_height']};
+                    font-size: 12px;
+                    color: #333;
+                }}
+                .page-content {{
+                    padding: 20px;
+                    padding-bottom: 120px;
+                    min-height: calc(100vh - 240px);
+                }}
+                .header {{ text-align: left; margin-bottom: 30px; }}
+                .content {{ margin: 20px 0; }}
+                .signature {{ margin-top: 50px; text-align: left; page-break-inside: avoid; }}
+                .footer {{
+                    text-align: center;
+                    width: 100%;
+                    margin-top: 20px;
+                    page-break-inside: avoid;
+                }}
+                .footer-bottom {{
+                    text-align: center;
+                    width: 100%;
+                    margin-top: 180px;
+                    page-break-inside: avoid;
+                }}
+                h1, h2, h3 {{ color: {config.DOCUMENT_STYLES['primary_color']}; }}
+                p {{ text-align: justify; margin: 8px 0; line-height: 1.4; }}
+                table {{ border-collapse: collapse; width: 100%; margin: 20px 0; }}
+                td {{ border: 1px solid #333; padding: 8px; }}
+            </style>
+        </head>
+        <body>
+            <!-- Page 1 -->
+            <div class="page-content">
+                <div class="header">
+                    <img src="data:image/png;base64,{header_img}" style="max-width: 150px; height: auto;">
+                </div>
+
+                <div class="content">
+                    {content}
+                </div>
+
+                <div class="signature">
+                    <img src="data:image/png;base64,{signature_img}" style="max-width: 80px; height: auto;">
+                    <p><strong>Aarushi Sharma</strong><br>
+                    Assistant Manager HR</p>
+                    <br><br>
+                    <p style="text-align: right;"><strong>Accepted By</strong><br>
+                    {candidate_name}</p>
+                </div>
+
+                <div class="footer-bottom" style="margin-top: 470px;">
+                    <img src="data:image/png;base64,{footer_img}" style="max-width: 100%; height: auto;">
+                </div>
+            </div>
+
+            <!-- Page 2 -->
+            <div style="page-break-before: always;"></div>
+            <div class="page-content">
+                <div class="header">
+                    <img src="data:image/png;base64,{header_img}" style="max-width: 150px; height: auto;">
+                </div>
+
+                <div class="content">
+                    {page2_content}
+                </div>
+
+                <div class="signature">
+                    <img src="data:image/png;base64,{signature_img}" style="max-width: 80px; height: auto;">
+                    <p><strong>Aarushi Sharma</strong><br>
+                    Assistant Manager HR</p>
+                    <br><br>
+                    <p style="text-align: right;"><strong>Accepted By</strong><br>
+                    {candidate_name}</p>
+                </div>
+
+                <div class="footer">
+                    <img src="data:image/png;base64,{footer_img}" style="max-width: 100%; height: auto;">
+                </div>
+            </div>
+        </body>
+        </html>
+        """
+    else:
+        # Internship letter template (existing clean format)
+        html_template = f"""
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <meta charset="UTF-8">
+            <style>
+                @page {{
+                    margin: 40px 40px 500px 40px;
+                    @bottom-center {{
+                        content: element(footer);
+                    }}
+                }}
+                body {{
+                    font-family: {config.DOCUMENT_STYLES['font_family']};
+                    margin: 0;
+                    padding: 0;
+                    line-height: {config.DOCUMENT_STYLES['line_height']};
+                    font-size: 12px;
+                    color: #333;
+                    min-height: 100vh;
+                    position: relative;
+                }}
+                .page-content {{
+                    padding: 20px;
+                    padding-bottom: 500px;
+                }}
+                .header {{ text-align: left; margin-bottom: 30px; }}
+                .content {{ margin: 20px 0; }}
+                .signature {{ margin-top: 50px; text-align: left; page-break-inside: avoid; }}
+                .footer {{
+                    text-align: center;
+                    position: running(footer);
+                    width: 100%;
+                    margin-top: 50px;
+                }}
+                h1, h2, h3 {{ color: {config.DOCUMENT_STYLES['primary_color']}; }}
+                p {{ text-align: justify; margin: 8px 0; line-height: 1.4; }}
+                table {{ border-collapse: collapse; width: 100%; }}
+                td {{ border: 1px solid #333; padding: 8px; }}
+            </style>
+        </head>
+        <body>
+            <div class="page-content">
+                <div class="header">
+                    <img src="data:image/png;base64,{header_img}" style="max-width: 200px; height: auto;">
+                </div>
+
+                <div class="content">
+                    {content}
+                </div>
+
+                <div class="signature">
+                    <img src="data:image/png;base64,{signature_img}" style="max-width: 80px; height: auto;">
+                    <p><strong>Aarushi Sharma</strong><br>
+                    Assistant Manager HR</p>
+                    <br><br>
+                    <p style="text-align: right;"><strong>Accepted By</strong><br>
+                    {candidate_name}</p>
+                </div>
+            </div>
+
+            <div class="footer">
+                <img src="data:image/png;base64,{footer_img}" style="max-width: 100%; height: auto;">
+            </div>
+        </body>
+        </html>
+        """
+
+    return tuple(html_template.split("\x00"))
+
+def generate_offer_letter_with_salary(offer_type, candidate_name, position, start_date, salary_data=None):
+    """Generate offer letter with detailed salary table for full-time employees
+
+    The letter is composed from cached fragments (template chrome, page 1
+    body, salary table, terms), so changing only the salary rebuilds only the
+    salary table; the PDF cache likewise re-renders only the pages that
+    changed (see core/pdf_cache.py).
+    """
+    full_time = offer_type == "Full-time Employee"
+    salary_table_html = ""
+    if salary_data and full_time:
+        salary_table_html = _salary_table_fragment(candidate_name, position, start_date,
+                                                   tuple(sorted(salary_data.items())))
+
+    values = {
+        'content': _offer_content(offer_type, candidate_name, position, start_date,
+                                  salary_data['total_ctc_annual'] if full_time else None),
+        'page2_content': "\n        " + salary_table_html + OFFER_TERMS_HTML if full_time else "",
+        'candidate_name': candidate_name,
+    }
+    parts = list(_offer_chrome(offer_type))
+    for i in range(1, len(parts), 2):
+        parts[i] = values[parts[i]]
+    return "".join(parts)
+
+def generate_revision_letter(name, position, effective_date, old_salary, new_salary, letter_date=None):
+    """Generate HTML salary revision letter comparing the current and revised salary structure"""
+
+    # Base64 encode images
+    header_img = get_base64_image(config.HEADER_IMAGE_PATH)
+    footer_img = get_base64_image(config.FOOTER_IMAGE_PATH)
+    signature_img = get_base64_image(config.SIGNATURE_IMAGE_PATH)
+
+    letter_date = letter_date or datetime.now().date()
+    old_ctc = old_salary['total_ctc_annual']
+    new_ctc = new_salary['total_ctc_annual']
+    change = ""
+    if old_ctc and new_ctc > old_ctc:
+        change = f", an increase of {(new_ctc - old_ctc) / old_ctc * 100:.1f}%"
+
+    cell = "border: 1px solid #333; padding: 6px;"
+    rows = [
+        ("Basic Salary", 'basic_salary'), ("HRA", 'hra'), ("Special Allowance", 'special_allowance'),
+        ("Medical Allowance", 'medical_allowance'), ("Books & Periodical", 'books_periodical'),
+        ("Health Club Facility", 'health_club'), ("Internet & Telephone", 'internet_telephone'),
+        ("Gross CTC", 'gross_ctc'), ("PF Employer Contribution", 'pf_contribution'), ("Total CTC", 'total_ctc'),
+    ]
+    table_rows = ""
+    for label, key in rows:
+        style = ' style="background-color: #e9ecef; font-weight: bold;"' if key in ('gross_ctc', 'total_ctc') else ""
+        table_rows += f"""
+                <tr{style}>
+                    <td style="{cell}">{label}</td>
+                    <td style="{cell} text-align: right;">{old_salary[key + '_annual']:,}</td>
+                    <td style="{cell} text-align: right;">{new_salary[key + '_monthly']:,}</td>
+                    <td style="{cell} text-align: right;">{new_salary[key + '_annual']:,}</td>
+                </tr>"""
+
+    content = f"""
+        <p style="text-align: right; margin-bottom: 20px;"><strong>Date: {letter_date.strftime('%d %B %Y')}</strong></p>
+
+        <h2 style="text-align: center; color: #1e3c72; margin: 30px 0;">Salary Revision Letter</h2>
+
+        <p>Dear {name},</p>
+
+        <p>We are pleased to inform you that, in recognition of your performance and contribution as <strong>"{position}"</strong> at Rapid Innovation, your annual CTC has been revised from <strong>Rs. {old_ctc:,}/-</strong> to <strong>Rs. {new_ctc:,}/-</strong> (Rupees {number_to_words(new_ctc)} Only) per annum{change}, effective <strong>{effective_date.strftime('%d %B %Y')}</strong>.</p>
+
+        <p>Your revised salary structure is given below. All other terms and conditions of your employment remain unchanged.</p>
+
+        <div style="margin: 20px 0;">
+            <h3 style="text-align: center; color: #1e3c72; margin-bottom: 15px;">REVISED COMPENSATION DETAILS</h3>
+            <table style="width: 100%; border-collapse: collapse; margin: 20px 0; font-size: 11px;">
+                <tr style="background-color: #f8f9fa; font-weight: bold;">
+                    <td style="{cell}">Particulars</td>
+                    <td style="{cell} text-align: center;">Current (Annual)</td>
+                    <td style="{cell} text-align: center;">Revised (Monthly)</td>
+                    <td style="{cell} text-align: center;">Revised (Annual)</td>
+                </tr>{table_rows}
+            </table>
+        </div>
+
+        <p>The Company shall withhold from any amounts payable to you such taxes as may be required to withhold pursuant to applicable laws or regulation.</p>
+
+        <p>We thank you for your contribution and look forward to your continued association with Rapid Innovation.</p>
+
+        <p>Sincerely,</p>
+        """
+
+    html_template = f"""
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <meta charset="UTF-8">
+            <style>
+                @page {{
+                    margin: 40px 40px 120px 40px;
+                }}
+                body {{
+                    font-family: {config.DOCUMENT_STYLES['font_family']};
+                    margin: 0;
+                    padding: 0;
+                    line-height: {config.DOCUMENT_STYLES['line_height']};
+                    font-size: 12px;
+                    color: #333;
+                }}
+                .page-content {{ padding: 20px; }}
+                .header {{ text-align: left; margin-bottom: 30px; }}
+                .content {{ margin: 20px 0; }}
+                .signature {{ margin-top: 50px; text-align: left; page-break-inside: avoid; }}
+                .footer {{ text-align: center; width: 100%; margin-top: 20px; page-break-inside: avoid; }}
+                h1, h2, h3 {{ color: {config.DOCUMENT_STYLES['primary_color']}; }}
+                p {{ text-align: justify; margin: 8px 0; line-height: 1.4; }}
+            </style>
+        </head>
+        <body>
+            <div class="page-content">
+                <div class="header">
+                    <img src="data:image/png;base64,{header_img}" style="max-width: 150px; height: auto;">
+                </div>
+
+                <div class="content">
+                    {content}
+                </div>
+
+                <div class="signature">
+                    <img src="data:image/png;base64,{signature_img}" style="max-width: 80px; height: auto;">
+                    <p><strong>{config.HR_MANAGER_NAME}</strong><br>
+                    {config.HR_MANAGER_TITLE}</p>
+                    <br><br>
+                    <p style="text-align: right;"><strong>Accepted By</strong><br>
+                    {name}</p>
+                </div>
+
+                <div class="footer">
+                    <img src="data:image/png;base64,{footer_img}" style="max-width: 100%; height: auto;">
+                </div>
+            </div>
+        </body>
+        </html>
+        """
+
+    return html_template
+
+def number_to_words(number):
+    """Convert number to words (simplified version)"""
+    # This is a simplified version - you might want to use a library like num2words for production
+    if number >= 100000:
+        lakhs = number // 100000
+        remainder = number % 100000
+        if remainder == 0:
+            return f"{lakhs} Lakh"
+        else:
+            return f"{lakhs} Lakh {remainder:,}"
+    else:
+        return f"{number:,}"
+
+# Sample values in appointment_letter.txt, replaced per letter
+APPOINTMENT_PLACEHOLDERS = ("Naman Nagi", "Associate Engineer", "18th June 2025")
+
+# A run of at least this many blank lines in appointment_letter.txt is a page break of the source document
+APPOINTMENT_PAGE_BREAK_LINES = 3
+
+def split_appointment_text(letter_content):
+    """The source pages of the appointment letter text, split at its runs of blank lines
+
+    Every run closes any open list, so each page converts to HTML on its own
+    exactly as it does inside the whole text. The blank lines themselves are
+    dropped; the pages are joined with explicit page breaks instead.
+    """
+    pages, page, blank = [], [], []
+    for line in letter_content.split('\n'):
+        if line.strip():
+            if len(blank) >= APPOINTMENT_PAGE_BREAK_LINES and page:
+                pages.append('\n'.join(page))
+                page = []
+            else:
+                page.extend(blank)
+            blank = []
+            page.append(line)
+        else:
+            blank.append(line)
+    pages.append('\n'.join(page + blank))
+    return pages
+
+@lru_cache(maxsize=4)
+def _compile_appointment_template(mtime):
+    with open(APPOINTMENT_LETTER_PATH, 'r', encoding='utf-8') as file:
+        letter_content = file.read()
+    first, *rest = split_appointment_text(letter_content)
+    # convert_text_to_html skips the first line (sample name and date), which only the first page has
+    return (convert_text_to_html(first), *(convert_text_to_html('\n' + page) for page in rest))
+
+def compile_appointment_template():
+    """appointment_letter.txt converted to HTML once (recompiled when the file changes)
+
+    Returns the HTML of each source page from split_appointment_text. The
+    sample name, position and date act as placeholders and are replaced per
+    letter by generate_appointment_letter. Pages without them (the
+    proprietary information agreement) are the same in every letter, so they
+    are rendered once and reused from the PDF cache.
+    """
+    try:
+        mtime = os.path.getmtime(APPOINTMENT_LETTER_PATH)
+    except FileNotFoundError:
+        raise TemplateNotFoundError("appointment_letter.txt file not found!")
+    return _compile_appointment_template(mtime)
+
+@lru_cache(maxsize=16)
+def _file_digest(path, mtime):
+    with open(path, 'rb') as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+def template_version(letter_type):
+    """Short hash of the sources a letter type is generated from (this module, config, templates)
+
+    Archived letters record it so it is clear which template version produced them.
+    """
+    paths = [os.path.abspath(__file__), os.path.abspath(config.__file__)]
+    if letter_type == "appointment":
+        paths.append(APPOINTMENT_LETTER_PATH)
+    digest = hashlib.sha256()
+    for path in paths:
+        try:
+            digest.update(_file_digest(path, os.path.getmtime(path)).encode())
+        except OSError:
+            digest.update(b"missing")
+    return digest.hexdigest()[:12]
+
+def generate_appointment_letter(name, position, joining_date):
+    """Generate HTML appointment letter with content from appointment_letter.txt"""
+
+    # Converted template pages; the first line (sample name and date) is not part of them
+    template_parts = compile_appointment_template()
+
+    # Base64 encode images
+    header_img = get_base64_image(config.HEADER_IMAGE_PATH)
+    footer_img = get_base64_image(config.FOOTER_IMAGE_PATH)
+    signature_img = get_base64_image(config.SIGNATURE_IMAGE_PATH)
+
+    # Replace placeholders
+    values = (name, position, joining_date.strftime('%d %B %Y'))
+    parts = list(template_parts)
+    for i, part in enumerate(parts):
+        for placeholder, value in zip(APPOINTMENT_PLACEHOLDERS, values):
+            part = part.replace(placeholder, value)
+        parts[i] = part
+
+    # Each source page on its own pages: the ones without placeholders render
+    # the same for every letter and come from the PDF cache (see core/pdf_cache.py)
+    html_content = f"""
+        </div>
+
+        {PAGE_BREAK}
+        <div class="content">
+            """.join(parts)
+
+    html_template = f"""
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <meta charset="UTF-8">
+        <style>
+            body {{
+                font-family: {config.DOCUMENT_STYLES['font_family']};
+                margin: 0;
+                padding: 20px;
+                line-height: {config.DOCUMENT_STYLES['line_height']};
+                font-size: 12px;
+                color: #333;
+            }}
+            .header {{ text-align: left; margin-bottom: 30px; }}
+            .content {{ margin: 20px 0; }}
+            .signature {{ margin-top: 50px; text-align: left; }}
+            .footer {{ text-align: center; margin-top: 50px; }}
+            h1, h2, h3 {{
+                color: {config.DOCUMENT_STYLES['primary_color']};
+                margin-top: 20px;
+                margin-bottom: 10px;
+                font-weight: bold;
+            }}
+            h4 {{
+                color: {config.DOCUMENT_STYLES['primary_color']};
+                margin-top: 15px;
+                margin-bottom: 8px;
+                font-weight: bold;
+                font-size: 13px;
+            }}
+            .confidential {{
+                text-align: right;
+                font-weight: bold;
+                margin-bottom: 10px;
+            }}
+            .date-header {{
+                text-align: right;
+                margin-bottom: 20px;
+            }}
+            ul {{
+                margin: 10px 0;
+                padding-left: 25px;
+                list-style-type: disc;
+            }}
+            ol {{
+                margin: 10px 0;
+                padding-left: 25px;
+                list-style-type: decimal;
+            }}
+            li {{
+                margin: 8px 0;
+                text-align: justify;
+                line-height: 1.4;
+            }}
+            p {{
+                text-align: justify;
+                margin: 8px 0;
+                line-height: 1.4;
+            }}
+            .signature-section {{
+                margin-top: 40px;
+                text-align: left;
+            }}
+            .signature-line {{
+                margin: 5px 0;
+            }}
+        </style>
+    </head>
+    <body>
+        <div class="header">
+            <img src="data:image/png;base64,{header_img}" style="max-width: 150px; height: auto;">
+        </div>
+
+        <div class="content">
+            {html_content}
+        </div>
+
+        <div class="signature">
+            <img src="data:image/png;base64,{signature_img}" style="max-width: 120px; height: auto;">
+            <p><strong>Aarushi Sharma</strong><br>
+            Assistant Manager HR</p>
+            <br><br>
+            <p style="text-align: right;"><strong>Accepted By</strong><br>
+            {name}</p>
+        </div>
+
+        <div class="footer">
+            <img src="data:image/png;base64,{footer_img}" style="max-width: 100%; height: auto;">
+        </div>
+    </body>
+    </html>
+    """
+
+    return html_template
@@ -0,0 +1,221 @@
+"""
+Streaming bulk import of new hires from CSV/XLSX spreadsheets
+
+Rows are read one at a time (csv.reader, openpyxl read-only mode), validated
+in batches and upserted into the employee store with one transaction per
+batch, so memory stays flat however large the file is. Rejected rows are
+written to a CSV report with the reason as they are found.
+
+Recognised columns (case and spacing do not matter, see HEADER_ALIASES):
+
+    name, email, official_email, title, employee_type, position,
+    employee_code, manager_name, manager_email, start_date
+
+name and email are required. Dates may be YYYY-MM-DD, DD/MM/YYYY,
+DD-MM-YYYY, DD.MM.YYYY or spreadsheet date cells.
+"""
+
+import csv
+import io
+import time
+from datetime import date, datetime
+from itertools import islice
+
+from core.errors import ImportFileError
+from core.validation import email_errors
+
+HEADER_ALIASES = {
+    'name': ["name", "employee_name", "candidate_name", "full_name"],
+    'email': ["email", "email_address", "personal_email", "candidate_email", "employee_email"],
+    'official_email': ["official_email", "work_email", "company_email"],
+    'title': ["title", "salutation"],
+    'employee_type': ["employee_type", "type", "offer_type"],
+    'position': ["position", "designation", "role", "job_title"],
+    'employee_code': ["employee_code", "employee_id", "emp_id"],
+    'manager_name': ["manager_name", "manager", "reporting_manager"],
+    'manager_email': ["manager_email"],
+    'start_date': ["start_date", "joining_date", "date_of_joining", "doj"],
+}
+HEADERS = {alias: field for field, aliases in HEADER_ALIASES.items() for alias in aliases}
+
+EMPLOYEE_TYPES = {
+    "intern": "Intern",
+    "full-time employee": "Full-time Employee",
+    "full-time": "Full-time Employee",
+    "full time": "Full-time Employee",
+    "contractor": "Contractor",
+}
+DATE_FORMATS = ["%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%d.%m.%Y", "%d %b %Y", "%d %B %Y"]
+REPORT_COLUMNS = ["row", "name", "email", "reason"]
+
+def normalize_header(value):
+    key = str(value or "").strip().lower().replace(" ", "_").replace("-", "_")
+    return HEADERS.get(key)
+
+def _csv_rows(source):
+    if isinstance(source, str):
+        with open(source, "r", encoding="utf-8-sig", newline="") as f:
+            yield from csv.reader(f)
+    else:
+        text = io.TextIOWrapper(source, encoding="utf-8-sig", newline="")
+        try:
+            yield from csv.reader(text)
+        finally:
+            text.detach()  # Leave the caller's file open
+
+def _xlsx_rows(source):
+    try:
+        import openpyxl
+    except ImportError:
+        raise ImportFileError("Reading .xlsx files needs openpyxl (pip install openpyxl)")
+    try:
+        workbook = openpyxl.load_workbook(source, read_only=True, data_only=True)
+    except Exception as e:
+        raise ImportFileError(f"Could not open the spreadsheet: {e}")
+    try:
+        for row in workbook.active.iter_rows(values_only=True):
+            yield list(row)
+    finally:
+        workbook.close()
+
+def iter_rows(source, filename=None, header_field=normalize_header):
+    """Yield (row number, record) without loading the whole file
+
+    source is a path or a binary file object (e.g. a Streamlit upload). Row
+    numbers count the header as row 1, as spreadsheets do. header_field maps
+    a header cell to a record field (None drops the column).
+    """
+    name = (filename or (source if isinstance(source, str) else getattr(source, "name", ""))).lower()
+    rows = _xlsx_rows(source) if name.endswith((".xlsx", ".xlsm")) else _csv_rows(source)
+
+    header = None
+    for number, values in enumerate(rows, start=1):
+        if header is None:
+            header = [header_field(value) for value in values]
+            if "name" not in header or "email" not in header:
+                raise ImportFileError("The first row must be a header with at least name and email columns")
+            continue
+        if all(value in (None, "") for value in values):
+            continue
+        yield number, {field: value for field, value in zip(header, values) if field}
+
+def parse_import_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    text = str(value).strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"start_date: {text!r} is not a recognised date")
+
+EMAIL_FIELDS = ["official_email", "manager_email"]
+
+def clean_record(record):
+    """(email, fields) for a row; raises ValueError with the reason if a field is invalid
+
+    Email syntax is checked separately for the whole batch (see validate_batch).
+    """
+    fields = {k: (v.strip() if isinstance(v, str) else v) for k, v in record.items() if v not in (None, "")}
+
+    if not fields.get("name"):
+        raise ValueError("name: missing")
+    email = str(fields.pop("email", "")).strip().lower()
+    if not email:
+        raise ValueError("email: missing")
+    for field in EMAIL_FIELDS:
+        if field in fields:
+            fields[field] = str(fields[field]).strip().lower()
+
+    if "start_date" in fields:
+        fields['start_date'] = parse_import_date(fields['start_date'])
+    if "employee_type" in fields:
+        employee_type = EMPLOYEE_TYPES.get(str(fields['employee_type']).strip().lower())
+        if employee_type is None:
+            raise ValueError(f"employee_type: {fields['employee_type']!r} is not Intern, Full-time Employee or Contractor")
+        fields['employee_type'] = employee_type
+
+    fields = {k: v if isinstance(v, date) else str(v) for k, v in fields.items()}
+    fields['personal_email'] = email
+    return email, fields
+
+def validate_batch(batch, check_deliverability=False, domain_cache=None):
+    """Split a batch of (row number, record) into valid (number, email, fields) and rejected (number, record, reason)"""
+    cleaned, rejected = [], []
+    for number, record in batch:
+        try:
+            cleaned.append((number, record, *clean_record(record)))
+        except ValueError as e:
+            rejected.append((number, record, str(e)))
+
+    # One pass over every address in the batch, so each domain is only checked once
+    addresses = []
+    for index, (_, _, email, fields) in enumerate(cleaned):
+        addresses.append((index, "email", email))
+        addresses.extend((index, field, fields[field]) for field in EMAIL_FIELDS if field in fields)
+    errors = email_errors([address for _, _, address in addresses], check_deliverability, domain_cache)
+
+    reasons = {}
+    for (index, field, _), error in zip(addresses, errors):
+        if error and index not in reasons:
+            reasons[index] = f"{field}: {error}"
+
+    valid = []
+    for index, (number, record, email, fields) in enumerate(cleaned):
+        if index in reasons:
+            rejected.append((number, record, reasons[index]))
+        else:
+            valid.append((number, email, fields))
+    return valid, rejected
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+def run_import(source, store, batch_size=500, filename=None, report=None, check_deliverability=False, progress=None):
+    """Import new hires from source into an EmployeeStore and return stats
+
+    report, if given, is a text file object that receives the rejected rows
+    as CSV. With check_deliverability each email domain is also checked for
+    DNS records, once per import. progress, if given, is called with the
+    running stats after every batch.
+    """
+    writer = csv.writer(report) if report is not None else None
+    if writer:
+        writer.writerow(REPORT_COLUMNS)
+
+    domain_cache = {}
+    stats = {'rows': 0, 'imported': 0, 'rejected': 0, 'batches': 0, 'reasons': {}}
+    started = time.perf_counter()
+
+    for batch in batched(iter_rows(source, filename), batch_size):
+        entries, rejected = validate_batch(batch, check_deliverability, domain_cache)
+        rejected.sort(key=lambda item: item[0])
+
+        if entries:
+            store.record_many([(email, fields) for _, email, fields in entries],
+                              "Import", "imported", filename or (source if isinstance(source, str) else None))
+
+        for number, record, reason in rejected:
+            if writer:
+                writer.writerow([number, record.get("name", ""), record.get("email", ""), reason])
+            field = reason.split(":", 1)[0]
+            stats['reasons'][field] = stats['reasons'].get(field, 0) + 1
+
+        stats['rows'] += len(batch)
+        stats['imported'] += len(entries)
+        stats['rejected'] += len(rejected)
+        stats['batches'] += 1
+        if progress:
+            progress(stats)
+
+    stats['elapsed_seconds'] = time.perf_counter() - started
+    stats['rows_per_second'] = stats['rows'] / stats['elapsed_seconds'] if stats['elapsed_seconds'] else 0.0
+    return stats
@@ -0,0 +1,134 @@
+"""
+SQLite-backed queue of email send jobs
+
+The queue lives in the data directory so every API worker process sees the
+same jobs: any worker can accept a send request, any worker can pick it up,
+and status polling works no matter which worker answers. A job can be
+scheduled for later with run_at; it is only claimed once that time has come.
+"""
+
+import json
+import sqlite3
+import time
+import uuid
+from contextlib import closing
+
+from core.paths import data_path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    message TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    run_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at);
+"""
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+class JobQueue:
+    """Persistent FIFO of jobs with atomic claiming across processes"""
+
+    def __init__(self, path=None):
+        self.path = path or data_path("jobs.db")
+        with closing(self._connect()) as conn:
+            conn.executescript(SCHEMA)
+            self._migrate(conn)
+
+    def _migrate(self, conn):
+        """Bring queues created by older versions up to the current schema"""
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+        if "run_at" not in columns:
+            conn.execute("ALTER TABLE jobs ADD COLUMN run_at REAL")
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def enqueue(self, kind, payload, run_at=None):
+        """Queue a job, to be run as soon as possible or not before the run_at timestamp"""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, kind, payload, status, created_at, updated_at, run_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, json.dumps(payload), QUEUED, now, now, run_at)
+            )
+        return job_id
+
+    def enqueue_many(self, kind, payloads):
+        """Queue several jobs in one transaction; returns their ids in order"""
+        now = time.time()
+        rows = [(uuid.uuid4().hex, kind, json.dumps(payload), QUEUED, now, now) for payload in payloads]
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany(
+                    "INSERT INTO jobs (id, kind, payload, status, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return [row[0] for row in rows]
+
+    def claim(self):
+        """Atomically take the oldest queued job that is due, or return None"""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE status = ? AND (run_at IS NULL OR run_at <= ?) ORDER BY created_at LIMIT 1",
+                (QUEUED, time.time())
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = ?, attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                (RUNNING, time.time(), row['id'])
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+        job = dict(row)
+        job['payload'] = json.loads(job['payload'])
+        return job
+
+    def finish(self, job_id, success, message):
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, message = ?, updated_at = ? WHERE id = ?",
+                (DONE if success else FAILED, message, time.time(), job_id)
+            )
+
+    def get(self, job_id):
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT id, kind, status, message, attempts, created_at, updated_at, run_at FROM jobs WHERE id = ?",
+                (job_id,)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def requeue_stale(self, older_than_seconds):
+        """Put jobs left running by a crashed worker back in the queue"""
+        with closing(self._connect()) as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET status = ?, updated_at = ? WHERE status = ? AND updated_at < ?",
+                (QUEUED, time.time(), RUNNING, time.time() - older_than_seconds)
+            )
+        return cur.rowcount
@@ -0,0 +1,248 @@
+"""
+Build letters from flat candidate records
+
+A candidate record is a dict as read from a CSV row or a JSON object (batch
+CLI, API service). It has a ``letter`` field (offer, appointment,
+experience or revision) plus the fields the matching Streamlit form asks for:
+
+    letter, name, position, start_date, end_date, offer_type,
+    certificate_type, title, basic_salary, hra, ..., pf_contribution, ctc
+
+Salary revision letters instead have effective_date and the current and
+revised compensation, each as a target CTC (old_ctc, new_ctc) or as monthly
+amounts with an old_ or new_ prefix (old_basic_salary, new_hra, ...).
+
+Dates are ISO formatted (YYYY-MM-DD). Salary fields are monthly amounts and
+only used for full-time offer letters; missing ones use the form defaults.
+Alternatively ctc gives a target annual CTC, which is split into components
+by the salary policy in config.py (core/salary.py solve_ctc).
+attach_salary_data computes the breakdowns for a whole batch up front, in
+which case build_letter uses the record's precomputed salary_data (or
+old_salary_data and new_salary_data).
+"""
+
+from datetime import datetime
+
+from core.emails import appointment_letter_email, certificate_email, offer_letter_email, revision_letter_email
+from core.errors import InvalidCandidateError
+from core.generators import (
+    generate_appointment_letter,
+    generate_experience_letter,
+    generate_offer_letter_with_salary,
+    generate_revision_letter,
+)
+from core.salary import (
+    DEFAULT_PF_CONTRIBUTION,
+    SALARY_COMPONENTS,
+    SALARY_KEYS,
+    build_salary_data,
+    monthly_arrays,
+    salary_rows,
+    salary_table,
+    solve_ctc,
+    solve_ctc_one,
+)
+
+LETTER_TYPES = ("offer", "appointment", "experience", "revision")
+REVISION_SIDES = ("old", "new")
+OFFER_TYPES = ("Intern", "Full-time Employee", "Contractor")
+CERTIFICATE_TYPES = ("standard", "internship", "dues_not_settled")
+
+def parse_date(value, field):
+    try:
+        return datetime.strptime(str(value).strip(), "%Y-%m-%d").date()
+    except ValueError:
+        raise InvalidCandidateError(f"{field} must be a YYYY-MM-DD date, got {value!r}")
+
+def is_full_time_offer(candidate):
+    return ((candidate.get("letter") or "offer").strip().lower() == "offer" and
+            (candidate.get("offer_type") or "Full-time Employee").strip() == "Full-time Employee")
+
+def parse_ctc(value):
+    """Target annual CTC in rupees from a field like "12,00,000" or 1200000"""
+    try:
+        ctc = int(float(str(value).replace(",", "").replace("₹", "").strip()))
+    except ValueError:
+        raise InvalidCandidateError(f"ctc must be an amount in rupees, got {value!r}")
+    if ctc <= 0:
+        raise InvalidCandidateError(f"ctc must be positive, got {value!r}")
+    return ctc
+
+def has_ctc(candidate):
+    return candidate.get("ctc") not in (None, "")
+
+def _valid_ctc(candidate):
+    try:
+        parse_ctc(candidate.get("ctc"))
+        return True
+    except InvalidCandidateError:
+        return False
+
+def candidate_salary_data(candidate):
+    """salary_data from a record's target ctc, or else from its monthly amounts"""
+    if has_ctc(candidate):
+        return solve_ctc_one(parse_ctc(candidate["ctc"]))
+    monthly = {c: candidate[c] for c in SALARY_COMPONENTS if candidate.get(c) not in (None, "")}
+    pf = candidate.get("pf_contribution")
+    return build_salary_data(monthly, pf if pf not in (None, "") else DEFAULT_PF_CONTRIBUTION)
+
+def revision_side(candidate, side):
+    """The old_ or new_ compensation fields of a revision record, without the prefix"""
+    prefix = side + "_"
+    return {key[len(prefix):]: value for key, value in candidate.items()
+            if key.startswith(prefix) and value not in (None, "")}
+
+def has_compensation(record):
+    return has_ctc(record) or any(record.get(c) not in (None, "") for c in SALARY_COMPONENTS)
+
+def _precomputed(candidate, key):
+    salary_data = candidate.get(key)
+    if isinstance(salary_data, dict) and salary_data.keys() >= set(SALARY_KEYS):
+        return salary_data
+    return None
+
+def revision_salary_data(candidate, side):
+    """salary_data for the old or new side of a revision record"""
+    salary_data = _precomputed(candidate, f"{side}_salary_data")
+    if salary_data:
+        return salary_data
+    record = revision_side(candidate, side)
+    if not has_compensation(record):
+        raise InvalidCandidateError(f"{side}_ctc or {side}_ monthly salary amounts are required")
+    return candidate_salary_data(record)
+
+def _whole_amounts(candidate):
+    try:
+        monthly_arrays([candidate])
+        return True
+    except (TypeError, ValueError):
+        return False
+
+def _salary_targets(candidates):
+    """(record, key, compensation fields) for every salary breakdown the candidates need"""
+    for candidate in candidates:
+        letter = (candidate.get("letter") or "offer").strip().lower()
+        if is_full_time_offer(candidate) and "salary_data" not in candidate:
+            yield candidate, 'salary_data', candidate
+        elif letter == "revision":
+            for side in REVISION_SIDES:
+                record = revision_side(candidate, side)
+                if f"{side}_salary_data" not in candidate and has_compensation(record):
+                    yield candidate, f"{side}_salary_data", record
+
+def attach_salary_data(candidates):
+    """Copies of the candidates with every salary breakdown they need computed in one vectorized pass
+
+    Covers full-time offers (salary_data) and revisions (old_salary_data,
+    new_salary_data). Records with an invalid amount are left without it, so
+    build_letter reports the error for that candidate alone.
+    """
+    candidates = [dict(c) for c in candidates]
+    targets = list(_salary_targets(candidates))
+
+    by_ctc = [t for t in targets if has_ctc(t[2]) and _valid_ctc(t[2])]
+    solved = solve_ctc([parse_ctc(record["ctc"]) for _, _, record in by_ctc])
+    for (candidate, key, _), salary_data, feasible in zip(by_ctc, salary_rows(solved), solved['feasible'].tolist()):
+        if feasible:
+            candidate[key] = salary_data
+
+    by_amounts = [t for t in targets if not has_ctc(t[2])]
+    try:
+        arrays = monthly_arrays([record for _, _, record in by_amounts])
+    except (TypeError, ValueError):
+        by_amounts = [t for t in by_amounts if _whole_amounts(t[2])]
+        arrays = monthly_arrays([record for _, _, record in by_amounts])
+    for (candidate, key, _), salary_data in zip(by_amounts, salary_rows(salary_table(*arrays))):
+        candidate[key] = salary_data
+    return candidates
+
+def solve_hiring_plan(candidates, policy=None):
+    """Split every record's target ctc into monthly components, in one vectorized pass
+
+    Returns copies of the records with the monthly amounts (basic_salary, ...,
+    pf_contribution) and total_ctc_annual filled in, ready for the batch CLI,
+    plus an error field for records whose ctc is missing, invalid or too low.
+    """
+    rows = [dict(c) for c in candidates]
+    for row in rows:
+        try:
+            row['ctc'] = parse_ctc(row.get("ctc")) if has_ctc(row) else None
+            row['error'] = "" if row['ctc'] else "ctc is required"
+        except InvalidCandidateError as e:
+            row['error'] = str(e)
+
+    targets = [row for row in rows if not row['error']]
+    solved = solve_ctc([row['ctc'] for row in targets], policy)
+    for row, salary_data, feasible in zip(targets, salary_rows(solved), solved['feasible'].tolist()):
+        if not feasible:
+            row['error'] = f"a CTC of {row['ctc']:,} is too low for the salary policy's Basic, HRA and PF"
+            continue
+        for component in SALARY_COMPONENTS:
+            row[component] = salary_data[f'{component}_monthly']
+        row['pf_contribution'] = salary_data['pf_contribution_monthly']
+        row['total_ctc_annual'] = salary_data['total_ctc_annual']
+    return rows
+
+def build_letter(candidate):
+    """Build (html, filename) for one candidate record"""
+    letter = (candidate.get("letter") or "offer").strip().lower()
+    name = (candidate.get("name") or "").strip()
+    position = (candidate.get("position") or "").strip()
+
+    if letter not in LETTER_TYPES:
+        raise InvalidCandidateError(f"letter must be one of {', '.join(LETTER_TYPES)}, got {letter!r}")
+    if not name or not position:
+        raise InvalidCandidateError("name and position are required")
+
+    safe_name = name.replace(' ', '_')
+    if letter == "revision":
+        effective_date = parse_date(candidate.get("effective_date"), "effective_date")
+        html = generate_revision_letter(name, position, effective_date, revision_salary_data(candidate, "old"),
+                                        revision_salary_data(candidate, "new"))
+        return html, f"salary_revision_letter_{safe_name}"
+
+    start_date = parse_date(candidate.get("start_date"), "start_date")
+
+    if letter == "offer":
+        offer_type = (candidate.get("offer_type") or "Full-time Employee").strip()
+        if offer_type not in OFFER_TYPES:
+            raise InvalidCandidateError(f"offer_type must be one of {', '.join(OFFER_TYPES)}, got {offer_type!r}")
+
+        salary_data = None
+        if offer_type == "Full-time Employee":
+            salary_data = _precomputed(candidate, "salary_data") or candidate_salary_data(candidate)
+
+        html = generate_offer_letter_with_salary(offer_type, name, position, start_date, salary_data)
+        return html, f"{offer_type.lower().replace(' ', '_')}_letter_{safe_name}"
+
+    if letter == "appointment":
+        html = generate_appointment_letter(name, position, start_date)
+        return html, f"appointment_letter_{safe_name}"
+
+    certificate_type = (candidate.get("certificate_type") or "standard").strip().lower()
+    if certificate_type not in CERTIFICATE_TYPES:
+        raise InvalidCandidateError(f"certificate_type must be one of {', '.join(CERTIFICATE_TYPES)}, got {certificate_type!r}")
+    end_date = parse_date(candidate.get("end_date"), "end_date")
+    if end_date <= start_date:
+        raise InvalidCandidateError("end_date must be after start_date")
+
+    title = (candidate.get("title") or "").strip()
+    employee_name = f"{title} {name}" if title else name
+    html = generate_experience_letter(employee_name, position, start_date, end_date, certificate_type)
+    prefix = "internship_certificate" if certificate_type == "internship" else "experience_letter"
+    return html, f"{prefix}_{safe_name}"
+
+def letter_email(candidate):
+    """Default (subject, html_body) for the email that carries this candidate's letter"""
+    letter = (candidate.get("letter") or "offer").strip().lower()
+    name = (candidate.get("name") or "").strip()
+
+    if letter == "offer":
+        offer_type = (candidate.get("offer_type") or "Full-time Employee").strip()
+        start_date = parse_date(candidate.get("start_date"), "start_date")
+        return offer_letter_email(offer_type, name, (candidate.get("position") or "").strip(), start_date)
+    if letter == "appointment":
+        return appointment_letter_email(name)
+    if letter == "revision":
+        return revision_letter_email(name, parse_date(candidate.get("effective_date"), "effective_date"))
+    return certificate_email(name, (candidate.get("certificate_type") or "standard").strip().lower())
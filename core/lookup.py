@@ -0,0 +1,139 @@
+"""
+In-memory prefix index for type-ahead employee lookup
+
+Every employee's full name, each word of their name and each of their email
+addresses are kept, normalized, in one sorted array; a lookup is a binary
+search for the typed prefix followed by a short scan, and returns the cached
+employee records, so the phase forms can prefill without touching the
+database on each keystroke rerun.
+
+The index is built once per process on first use. Writes made through the
+same EmployeeStore update it immediately; writes from other processes (the
+API, the import CLI) are picked up by a cheap check for recently updated rows
+at most every refresh_interval seconds.
+"""
+
+import threading
+import time
+import unicodedata
+from bisect import bisect_left
+
+# Writes touching more employees than this rebuild the index instead of updating it in place
+BULK_THRESHOLD = 200
+
+def normalize_key(text):
+    """Lowercase, accents removed and whitespace collapsed, so "  José  D" matches "jose d" """
+    text = unicodedata.normalize("NFKD", str(text or ""))
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return " ".join(text.casefold().split())
+
+def record_keys(record):
+    """Every key an employee can be found under"""
+    keys = set()
+    name = normalize_key(record.get("name"))
+    if name:
+        keys.add(name)
+        keys.update(name.split())
+    for field in ("email", "official_email", "personal_email"):
+        email = normalize_key(record.get(field))
+        if email:
+            keys.add(email)
+    return keys
+
+class EmployeeLookup:
+    """Sorted array of (key, employee id) with the employee records, searched with bisect"""
+
+    def __init__(self, store, refresh_interval=2.0):
+        self.store = store
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._keys = []
+        self._ids = []
+        self._records = {}
+        self._synced_to = 0.0
+        self._checked_at = 0.0
+        self._stale = False
+        self._build()
+
+    def _build(self):
+        records = {}
+        entries = []
+        for record in self.store.changed_since(None):
+            records[record['id']] = record
+            entries.extend((key, record['id']) for key in record_keys(record))
+        entries.sort()
+        with self._lock:
+            self._records = records
+            self._keys = [key for key, _ in entries]
+            self._ids = [employee_id for _, employee_id in entries]
+            self._synced_to = max((r['updated_at'] for r in records.values()), default=0.0)
+            self._checked_at = time.monotonic()
+            self._stale = False
+
+    def _remove(self, employee_id):
+        old = self._records.pop(employee_id, None)
+        if old is None:
+            return
+        for key in record_keys(old):
+            i = bisect_left(self._keys, key)
+            while i < len(self._keys) and self._keys[i] == key:
+                if self._ids[i] == employee_id:
+                    del self._keys[i]
+                    del self._ids[i]
+                    break
+                i += 1
+
+    def _insert(self, record):
+        self._records[record['id']] = record
+        for key in record_keys(record):
+            i = bisect_left(self._keys, key)
+            self._keys.insert(i, key)
+            self._ids.insert(i, record['id'])
+
+    def apply(self, records):
+        """Add or replace employee records (called after every write through the store)"""
+        with self._lock:
+            for record in records:
+                self._remove(record['id'])
+                self._insert(record)
+                self._synced_to = max(self._synced_to, record['updated_at'])
+
+    def invalidate(self):
+        """Rebuild on the next search; after a bulk write that is cheaper than thousands of inserts"""
+        self._stale = True
+
+    def _sync(self):
+        """Pick up writes made by other processes, at most every refresh_interval seconds"""
+        if self._stale:
+            self._build()
+            return
+        now = time.monotonic()
+        if now - self._checked_at < self.refresh_interval:
+            return
+        self._checked_at = now
+        changed = self.store.changed_since(self._synced_to)
+        if len(changed) > BULK_THRESHOLD:
+            self._build()
+        else:
+            self.apply(changed)
+
+    def search(self, text, limit=10):
+        """Employees with a name, name word or email starting with text"""
+        prefix = normalize_key(text)
+        if not prefix:
+            return []
+        self._sync()
+        results = []
+        seen = set()
+        with self._lock:
+            i = bisect_left(self._keys, prefix)
+            while i < len(self._keys) and len(results) < limit and self._keys[i].startswith(prefix):
+                employee_id = self._ids[i]
+                if employee_id not in seen:
+                    seen.add(employee_id)
+                    results.append(dict(self._records[employee_id]))
+                i += 1
+        return results
+
+    def __len__(self):
+        return len(self._records)
@@ -0,0 +1,279 @@
+"""
+SMTP delivery shared by the Streamlit app and the API service
+
+Every send attempt is recorded in the email audit log (see core/audit.py)
+and every delivered email is indexed for full-text search (core/search.py).
+Attachments may be bytes or a binary file; either way the message is
+written to a spooled file (core/spool.py) and streamed to the server, so a
+large attachment is never held in memory base64-encoded.
+"""
+
+import base64
+import logging
+import multiprocessing
+import os
+import smtplib
+import tempfile
+import time
+from email import encoders
+from email.mime.base import MIMEBase
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+from core.audit import get_audit_log
+from core.errors import EmailDeliveryError
+from core.paths import data_path
+from core.search import get_search_index
+from core.spool import CHUNK_SIZE, as_file, data_digest, peak_rss_bytes, spooled_file
+
+# Stands in for the attachment's base64 text while the rest of the message is generated
+ATTACHMENT_PLACEHOLDER = b"@@attachment@@"
+
+logger = logging.getLogger(__name__)
+
+class RecordingSMTP(smtplib.SMTP):
+    """smtplib.SMTP that keeps the server's reply to the message data"""
+
+    data_response = None
+
+    def data(self, msg):
+        self.data_response = super().data(msg)
+        return self.data_response
+
+    def data_from_file(self, message_file):
+        """DATA with the message read line by line from a binary file, like data() without a copy in memory"""
+        self.putcmd("data")
+        code, repl = self.getreply()
+        if code != 354:
+            raise smtplib.SMTPDataError(code, repl)
+        buffer = []
+        buffered = 0
+        for line in message_file:
+            line = line.rstrip(b"\r\n")
+            if line.startswith(b"."):
+                line = b"." + line
+            buffer.append(line + b"\r\n")
+            buffered += len(line) + 2
+            if buffered >= CHUNK_SIZE:
+                self.send(b"".join(buffer))
+                buffer, buffered = [], 0
+        buffer.append(b".\r\n")
+        self.send(b"".join(buffer))
+        self.data_response = self.getreply()
+        return self.data_response
+
+    def sendmail_file(self, from_addr, to_addrs, message_file):
+        """sendmail() for a message in a binary file; returns the refused recipients like sendmail()"""
+        self.ehlo_or_helo_if_needed()
+        code, resp = self.mail(from_addr)
+        if code != 250:
+            self._rset()
+            raise smtplib.SMTPSenderRefused(code, resp, from_addr)
+        refused = {}
+        for address in to_addrs:
+            code, resp = self.rcpt(address)
+            if code not in (250, 251):
+                refused[address] = (code, resp)
+        if len(refused) == len(to_addrs):
+            self._rset()
+            raise smtplib.SMTPRecipientsRefused(refused)
+        code, resp = self.data_from_file(message_file)
+        if code != 250:
+            self._rset()
+            raise smtplib.SMTPDataError(code, resp)
+        return refused
+
+def smtp_response_text(code, message):
+    if isinstance(message, bytes):
+        message = message.decode("utf-8", "replace")
+    return f"{code} {message}".strip()
+
+def audit_attempt(audit, success, smtp_response, started):
+    """Record a send attempt in the audit log; a logging failure never fails the send"""
+    try:
+        get_audit_log().log(success=success, smtp_response=smtp_response,
+                            latency_ms=(time.perf_counter() - started) * 1000, **audit)
+    except Exception:
+        logger.exception("Could not record the email to %s in the audit log", audit['recipient'])
+
+def index_email(audit, body):
+    """Make a delivered email searchable; an indexing failure never fails the send"""
+    try:
+        people = {audit['recipient'], audit['employee_email']}
+        people.update(cc.strip() for cc in (audit.get('cc') or "").split(","))
+        get_search_index().add("email", body, employee_email=audit['employee_email'], subject=audit['subject'],
+                               filename=audit.get('attachment_name'), people=" ".join(sorted(p for p in people if p)))
+    except Exception:
+        logger.exception("Could not index the email to %s", audit['recipient'])
+
+def email_config_from_env():
+    """SMTP settings from environment variables (used outside Streamlit)
+
+    Set SMTP_USE_TLS=false and leave SENDER_PASSWORD empty to deliver to a
+    local development SMTP server such as ``python -m aiosmtpd -n``.
+    """
+    return {
+        'smtp_server': os.getenv('SMTP_SERVER', 'smtp.gmail.com'),
+        'smtp_port': int(os.getenv('SMTP_PORT', '587')),
+        'sender_email': os.getenv('SENDER_EMAIL', os.getenv('DEFAULT_SENDER_EMAIL', '')),
+        'sender_password': os.getenv('SENDER_PASSWORD', os.getenv('SMTP_PASSWORD', '')),
+        'use_tls': os.getenv('SMTP_USE_TLS', 'true').lower() not in ('0', 'false', 'no'),
+    }
+
+def build_message(sender_email, recipient_email, cc_emails, subject, body, attachment_data=None, attachment_name=None):
+    """Build the MIME message for an HTML email with an optional attachment"""
+    msg = MIMEMultipart()
+    msg['From'] = sender_email
+    msg['To'] = recipient_email
+    if cc_emails:
+        msg['Cc'] = ', '.join(cc_emails)
+    msg['Subject'] = subject
+
+    msg.attach(MIMEText(body, 'html'))
+
+    if attachment_data and attachment_name:
+        part = MIMEBase('application', 'octet-stream')
+        part.set_payload(attachment_data)
+        encoders.encode_base64(part)
+        part.add_header(
+            'Content-Disposition',
+            f'attachment; filename= {attachment_name}'
+        )
+        msg.attach(part)
+    return msg
+
+def write_message(out, sender_email, recipient_email, cc_emails, subject, body, attachment=None, attachment_name=None):
+    """Write the message build_message would build to a binary file, base64-encoding the attachment a chunk at a time
+
+    attachment is bytes or a binary file.
+    """
+    msg = build_message(sender_email, recipient_email, cc_emails, subject, body)
+    if attachment is None or not attachment_name:
+        out.write(msg.as_bytes())
+        return
+
+    part = MIMEBase('application', 'octet-stream')
+    part['Content-Transfer-Encoding'] = 'base64'
+    part.add_header(
+        'Content-Disposition',
+        f'attachment; filename= {attachment_name}'
+    )
+    part.set_payload(ATTACHMENT_PLACEHOLDER.decode())
+    msg.attach(part)
+    head, tail = msg.as_bytes().split(ATTACHMENT_PLACEHOLDER)
+
+    out.write(head)
+    attachment = as_file(attachment)
+    attachment.seek(0)
+    # Whole 57-byte groups per chunk, so every chunk encodes to complete 76-character lines
+    for chunk in iter(lambda: attachment.read(57 * 1024), b""):
+        out.write(base64.encodebytes(chunk))
+    out.write(tail)
+
+def deliver_email(smtp_config, recipient_email, cc_emails, subject, body, attachment_data=None, attachment_name=None,
+                  phase=None, employee_email=None):
+    """Send an email using an smtp_config dict (see email_config_from_env)
+
+    phase and employee_email (default: the recipient) are recorded in the
+    audit log. Raises EmailDeliveryError if the message could not be handed
+    to the server.
+    """
+    sender_email = smtp_config['sender_email']
+    recipients = [recipient_email] + (cc_emails if cc_emails else [])
+
+    audit = {
+        'phase': phase,
+        'employee_email': (employee_email or recipient_email or "").strip().lower(),
+        'sender': sender_email,
+        'recipient': recipient_email,
+        'cc': ", ".join(cc_emails) if cc_emails else None,
+        'subject': subject,
+    }
+    if attachment_data is not None and attachment_name:
+        sha256, size = data_digest(attachment_data)
+        if size:
+            audit.update({'attachment_name': attachment_name, 'attachment_sha256': sha256, 'attachment_bytes': size})
+        else:
+            attachment_data = None
+
+    started = time.perf_counter()
+    try:
+        with spooled_file() as message:
+            write_message(message, sender_email, recipient_email, cc_emails, subject, body, attachment_data,
+                          attachment_name)
+            message.seek(0)
+            with RecordingSMTP(smtp_config['smtp_server'], smtp_config['smtp_port']) as server:
+                if smtp_config.get('use_tls', True):
+                    server.starttls()
+                if smtp_config['sender_password']:
+                    server.login(sender_email, smtp_config['sender_password'])
+                refused = server.sendmail_file(sender_email, recipients, message)
+                response = smtp_response_text(*server.data_response)
+                if refused:
+                    response += f" (refused: {', '.join(refused)})"
+    except Exception as e:
+        if isinstance(e, smtplib.SMTPResponseException):
+            response = smtp_response_text(e.smtp_code, e.smtp_error)
+        else:
+            response = f"{type(e).__name__}: {e}"
+        audit_attempt(audit, False, response, started)
+        raise EmailDeliveryError(f"Error sending email: {str(e)}") from e
+
+    audit_attempt(audit, True, response, started)
+    index_email(audit, body)
+
+def send_email(smtp_server, smtp_port, sender_email, sender_password, recipient_email, cc_emails, subject, body, attachment_data=None, attachment_name=None, use_tls=True, phase=None, employee_email=None):
+    """deliver_email with positional settings, returning (success, message) instead of raising"""
+    smtp_config = {
+        'smtp_server': smtp_server,
+        'smtp_port': smtp_port,
+        'sender_email': sender_email,
+        'sender_password': sender_password,
+        'use_tls': use_tls
+    }
+    try:
+        deliver_email(smtp_config, recipient_email, cc_emails, subject, body, attachment_data, attachment_name,
+                      phase=phase, employee_email=employee_email)
+    except EmailDeliveryError as e:
+        return False, str(e)
+    return True, "Email sent successfully!"
+
+def _measure_message(variant, attachment_path):
+    """Child process of memory_benchmark: build one message with the attachment and report peak RSS"""
+    args = ("hr@example.com", "candidate@example.com", ["manager@example.com"], "Offer letter", "<p>Hello</p>")
+    if variant == "bytes":
+        with open(attachment_path, "rb") as f:
+            message = build_message(*args, f.read(), "offer_letter.pdf").as_string()
+        size = len(message)
+    elif variant == "spooled":
+        with open(attachment_path, "rb") as f, spooled_file() as message:
+            write_message(message, *args, f, "offer_letter.pdf")
+            size = message.tell()
+    else:
+        size = 0  # "baseline": the interpreter and imports only
+    return size, peak_rss_bytes()
+
+def memory_benchmark(size_mb=50):
+    """Peak RSS of building an email with a size_mb attachment in memory vs spooled
+
+    Each variant runs in a fresh process so the peaks do not mask each other.
+    Returns {variant: {'message_bytes', 'peak_rss_bytes'}}, or None where the
+    resource module is missing (Windows).
+    """
+    try:
+        import resource  # noqa: F401
+    except ImportError:
+        return None
+
+    os.makedirs(data_path("spool"), exist_ok=True)
+    context = multiprocessing.get_context("spawn")
+    results = {}
+    with tempfile.NamedTemporaryFile(dir=data_path("spool"), suffix=".pdf") as attachment:
+        for _ in range(size_mb):
+            attachment.write(os.urandom(1024 * 1024))
+        attachment.flush()
+        for variant in ("baseline", "bytes", "spooled"):
+            with context.Pool(1) as pool:
+                size, peak = pool.apply(_measure_message, (variant, attachment.name))
+            results[variant] = {'message_bytes': size, 'peak_rss_bytes': peak}
+    return results
@@ -0,0 +1,125 @@
+"""
+Candidate packets: the offer letter, appointment letter and welcome email of one full-time hire
+
+build_packet builds both letters and renders them side by side in the render
+pool (core/workers.py), timing each stage. A packet then goes out either as
+one email carrying both letters merged into a single PDF (send_packet) or as
+a staged schedule of queued sends (schedule_packet): the offer letter right
+away, the appointment letter config.PACKET_APPOINTMENT_DELAY_HOURS later and
+the welcome email on the start date. The API's send worker delivers the
+scheduled jobs; their letters are already in the PDF cache by then.
+
+The candidate is a record as in core/letters.py; its letter and offer_type
+fields are ignored, as packets are for full-time hires.
+"""
+
+import time
+from datetime import datetime, timedelta
+
+import config
+from core.emails import packet_email, welcome_email
+from core.errors import PdfRenderError
+from core.letters import build_letter, parse_date
+from core.mailer import deliver_email
+from core.pdf_size import letter_preset
+from core.renderer import merge_pdfs
+from core.workers import render_all
+
+PACKET_LETTERS = ("offer", "appointment")
+STAGES = ("html", "render", "combine", "send", "schedule")
+
+def packet_records(candidate):
+    """The candidate record of each letter in the packet"""
+    return {letter: {**candidate, 'letter': letter, 'offer_type': "Full-time Employee"} for letter in PACKET_LETTERS}
+
+def build_packet(candidate, joining_form_url=None):
+    """Build a candidate packet and render its letters concurrently (raises core.errors exceptions)
+
+    Returns a dict with the candidate, its 'letters' (letter -> {'record',
+    'html', 'filename', 'pdf', 'render_seconds'}), the 'welcome' email as
+    (subject, body) and 'stages', the seconds spent in each stage so far.
+    """
+    stages = {}
+    started = time.perf_counter()
+    name = (candidate.get("name") or "").strip()
+    joining_form_url = joining_form_url or config.DEFAULT_JOINING_FORM_URL
+    letters = {}
+    for letter, record in packet_records(candidate).items():
+        html, filename = build_letter(record)
+        letters[letter] = {'record': record, 'html': html, 'filename': f"{filename}.pdf"}
+    welcome = welcome_email(name, joining_form_url)
+    stages['html'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    rendered = render_all([(letters[letter]['html'], letter_preset(letter)) for letter in PACKET_LETTERS])
+    for letter, (pdf, seconds) in zip(PACKET_LETTERS, rendered):
+        letters[letter].update({'pdf': pdf, 'render_seconds': seconds})
+    stages['render'] = time.perf_counter() - started
+
+    return {'candidate': candidate, 'name': name, 'joining_form_url': joining_form_url,
+            'letters': letters, 'welcome': welcome, 'stages': stages}
+
+def combine_packet(packet):
+    """Merge the packet's letters into one PDF; returns (pdf bytes, filename) (raises PdfRenderError)"""
+    started = time.perf_counter()
+    pdf = merge_pdfs(packet['letters'][letter]['pdf'] for letter in PACKET_LETTERS)
+    if pdf is None:
+        raise PdfRenderError("pypdf is required to combine a packet's letters into one PDF")
+    packet['stages']['combine'] = time.perf_counter() - started
+    return pdf, f"onboarding_packet_{packet['name'].replace(' ', '_')}.pdf"
+
+def send_packet(smtp_config, packet, recipient_email, cc_emails, phase=None):
+    """Send the whole packet as one email with its letters merged into one PDF
+
+    Returns the (subject, body, filename) that were sent. Raises
+    PdfRenderError or EmailDeliveryError.
+    """
+    pdf, filename = combine_packet(packet)
+    candidate = packet['candidate']
+    subject, body = packet_email(packet['name'], (candidate.get("position") or "").strip(),
+                                 parse_date(candidate.get("start_date"), "start_date"), packet['joining_form_url'])
+
+    started = time.perf_counter()
+    deliver_email(smtp_config, recipient_email, cc_emails, subject, body, pdf, filename, phase=phase)
+    packet['stages']['send'] = time.perf_counter() - started
+    return subject, body, filename
+
+def packet_schedule(start_date, now=None):
+    """When each stage of a staged packet is sent, as {stage: timestamp} (None means right away)"""
+    now = now or time.time()
+    appointment_at = now + config.PACKET_APPOINTMENT_DELAY_HOURS * 3600
+    welcome_at = datetime.combine(start_date, datetime.min.time()) + timedelta(hours=config.PACKET_WELCOME_HOUR)
+    return {'offer': None, 'appointment': appointment_at, 'welcome': max(welcome_at.timestamp(), appointment_at)}
+
+def schedule_packet(queue, packet, recipient_email, cc_emails, welcome_email_to=None, now=None):
+    """Queue the packet's emails as a staged schedule of jobs for the API's send worker
+
+    The letters go to recipient_email as "send" jobs; the welcome email goes
+    to welcome_email_to (e.g. the official address, default: recipient_email)
+    as a "welcome" job. Returns [{'stage', 'job_id', 'run_at'}] in send order.
+    """
+    started = time.perf_counter()
+    candidate = packet['candidate']
+    run_at = packet_schedule(parse_date(candidate.get("start_date"), "start_date"), now)
+
+    scheduled = []
+    for letter in PACKET_LETTERS:
+        payload = {'candidate': packet['letters'][letter]['record'], 'to': recipient_email, 'cc': cc_emails,
+                   'subject': None, 'body': None}
+        job_id = queue.enqueue("send", payload, run_at=run_at[letter])
+        scheduled.append({'stage': letter, 'job_id': job_id, 'run_at': run_at[letter]})
+
+    payload = {'name': packet['name'], 'to': welcome_email_to or recipient_email, 'cc': cc_emails,
+               'joining_form_url': packet['joining_form_url'], 'employee_email': recipient_email}
+    job_id = queue.enqueue("welcome", payload, run_at=run_at['welcome'])
+    scheduled.append({'stage': "welcome", 'job_id': job_id, 'run_at': run_at['welcome']})
+    packet['stages']['schedule'] = time.perf_counter() - started
+    return scheduled
+
+def stage_summary(packet):
+    """One line with the seconds spent in each stage, e.g. for a job's result message"""
+    stages = packet['stages']
+    parts = [f"{stage} {stages[stage]:.2f}s" for stage in STAGES if stage in stages]
+    renders = " + ".join(f"{packet['letters'][letter]['render_seconds']:.2f}s" for letter in PACKET_LETTERS
+                         if 'render_seconds' in packet['letters'][letter])
+    return ", ".join(parts) + (f" (letters rendered concurrently: {renders})" if renders else "")
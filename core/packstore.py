@@ -0,0 +1,351 @@
+"""
+Append-only pack files for long-term letter retention
+
+Instead of one file per PDF, blobs are appended to large pack files
+(packs/pack-000001.pack, ...) and a small SQLite sidecar index maps each
+SHA-256 digest to its pack, offset and length. Years of letters become a
+handful of files that back up and scan quickly, and reads go through a
+read-only mmap of the pack, so serving a letter is a slice of mapped memory
+rather than an open/read/close per document.
+
+Each blob is stored as a 44-byte header (magic, raw digest, length) followed
+by the PDF bytes, so the index can be rebuilt from the packs alone
+(rebuild_index). Appends happen inside a write transaction on the index,
+which serializes writers across processes; a crash mid-append leaves only
+unreferenced bytes at the end of a pack, which the next append overwrites.
+Archived letters are never deleted, so packs only grow.
+
+Enable with ARCHIVE_STORAGE = "packs" in config.py, then move existing files
+in with `python run.py archive pack`.
+"""
+
+import hashlib
+import io
+import mmap
+import os
+import random
+import shutil
+import sqlite3
+import struct
+import tempfile
+import threading
+import time
+from contextlib import closing
+
+MAGIC = b"RIPK"
+HEADER = struct.Struct(">4s32sQ")  # magic, raw SHA-256 digest, length
+PACK_MAX_BYTES = 512 * 1024 * 1024
+
+INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    digest TEXT PRIMARY KEY,
+    pack INTEGER NOT NULL,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_blobs_pack ON blobs (pack, offset);
+CREATE TABLE IF NOT EXISTS packs (
+    id INTEGER PRIMARY KEY,
+    size INTEGER NOT NULL
+);
+"""
+
+def _length(data):
+    """Size of bytes, or of a binary file (rewound to its start)"""
+    if hasattr(data, "read"):
+        data.seek(0, os.SEEK_END)
+        length = data.tell()
+        data.seek(0)
+        return length
+    return len(data)
+
+class _ViewReader(io.RawIOBase):
+    """Read-only file object over a memoryview, copying straight into the caller's buffer"""
+
+    def __init__(self, view):
+        self._view = view
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        chunk = self._view[self._pos:self._pos + len(buffer)]
+        buffer[:len(chunk)] = chunk
+        self._pos += len(chunk)
+        return len(chunk)
+
+    def close(self):
+        self._view = memoryview(b"")
+        super().close()
+
+class PackStore:
+    """Content-addressed blobs appended to pack files, read through mmap"""
+
+    def __init__(self, directory, pack_max_bytes=PACK_MAX_BYTES):
+        self.directory = directory
+        self.pack_max_bytes = pack_max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self.index_path = os.path.join(directory, "index.db")
+        self._maps = {}
+        self._maps_lock = threading.Lock()
+        self._local = threading.local()
+        self._conns = []
+        self._conns_lock = threading.Lock()
+        with closing(sqlite3.connect(self.index_path)) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(INDEX_SCHEMA)
+
+    def _conn(self):
+        """This thread's index connection (opened once and reused, lookups are on the read path)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # check_same_thread=False only so close() can release it; each thread still uses its own
+            conn = sqlite3.connect(self.index_path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._conns_lock:
+                self._conns.append(conn)
+        return conn
+
+    def close(self):
+        """Close every thread's index connection and drop the pack maps (the store reopens them on next use)"""
+        with self._conns_lock:
+            conns, self._conns = self._conns, []
+            self._local = threading.local()
+        for conn in conns:
+            conn.close()
+        with self._maps_lock:
+            # Dropped rather than closed: views handed out may still use them
+            self._maps.clear()
+
+    def _pack_path(self, pack):
+        return os.path.join(self.directory, f"pack-{pack:06d}.pack")
+
+    def _append(self, conn, items):
+        """Append (digest, data) items to the current pack inside the caller's transaction
+
+        Returns the index rows written. Starts a new pack when the current one is full.
+        """
+        row = conn.execute("SELECT id, size FROM packs ORDER BY id DESC LIMIT 1").fetchone()
+        pack, size = row if row else (1, 0)
+        if not row:
+            conn.execute("INSERT INTO packs (id, size) VALUES (?, 0)", (pack,))
+
+        rows = []
+        f = None
+        try:
+            for digest, data in items:
+                length = _length(data)
+                if size and size + HEADER.size + length > self.pack_max_bytes:
+                    if f is not None:
+                        f.close()
+                        f = None
+                    pack, size = pack + 1, 0
+                    conn.execute("INSERT INTO packs (id, size) VALUES (?, 0)", (pack,))
+                if f is None:
+                    path = self._pack_path(pack)
+                    f = open(path, "r+b" if os.path.exists(path) else "w+b")
+                f.seek(size)  # Overwrites anything a crashed writer left past the committed size
+                f.write(HEADER.pack(MAGIC, bytes.fromhex(digest), length))
+                if hasattr(data, "read"):
+                    shutil.copyfileobj(data, f)
+                else:
+                    f.write(data)
+                rows.append((digest, pack, size + HEADER.size, length))
+                size += HEADER.size + length
+                conn.execute("UPDATE packs SET size = ? WHERE id = ?", (size, pack))
+        finally:
+            if f is not None:
+                f.close()
+        return rows
+
+    def put(self, digest, data):
+        """Store a blob (bytes or a binary file) unless it is already stored; returns True if written"""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if conn.execute("SELECT 1 FROM blobs WHERE digest = ?", (digest,)).fetchone():
+                conn.execute("ROLLBACK")
+                return False
+            rows = self._append(conn, [(digest, data)])
+            conn.executemany("INSERT INTO blobs (digest, pack, offset, length) VALUES (?, ?, ?, ?)", rows)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return True
+
+    def _location(self, digest):
+        return self._conn().execute("SELECT pack, offset, length FROM blobs WHERE digest = ?", (digest,)).fetchone()
+
+    def _map(self, pack, end):
+        """A read-only mmap of the pack covering at least end bytes (remapped if the pack has grown)"""
+        with self._maps_lock:
+            mapped = self._maps.get(pack)
+            if mapped is None or len(mapped) < end:
+                with open(self._pack_path(pack), "rb") as f:
+                    mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                # An older, smaller map is dropped rather than closed: views handed out may still use it
+                self._maps[pack] = mapped
+            return mapped
+
+    def view(self, digest):
+        """memoryview of a stored blob inside the mapped pack (no copy), or None"""
+        location = self._location(digest)
+        if location is None:
+            return None
+        pack, offset, length = location
+        return memoryview(self._map(pack, offset + length))[offset:offset + length]
+
+    def get(self, digest):
+        """Blob bytes, or None if it is not stored"""
+        view = self.view(digest)
+        return bytes(view) if view is not None else None
+
+    def open(self, digest):
+        """Binary file object reading the blob from the mapped pack (raises FileNotFoundError)"""
+        view = self.view(digest)
+        if view is None:
+            raise FileNotFoundError(digest)
+        return io.BufferedReader(_ViewReader(view))
+
+    def __contains__(self, digest):
+        return self._location(digest) is not None
+
+    def __iter__(self):
+        """Stored digests, in pack order"""
+        conn = self._conn()
+        rows = conn.execute("SELECT digest FROM blobs ORDER BY pack, offset").fetchall()
+        return iter([row[0] for row in rows])
+
+    def scan(self):
+        """(digest, memoryview) for every stored blob, reading each pack front to back"""
+        rows = self._conn().execute("SELECT digest, pack, offset, length FROM blobs ORDER BY pack, offset").fetchall()
+        for digest, pack, offset, length in rows:
+            yield digest, memoryview(self._map(pack, offset + length))[offset:offset + length]
+
+    def stats(self):
+        """Packs, blobs and pack bytes"""
+        conn = self._conn()
+        packs, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM packs").fetchone()
+        blobs = conn.execute("SELECT COUNT(*) FROM blobs").fetchone()[0]
+        return {'packs': packs, 'blobs': blobs, 'pack_bytes': size}
+
+    def import_files(self, file_store, remove=True, batch_size=200):
+        """Move blobs from a FileBlobStore into packs (files are removed once indexed); returns the count"""
+        moved = 0
+        digests = list(file_store)
+        for start in range(0, len(digests), batch_size):
+            batch = []
+            for digest in digests[start:start + batch_size]:
+                data = file_store.get(digest)
+                if data is not None and hashlib.sha256(data).hexdigest() == digest:
+                    batch.append((digest, data))
+            conn = self._conn()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                batch = [(d, data) for d, data in batch
+                         if not conn.execute("SELECT 1 FROM blobs WHERE digest = ?", (d,)).fetchone()]
+                rows = self._append(conn, batch)
+                conn.executemany("INSERT INTO blobs (digest, pack, offset, length) VALUES (?, ?, ?, ?)", rows)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            moved += len(batch)
+            if remove:
+                for digest in digests[start:start + batch_size]:
+                    if digest in self:
+                        file_store.remove(digest)
+        return moved
+
+    def rebuild_index(self):
+        """Recreate the index by scanning the pack headers (e.g. after losing index.db); returns the blob count"""
+        packs = sorted(
+            int(name[5:11]) for name in os.listdir(self.directory)
+            if name.startswith("pack-") and name.endswith(".pack")
+        )
+        rows, sizes = [], []
+        for pack in packs:
+            with open(self._pack_path(pack), "rb") as f:
+                offset = 0
+                while True:
+                    header = f.read(HEADER.size)
+                    if len(header) < HEADER.size:
+                        break
+                    magic, raw_digest, length = HEADER.unpack(header)
+                    data = f.read(length)
+                    if magic != MAGIC or len(data) < length or hashlib.sha256(data).digest() != raw_digest:
+                        break  # Torn write at the end of the pack
+                    rows.append((raw_digest.hex(), pack, offset + HEADER.size, length))
+                    offset += HEADER.size + length
+                sizes.append((pack, offset))
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("DELETE FROM blobs")
+        conn.execute("DELETE FROM packs")
+        conn.executemany("INSERT OR IGNORE INTO blobs (digest, pack, offset, length) VALUES (?, ?, ?, ?)", rows)
+        conn.executemany("INSERT INTO packs (id, size) VALUES (?, ?)", sizes)
+        conn.execute("COMMIT")
+        return len(rows)
+
+def benchmark(count=2000, size=60 * 1024, reads=1000, directory=None):
+    """Compare file-per-document storage with pack files: write, random read and a verifying full scan
+
+    Documents are random (incompressible) bytes of about size bytes, like
+    rendered PDFs. Returns {'files': {...}, 'packs': {...}} with seconds per
+    phase, file count and bytes on disk. Reads hit the OS page cache.
+    """
+    from core.archive import FileBlobStore
+
+    base = tempfile.mkdtemp(prefix="archive-bench-", dir=directory)
+    rng = random.Random(42)
+    documents = []
+    for _ in range(count):
+        data = os.urandom(max(1, int(size * rng.uniform(0.5, 1.5))))
+        documents.append((hashlib.sha256(data).hexdigest(), data))
+    sample = [rng.choice(documents)[0] for _ in range(reads)]
+
+    results = {}
+    stores = {}
+    try:
+        stores['files'] = FileBlobStore(os.path.join(base, "files"))
+        stores['packs'] = PackStore(os.path.join(base, "packs"))
+        for name, store in stores.items():
+            started = time.perf_counter()
+            for digest, data in documents:
+                store.put(digest, data)
+            written = time.perf_counter()
+
+            for digest in sample:
+                store.get(digest)
+            read = time.perf_counter()
+
+            scanned = corrupt = 0
+            for digest, data in store.scan():  # An integrity check: hash every stored document
+                scanned += len(data)
+                corrupt += hashlib.sha256(data).hexdigest() != digest
+            done = time.perf_counter()
+
+            files, disk_bytes = 0, 0
+            for root, _, names in os.walk(store.directory):
+                for file_name in names:
+                    files += 1
+                    st = os.stat(os.path.join(root, file_name))
+                    disk_bytes += getattr(st, "st_blocks", 0) * 512 or st.st_size  # Allocated blocks where known
+            results[name] = {
+                'write_seconds': written - started,
+                'read_seconds': read - written,
+                'reads_per_second': reads / (read - written) if read > written else 0.0,
+                'scan_seconds': done - read,
+                'scan_mb_per_second': scanned / 1024 / 1024 / (done - read) if done > read else 0.0,
+                'corrupt': corrupt,
+                'files': files,
+                'disk_bytes': disk_bytes,
+            }
+    finally:
+        if 'packs' in stores:
+            stores['packs'].close()
+        shutil.rmtree(base, ignore_errors=True)
+    return results
@@ -0,0 +1,20 @@
+"""
+Filesystem locations shared by the app, the batch CLI and the API service
+"""
+
+import os
+
+import config
+
+# Repository root, so assets resolve no matter where the process was started
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def resolve_path(path):
+    """Resolve a repository-relative path (as used in config) to an absolute one"""
+    return path if os.path.isabs(path) else os.path.join(BASE_DIR, path)
+
+def data_path(*parts):
+    """Path inside the data directory, creating the directory on first use"""
+    directory = resolve_path(config.DATA_DIR)
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, *parts)
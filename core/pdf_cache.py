@@ -0,0 +1,231 @@
+"""
+On-disk PDF cache keyed by the SHA-256 of the source HTML
+
+The cache lives in the data directory, so it is shared by the Streamlit app,
+every API worker process and the batch CLI. Entries are written atomically
+(temp file + rename) and the oldest ones are pruned once the cache grows past
+config.PDF_CACHE_MAX_BYTES.
+
+Letters with explicit page breaks (the full-time offer letter) are also
+cached page by page: a letter whose salary table changed re-renders only
+that page and reuses the cached render of the unchanged ones.
+
+Every render applies a size preset (core/pdf_size.py), which is part of
+the cache key. Renders are written by the renderer straight into a new cache
+entry on disk. render_pdf_spooled returns the PDF as a spooled file (see
+core/spool.py) copied from the cache entry, for streaming it without
+reading it whole, and cache_pdf fills the cache without reading it at all.
+memory_benchmark compares the peak memory of serving a download both ways.
+"""
+
+import hashlib
+import io
+import multiprocessing
+import os
+import tempfile
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+import config
+from core.paths import data_path
+from core.pdf_size import optimize_pdf_file, preset_fingerprint, preset_options, shrink_images
+from core.renderer import PAGE_BREAK, merge_pdfs, render_pdf, split_pages
+from core.spool import copy_data, spooled_file
+
+def cache_dir():
+    directory = data_path("pdf_cache")
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+def cache_key(html_content, preset=None):
+    digest = hashlib.sha256(html_content.encode("utf-8"))
+    digest.update(preset_fingerprint(preset).encode("utf-8"))
+    return digest.hexdigest()
+
+def cached_pdf_path(html_content, preset=None):
+    return os.path.join(cache_dir(), cache_key(html_content, preset) + ".pdf")
+
+def get_cached_pdf(html_content, preset=None):
+    """Return cached PDF bytes for this HTML and preset, or None"""
+    path = cached_pdf_path(html_content, preset)
+    try:
+        with open(path, "rb") as f:
+            pdf_bytes = f.read()
+    except FileNotFoundError:
+        return None
+    try:
+        os.utime(path)  # Mark as recently used for pruning
+    except FileNotFoundError:
+        pass  # Pruned by another process since it was read
+    return pdf_bytes
+
+def put_cached_pdf(html_content, pdf_bytes, preset=None):
+    directory = cache_dir()
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(pdf_bytes)
+    os.replace(tmp_path, os.path.join(directory, cache_key(html_content, preset) + ".pdf"))
+    prune()
+
+def prune(max_bytes=None):
+    """Delete least recently used entries until the cache fits in max_bytes"""
+    max_bytes = config.PDF_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    entries = []
+    total = 0
+    for entry in os.scandir(cache_dir()):
+        if entry.name.endswith(".pdf"):
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total += stat.st_size
+
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass  # Already pruned by another process
+        total -= size
+
+def _render_entry(html_content, preset, path):
+    """Render html_content with the preset straight into the file at path"""
+    options = preset_options(preset)
+    html = shrink_images(html_content, options)
+    if _render_by_page(html, path) is None:
+        render_pdf(html, path)
+    optimize_pdf_file(path, options)
+
+@contextmanager
+def _new_entry(html_content, preset=None):
+    """Render a cache entry and yield it as an open file; it is added to the cache after the block
+
+    The renderer writes to a temporary file in the cache directory, so the
+    PDF is never held in memory whole on its way into the cache.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir(), suffix=".tmp")
+    os.close(fd)
+    try:
+        _render_entry(html_content, preset, tmp_path)
+        with open(tmp_path, "rb") as f:
+            yield f
+        os.replace(tmp_path, cached_pdf_path(html_content, preset))
+    finally:
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass  # Added to the cache
+    prune()
+
+def render_pdf_cached(html_content, preset=None):
+    """render_pdf with a size preset, reusing a previous render of identical HTML (raises PdfRenderError)
+
+    preset is a name from config.PDF_PRESETS (default: config.PDF_DEFAULT_PRESET).
+    """
+    pdf_bytes = get_cached_pdf(html_content, preset)
+    if pdf_bytes is None:
+        with _new_entry(html_content, preset) as f:
+            pdf_bytes = f.read()
+    return pdf_bytes
+
+def cache_pdf(html_content, preset=None):
+    """Make sure the cache has a render of this HTML and preset, without reading it (raises PdfRenderError)"""
+    path = cached_pdf_path(html_content, preset)
+    try:
+        os.utime(path)  # Mark as recently used for pruning
+    except FileNotFoundError:
+        with _new_entry(html_content, preset):
+            pass
+
+def render_pdf_spooled(html_content, preset=None):
+    """render_pdf_cached as a spooled file positioned at the start (raises PdfRenderError)
+
+    The PDF is copied a chunk at a time from its cache entry, or on a cache
+    miss from the file the renderer wrote, so only PDFs under
+    config.SPOOL_MAX_MEMORY_BYTES are ever held in memory.
+    """
+    spool = spooled_file()
+    try:
+        path = cached_pdf_path(html_content, preset)
+        try:
+            with open(path, "rb") as f:
+                os.utime(path)  # Mark as recently used for pruning
+                copy_data(f, spool)
+        except FileNotFoundError:
+            with _new_entry(html_content, preset) as f:
+                copy_data(f, spool)
+    except BaseException:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool
+
+def _render_by_page(html_content, output_path):
+    """Write the merge of the (cached) renders of each page to output_path
+
+    Returns None, without rendering anything, for single-page HTML or without pypdf.
+    """
+    pages = split_pages(html_content)
+    if len(pages) < 2:
+        return None
+    # A generator, so nothing is rendered when merge_pdfs cannot merge
+    return merge_pdfs((render_pdf_cached(page, "original") for page in pages), output_path)
+
+def _measure_download(variant, html_content, preset):
+    """Child process of memory_benchmark: render and stream one PDF as the API does, and report peak RSS"""
+    from core.spool import iter_chunks, peak_rss_bytes
+    from core.workers import shutdown_pool, submit_render
+
+    size = 0
+    try:
+        if variant == "bytes":
+            # Rendered in the pool and passed back whole, then sent from memory
+            chunks = iter_chunks(io.BytesIO(submit_render(html_content, preset).result()))
+        elif variant == "spooled":
+            # Rendered into the cache by the pool, then streamed from a spooled copy (api.render_spooled)
+            submit_render(html_content, preset, cache_only=True).result()
+            chunks = iter_chunks(render_pdf_spooled(html_content, preset), close=True)
+        else:
+            chunks = ()  # "baseline": the interpreter and imports only
+        for chunk in chunks:
+            size += len(chunk)
+        return size, peak_rss_bytes()
+    finally:
+        shutdown_pool()  # This process cannot exit while its render workers run
+
+def memory_benchmark(copies=20):
+    """Peak RSS of the serving process while a PDF download is rendered and streamed, bytes vs spooled
+
+    The document is a sample appointment letter repeated copies times. Each
+    variant runs in a fresh process (which renders in its own render pool)
+    and renders its own copy, so the peaks do not mask each other and every
+    render is a cache miss. Returns {variant: {'pdf_bytes', 'peak_rss_bytes'}},
+    or None where the resource module is missing (Windows).
+    """
+    try:
+        import resource  # noqa: F401
+    except ImportError:
+        return None
+    from datetime import date
+
+    from core.generators import generate_appointment_letter
+    from core.pdf_size import letter_preset
+
+    letter = generate_appointment_letter("Sample Employee", "Software Engineer", date(2024, 1, 1))
+    body_start = letter.index("<body>") + len("<body>")
+    body_end = letter.rindex("</body>")
+    preset = letter_preset("appointment")
+    results = {}
+    for variant in ("baseline", "bytes", "spooled"):
+        html = (f"{letter[:body_start]}<!-- memory benchmark: {variant} {uuid.uuid4().hex} -->"
+                f"{PAGE_BREAK.join([letter[body_start:body_end]] * copies)}{letter[body_end:]}")
+        try:
+            with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+                size, peak = executor.submit(_measure_download, variant, html, preset).result()
+        finally:
+            try:
+                os.remove(cached_pdf_path(html, preset))
+            except FileNotFoundError:
+                pass
+        results[variant] = {'pdf_bytes': size, 'peak_rss_bytes': peak}
+    return results
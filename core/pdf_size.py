@@ -0,0 +1,173 @@
+"""
+Size presets for rendered PDFs
+
+Letters embed the letterhead, footer and signature as base64 PNG data URIs
+at full resolution (the letterhead is 8326 px wide for a 150 px slot), and
+letters merged from separately rendered pages (core/pdf_cache.py) carry a
+copy of them per page. A preset from config.PDF_PRESETS shrinks the images
+in the HTML before rendering (shrink_images) and post-processes the PDF with
+pypdf (optimize_pdf, or optimize_pdf_file for a PDF on disk). Both PDF
+backends already embed only the glyphs a letter uses (font subsetting), so
+presets leave fonts alone.
+
+Pillow and pypdf are imported lazily; without them the HTML or PDF is
+returned unchanged.
+"""
+
+import base64
+import io
+import json
+import logging
+import os
+import re
+from functools import lru_cache
+
+import config
+
+logger = logging.getLogger(__name__)
+
+DATA_URI = re.compile(r"data:image/(png|jpeg);base64,([A-Za-z0-9+/=]+)")
+IMAGE_OPTIONS = ("image_max_width", "image_format", "jpeg_quality")
+PDF_OPTIONS = ("dedupe_objects", "flate_level", "strip_metadata")
+
+# One of each letter, for size_report
+SAMPLE_CANDIDATES = [
+    {'letter': "offer", 'offer_type': "Full-time Employee", 'name': "Sample Employee",
+     'position': "Software Engineer", 'start_date': "2025-01-06"},
+    {'letter': "offer", 'offer_type': "Intern", 'name': "Sample Intern",
+     'position': "Software Engineer", 'start_date': "2025-01-06"},
+    {'letter': "appointment", 'name': "Sample Employee", 'position': "Software Engineer",
+     'start_date': "2025-01-06"},
+    {'letter': "experience", 'name': "Sample Employee", 'position': "Software Engineer",
+     'start_date': "2024-01-01", 'end_date': "2025-01-01"},
+    {'letter': "revision", 'name': "Sample Employee", 'position': "Software Engineer",
+     'effective_date': "2025-04-01", 'old_ctc': 900000, 'new_ctc': 1100000},
+]
+
+def preset_options(preset=None):
+    """Options of a preset (default: config.PDF_DEFAULT_PRESET); raises KeyError for unknown presets"""
+    return config.PDF_PRESETS[preset or config.PDF_DEFAULT_PRESET]
+
+def preset_fingerprint(preset=None):
+    """Stable text for a preset's options, part of the PDF cache key"""
+    return json.dumps(preset_options(preset), sort_keys=True)
+
+def letter_preset(letter):
+    return config.PDF_LETTER_PRESETS.get(letter, config.PDF_DEFAULT_PRESET)
+
+@lru_cache(maxsize=32)
+def _shrink_image(kind, data, max_width, image_format, jpeg_quality):
+    """(kind, base64 data) of an embedded image after scaling and re-encoding it"""
+    from PIL import Image
+
+    image = Image.open(io.BytesIO(base64.b64decode(data)))
+    if max_width and image.width > max_width:
+        image = image.resize((max_width, max(1, round(image.height * max_width / image.width))), Image.LANCZOS)
+
+    output = io.BytesIO()
+    if image_format == "JPEG":
+        if image.mode in ("RGBA", "LA", "P"):
+            # JPEG has no transparency: flatten onto the white page
+            image = image.convert("RGBA")
+            background = Image.new("RGB", image.size, "white")
+            background.paste(image, mask=image.getchannel("A"))
+            image = background
+        image.convert("RGB").save(output, "JPEG", quality=jpeg_quality or 85, optimize=True)
+        kind = "jpeg"
+    else:
+        image.save(output, "PNG", optimize=True)
+        kind = "png"
+
+    if output.tell() >= len(data) * 3 // 4:
+        return None  # Not smaller than the original
+    return kind, base64.b64encode(output.getvalue()).decode()
+
+def shrink_images(html_content, options):
+    """html_content with its data URI images scaled down and re-encoded as the preset options say"""
+    if not any(options.get(key) for key in IMAGE_OPTIONS):
+        return html_content
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        logger.info("Pillow is not installed, images are embedded as they are")
+        return html_content
+
+    def replace(match):
+        try:
+            shrunk = _shrink_image(match.group(1), match.group(2), options.get("image_max_width"),
+                                   options.get("image_format", "PNG"), options.get("jpeg_quality"))
+        except Exception as e:
+            logger.info("Could not shrink an embedded image: %s", e)
+            shrunk = None
+        if shrunk is None:
+            return match.group(0)
+        return f"data:image/{shrunk[0]};base64,{shrunk[1]}"
+
+    return DATA_URI.sub(replace, html_content)
+
+def _write_optimized(source, options, output):
+    """Write the PDF read from source (a binary file) to output, post-processed as the preset options say"""
+    from pypdf import PdfReader, PdfWriter
+
+    writer = PdfWriter(clone_from=PdfReader(source))
+    if options.get("flate_level"):
+        for page in writer.pages:
+            page.compress_content_streams(level=options["flate_level"])
+    if options.get("dedupe_objects"):
+        writer.compress_identical_objects()
+    if options.get("strip_metadata"):
+        writer.metadata = None
+    writer.write(output)
+
+def _can_optimize(options):
+    if not any(options.get(key) for key in PDF_OPTIONS):
+        return False
+    try:
+        import pypdf  # noqa: F401
+    except ImportError:
+        logger.info("pypdf is not installed, PDFs are not post-processed")
+        return False
+    return True
+
+def optimize_pdf(pdf_bytes, options):
+    """pdf_bytes post-processed as the preset options say (never larger than the input)"""
+    if not _can_optimize(options):
+        return pdf_bytes
+    output = io.BytesIO()
+    _write_optimized(io.BytesIO(pdf_bytes), options, output)
+    return output.getvalue() if output.tell() < len(pdf_bytes) else pdf_bytes
+
+def optimize_pdf_file(path, options):
+    """Post-process the PDF file at path in place as the preset options say (kept as is unless that is smaller)"""
+    if not _can_optimize(options):
+        return
+    optimized = path + ".optimized"
+    try:
+        with open(path, "rb") as source:
+            _write_optimized(source, options, optimized)
+        if os.path.getsize(optimized) < os.path.getsize(path):
+            os.replace(optimized, path)
+    finally:
+        try:
+            os.remove(optimized)
+        except FileNotFoundError:
+            pass
+
+def size_report(presets=None):
+    """Size of a sample of each letter with every preset (raises PdfRenderError)
+
+    Returns one row per sample letter with its 'original' size and the size
+    with each preset; the preset each letter uses (config.PDF_LETTER_PRESETS)
+    is in 'preset'.
+    """
+    from core.letters import build_letter
+    from core.pdf_cache import render_pdf_cached
+
+    presets = presets or list(config.PDF_PRESETS)
+    rows = []
+    for candidate in SAMPLE_CANDIDATES:
+        html, filename = build_letter(candidate)
+        sizes = {preset: len(render_pdf_cached(html, preset)) for preset in ["original", *presets]}
+        rows.append({'letter': candidate['letter'], 'filename': filename,
+                     'preset': letter_preset(candidate['letter']), 'sizes': sizes})
+    return rows
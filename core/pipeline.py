@@ -0,0 +1,51 @@
+"""
+Onboarding/offboarding pipeline stages and the transitions between them
+
+An employee's status in the employee store is one of STAGES. Onboarding moves
+forward through ONBOARDING_STAGES (steps may be skipped, e.g. BGV is only for
+experienced hires), exit can start from any onboarding stage, and the exit
+steps move forward to the certificate. Resending a step keeps the employee in
+the same stage.
+"""
+
+ONBOARDING_STAGES = [
+    "docs_requested",
+    "offer_sent",
+    "appointment_sent",
+    "welcomed",
+    "bgv_pending",
+    "bgv_cleared",
+]
+EXIT_STAGES = [
+    "exit_initiated",
+    "assets_returned",
+    "certificate_issued",
+]
+STAGES = ONBOARDING_STAGES + EXIT_STAGES
+
+STAGE_LABELS = {
+    "docs_requested": "📝 Docs Requested",
+    "offer_sent": "📄 Offer Sent",
+    "appointment_sent": "📋 Appointment Sent",
+    "welcomed": "🎯 Welcomed",
+    "bgv_pending": "🔍 BGV Pending",
+    "bgv_cleared": "✅ BGV Cleared",
+    "exit_initiated": "🚪 Exit Initiated",
+    "assets_returned": "📦 Assets Returned",
+    "certificate_issued": "📜 Certificate Issued",
+}
+
+def _forward(stages):
+    return {stage: set(stages[i + 1:]) for i, stage in enumerate(stages)}
+
+# Allowed next stages for each stage (None: employee not in the pipeline yet)
+TRANSITIONS = {None: set(STAGES)}
+TRANSITIONS.update({stage: later | {"exit_initiated"} for stage, later in _forward(ONBOARDING_STAGES).items()})
+TRANSITIONS.update(_forward(EXIT_STAGES))
+
+def can_transition(current, target):
+    """True if an employee in stage current may move to target"""
+    return target in TRANSITIONS.get(current, set())
+
+def stage_label(stage):
+    return STAGE_LABELS.get(stage, stage or "—")
@@ -0,0 +1,317 @@
+"""
+HTML to PDF rendering (pdfkit/wkhtmltopdf with a weasyprint fallback)
+
+render_pdfs converts a whole batch in one engine session (a single
+wkhtmltopdf process, or one weasyprint font configuration and image cache),
+which saves the per-document engine startup of calling render_pdf in a loop.
+
+Both backends are imported lazily: weasyprint alone takes a noticeable time
+to import, and worker processes that only build HTML never need it. The same
+goes for pypdf, which merges separately rendered pages (merge_pdfs).
+
+wkhtmltopdf runs under config.RENDER_TIMEOUT_SECONDS per document and, on
+Linux, with CPU time and memory limits; it is killed when it runs past them.
+weasyprint runs in-process, so its limits are only enforced inside the
+render pool's workers (core/workers.py).
+"""
+
+import io
+import logging
+import os
+import signal
+import subprocess
+import tempfile
+import time
+
+import config
+from core.errors import PdfRenderError, RenderAbortedError, RenderTimeoutError
+
+logger = logging.getLogger(__name__)
+
+# How often a wkhtmltopdf session is checked for completed documents
+SESSION_CHECK_SECONDS = 0.5
+
+# Configure pdfkit options for better PDF output
+PDFKIT_OPTIONS = {
+    'page-size': 'A4',
+    'margin-top': '0.75in',
+    'margin-right': '0.75in',
+    'margin-bottom': '0.75in',
+    'margin-left': '0.75in',
+    'encoding': "UTF-8",
+    'no-outline': None,
+    'enable-local-file-access': None
+}
+
+def render_pdf(html_content, output_path=None):
+    """Convert HTML content to PDF bytes, raising PdfRenderError if every backend fails
+
+    With output_path, the PDF is written straight to that file instead and
+    None is returned. A render that times out or is cancelled
+    (RenderAbortedError) is not retried with the fallback backend.
+    """
+    # Try wkhtmltopdf first (located through pdfkit)
+    try:
+        return _render_wkhtmltopdf(html_content, output_path)
+    except RenderAbortedError:
+        raise
+    except Exception as e:
+        logger.info("pdfkit failed: %s. Trying weasyprint as fallback...", e)
+
+        # Fallback to weasyprint
+        try:
+            import weasyprint
+
+            return weasyprint.HTML(string=html_content).write_pdf(output_path)
+        except RenderAbortedError:
+            raise
+        except Exception as e2:
+            raise PdfRenderError(
+                f"Both PDF conversion methods failed. pdfkit: {str(e)}, weasyprint: {str(e2)}"
+            ) from e2
+
+def set_soft_limit(which, value):
+    """Set a resource's soft limit, capped at its hard limit"""
+    import resource
+
+    _, hard = resource.getrlimit(which)
+    if hard != resource.RLIM_INFINITY and (value == resource.RLIM_INFINITY or value > hard):
+        value = hard
+    resource.setrlimit(which, (value, hard))
+
+def limit_process(cpu_seconds=None, memory_mb=None):
+    """Limit the current process's CPU time and memory (data segment); a no-op where resource is missing"""
+    try:
+        import resource
+    except ImportError:
+        return
+    if cpu_seconds:
+        set_soft_limit(resource.RLIMIT_CPU, int(cpu_seconds))
+    if memory_mb:
+        set_soft_limit(resource.RLIMIT_DATA, int(memory_mb) * 1024 * 1024)
+
+def _apply_limits(process, documents):
+    """Apply the render limits to a started wkhtmltopdf process converting documents documents (Linux only)
+
+    Set from outside with prlimit, as a preexec_fn is unsafe in a process
+    that runs threads.
+    """
+    try:
+        import resource
+    except ImportError:
+        return
+    if not hasattr(resource, "prlimit"):
+        return
+    limits = ((resource.RLIMIT_CPU, config.RENDER_CPU_LIMIT_SECONDS * documents),
+              (resource.RLIMIT_DATA, config.RENDER_MEMORY_LIMIT_MB * 1024 * 1024))
+    try:
+        for which, value in limits:
+            _, hard = resource.prlimit(process.pid, which)
+            if hard != resource.RLIM_INFINITY:
+                value = min(value, hard)
+            resource.prlimit(process.pid, which, (int(value), hard))
+    except (OSError, ValueError) as e:
+        # E.g. the process has already exited
+        logger.debug("Could not limit wkhtmltopdf: %s", e)
+
+def _wkhtmltopdf_binary():
+    import pdfkit
+
+    binary = pdfkit.configuration().wkhtmltopdf
+    return binary.decode() if isinstance(binary, bytes) else binary
+
+def _kill(process):
+    """Kill a wkhtmltopdf process and anything it started (its own process group on POSIX)"""
+    if os.name == "posix":
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+    else:
+        process.kill()
+    process.wait()
+
+def _render_wkhtmltopdf(html_content, output_path=None):
+    """PDF bytes (or None, written to output_path) from one wkhtmltopdf process
+
+    The process is killed once it runs past config.RENDER_TIMEOUT_SECONDS.
+    """
+    command = [_wkhtmltopdf_binary(), "--quiet", *_wkhtmltopdf_args(PDFKIT_OPTIONS), "-", output_path or "-"]
+    process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                               start_new_session=os.name == "posix")
+    try:
+        _apply_limits(process, 1)
+        pdf_bytes, stderr = process.communicate(html_content.encode("utf-8"), timeout=config.RENDER_TIMEOUT_SECONDS)
+    except subprocess.TimeoutExpired:
+        _kill(process)
+        raise RenderTimeoutError(f"wkhtmltopdf took longer than {config.RENDER_TIMEOUT_SECONDS}s and was stopped")
+    except BaseException:
+        # E.g. the render was cancelled: do not leave wkhtmltopdf running
+        _kill(process)
+        raise
+    if process.returncode != 0 or not (os.path.getsize(output_path) if output_path else pdf_bytes):
+        raise OSError(f"wkhtmltopdf exited with {process.returncode}: {stderr.decode(errors='replace').strip()}")
+    return None if output_path else pdf_bytes
+
+def _wkhtmltopdf_args(options):
+    args = []
+    for name, value in options.items():
+        args.append(f"--{name}")
+        if value is not None:
+            args.append(str(value))
+    return args
+
+def _quote(path):
+    return '"' + path.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+def _complete(path):
+    """Whether a PDF written by wkhtmltopdf is complete (a stopped session can leave one half written)"""
+    try:
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            f.seek(max(0, f.tell() - 1024))
+            return f.read().rstrip().endswith(b"%%EOF")
+    except FileNotFoundError:
+        return False
+
+def _render_wkhtmltopdf_session(html_documents):
+    """PDF bytes (or None where it failed) for each document, from a single wkhtmltopdf process
+
+    wkhtmltopdf --read-args-from-stdin runs one conversion per input line in
+    the same process, so the browser engine starts once for the whole batch.
+    The session is stopped once no document has completed for
+    config.RENDER_TIMEOUT_SECONDS.
+    """
+    binary = _wkhtmltopdf_binary()
+    with tempfile.TemporaryDirectory(prefix="render_") as directory:
+        lines, outputs = [], []
+        for i, html_content in enumerate(html_documents):
+            source = os.path.join(directory, f"{i}.html")
+            with open(source, "w", encoding="utf-8") as f:
+                f.write(html_content)
+            outputs.append(os.path.join(directory, f"{i}.pdf"))
+            lines.append(f"{_quote(source)} {_quote(outputs[-1])}\n")
+        args_path = os.path.join(directory, "args.txt")
+        with open(args_path, "w", encoding="utf-8") as f:
+            f.writelines(lines)
+
+        command = [binary, "--quiet", *_wkhtmltopdf_args(PDFKIT_OPTIONS), "--read-args-from-stdin"]
+        # Arguments and errors go through files, so nothing blocks on a full pipe while the session is watched
+        with open(args_path, "rb") as stdin, tempfile.TemporaryFile() as stderr:
+            process = subprocess.Popen(command, stdin=stdin, stdout=subprocess.DEVNULL, stderr=stderr,
+                                       start_new_session=os.name == "posix")
+            try:
+                _apply_limits(process, len(lines))
+                completed, progress_at, stopped = 0, time.monotonic(), False
+                while True:
+                    try:
+                        process.wait(timeout=SESSION_CHECK_SECONDS)
+                        break
+                    except subprocess.TimeoutExpired:
+                        pass
+                    while completed < len(outputs) and _complete(outputs[completed]):
+                        completed, progress_at = completed + 1, time.monotonic()
+                    if time.monotonic() - progress_at > config.RENDER_TIMEOUT_SECONDS:
+                        _kill(process)
+                        logger.info("wkhtmltopdf session completed no document for %ss and was stopped",
+                                    config.RENDER_TIMEOUT_SECONDS)
+                        stopped = True
+                        break
+            except BaseException:
+                _kill(process)
+                raise
+            if process.returncode != 0 and not stopped:
+                stderr.seek(0)
+                logger.info("wkhtmltopdf session exited with %s: %s", process.returncode,
+                            stderr.read().decode(errors="replace").strip())
+
+        results = []
+        for path in outputs:
+            if _complete(path):
+                with open(path, "rb") as f:
+                    results.append(f.read())
+            else:
+                results.append(None)
+        return results
+
+def _render_weasyprint_session(html_documents):
+    """PDF bytes for each document, rendered by weasyprint with shared fonts and image cache"""
+    import weasyprint
+    from weasyprint.text.fonts import FontConfiguration
+
+    font_config = FontConfiguration()
+    cache = {}  # Decoded images (the letterhead, footer and signature are in every letter)
+    results = []
+    for html_content in html_documents:
+        try:
+            results.append(weasyprint.HTML(string=html_content).write_pdf(font_config=font_config, cache=cache))
+        except Exception as e:
+            logger.info("weasyprint failed for one document in the batch: %s", e)
+            results.append(None)
+    return results
+
+def render_pdfs(html_documents):
+    """Convert many HTML documents to PDF in one engine session instead of one per document
+
+    Returns a list with, for each document in order, its PDF bytes or the
+    PdfRenderError it failed with. Uses the same backend order as render_pdf;
+    documents the session could not render are retried one by one.
+    """
+    html_documents = list(html_documents)
+    results = [None] * len(html_documents)
+    for session in (_render_wkhtmltopdf_session, _render_weasyprint_session):
+        missing = [i for i, pdf_bytes in enumerate(results) if pdf_bytes is None]
+        if not missing:
+            break
+        try:
+            rendered = session([html_documents[i] for i in missing])
+        except Exception as e:
+            logger.info("%s unavailable: %s", session.__name__, e)
+            continue
+        for i, pdf_bytes in zip(missing, rendered):
+            results[i] = pdf_bytes
+
+    for i, pdf_bytes in enumerate(results):
+        if pdf_bytes is None:
+            try:
+                results[i] = render_pdf(html_documents[i])
+            except PdfRenderError as e:
+                results[i] = e
+    return results
+
+# Explicit page break between the pages of a multi-page letter (see split_pages)
+PAGE_BREAK = '<div style="page-break-before: always;"></div>'
+
+def split_pages(html_content):
+    """Standalone HTML documents for each explicitly broken page, or [html_content] if there is only one
+
+    Every page keeps the document's head (styles) and closing tags, so it
+    renders on its own as it does inside the whole letter.
+    """
+    body_start = html_content.find("<body>")
+    body_end = html_content.rfind("</body>")
+    if body_start == -1 or body_end == -1 or PAGE_BREAK not in html_content[body_start:body_end]:
+        return [html_content]
+    body_start += len("<body>")
+    head, tail = html_content[:body_start], html_content[body_end:]
+    return [head + page + tail for page in html_content[body_start:body_end].split(PAGE_BREAK)]
+
+def merge_pdfs(parts, output_path=None):
+    """Concatenate an iterable of PDF documents (bytes) into one, or None when pypdf is not installed
+
+    With output_path, the merged PDF is written to that file and output_path is returned.
+    """
+    try:
+        from pypdf import PdfReader, PdfWriter
+    except ImportError:
+        return None
+
+    writer = PdfWriter()
+    for pdf_bytes in parts:
+        writer.append(PdfReader(io.BytesIO(pdf_bytes)))
+    if output_path:
+        writer.write(output_path)
+        return output_path
+    output = io.BytesIO()
+    writer.write(output)
+    return output.getvalue()
@@ -0,0 +1,156 @@
+"""
+Bulk salary revision letters from a compensation spreadsheet
+
+For appraisal season: one row per employee (CSV or XLSX with a header row)
+with the current and revised compensation. Every salary breakdown in the file
+is computed in one vectorized pass (core/letters.py attach_salary_data), the
+letters are rendered to PDF across worker processes and written to the output
+directory, and with send=True each rendered letter is queued in the shared
+send queue (core/jobs.py), from which the API's send workers deliver it.
+
+Recognised columns (case and spacing do not matter, see HEADER_ALIASES):
+
+    name, email, position, effective_date, old_ctc, new_ctc
+
+Instead of old_ctc/new_ctc, a side can be given as monthly amounts with an
+old_ or new_ prefix (old_basic_salary, ..., new_pf_contribution).
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from core.errors import InvalidCandidateError
+from core.importer import iter_rows, parse_import_date
+from core.jobs import JobQueue
+from core.letters import REVISION_SIDES, attach_salary_data, build_letter
+from core.pdf_cache import render_pdf_cached
+from core.pdf_size import letter_preset
+from core.salary import SALARY_COMPONENTS
+from core.validation import email_error
+from core.workers import init_worker
+
+HEADER_ALIASES = {
+    'name': ["name", "employee_name", "full_name"],
+    'email': ["email", "official_email", "work_email", "employee_email", "email_address"],
+    'position': ["position", "designation", "role", "job_title"],
+    'effective_date': ["effective_date", "effective_from", "with_effect_from", "revision_date"],
+    'old_ctc': ["old_ctc", "current_ctc", "existing_ctc"],
+    'new_ctc': ["new_ctc", "revised_ctc"],
+}
+HEADERS = {alias: field for field, aliases in HEADER_ALIASES.items() for alias in aliases}
+HEADERS.update({
+    f"{side}_{component}": f"{side}_{component}"
+    for side in REVISION_SIDES for component in list(SALARY_COMPONENTS) + ["pf_contribution"]
+})
+
+# Rendered letters are queued for sending in batches of this many (one transaction each)
+QUEUE_BATCH_SIZE = 100
+
+def normalize_revision_header(value):
+    key = str(value or "").strip().lower().replace(" ", "_").replace("-", "_")
+    return HEADERS.get(key)
+
+def revision_candidate(record):
+    """Candidate record (see core/letters.py) for a spreadsheet row; raises InvalidCandidateError"""
+    email = str(record.get("email") or "").strip().lower()
+    error = email_error(email) if email else "email is required"
+    if error:
+        raise InvalidCandidateError(f"email: {error}")
+    value = record.get("effective_date")
+    try:
+        effective_date = parse_import_date(value)
+    except ValueError:
+        raise InvalidCandidateError(f"effective_date: {value!r} is not a recognised date")
+
+    candidate = {key: value for key, value in record.items() if value not in (None, "")}
+    candidate.update({'letter': "revision", 'email': email, 'effective_date': effective_date.isoformat()})
+    return candidate
+
+def render_revision(job):
+    """Worker entry point: render one revision letter and write it to the output directory"""
+    number, candidate, output_dir = job
+    result = {'row': number, 'name': candidate.get("name"), 'email': candidate.get("email")}
+    started = time.perf_counter()
+    try:
+        html, filename = build_letter(candidate)
+        # Through the PDF cache, so the send worker reuses this render instead of repeating it
+        pdf_bytes = render_pdf_cached(html, letter_preset("revision"))
+        path = os.path.join(output_dir, f"{number:05d}_{filename}.pdf")
+        with open(path, "wb") as f:
+            f.write(pdf_bytes)
+        result.update({'ok': True, 'path': path, 'bytes': len(pdf_bytes)})
+    except Exception as e:
+        result.update({'ok': False, 'error': str(e)})
+    result['seconds'] = time.perf_counter() - started
+    return result
+
+def send_payload(candidate, cc=None):
+    """Send queue payload (as accepted by the API's POST /sends) for a revision letter"""
+    candidate = {key: value for key, value in candidate.items() if not key.endswith("_salary_data")}
+    return {'candidate': candidate, 'to': candidate['email'], 'cc': list(cc or []), 'subject': None, 'body': None}
+
+def run_revisions(source, output_dir, workers=None, send=False, cc=None, filename=None, queue=None, progress=None):
+    """Render revision letters for every row of a compensation spreadsheet and optionally queue them
+
+    progress, if given, is called with each per-letter result as it finishes.
+    Returns throughput stats; rows that could not be read or rendered are
+    listed under 'failed' with the reason.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    queue = queue or (JobQueue() if send else None)
+    started = time.perf_counter()
+
+    results, jobs = [], []
+    for number, record in iter_rows(source, filename, normalize_revision_header):
+        try:
+            jobs.append((number, revision_candidate(record)))
+        except InvalidCandidateError as e:
+            results.append({'row': number, 'name': record.get("name"), 'email': record.get("email"),
+                            'ok': False, 'error': str(e), 'seconds': 0.0})
+            if progress:
+                progress(results[-1])
+
+    candidates = attach_salary_data([candidate for _, candidate in jobs])
+    jobs = [(number, candidate, output_dir) for (number, _), candidate in zip(jobs, candidates)]
+    breakdown_seconds = time.perf_counter() - started
+
+    pending = []
+    queued = 0
+
+    def finished(result, candidate):
+        nonlocal queued
+        results.append(result)
+        if send and result['ok']:
+            pending.append(send_payload(candidate, cc))
+            if len(pending) >= QUEUE_BATCH_SIZE:
+                queued += len(queue.enqueue_many("send", pending))
+                pending.clear()
+        if progress:
+            progress(result)
+
+    if workers == 1:
+        for job in jobs:
+            finished(render_revision(job), job[1])
+    else:
+        chunksize = max(1, len(jobs) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as executor:
+            for job, result in zip(jobs, executor.map(render_revision, jobs, chunksize=chunksize)):
+                finished(result, job[1])
+    if pending:
+        queued += len(queue.enqueue_many("send", pending))
+    elapsed = time.perf_counter() - started
+
+    succeeded = [r for r in results if r['ok']]
+    return {
+        'total': len(results),
+        'succeeded': len(succeeded),
+        'failed': sorted((r for r in results if not r['ok']), key=lambda r: r['row']),
+        'queued': queued,
+        'workers': workers,
+        'breakdown_seconds': breakdown_seconds,
+        'elapsed_seconds': elapsed,
+        'documents_per_second': len(succeeded) / elapsed if elapsed else 0.0,
+        'bytes_written': sum(r['bytes'] for r in succeeded),
+    }
@@ -0,0 +1,221 @@
+"""
+Salary structure used by full-time offer letters
+
+build_salary_data computes one candidate's breakdown (the Phase 2 form and
+its edit expander). For bulk offer runs, salary_table does the same for
+thousands of candidates at once: the monthly components are held as one
+(candidates x components) integer array, and every annual amount and total
+is a single vectorized operation over it.
+
+solve_ctc goes the other way: from target annual CTCs and a salary policy
+(config.SALARY_POLICY) to integer-rupee breakdowns whose total CTC is the
+target, again for a whole hiring plan in one pass.
+"""
+
+import random
+import time
+
+import numpy as np
+
+from config import SALARY_POLICY
+from core.errors import InvalidCandidateError
+
+# Monthly components in the order they appear in the offer letter table,
+# with the defaults pre-filled in the Phase 2 form
+SALARY_COMPONENTS = {
+    'basic_salary': 19934,
+    'hra': 9967,
+    'special_allowance': 4716,
+    'medical_allowance': 1250,
+    'books_periodical': 500,
+    'health_club': 1000,
+    'internet_telephone': 2500,
+}
+DEFAULT_PF_CONTRIBUTION = 1800
+
+SALARY_LABELS = {
+    'basic_salary': "Basic Salary",
+    'hra': "HRA",
+    'special_allowance': "Special Allowance",
+    'medical_allowance': "Medical Allowance",
+    'books_periodical': "Books & Periodical",
+    'health_club': "Health Club Facility",
+    'internet_telephone': "Internet & Telephone",
+}
+
+def build_salary_data(monthly=None, pf_contribution_monthly=DEFAULT_PF_CONTRIBUTION):
+    """Build the salary_data dict expected by generate_offer_letter_with_salary
+
+    monthly maps component names (see SALARY_COMPONENTS) to monthly amounts;
+    missing components fall back to the form defaults.
+    """
+    monthly = monthly or {}
+    salary_data = {}
+    gross_ctc_monthly = 0
+
+    for component, default in SALARY_COMPONENTS.items():
+        amount = int(monthly.get(component, default))
+        salary_data[f'{component}_monthly'] = amount
+        salary_data[f'{component}_annual'] = amount * 12
+        gross_ctc_monthly += amount
+
+    pf_contribution_monthly = int(pf_contribution_monthly)
+    total_ctc_monthly = gross_ctc_monthly + pf_contribution_monthly
+
+    salary_data.update({
+        'gross_ctc_monthly': gross_ctc_monthly,
+        'gross_ctc_annual': gross_ctc_monthly * 12,
+        'pf_contribution_monthly': pf_contribution_monthly,
+        'pf_contribution_annual': pf_contribution_monthly * 12,
+        'total_ctc_monthly': total_ctc_monthly,
+        'total_ctc_annual': total_ctc_monthly * 12
+    })
+    return salary_data
+
+COMPONENT_NAMES = tuple(SALARY_COMPONENTS)
+SALARY_KEYS = tuple(
+    [f'{c}_{period}' for c in COMPONENT_NAMES for period in ("monthly", "annual")] +
+    ['gross_ctc_monthly', 'gross_ctc_annual', 'pf_contribution_monthly', 'pf_contribution_annual',
+     'total_ctc_monthly', 'total_ctc_annual']
+)
+
+def salary_table(monthly, pf_contribution_monthly):
+    """Salary breakdowns for many candidates in one vectorized pass
+
+    monthly is a (candidates, components) array of monthly amounts in
+    SALARY_COMPONENTS order and pf_contribution_monthly one amount per
+    candidate. Returns a dict of int64 arrays, one per salary_data key.
+    """
+    monthly = np.asarray(monthly, dtype=np.int64).reshape(-1, len(COMPONENT_NAMES))
+    pf = np.asarray(pf_contribution_monthly, dtype=np.int64).reshape(-1)
+    annual = monthly * 12
+    gross = monthly.sum(axis=1)
+    total = gross + pf
+
+    table = {}
+    for i, component in enumerate(COMPONENT_NAMES):
+        table[f'{component}_monthly'] = monthly[:, i]
+        table[f'{component}_annual'] = annual[:, i]
+    table.update({
+        'gross_ctc_monthly': gross,
+        'gross_ctc_annual': gross * 12,
+        'pf_contribution_monthly': pf,
+        'pf_contribution_annual': pf * 12,
+        'total_ctc_monthly': total,
+        'total_ctc_annual': total * 12,
+    })
+    return table
+
+def salary_rows(table):
+    """One salary_data dict (plain ints) per candidate from a salary_table"""
+    columns = [table[key].tolist() for key in SALARY_KEYS]
+    return [dict(zip(SALARY_KEYS, values)) for values in zip(*columns)]
+
+def monthly_arrays(records):
+    """(monthly, pf) arrays for salary_table from candidate records (missing amounts use the defaults)
+
+    Raises ValueError if an amount is not a whole number.
+    """
+    monthly = np.array(
+        [[int(r.get(c) if r.get(c) not in (None, "") else default) for c, default in SALARY_COMPONENTS.items()]
+         for r in records],
+        dtype=np.int64
+    ).reshape(-1, len(COMPONENT_NAMES))
+    pf = np.array(
+        [int(r.get("pf_contribution") if r.get("pf_contribution") not in (None, "") else DEFAULT_PF_CONTRIBUTION)
+         for r in records],
+        dtype=np.int64
+    )
+    return monthly, pf
+
+def benchmark(count=10000, seed=42):
+    """Time build_salary_data per candidate against salary_table for count candidates
+
+    Returns seconds for each path, candidates per second and whether both
+    produced identical breakdowns.
+    """
+    rng = random.Random(seed)
+    monthly = [[rng.randrange(0, 200000) for _ in COMPONENT_NAMES] for _ in range(count)]
+    pf = [rng.choice((0, 1800)) for _ in range(count)]
+
+    started = time.perf_counter()
+    scalar = [build_salary_data(dict(zip(COMPONENT_NAMES, row)), p) for row, p in zip(monthly, pf)]
+    scalar_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    table = salary_table(monthly, pf)
+    table_seconds = time.perf_counter() - started
+    vectorized = salary_rows(table)
+    rows_seconds = time.perf_counter() - started
+
+    return {
+        'candidates': count,
+        'scalar_seconds': scalar_seconds,
+        'vectorized_seconds': table_seconds,
+        'vectorized_with_rows_seconds': rows_seconds,
+        'speedup': scalar_seconds / table_seconds if table_seconds else 0.0,
+        'identical': scalar == vectorized,
+    }
+
+def _round(values):
+    """Round half up to whole rupees"""
+    return np.floor(values + 0.5).astype(np.int64)
+
+def solve_ctc(target_annual_ctc, policy=None):
+    """Integer-rupee salary breakdowns for target annual CTCs, one vectorized pass for all targets
+
+    Monthly components are whole rupees, so the annual total is a multiple of
+    12: each target is met exactly when it is one, otherwise to within the
+    remainder (under ₹12 a year, reported per target). Basic is a percentage
+    of CTC, HRA a percentage of Basic, PF a percentage of Basic up to a cap,
+    the fixed reimbursements come from the policy and Special Allowance is
+    the balancing figure. When a target is too low for that, the fixed
+    reimbursements are reduced, last first.
+
+    Returns a salary_table dict of arrays plus 'target_annual_ctc',
+    'remainder_annual' and 'feasible' (False where even Basic, HRA and PF
+    exceed the target).
+    """
+    policy = policy or SALARY_POLICY
+    unknown = set(policy.get("fixed_monthly", {})) - set(COMPONENT_NAMES)
+    if unknown:
+        raise ValueError(f"Unknown fixed salary components: {', '.join(sorted(unknown))}")
+
+    target = np.asarray(target_annual_ctc, dtype=np.int64).reshape(-1)
+    total_monthly = target // 12
+    basic = _round(total_monthly * (policy["basic_percent_of_ctc"] / 100))
+    hra = _round(basic * (policy["hra_percent_of_basic"] / 100))
+    pf = np.minimum(_round(basic * (policy["pf_percent_of_basic"] / 100)), policy["pf_cap_monthly"])
+
+    monthly = np.zeros((len(target), len(COMPONENT_NAMES)), dtype=np.int64)
+    monthly[:, COMPONENT_NAMES.index('basic_salary')] = basic
+    monthly[:, COMPONENT_NAMES.index('hra')] = hra
+    for component, amount in policy.get("fixed_monthly", {}).items():
+        monthly[:, COMPONENT_NAMES.index(component)] = amount
+
+    special = COMPONENT_NAMES.index('special_allowance')
+    balance = total_monthly - monthly.sum(axis=1) - pf
+    deficit = np.maximum(-balance, 0)
+    for component in reversed(list(policy.get("fixed_monthly", {}))):
+        column = COMPONENT_NAMES.index(component)
+        cut = np.minimum(deficit, monthly[:, column])
+        monthly[:, column] -= cut
+        deficit -= cut
+    monthly[:, special] = np.maximum(balance, 0)
+
+    table = salary_table(monthly, pf)
+    table.update({
+        'target_annual_ctc': target,
+        'remainder_annual': target - table['total_ctc_annual'],
+        'feasible': (deficit == 0) & (target >= 0),
+    })
+    return table
+
+def solve_ctc_one(target_annual_ctc, policy=None):
+    """salary_data for one target annual CTC (raises InvalidCandidateError if the policy cannot meet it)"""
+    table = solve_ctc([target_annual_ctc], policy)
+    if not table['feasible'][0]:
+        raise InvalidCandidateError(
+            f"A CTC of {int(target_annual_ctc):,} is too low for the salary policy's Basic, HRA and PF"
+        )
+    return salary_rows(table)[0]
@@ -0,0 +1,279 @@
+"""
+Full-text search over generated letters and sent emails
+
+Every archived letter and every delivered email is indexed as it is produced:
+the HTML is reduced to plain text and stored in data/search.db, with an FTS5
+inverted index over name, position, subject, body and the addresses involved.
+As with the email audit log, documents are handed to a background writer
+thread and inserted in batches, so indexing adds no latency to sends.
+
+Queries are plain words (matched as prefixes, all must appear) and "quoted
+phrases", optionally limited to one field:
+
+    index.search('"relieved from" priya')           # phrase and name anywhere
+    index.search("engineer", field="position", kind="letter")
+
+Letters are indexed once per archived PDF (the same letter downloaded and then
+sent is one document). Letters archived before this index existed have no
+text to index and are not searchable.
+"""
+
+import atexit
+import logging
+import queue
+import re
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from html import unescape
+from html.parser import HTMLParser
+
+from core.paths import data_path
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    ref TEXT,
+    letter_type TEXT,
+    filename TEXT,
+    employee_email TEXT,
+    name TEXT,
+    position TEXT,
+    subject TEXT,
+    body TEXT,
+    people TEXT,
+    created_at REAL NOT NULL,
+    UNIQUE (kind, ref)
+);
+CREATE INDEX IF NOT EXISTS idx_documents_created ON documents (created_at);
+CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+    name, position, subject, body, people,
+    content='documents', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+);
+CREATE TRIGGER IF NOT EXISTS trg_documents_fts_insert AFTER INSERT ON documents
+BEGIN
+    INSERT INTO documents_fts (rowid, name, position, subject, body, people)
+    VALUES (new.id, new.name, new.position, new.subject, new.body, new.people);
+END;
+"""
+
+COLUMNS = ["kind", "ref", "letter_type", "filename", "employee_email", "name", "position", "subject", "body",
+           "people", "created_at"]
+KINDS = ("letter", "email")
+FIELDS = ("name", "position", "subject", "body", "people")
+
+# bm25 weights for name, position, subject, body, people: a hit in a name or
+# subject says more about a document than the same word somewhere in the body
+RANK_WEIGHTS = (8.0, 4.0, 4.0, 1.0, 2.0)
+RANK_WINDOW = 2000
+
+class _TextExtractor(HTMLParser):
+    """Collects the visible text of an HTML document"""
+
+    SKIP = {"style", "script", "head", "title"}
+    BREAKS = {"p", "div", "br", "tr", "li", "h1", "h2", "h3", "h4", "table"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self.skipping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP:
+            self.skipping += 1
+        elif tag in self.BREAKS:
+            self.parts.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP and self.skipping:
+            self.skipping -= 1
+
+    def handle_data(self, data):
+        if not self.skipping:
+            self.parts.append(data)
+
+def html_to_text(html):
+    """Visible text of an HTML letter or email, one paragraph per line"""
+    if not html:
+        return ""
+    if "<" not in html:
+        return unescape(html).strip()
+    extractor = _TextExtractor()
+    extractor.feed(html)
+    extractor.close()
+    lines = (" ".join(line.split()) for line in "".join(extractor.parts).splitlines())
+    return "\n".join(line for line in lines if line)
+
+def fts_query(text, field=None):
+    """FTS5 MATCH expression for a search box entry, or None if it has no terms
+
+    Words become prefix terms and "quoted text" an exact phrase, all of which
+    must match. FTS5 operators typed by the user are treated as plain words.
+    """
+    terms = []
+    for phrase, word in re.findall(r'"([^"]*)"|(\S+)', text or ""):
+        if phrase.strip():
+            terms.append('"' + phrase.replace('"', "") + '"')
+        elif word and re.search(r"\w", word):
+            terms.append('"' + word.replace('"', "") + '"*')
+    if not terms:
+        return None
+    query = " ".join(terms)
+    if field:
+        if field not in FIELDS:
+            raise ValueError(f"field must be one of {', '.join(FIELDS)}, got {field!r}")
+        query = f"{field} : ({query})"
+    return query
+
+class SearchIndex:
+    """Letters and emails with an FTS5 index, written by a background thread in batches"""
+
+    def __init__(self, path=None, batch_size=100, flush_interval=0.5):
+        self.path = path or data_path("search.db")
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue()
+        with closing(self._connect()) as conn:
+            conn.executescript(SCHEMA)
+        self._writer = threading.Thread(target=self._write_loop, name="search-index-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def add(self, kind, html=None, **document):
+        """Queue a letter or email for indexing; html is reduced to text on the writer thread
+
+        Letters pass their archive digest as ref, so indexing the same PDF
+        again is a no-op.
+        """
+        if kind not in KINDS:
+            raise ValueError(f"kind must be one of {', '.join(KINDS)}, got {kind!r}")
+        document.setdefault("created_at", time.time())
+        if document.get("employee_email"):
+            document['employee_email'] = document['employee_email'].strip().lower()
+        self._queue.put((kind, html, document))
+
+    def flush(self):
+        """Wait until every queued document is searchable"""
+        self._queue.join()
+
+    def _row(self, kind, html, document):
+        document = dict(document, kind=kind)
+        if html is not None:
+            document['body'] = html_to_text(html)
+        return tuple(document.get(column) for column in COLUMNS)
+
+    def _write_loop(self):
+        with closing(self._connect()) as conn:
+            while True:
+                batch = [self._queue.get()]
+                deadline = time.monotonic() + self.flush_interval
+                while len(batch) < self.batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(self._queue.get(timeout=remaining))
+                    except queue.Empty:
+                        break
+                try:
+                    rows = [self._row(*item) for item in batch]
+                    conn.execute("BEGIN IMMEDIATE")
+                    conn.executemany(
+                        f"INSERT OR IGNORE INTO documents ({', '.join(COLUMNS)}) "
+                        f"VALUES ({', '.join('?' * len(COLUMNS))})",
+                        rows
+                    )
+                    conn.execute("COMMIT")
+                except Exception:
+                    logger.exception("Could not index %d documents", len(batch))
+                    try:
+                        if conn.in_transaction:
+                            conn.execute("ROLLBACK")
+                    except sqlite3.Error:
+                        logger.exception("Could not roll back the search index write")
+                finally:
+                    for _ in batch:
+                        self._queue.task_done()
+
+    def search(self, text, kind=None, field=None, limit=50):
+        """Best matching documents first, each with a snippet of the matching text (**bold** hits)
+
+        Only the RANK_WINDOW most recent matches are ranked, which keeps words
+        that appear in nearly every document (e.g. "offer") fast to search.
+        """
+        query = fts_query(text, field)
+        if query is None:
+            return []
+        kind_condition = "AND d.kind = :kind" if kind else ""
+        snippet_column = FIELDS.index(field) if field else -1
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                f"""
+                SELECT d.id, d.kind, d.ref, d.letter_type, d.filename, d.employee_email, d.name, d.position,
+                       d.subject, d.people, d.created_at,
+                       snippet(documents_fts, {snippet_column}, '**', '**', ' … ', 16) AS snippet
+                FROM documents_fts JOIN documents d ON d.id = documents_fts.rowid
+                WHERE documents_fts MATCH :query {kind_condition}
+                  AND documents_fts.rowid >= (
+                      SELECT COALESCE(MIN(id), 0) FROM (
+                          SELECT d.id FROM documents_fts JOIN documents d ON d.id = documents_fts.rowid
+                          WHERE documents_fts MATCH :query {kind_condition}
+                          ORDER BY documents_fts.rowid DESC LIMIT :window))
+                ORDER BY bm25(documents_fts, {', '.join(map(str, RANK_WEIGHTS))}) LIMIT :limit
+                """,
+                {'query': query, 'kind': kind, 'window': RANK_WINDOW, 'limit': limit}
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def document(self, document_id):
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT * FROM documents WHERE id = ?", (document_id,)).fetchone()
+        return dict(row) if row else None
+
+    def count(self):
+        """Documents indexed, by kind"""
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT kind, COUNT(*) FROM documents GROUP BY kind").fetchall()
+        counts = dict.fromkeys(KINDS, 0)
+        counts.update({kind: count for kind, count in rows})
+        return counts
+
+    def optimize(self):
+        """Merge the index segments (worth running after large imports; searches stay correct without it)"""
+        self.flush()
+        with closing(self._connect()) as conn:
+            conn.execute("INSERT INTO documents_fts (documents_fts) VALUES ('optimize')")
+
+_search_index = None
+_search_index_lock = threading.Lock()
+
+def get_search_index():
+    """The process-wide search index (created on first use, flushed at exit)"""
+    global _search_index
+    with _search_index_lock:
+        if _search_index is None:
+            _search_index = SearchIndex()
+            atexit.register(_search_index.flush)
+        return _search_index
+
+def index_letter(digest, letter_type, filename, html=None, name=None, position=None, subject=None,
+                 employee_email=None, recipient=None):
+    """Index an archived letter; an indexing failure is logged, never raised"""
+    try:
+        get_search_index().add(
+            "letter", html, ref=digest, letter_type=letter_type, filename=filename, employee_email=employee_email,
+            name=name, position=position, subject=subject,
+            people=" ".join(sorted({e for e in (employee_email, recipient) if e}))
+        )
+    except Exception:
+        logger.exception("Could not index the letter %s", filename)
@@ -0,0 +1,68 @@
+"""
+Spooled temporary files for rendered PDFs and outgoing email
+
+A spooled file stays in memory until it grows past
+config.SPOOL_MAX_MEMORY_BYTES and then moves to a temporary file in the data
+directory, so a large letter or bundle is never held in memory whole. The
+helpers below accept either bytes or a binary file wherever a document is
+passed around (mailer attachments, archive puts).
+"""
+
+import hashlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+
+import config
+from core.paths import data_path
+
+CHUNK_SIZE = 64 * 1024
+
+def spooled_file(max_size=None):
+    """Empty binary SpooledTemporaryFile that rolls over to disk above max_size bytes"""
+    directory = data_path("spool")
+    os.makedirs(directory, exist_ok=True)
+    max_size = config.SPOOL_MAX_MEMORY_BYTES if max_size is None else max_size
+    return tempfile.SpooledTemporaryFile(max_size=max_size, mode="w+b", dir=directory)
+
+def as_file(data):
+    """A binary file for bytes (without copying them), or the file itself"""
+    return io.BytesIO(data) if isinstance(data, (bytes, bytearray, memoryview)) else data
+
+def iter_chunks(f, chunk_size=CHUNK_SIZE, close=False):
+    """Yield the rest of a binary file in chunks (closing it afterwards if close)"""
+    try:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            yield chunk
+    finally:
+        if close:
+            f.close()
+
+def copy_data(data, out):
+    """Write bytes, or a binary file from its start, to out"""
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        out.write(data)
+    else:
+        data.seek(0)
+        shutil.copyfileobj(data, out, CHUNK_SIZE)
+
+def data_digest(data):
+    """(sha256 hex digest, size in bytes) of bytes or a binary file, read from its start"""
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        return hashlib.sha256(data).hexdigest(), len(data)
+    digest, size = hashlib.sha256(), 0
+    data.seek(0)
+    for chunk in iter_chunks(data):
+        digest.update(chunk)
+        size += len(chunk)
+    data.seek(0)
+    return digest.hexdigest(), size
+
+def peak_rss_bytes():
+    """Peak resident memory of this process, for the memory benchmarks (needs the resource module)"""
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # kilobytes everywhere but macOS
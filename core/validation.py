@@ -0,0 +1,56 @@
+"""
+Input validation shared by the UI and the API
+"""
+
+from email_validator import validate_email as email_validate, EmailNotValidError
+
+try:
+    from email_validator.syntax import validate_email_local_part
+except ImportError:  # Not part of email-validator's public API; fall back to full checks
+    validate_email_local_part = None
+
+# Email validation function using email-validator
+def validate_email(email, check_deliverability=True):
+    try:
+        # Validate and get info about the email
+        email_validate(email, check_deliverability=check_deliverability)
+        return True
+    except EmailNotValidError:
+        return False
+
+def email_error(email, check_deliverability=False):
+    """Why an address is invalid, or None if it is valid"""
+    try:
+        email_validate(email, check_deliverability=check_deliverability)
+        return None
+    except EmailNotValidError as e:
+        return str(e)
+
+def email_errors(emails, check_deliverability=False, domain_cache=None):
+    """email_error for many addresses, checking each distinct domain only once
+
+    Domain checks (IDNA, and DNS with check_deliverability) dominate the cost,
+    and bulk lists share a handful of domains. Pass the same domain_cache dict
+    to reuse domain results across calls.
+    """
+    domain_cache = {} if domain_cache is None else domain_cache
+    errors = []
+    for email in emails:
+        local, at, domain = email.rpartition("@")
+        if validate_email_local_part is None or not local or len(email) > 254:
+            errors.append(email_error(email, check_deliverability))
+            continue
+        if domain not in domain_cache:
+            domain_cache[domain] = email_error(f"postmaster@{domain}", check_deliverability)
+        error = domain_cache[domain]
+        if error is None:
+            try:
+                validate_email_local_part(local)
+            except EmailNotValidError as e:
+                error = str(e)
+        errors.append(error)
+    return errors
+
+def parse_cc_list(cc_emails):
+    """Parse a one-address-per-line text area into a list of valid addresses"""
+    return [email.strip() for email in cc_emails.split('\n') if email.strip() and validate_email(email.strip())]
@@ -0,0 +1,121 @@
+"""
+Startup health checks and cache prewarming
+
+run.py runs these stages concurrently before launching Streamlit so that
+missing dependencies or PDF backends are reported up front and the first HR
+user does not pay for font discovery, asset encoding, template compilation
+and the first PDF render.
+"""
+
+import importlib.util
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+import config
+from core.paths import resolve_path
+
+REQUIRED_MODULES = ["streamlit", "jinja2", "pdfkit", "weasyprint", "email_validator", "dotenv"]
+REQUIRED_IMAGES = [config.HEADER_IMAGE_PATH, config.FOOTER_IMAGE_PATH, config.SIGNATURE_IMAGE_PATH]
+
+class StageFailed(Exception):
+    """A startup stage found a problem; the message is shown to the user"""
+
+def check_dependencies():
+    missing = [m for m in REQUIRED_MODULES if importlib.util.find_spec(m) is None]
+    if missing:
+        raise StageFailed(f"Missing dependencies: {', '.join(missing)}")
+    return f"{len(REQUIRED_MODULES)} packages installed"
+
+def check_images():
+    missing = [img for img in REQUIRED_IMAGES if not os.path.exists(resolve_path(img))]
+    if missing:
+        raise StageFailed("Missing image files: " + ", ".join(missing))
+    return f"{len(REQUIRED_IMAGES)} images found"
+
+def check_pdf_backends():
+    """At least one of wkhtmltopdf (pdfkit) and weasyprint must work"""
+    backends = []
+    if shutil.which("wkhtmltopdf"):
+        backends.append("wkhtmltopdf")
+    try:
+        import weasyprint
+        backends.append(f"weasyprint {weasyprint.__version__}")
+    except Exception:
+        pass  # Import errors (missing Pango etc.) mean the backend is unusable
+
+    if not backends:
+        raise StageFailed("No PDF backend available (install wkhtmltopdf or weasyprint's system libraries)")
+    return ", ".join(backends)
+
+def prewarm_assets():
+    from core.generators import get_base64_image
+
+    encoded = sum(len(get_base64_image(img)) for img in REQUIRED_IMAGES)
+    return f"{encoded / 1024:,.0f} KB of images encoded"
+
+def prewarm_templates():
+    from core.generators import compile_appointment_template
+
+    parts = compile_appointment_template()
+    return f"appointment letter compiled ({sum(map(len, parts)) / 1024:,.0f} KB in {len(parts)} pages)"
+
+def prewarm_sample_render():
+    """Render a sample certificate: loads the PDF backend and discovers fonts"""
+    from core.generators import generate_experience_letter
+    from core.pdf_cache import render_pdf_cached
+
+    html = generate_experience_letter("Mr. Sample Employee", "Software Engineer",
+                                      date(2024, 1, 1), date(2025, 1, 1))
+    return f"{len(render_pdf_cached(html)) / 1024:,.0f} KB sample PDF"
+
+def prewarm_appointment_pages():
+    """Render a sample appointment letter, which caches the static pages every appointment letter reuses"""
+    from core.generators import generate_appointment_letter
+    from core.pdf_cache import render_pdf_cached
+    from core.pdf_size import letter_preset
+
+    html = generate_appointment_letter("Sample Employee", "Software Engineer", date(2024, 1, 1))
+    return f"{len(render_pdf_cached(html, letter_preset('appointment'))) / 1024:,.0f} KB sample appointment letter"
+
+CHECK_STAGES = [
+    ("Dependencies", check_dependencies),
+    ("Images", check_images),
+    ("PDF backends", check_pdf_backends),
+]
+PREWARM_STAGES = [
+    ("Asset cache", prewarm_assets),
+    ("Templates", prewarm_templates),
+    ("Sample render", prewarm_sample_render),
+    ("Appointment pages", prewarm_appointment_pages),
+]
+# Stages whose results live in the shared on-disk PDF cache
+DISK_STAGES = (prewarm_sample_render, prewarm_appointment_pages)
+
+def run_stage(name, func):
+    started = time.perf_counter()
+    try:
+        detail, ok = func(), True
+    except StageFailed as e:
+        detail, ok = str(e), False
+    except Exception as e:
+        detail, ok = f"{type(e).__name__}: {e}", False
+    return {'name': name, 'ok': ok, 'detail': detail, 'seconds': time.perf_counter() - started}
+
+def run_stages(stages):
+    """Run (name, func) stages concurrently; returns results in stage order plus wall time"""
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(stages)) as executor:
+        futures = [executor.submit(run_stage, name, func) for name, func in stages]
+        results = [f.result() for f in futures]
+    return results, time.perf_counter() - started
+
+def prewarm_process():
+    """Fill this process's in-memory caches (called once per Streamlit server process)
+
+    The sample renders are skipped: their results live in the shared on-disk
+    cache, which run.py has already warmed.
+    """
+    return [run_stage(name, func) for name, func in PREWARM_STAGES if func not in DISK_STAGES]
@@ -0,0 +1,273 @@
+"""
+Shared pool of PDF render worker processes
+
+Documents that belong together (e.g. the letters of a candidate packet, see
+core/packet.py) are rendered side by side in worker processes, and the app
+renders in the pool so its script run stays interactive. The pool is created
+on first use and shared by everything in the process: Streamlit sessions and
+the API's send worker. Workers are started with "spawn", as forking a
+process that runs server threads is unsafe.
+
+Every render is a RenderJob with limits enforced inside its worker:
+config.RENDER_TIMEOUT_SECONDS of wall-clock time and
+config.RENDER_CPU_LIMIT_SECONDS of CPU time, after which it fails with
+RenderTimeoutError, and cancel() stops it with RenderCancelledError (the
+worker polls a marker file in the data directory). A worker that stops
+responding altogether is killed, with its pool, once the job is well past
+its deadline. Workers run with config.RENDER_MEMORY_LIMIT_MB of memory at a
+lower CPU priority, and are replaced after config.RENDER_WORKER_MAX_JOBS
+renders or once one grows past config.RENDER_WORKER_MAX_RSS_MB. Time and CPU
+limits need POSIX signals; elsewhere only the pool-level deadline applies.
+
+Renders go through the on-disk PDF cache (core/pdf_cache.py), so a document
+rendered by a worker is reused by every other process.
+"""
+
+import logging
+import multiprocessing
+import os
+import signal
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+
+import config
+from core.errors import PdfRenderError, RenderCancelledError, RenderTimeoutError
+from core.paths import data_path
+from core.renderer import limit_process, set_soft_limit
+
+logger = logging.getLogger(__name__)
+
+# How often a worker checks its job's deadline and cancel marker
+CHECK_INTERVAL_SECONDS = 0.25
+# How long past its deadline a job may go unanswered before its pool is killed
+KILL_GRACE_SECONDS = 10
+
+_pool = None
+_pool_jobs = 0
+_pool_lock = threading.Lock()
+
+def init_worker():
+    """Initializer for render and batch worker processes: lower CPU priority and a memory limit"""
+    if hasattr(os, "nice") and config.RENDER_WORKER_NICE:
+        os.nice(config.RENDER_WORKER_NICE)
+    limit_process(memory_mb=config.RENDER_MEMORY_LIMIT_MB)
+
+def current_rss_bytes():
+    """Resident memory of this process (its peak where the current size is not available)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+@contextmanager
+def job_limits(timeout=None, cpu_seconds=None, cancel_path=None):
+    """Raise RenderTimeoutError or RenderCancelledError inside the block once a limit is hit (POSIX only)
+
+    Must run in the process's main thread, as render workers do.
+    """
+    if not hasattr(signal, "setitimer"):
+        yield
+        return
+    import resource
+
+    deadline = time.monotonic() + timeout if timeout else None
+
+    def check(signum, frame):
+        if deadline and time.monotonic() > deadline:
+            raise RenderTimeoutError(f"PDF rendering took longer than {timeout}s and was stopped")
+        if cancel_path and os.path.exists(cancel_path):
+            raise RenderCancelledError("PDF rendering was cancelled")
+
+    def out_of_cpu(signum, frame):
+        raise RenderTimeoutError(f"PDF rendering used more than {cpu_seconds}s of CPU time and was stopped")
+
+    previous_alarm = signal.signal(signal.SIGALRM, check)
+    previous_xcpu = signal.signal(signal.SIGXCPU, out_of_cpu)
+    previous_cpu_limit = resource.getrlimit(resource.RLIMIT_CPU)[0]
+    if cpu_seconds:
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        set_soft_limit(resource.RLIMIT_CPU, int(usage.ru_utime + usage.ru_stime + cpu_seconds) + 1)
+    signal.setitimer(signal.ITIMER_REAL, CHECK_INTERVAL_SECONDS, CHECK_INTERVAL_SECONDS)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        set_soft_limit(resource.RLIMIT_CPU, previous_cpu_limit)
+        signal.signal(signal.SIGALRM, previous_alarm)
+        signal.signal(signal.SIGXCPU, previous_xcpu)
+
+def render_cached(html_content, preset=None, cancel_path=None, timeout=None, cache_only=False):
+    """Worker entry point: (pdf bytes, seconds, worker RSS bytes) of render_pdf_cached within the job limits
+
+    With cache_only, the render only goes into the PDF cache and None is returned in place of the bytes.
+    """
+    from core.pdf_cache import cache_pdf, render_pdf_cached
+
+    started = time.perf_counter()
+    try:
+        with job_limits(timeout or config.RENDER_TIMEOUT_SECONDS, config.RENDER_CPU_LIMIT_SECONDS, cancel_path):
+            pdf_bytes = cache_pdf(html_content, preset) if cache_only else render_pdf_cached(html_content, preset)
+    except MemoryError:
+        raise PdfRenderError(f"PDF rendering needed more than {config.RENDER_MEMORY_LIMIT_MB} MB of memory")
+    finally:
+        if cancel_path:
+            try:
+                os.remove(cancel_path)
+            except FileNotFoundError:
+                pass
+    return pdf_bytes, time.perf_counter() - started, current_rss_bytes()
+
+def get_pool():
+    """The process's render pool (config.RENDER_POOL_WORKERS workers), started on first use"""
+    global _pool, _pool_jobs
+    with _pool_lock:
+        if _pool is None:
+            options = {}
+            if sys.version_info >= (3, 11):
+                options['max_tasks_per_child'] = config.RENDER_WORKER_MAX_JOBS
+            _pool = ProcessPoolExecutor(max_workers=config.RENDER_POOL_WORKERS, initializer=init_worker,
+                                        mp_context=multiprocessing.get_context("spawn"), **options)
+            _pool_jobs = 0
+        return _pool
+
+def recycle_pool(pool, kill=False):
+    """Start the next render in a new pool; the old one finishes its jobs and exits (or is killed)"""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    if kill:
+        # ProcessPoolExecutor cannot stop a running job, so stop the worker processes themselves
+        for process in list((getattr(pool, "_processes", None) or {}).values()):
+            process.kill()
+    pool.shutdown(wait=False)
+
+def shutdown_pool():
+    """Stop the render pool's workers once their jobs are done, e.g. before a short-lived process exits"""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown()
+
+def _job_finished(pool, rss_bytes):
+    """Recycle the pool once a worker has grown too large, or (before Python 3.11) after enough jobs"""
+    global _pool_jobs
+    with _pool_lock:
+        _pool_jobs += 1
+        jobs = _pool_jobs
+    if rss_bytes > config.RENDER_WORKER_MAX_RSS_MB * 1024 * 1024:
+        logger.info("A render worker uses %d MB, recycling the render pool", rss_bytes // (1024 * 1024))
+        recycle_pool(pool)
+    elif sys.version_info < (3, 11) and jobs >= config.RENDER_WORKER_MAX_JOBS * config.RENDER_POOL_WORKERS:
+        recycle_pool(pool)
+
+class RenderJob:
+    """A PDF render submitted to the pool (see submit_render)"""
+
+    def __init__(self, html_content, preset=None, timeout=None, cache_only=False):
+        self.id = uuid.uuid4().hex
+        self.timeout = timeout or config.RENDER_TIMEOUT_SECONDS
+        directory = data_path("render_jobs")
+        os.makedirs(directory, exist_ok=True)
+        self.cancel_path = os.path.join(directory, f"{self.id}.cancel")
+        self.started = time.monotonic()
+        self.seconds = None
+        self._running_since = None
+        task = (render_cached, html_content, preset, self.cancel_path, self.timeout, cache_only)
+        self._pool = get_pool()
+        try:
+            self._future = self._pool.submit(*task)
+        except RuntimeError:
+            # The pool broke (BrokenProcessPool) or was recycled meanwhile: submit to its replacement
+            recycle_pool(self._pool)
+            self._pool = get_pool()
+            self._future = self._pool.submit(*task)
+
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    def done(self):
+        return self._future.done()
+
+    def cancel(self):
+        """Stop the render: drop it if it has not started, or tell its worker to stop"""
+        if self._future.cancel() or self._future.done():
+            return
+        with open(self.cancel_path, "w"):
+            pass
+
+    def _overdue(self):
+        """Whether the job has run well past its deadline without its worker stopping it"""
+        if self._running_since is None:
+            if not self._future.running():
+                return False  # Still waiting for a free worker
+            self._running_since = time.monotonic()
+        return time.monotonic() - self._running_since > self.timeout + KILL_GRACE_SECONDS
+
+    def result(self, timeout=None):
+        """The PDF bytes (raises PdfRenderError, RenderTimeoutError or RenderCancelledError)
+
+        A cache_only job returns None. With timeout, raises
+        concurrent.futures.TimeoutError if the render is still running after
+        that many seconds, so callers can poll.
+        """
+        until = None if timeout is None else time.monotonic() + timeout
+        while True:
+            self._overdue()  # Notes when the job starts running
+            wait = 1.0 if until is None else max(0.0, min(1.0, until - time.monotonic()))
+            try:
+                pdf_bytes, self.seconds, rss_bytes = self._future.result(wait)
+                break
+            except CancelledError:
+                raise RenderCancelledError("PDF rendering was cancelled")
+            except FuturesTimeoutError:
+                if self._overdue():
+                    logger.warning("Render job %s stopped responding, killing the render pool", self.id)
+                    recycle_pool(self._pool, kill=True)
+                    raise RenderTimeoutError(f"PDF rendering took longer than {self.timeout}s and was stopped")
+                if until is not None and time.monotonic() >= until:
+                    raise
+            except BrokenProcessPool as e:
+                logger.warning("A render worker died, restarting the render pool: %s", e)
+                recycle_pool(self._pool)
+                raise PdfRenderError(f"A PDF render worker stopped unexpectedly: {e}") from e
+        _job_finished(self._pool, rss_bytes)
+        return pdf_bytes
+
+def submit_render(html_content, preset=None, timeout=None, cache_only=False):
+    """Start rendering HTML to PDF (through the PDF cache) in the render pool; returns its RenderJob
+
+    timeout is the job's wall-clock limit in seconds (default: config.RENDER_TIMEOUT_SECONDS).
+    With cache_only, the PDF is only written to the PDF cache, e.g. for
+    streaming it from there, and never passed back to this process.
+    """
+    return RenderJob(html_content, preset, timeout, cache_only)
+
+def render_all(documents):
+    """Render (html, preset) pairs concurrently in the pool (raises PdfRenderError)
+
+    Returns a (pdf bytes, seconds) pair per document, in order; seconds is
+    the document's own render time inside its worker. If one document fails,
+    the others are cancelled.
+    """
+    jobs = [submit_render(html, preset) for html, preset in documents]
+    try:
+        return [(job.result(), job.seconds) for job in jobs]
+    except BaseException:
+        for job in jobs:
+            job.cancel()
+        raise
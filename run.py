@@ -1,65 +1,559 @@
 #!/usr/bin/env python3
 """
 Launcher script for Rapid Innovation Onboarding Automation System
+
+    python run.py                                 # start the Streamlit app
+    python run.py batch candidates.csv -o output  # generate letters headlessly
+    python run.py api --workers 4                 # start the HTTP API service
+    python run.py import new_hires.xlsx           # bulk import new hires into the employee records
+    python run.py revisions pay.xlsx --send       # salary revision letters, queued for sending
+    python run.py export --letter offer -o q1.zip # ZIP of letters for employees in a date range
+    python run.py packet --name "John Doe" ...    # offer + appointment + welcome for one hire, timed per stage
+    python run.py archive pack|reindex|bench      # maintain the letter archive's pack files
+    python run.py salary bench                    # time the vectorized salary engine
+    python run.py salary solve plan.csv           # salary breakdowns for a hiring plan's target CTCs
+    python run.py pdf bench -n 200                # PDFs/sec one at a time vs in one render session
+    python run.py pdf sizes                       # PDF size of each letter with each size preset
+    python run.py pdf memory --size-mb 50         # peak memory of an email attachment in memory vs spooled
 """
 
+import argparse
 import subprocess
 import sys
 import os
 
-def check_dependencies():
-    """Check if required dependencies are installed"""
-    try:
-        import streamlit
-        import jinja2
-        print("✅ All dependencies are installed!")
-        return True
-    except ImportError as e:
-        print(f"❌ Missing dependency: {e}")
+def print_stage_results(results, elapsed):
+    for r in results:
+        icon = "✅" if r['ok'] else "⚠️ "
+        print(f"{icon} {r['name']:<14} {r['seconds']:6.2f}s  {r['detail']}")
+    print(f"⏱️  {elapsed:.2f}s total ({sum(r['seconds'] for r in results):.2f}s if run one after another)")
+
+def run_startup_checks(prewarm=True):
+    """Run health checks concurrently, then prewarm the caches; returns False if the app cannot start"""
+    from core.warmup import CHECK_STAGES, PREWARM_STAGES, run_stages
+
+    results, elapsed = run_stages(CHECK_STAGES)
+    if not results[0]['ok']:
+        print(f"❌ {results[0]['detail']}")
         print("Installing dependencies...")
-        subprocess.check_call([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"])
-        return True
-
-def check_images():
-    """Check if required images exist"""
-    required_images = [
-        "images/Rapid Innovation Header (1).png",
-        "images/footer (1) copy (1) copy.png", 
-        "images/Aarushi.sign.png"
-    ]
-    
-    missing_images = []
-    for img in required_images:
-        if not os.path.exists(img):
-            missing_images.append(img)
-    
-    if missing_images:
-        print("⚠️  Warning: Missing image files:")
-        for img in missing_images:
-            print(f"   - {img}")
+        try:
+            subprocess.check_call([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"])
+        except subprocess.CalledProcessError:
+            return False
+        results, elapsed = run_stages(CHECK_STAGES)
+    print_stage_results(results, elapsed)
+
+    failed = {r['name'] for r in results if not r['ok']}
+    if "Images" in failed:
         print("The application will still work, but documents may not display properly.")
-        return False
-    else:
-        print("✅ All required images found!")
-        return True
+    if "PDF backends" in failed:
+        print("Documents can be generated as HTML, but PDF downloads will fail.")
+
+    if prewarm and "PDF backends" not in failed:
+        print("🔥 Prewarming caches...")
+        print_stage_results(*run_stages(PREWARM_STAGES))
+    return "Dependencies" not in failed
+
+def run_batch(args):
+    """Generate letters for every candidate in a CSV/JSON file without the UI"""
+    from core.batch import load_candidates, run_batch as generate_batch
+
+    print("📄 Rapid Innovation - Batch Letter Generation")
+    print("=" * 60)
+
+    try:
+        candidates = load_candidates(args.input)
+    except (OSError, ValueError) as e:
+        print(f"❌ Could not read candidates: {e}")
+        return 1
+
+    print(f"📋 {len(candidates)} candidates from {args.input}")
+    print(f"📁 Output directory: {args.output}")
+
+    def progress(result):
+        if not result['ok']:
+            print(f"   ❌ #{result['index']} {result['name']}: {result['error']}")
+        elif args.verbose:
+            print(f"   ✅ #{result['index']} {result['path']} ({result['seconds']:.2f}s)")
+
+    stats = generate_batch(candidates, args.output, workers=args.workers,
+                           output_format=args.format, progress=progress, session=not args.no_session)
+
+    print("=" * 60)
+    print(f"✅ Generated {stats['succeeded']}/{stats['total']} documents "
+          f"with {stats['workers']} worker(s) in {stats['elapsed_seconds']:.2f}s")
+    for letter, count in sorted(stats['by_letter'].items()):
+        print(f"   - {letter}: {count}")
+    print(f"⚡ Throughput: {stats['documents_per_second']:.1f} documents/sec "
+          f"({stats['bytes_written'] / 1024 / 1024:.1f} MB written)")
+    print(f"⏱️  CPU time: {stats['html_seconds']:.2f}s building HTML, "
+          f"{stats['pdf_seconds']:.2f}s rendering {args.format.upper()}")
+    if stats['failed']:
+        print(f"⚠️  {len(stats['failed'])} candidate(s) failed, see messages above")
+        return 1
+    return 0
+
+def run_import(args):
+    """Stream new hires from a CSV/XLSX file into the employee records"""
+    from core.employees import EmployeeStore
+    from core.errors import ImportFileError
+    from core.importer import run_import as import_hires
+
+    print("📥 Rapid Innovation - Bulk Import of New Hires")
+    print("=" * 60)
+
+    def progress(stats):
+        print(f"   ... {stats['rows']:,} rows read, {stats['imported']:,} imported, {stats['rejected']:,} rejected")
+
+    try:
+        with open(args.rejects, "w", encoding="utf-8", newline="") as report:
+            stats = import_hires(args.input, EmployeeStore(), batch_size=args.batch_size, report=report,
+                                 check_deliverability=args.check_domains,
+                                 progress=progress if args.verbose else None)
+    except (OSError, ImportFileError) as e:
+        print(f"❌ Could not import {args.input}: {e}")
+        return 1
+
+    print("=" * 60)
+    print(f"✅ Imported {stats['imported']:,}/{stats['rows']:,} rows in {stats['batches']} batches "
+          f"in {stats['elapsed_seconds']:.2f}s ({stats['rows_per_second']:,.0f} rows/sec)")
+    try:
+        import resource
+        print(f"🧠 Peak memory: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:,.0f} MB")
+    except ImportError:
+        pass  # Not available on Windows
+    if stats['rejected']:
+        reasons = ", ".join(f"{field}: {count}" for field, count in sorted(stats['reasons'].items()))
+        print(f"⚠️  {stats['rejected']:,} rows rejected ({reasons}), see {args.rejects}")
+        return 1
+    return 0
+
+def run_revisions(args):
+    """Render salary revision letters from a compensation spreadsheet and optionally queue them for sending"""
+    import time
+    from core.errors import ImportFileError
+    from core.revisions import run_revisions as render_revisions
+
+    print("📈 Rapid Innovation - Salary Revision Letters")
+    print("=" * 60)
+    started = time.perf_counter()
+    done = 0
+
+    def progress(result):
+        nonlocal done
+        done += 1
+        if not result['ok']:
+            print(f"❌ Row {result['row']} ({result['name'] or '?'}): {result['error']}")
+        elif args.verbose:
+            print(f"✅ {result['path']} ({result['seconds']:.2f}s)")
+        elif done % 50 == 0:
+            elapsed = time.perf_counter() - started
+            print(f"   ... {done:,} letters in {elapsed:.1f}s ({done / elapsed:.1f}/sec)")
+
+    try:
+        stats = render_revisions(args.input, args.output, workers=args.workers, send=args.send, cc=args.cc,
+                                 progress=progress)
+    except (OSError, ImportFileError) as e:
+        print(f"❌ Could not read {args.input}: {e}")
+        return 1
+
+    print("=" * 60)
+    print(f"✅ {stats['succeeded']}/{stats['total']} letters written to {args.output}/ "
+          f"in {stats['elapsed_seconds']:.2f}s with {stats['workers']} workers")
+    print(f"⚡ Throughput: {stats['documents_per_second']:.1f} letters/sec "
+          f"({stats['bytes_written'] / 1024 / 1024:.1f} MB written, "
+          f"salary breakdowns in {stats['breakdown_seconds'] * 1000:.0f} ms)")
+    if args.send:
+        print(f"📬 {stats['queued']} letters queued for sending; the API's send workers deliver them "
+              f"(python run.py api), track them with GET /jobs/<id>")
+    if stats['failed']:
+        print(f"⚠️  {len(stats['failed'])} row(s) failed, see messages above")
+        return 1
+    return 0
+
+def run_packet(args):
+    """Render a full-time hire's candidate packet, then send it, queue its staged schedule or just write it"""
+    import time
+    from core.errors import OnboardingError
+    from core.jobs import JobQueue
+    from core.mailer import email_config_from_env
+    from core.packet import PACKET_LETTERS, build_packet, combine_packet, schedule_packet, send_packet, stage_summary
+
+    print("📦 Rapid Innovation - Candidate Packet")
+    print("=" * 60)
+    candidate = {'name': args.name, 'position': args.position, 'start_date': args.start_date, 'ctc': args.ctc}
+    try:
+        packet = build_packet(candidate, args.joining_form_url)
+        os.makedirs(args.output, exist_ok=True)
+        for letter in PACKET_LETTERS:
+            document = packet['letters'][letter]
+            with open(os.path.join(args.output, document['filename']), "wb") as f:
+                f.write(document['pdf'])
+            print(f"📄 {document['filename']} ({len(document['pdf']) / 1024:,.0f} KB, "
+                  f"rendered in {document['render_seconds']:.2f}s)")
+
+        if args.to and args.staged:
+            for item in schedule_packet(JobQueue(), packet, args.to, args.cc, args.welcome_to):
+                when = time.strftime('%Y-%m-%d %H:%M', time.localtime(item['run_at'])) if item['run_at'] else "now"
+                print(f"🗓️  {item['stage']:<12} {when}  (job {item['job_id']})")
+            print("📬 The API's send workers deliver the scheduled emails (python run.py api)")
+        elif args.to:
+            _, _, filename = send_packet(email_config_from_env(), packet, args.to, args.cc, phase="CLI")
+            print(f"📧 Sent to {args.to} with {filename}")
+        else:
+            pdf, filename = combine_packet(packet)
+            with open(os.path.join(args.output, filename), "wb") as f:
+                f.write(pdf)
+            print(f"📎 {filename} ({len(pdf) / 1024:,.0f} KB, both letters)")
+    except OnboardingError as e:
+        print(f"❌ {e}")
+        return 1
+
+    print("=" * 60)
+    print(f"⏱️  {stage_summary(packet)}")
+    return 0
+
+def run_export(args):
+    """Stream a ZIP of letters for the selected employees to a file"""
+    from core.errors import InvalidCandidateError
+    from core.export import export_letters
+
+    print("🗜️  Rapid Innovation - Letter Export")
+    print("=" * 60)
+    field = "exit" if args.letter == "experience" else "joining"
+    print(f"📋 {args.letter} letters, {field} date {args.start or 'any'} to {args.end or 'any'}"
+          f"{f', {args.cohort} cohort' if args.cohort else ''}")
+
+    def progress(row):
+        if row['source'] in ("skipped", "failed"):
+            print(f"   ⚠️  {row['name']} ({row['email']}): {row['source']}, {row['reason']}")
+        elif args.verbose:
+            print(f"   ✅ {row['file']} ({row['source']})")
+
+    try:
+        stats = export_letters(args.output, args.letter, args.start, args.end, args.cohort,
+                               workers=args.workers, progress=progress)
+    except (OSError, InvalidCandidateError) as e:
+        print(f"❌ Could not export letters: {e}")
+        return 1
+
+    print("=" * 60)
+    print(f"✅ {stats['archived'] + stats['rendered']}/{stats['employees']} letters written to {args.output} "
+          f"in {stats['elapsed_seconds']:.2f}s ({stats['bytes'] / 1024 / 1024:.1f} MB)")
+    print(f"   - from the archive: {stats['archived']}")
+    print(f"   - rendered: {stats['rendered']}")
+    try:
+        import resource
+        print(f"🧠 Peak memory: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:,.0f} MB")
+    except ImportError:
+        pass  # Not available on Windows
+    if stats['skipped'] or stats['failed']:
+        print(f"⚠️  {stats['skipped']} skipped, {stats['failed']} failed, see manifest.csv in the ZIP")
+        return 1
+    return 0
+
+def run_archive(args):
+    """Move loose archived PDFs into pack files, rebuild the pack index, or benchmark the two layouts"""
+    from core.packstore import benchmark
+
+    print("🗄️  Rapid Innovation - Letter Archive")
+    print("=" * 60)
+
+    if args.action == "bench":
+        print(f"⏱️  {args.count} documents of ~{args.size // 1024} KB, {args.reads} random reads per layout")
+        results = benchmark(args.count, args.size, args.reads)
+        for name, r in results.items():
+            print(f"📦 {name:<6} write {r['write_seconds']:6.2f}s | {r['reads_per_second']:8,.0f} reads/s | "
+                  f"scan {r['scan_mb_per_second']:7,.0f} MB/s | {r['files']:,} files, "
+                  f"{r['disk_bytes'] / 1024 / 1024:,.1f} MB")
+        return 0
+
+    from config import ARCHIVE_STORAGE
+    from core.archive import LetterArchive
+
+    archive = LetterArchive(storage="packs")
+    try:
+        if args.action == "pack":
+            moved = archive.packs.import_files(archive.files)
+            print(f"✅ Moved {moved:,} PDFs into pack files")
+            if ARCHIVE_STORAGE != "packs":
+                print('⚠️  Set ARCHIVE_STORAGE = "packs" in config.py so new letters are packed too')
+        elif args.action == "reindex":
+            print(f"✅ Rebuilt the pack index: {archive.packs.rebuild_index():,} PDFs")
+
+        stats = archive.packs.stats()
+        print(f"📦 {stats['blobs']:,} PDFs in {stats['packs']} packs, {stats['pack_bytes'] / 1024 / 1024:,.1f} MB")
+    finally:
+        archive.close()
+    return 0
+
+def run_salary(args):
+    """Benchmark the vectorized salary engine, or solve a hiring plan's target CTCs into breakdowns"""
+    import time
+    from core.salary import benchmark
+
+    print("💰 Rapid Innovation - Salary Engine")
+    print("=" * 60)
+
+    if args.action == "solve":
+        import csv
+        from core.batch import load_candidates
+        from core.letters import solve_hiring_plan
+
+        if not args.input:
+            print("❌ solve needs a hiring plan: python run.py salary solve plan.csv")
+            return 1
+        try:
+            candidates = load_candidates(args.input)
+        except (OSError, ValueError) as e:
+            print(f"❌ Could not read {args.input}: {e}")
+            return 1
+        started = time.perf_counter()
+        rows = solve_hiring_plan(candidates)
+        elapsed = time.perf_counter() - started
+
+        fieldnames = []
+        for row in rows:
+            fieldnames.extend(key for key in row if key not in fieldnames)
+        with open(args.output, "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(rows)
+
+        failed = [row for row in rows if row['error']]
+        print(f"✅ {len(rows) - len(failed):,}/{len(rows):,} breakdowns in {elapsed * 1000:.1f} ms, written to {args.output}")
+        for row in failed[:20]:
+            print(f"   ⚠️  {row.get('name') or '?'}: {row['error']}")
+        return 1 if failed else 0
+
+    result = benchmark(args.count)
+    print(f"⏱️  {result['candidates']:,} candidates")
+    print(f"   - per candidate (build_salary_data): {result['scalar_seconds'] * 1000:8.1f} ms")
+    print(f"   - vectorized (salary_table):         {result['vectorized_seconds'] * 1000:8.1f} ms "
+          f"({result['speedup']:.0f}x)")
+    print(f"   - vectorized, as salary_data dicts:  {result['vectorized_with_rows_seconds'] * 1000:8.1f} ms")
+    if not result['identical']:
+        print("❌ The two paths produced different breakdowns")
+        return 1
+    print("✅ Both paths produced identical breakdowns")
+    return 0
+
+def run_pdf(args):
+    """Compare PDF rendering one at a time with one engine session, report PDF sizes per preset, or memory use"""
+    from core.batch import benchmark
+    from core.errors import PdfRenderError
+
+    print("🖨️  Rapid Innovation - PDF Rendering")
+    print("=" * 60)
+
+    if args.action == "sizes":
+        from core.pdf_size import size_report
+
+        try:
+            rows = size_report()
+        except PdfRenderError as e:
+            print(f"❌ {e}")
+            return 1
+        presets = list(rows[0]['sizes']) if rows else []
+        print(f"{'letter':<40}" + "".join(f"{preset:>12}" for preset in presets) + "  in use")
+        for row in rows:
+            original = row['sizes']['original']
+            used = row['sizes'][row['preset']]
+            print(f"{row['filename']:<40}" + "".join(f"{size / 1024:>9,.0f} KB" for size in row['sizes'].values()) +
+                  f"  {row['preset']} ({100 - used * 100 / original:.0f}% smaller)")
+        original = sum(row['sizes']['original'] for row in rows)
+        used = sum(row['sizes'][row['preset']] for row in rows)
+        print(f"📦 Attachments with the configured presets: {used / 1024:,.0f} KB instead of "
+              f"{original / 1024:,.0f} KB ({100 - used * 100 / original:.0f}% smaller)")
+        return 0
+
+    if args.action == "memory":
+        from core.mailer import memory_benchmark
+        from core.pdf_cache import memory_benchmark as download_memory_benchmark
+
+        print(f"🧠 Peak memory of an email with a {args.size_mb} MB attachment")
+        results = memory_benchmark(args.size_mb)
+        if results is None:
+            print("❌ The resource module is not available on this platform")
+            return 1
+        baseline = results['baseline']['peak_rss_bytes']
+        for variant, label in (("bytes", "in memory (build_message)"), ("spooled", "spooled (write_message)")):
+            result = results[variant]
+            print(f"   - {label:<26} {result['peak_rss_bytes'] / 1024 / 1024:7.1f} MB peak "
+                  f"(+{(result['peak_rss_bytes'] - baseline) / 1024 / 1024:.1f} MB over the interpreter), "
+                  f"{result['message_bytes'] / 1024 / 1024:.1f} MB message")
+
+        print(f"🧠 Peak memory of serving a download of {args.copies} appointment letters in one PDF")
+        try:
+            results = download_memory_benchmark(args.copies)
+        except PdfRenderError as e:
+            print(f"❌ {e}")
+            return 1
+        baseline = results['baseline']['peak_rss_bytes']
+        for variant, label in (("bytes", "in memory (PDF bytes)"), ("spooled", "spooled (render_pdf_spooled)")):
+            result = results[variant]
+            print(f"   - {label:<29} {result['peak_rss_bytes'] / 1024 / 1024:7.1f} MB peak "
+                  f"(+{(result['peak_rss_bytes'] - baseline) / 1024 / 1024:.1f} MB over the interpreter), "
+                  f"{result['pdf_bytes'] / 1024 / 1024:.1f} MB PDF")
+        return 0
+
+    print(f"⏱️  {args.count} internship certificates")
+    try:
+        result = benchmark(args.count)
+    except PdfRenderError as e:
+        print(f"❌ {e}")
+        return 1
+    print(f"   - one at a time (render_pdf): {result['single_seconds']:7.2f}s | "
+          f"{result['single_per_second']:6.1f} documents/sec")
+    print(f"   - one session (render_pdfs):  {result['session_seconds']:7.2f}s | "
+          f"{result['session_per_second']:6.1f} documents/sec ({result['speedup']:.1f}x)")
+    print(f"📦 {result['single_bytes'] / 1024 / 1024:.1f} MB vs {result['session_bytes'] / 1024 / 1024:.1f} MB of PDFs")
+    return 0
+
+def run_api(args):
+    """Start the HTTP API service (api.py) under uvicorn"""
+    print("🔌 Starting Rapid Innovation Onboarding API...")
+    print(f"🔗 URL: http://{args.host}:{args.port}  (docs at /docs)")
+    try:
+        subprocess.run([sys.executable, "-m", "uvicorn", "api:app",
+                        "--host", args.host, "--port", str(args.port), "--workers", str(args.workers)])
+    except KeyboardInterrupt:
+        print("\n👋 API stopped by user")
 
 def main():
+    parser = argparse.ArgumentParser(description="Rapid Innovation Onboarding Automation System")
+    subparsers = parser.add_subparsers(dest="command")
+
+    batch_parser = subparsers.add_parser("batch", help="Generate letters for a CSV/JSON list of candidates")
+    batch_parser.add_argument("input", help="CSV or JSON file with one candidate per row")
+    batch_parser.add_argument("-o", "--output", default="output", help="Output directory (default: output)")
+    batch_parser.add_argument("-w", "--workers", type=int, default=None,
+                              help="Worker processes (default: number of CPU cores)")
+    batch_parser.add_argument("--format", choices=["pdf", "html"], default="pdf", help="Output format")
+    batch_parser.add_argument("--no-session", action="store_true",
+                              help="Render each PDF separately instead of a chunk at a time in one engine session")
+    batch_parser.add_argument("-v", "--verbose", action="store_true", help="Print every generated file")
+
+    api_parser = subparsers.add_parser("api", help="Start the HTTP API service")
+    api_parser.add_argument("--host", default="127.0.0.1", help="Bind address (default: 127.0.0.1)")
+    api_parser.add_argument("--port", type=int, default=8000, help="Port (default: 8000)")
+    api_parser.add_argument("--workers", type=int, default=2, help="Worker processes (default: 2)")
+
+    import_parser = subparsers.add_parser("import", help="Bulk import new hires from a CSV/XLSX file")
+    import_parser.add_argument("input", help="CSV or XLSX file with a header row (name, email, ...)")
+    import_parser.add_argument("-b", "--batch-size", type=int, default=500,
+                               help="Rows validated and written per transaction (default: 500)")
+    import_parser.add_argument("--rejects", default="rejected_rows.csv",
+                               help="Report of rejected rows (default: rejected_rows.csv)")
+    import_parser.add_argument("--check-domains", action="store_true",
+                               help="Also check that every email domain accepts mail (DNS lookups)")
+    import_parser.add_argument("-v", "--verbose", action="store_true", help="Print progress after every batch")
+
+    packet_parser = subparsers.add_parser("packet", help="Offer, appointment and welcome email for one full-time hire")
+    packet_parser.add_argument("--name", required=True, help="Candidate name")
+    packet_parser.add_argument("--position", required=True, help="Position")
+    packet_parser.add_argument("--start-date", required=True, help="Start date (YYYY-MM-DD)")
+    packet_parser.add_argument("--ctc", required=True, help="Annual CTC in rupees")
+    packet_parser.add_argument("--joining-form-url", default=None, help="Joining form link for the welcome email")
+    packet_parser.add_argument("-o", "--output", default="packets", help="Output directory (default: packets)")
+    packet_parser.add_argument("--to", default=None, help="Send the packet to this address (default: only write it)")
+    packet_parser.add_argument("--cc", action="append", default=[], help="CC address (repeatable)")
+    packet_parser.add_argument("--staged", action="store_true",
+                               help="Queue a staged schedule (offer now, appointment later, welcome on the start date) "
+                                    "instead of sending one email")
+    packet_parser.add_argument("--welcome-to", default=None, help="Address of the staged welcome email (default: --to)")
+
+    revisions_parser = subparsers.add_parser("revisions",
+                                             help="Salary revision letters from a compensation CSV/XLSX file")
+    revisions_parser.add_argument("input", help="CSV or XLSX file: name, email, position, effective_date, "
+                                                "old_ctc, new_ctc (or old_/new_ monthly amounts)")
+    revisions_parser.add_argument("-o", "--output", default="revisions", help="Output directory (default: revisions)")
+    revisions_parser.add_argument("-w", "--workers", type=int, default=None,
+                                  help="Worker processes (default: number of CPU cores)")
+    revisions_parser.add_argument("--send", action="store_true", help="Queue every rendered letter for sending")
+    revisions_parser.add_argument("--cc", action="append", default=[], help="CC address for every email (repeatable)")
+    revisions_parser.add_argument("-v", "--verbose", action="store_true", help="Print every generated file")
+
+    export_parser = subparsers.add_parser("export", help="Export a ZIP of letters for a date range or cohort")
+    export_parser.add_argument("--letter", choices=["offer", "appointment", "experience"], required=True,
+                               help="Letter type (date range is the joining date, or exit date for experience)")
+    export_parser.add_argument("--from", dest="start", default=None, help="First date, YYYY-MM-DD (default: any)")
+    export_parser.add_argument("--to", dest="end", default=None, help="Last date, YYYY-MM-DD (default: any)")
+    export_parser.add_argument("--cohort", choices=["Intern", "Full-time Employee", "Contractor"], default=None,
+                               help="Only this employee type")
+    export_parser.add_argument("-o", "--output", default="letters.zip", help="ZIP file (default: letters.zip)")
+    export_parser.add_argument("-w", "--workers", type=int, default=None,
+                               help="Renders kept in flight for letters not in the archive "
+                                    "(default: twice RENDER_POOL_WORKERS in config.py)")
+    export_parser.add_argument("-v", "--verbose", action="store_true", help="Print every exported file")
+
+    archive_parser = subparsers.add_parser("archive", help="Maintain the letter archive's pack files")
+    archive_parser.add_argument("action", choices=["pack", "reindex", "bench"],
+                                help="pack: move loose PDFs into packs, reindex: rebuild the pack index, "
+                                     "bench: compare files and packs")
+    archive_parser.add_argument("--count", type=int, default=2000, help="bench: documents (default: 2000)")
+    archive_parser.add_argument("--size", type=int, default=60 * 1024, help="bench: average bytes (default: 61440)")
+    archive_parser.add_argument("--reads", type=int, default=1000, help="bench: random reads (default: 1000)")
+
+    salary_parser = subparsers.add_parser("salary", help="Salary engine tools")
+    salary_parser.add_argument("action", choices=["bench", "solve"],
+                               help="bench: time the vectorized salary engine, "
+                                    "solve: breakdowns for a hiring plan's target CTCs (ctc column)")
+    salary_parser.add_argument("input", nargs="?", help="solve: CSV or JSON hiring plan with a ctc column")
+    salary_parser.add_argument("-o", "--output", default="salary_breakdowns.csv",
+                               help="solve: output CSV, usable as input to batch (default: salary_breakdowns.csv)")
+    salary_parser.add_argument("-n", "--count", type=int, default=10000, help="bench: candidates (default: 10000)")
+
+    pdf_parser = subparsers.add_parser("pdf", help="PDF rendering tools")
+    pdf_parser.add_argument("action", choices=["bench", "sizes", "memory"],
+                            help="bench: documents/sec one at a time vs in one engine session, "
+                                 "sizes: PDF size of each letter with each size preset (config.PDF_PRESETS), "
+                                 "memory: peak memory of an email attachment and of a PDF download "
+                                 "held in memory vs spooled")
+    pdf_parser.add_argument("-n", "--count", type=int, default=200, help="bench: documents (default: 200)")
+    pdf_parser.add_argument("--size-mb", type=int, default=50, help="memory: attachment size in MB (default: 50)")
+    pdf_parser.add_argument("--copies", type=int, default=20,
+                            help="memory: appointment letters in the downloaded PDF (default: 20)")
+
+    parser.add_argument("--no-prewarm", action="store_true",
+                        help="Skip cache prewarming before starting the Streamlit app")
+
+    args = parser.parse_args()
+    if args.command == "batch":
+        sys.exit(run_batch(args))
+    if args.command == "api":
+        return run_api(args)
+    if args.command == "import":
+        sys.exit(run_import(args))
+    if args.command == "revisions":
+        sys.exit(run_revisions(args))
+    if args.command == "export":
+        sys.exit(run_export(args))
+    if args.command == "packet":
+        sys.exit(run_packet(args))
+    if args.command == "archive":
+        sys.exit(run_archive(args))
+    if args.command == "salary":
+        sys.exit(run_salary(args))
+    if args.command == "pdf":
+        sys.exit(run_pdf(args))
+
+    launch_app(prewarm=not args.no_prewarm)
+
+def launch_app(prewarm=True):
     print("🚀 Starting Rapid Innovation Onboarding Automation System...")
     print("=" * 60)
     
-    # Check dependencies
-    if not check_dependencies():
-        print("❌ Failed to install dependencies. Please install manually.")
-        return
-    
-    # Check images
-    check_images()
-    
     # Create images directory if it doesn't exist
     if not os.path.exists("images"):
         os.makedirs("images")
         print("📁 Created images directory")
     
+    # Check dependencies, images and PDF backends, then prewarm caches
+    if not run_startup_checks(prewarm):
+        print("❌ Failed to install dependencies. Please install manually.")
+        return
+    
     print("=" * 60)
     print("🌐 Launching Streamlit application...")
     print("📱 The application will open in your default web browser")
@@ -0,0 +1,36 @@
+"""
+Shared fixtures: the repository root on sys.path, a throwaway data directory and small PDFs
+"""
+
+import io
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path, monkeypatch):
+    """Point config.DATA_DIR at a temporary directory so tests never touch data/"""
+    directory = tmp_path / "data"
+    monkeypatch.setattr(config, "DATA_DIR", str(directory))
+    return directory
+
+@pytest.fixture
+def make_pdf():
+    """Factory for small valid PDFs (blank pages titled title), built with pypdf"""
+    pypdf = pytest.importorskip("pypdf")
+
+    def make(pages=1, title=""):
+        writer = pypdf.PdfWriter()
+        for _ in range(pages):
+            writer.add_blank_page(width=595, height=842)
+        writer.add_metadata({'/Title': title})
+        output = io.BytesIO()
+        writer.write(output)
+        return output.getvalue()
+
+    return make
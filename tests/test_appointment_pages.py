@@ -0,0 +1,45 @@
+from datetime import date
+
+import pytest
+
+import core.pdf_cache as pdf_cache
+from core.generators import (
+    APPOINTMENT_PAGE_BREAK_LINES,
+    compile_appointment_template,
+    generate_appointment_letter,
+    split_appointment_text,
+)
+from core.renderer import split_pages
+
+def test_split_appointment_text_at_runs_of_blank_lines():
+    gap = "\n" * (APPOINTMENT_PAGE_BREAK_LINES + 1)
+    text = f"Title\nline one\n\nline two{gap}Second page\n- item{gap}Third page\n"
+    assert split_appointment_text(text) == ["Title\nline one\n\nline two", "Second page\n- item", "Third page\n"]
+    assert split_appointment_text("one page\n\nonly") == ["one page\n\nonly"]
+
+def test_static_pages_are_identical_in_every_letter():
+    asha = split_pages(generate_appointment_letter("Asha Rao", "Engineer", date(2025, 1, 6)))
+    ravi = split_pages(generate_appointment_letter("Ravi Kumar", "Analyst", date(2025, 2, 3)))
+    assert len(asha) == len(ravi) == len(compile_appointment_template())
+    same = [a == r for a, r in zip(asha, ravi)]
+    assert any(same) and not all(same)
+    assert all("Asha Rao" not in page for page, static in zip(asha, same) if static)
+
+def test_a_second_letter_renders_only_its_own_pages(monkeypatch, make_pdf):
+    rendered = []
+
+    def fake_render_pdf(html_content, output_path=None):
+        rendered.append(html_content)
+        with open(output_path, "wb") as f:
+            f.write(make_pdf(title=str(len(rendered))))
+
+    monkeypatch.setattr(pdf_cache, "render_pdf", fake_render_pdf)
+    pages = len(compile_appointment_template())
+    pdf_cache.render_pdf_cached(generate_appointment_letter("Asha Rao", "Engineer", date(2025, 1, 6)))
+    assert len(rendered) == pages
+
+    html = generate_appointment_letter("Ravi Kumar", "Analyst", date(2025, 2, 3))
+    static = sum(page in rendered for page in split_pages(html))
+    pdf_cache.render_pdf_cached(html)
+    assert static >= 1
+    assert len(rendered) == 2 * pages - static
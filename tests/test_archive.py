@@ -0,0 +1,38 @@
+import io
+
+import pytest
+
+from core.archive import LetterArchive
+
+PDF = b"%PDF-1.4 offer letter for Asha Rao"
+
+@pytest.fixture(params=["files", "packs"])
+def archive(request, tmp_path):
+    archive = LetterArchive(str(tmp_path / "archive.db"), str(tmp_path / "archive"), storage=request.param)
+    yield archive
+    archive.close()
+
+def test_identical_letters_are_stored_once(archive):
+    first = archive.put(PDF, "offer", "offer_letter_Asha_Rao", "Asha@Example.com")
+    second = archive.put(io.BytesIO(PDF), "offer", "offer_letter_Asha_Rao", "asha@example.com")
+    assert first == second
+    assert archive.get(first) == PDF
+    assert archive.stats() == {'letters': 2, 'blobs': 1, 'stored_bytes': len(PDF), 'saved_bytes': len(PDF)}
+
+def test_latest_checks_every_employee_address(archive):
+    archive.put(PDF, "offer", "offer_1", "asha@example.com")
+    digest = archive.put(PDF + b" v2", "offer", "offer_2", "asha@company.com")
+    archive.put(b"%PDF appointment", "appointment", "appointment_1", "asha@company.com")
+
+    entry = archive.latest(["asha@example.com", "Asha@Company.com", None], "offer")
+    assert (entry['digest'], entry['filename']) == (digest, "offer_2")
+    assert archive.latest("ravi@example.com", "offer") is None
+    assert [e['filename'] for e in archive.for_employee("asha@company.com")] == ["appointment_1", "offer_2"]
+
+def test_open_blob_streams_the_stored_pdf(archive):
+    digest = archive.put(PDF, "offer", "offer_1")
+    with archive.open_blob(digest) as f:
+        assert f.read() == PDF
+    with pytest.raises(FileNotFoundError):
+        archive.open_blob("0" * 64)
+    assert archive.get("0" * 64) is None
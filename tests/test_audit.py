@@ -0,0 +1,49 @@
+import sqlite3
+from datetime import date, datetime
+
+import pytest
+
+from core.audit import EmailAuditLog
+
+@pytest.fixture
+def audit(tmp_path):
+    return EmailAuditLog(str(tmp_path / "email_audit.db"), flush_interval=0.01)
+
+def send(audit, recipient="asha@example.com", **entry):
+    audit.log(phase="offer", employee_email="asha@example.com", recipient=recipient,
+              success=1, latency_ms=12.5, **entry)
+
+def test_entries_are_queryable_after_flush(audit):
+    send(audit, sent_at=datetime(2025, 1, 6, 10).timestamp())
+    send(audit, recipient="ravi@example.com", sent_at=datetime(2025, 2, 1, 10).timestamp())
+    assert audit.flush() == []
+    assert [e['recipient'] for e in audit.query()] == ["ravi@example.com", "asha@example.com"]
+    assert [e['recipient'] for e in audit.query(start=date(2025, 1, 1), end=date(2025, 1, 6))] == ["asha@example.com"]
+    assert len(audit.query(employee_email=" Asha@Example.com ")) == 2
+
+def test_log_is_append_only(audit):
+    send(audit)
+    audit.flush()
+    with sqlite3.connect(audit.path) as conn:
+        with pytest.raises(sqlite3.DatabaseError, match="append-only"):
+            conn.execute("UPDATE email_audit SET recipient = 'x'")
+        with pytest.raises(sqlite3.DatabaseError, match="append-only"):
+            conn.execute("DELETE FROM email_audit")
+
+def test_a_bad_row_does_not_drop_the_rest_of_its_batch(audit):
+    send(audit)
+    send(audit, recipient=None)  # recipient is NOT NULL
+    send(audit, recipient="ravi@example.com")
+
+    dropped = audit.flush()
+    assert [e['recipient'] for e in dropped] == [None]
+    assert audit.dropped == 1
+    assert audit.flush() == []
+    assert sorted(e['recipient'] for e in audit.query()) == ["asha@example.com", "ravi@example.com"]
+
+def test_export_csv_has_readable_timestamps(audit):
+    send(audit, sent_at=datetime(2025, 1, 6, 10, 30).timestamp(), subject="Offer")
+    csv_text = audit.export_csv(audit.query())
+    header, row = csv_text.splitlines()
+    assert header.startswith("sent_at,phase,employee_email")
+    assert row.startswith("2025-01-06T10:30:00,offer,asha@example.com")
@@ -0,0 +1,32 @@
+import json
+
+from core.batch import load_candidates, run_batch
+
+CANDIDATES = [
+    {'letter': "appointment", 'name': "Asha Rao", 'position': "Engineer", 'start_date': "2025-01-06"},
+    {'letter': "experience", 'name': "Ravi Kumar", 'position': "Intern", 'start_date': "2024-01-08",
+     'end_date': "2024-06-28", 'certificate_type': "internship"},
+    {'letter': "appointment", 'name': "No Date", 'position': "Engineer", 'start_date': "06/01/2025"},
+]
+
+def test_load_candidates_reads_csv_and_json(tmp_path):
+    csv_path = tmp_path / "candidates.csv"
+    csv_path.write_text("\ufeffletter,name,position\noffer,Asha Rao,Engineer\n", encoding="utf-8")
+    assert load_candidates(str(csv_path)) == [{'letter': "offer", 'name': "Asha Rao", 'position': "Engineer"}]
+
+    json_path = tmp_path / "candidates.json"
+    json_path.write_text(json.dumps({'candidates': CANDIDATES}), encoding="utf-8")
+    assert load_candidates(str(json_path)) == CANDIDATES
+
+def test_run_batch_writes_html_and_reports_failures(tmp_path):
+    seen = []
+    stats = run_batch(CANDIDATES, str(tmp_path / "out"), workers=1, output_format="html", progress=seen.append)
+
+    assert stats['total'] == len(seen) == 3
+    assert stats['succeeded'] == 2
+    assert stats['by_letter'] == {'appointment': 1, 'experience': 1}
+    [failed] = stats['failed']
+    assert failed['index'] == 3 and "start_date" in failed['error']
+    names = sorted(p.name for p in (tmp_path / "out").iterdir())
+    assert names == ["00001_appointment_letter_Asha_Rao.html", "00002_internship_certificate_Ravi_Kumar.html"]
+    assert stats['bytes_written'] == sum(p.stat().st_size for p in (tmp_path / "out").iterdir())
@@ -0,0 +1,36 @@
+import time
+
+from core.document_store import DocumentStore
+
+def test_identical_content_is_stored_once():
+    store = DocumentStore(max_bytes=10 ** 6, ttl_seconds=60)
+    first = store.put("<html>offer</html>", owner="a")
+    second = store.put("<html>offer</html>", owner="b")
+    assert first == second
+    assert store.get(first) == "<html>offer</html>"
+    report = store.report()
+    assert report['documents'] == 1
+    assert {s['session'] for s in report['sessions']} == {"a", "b"}
+
+def test_release_drops_unreferenced_documents():
+    store = DocumentStore(max_bytes=10 ** 6, ttl_seconds=60)
+    key = store.put("letter", owner="a")
+    store.put("letter", owner="b")
+    store.release(key, "a")
+    assert store.get(key) == "letter"
+    store.release(key, "b")
+    assert store.get(key) is None
+
+def test_least_recently_used_document_is_evicted_over_budget():
+    store = DocumentStore(max_bytes=1, ttl_seconds=60)
+    old = store.put("x" * 1000)
+    new = store.put("y" * 1000)
+    assert store.get(old) is None
+    assert store.get(new) == "y" * 1000
+    assert store.report()['evictions'] == 1
+
+def test_expired_documents_are_not_returned():
+    store = DocumentStore(max_bytes=10 ** 6, ttl_seconds=0.01)
+    key = store.put("letter")
+    time.sleep(0.02)
+    assert store.get(key) is None
@@ -0,0 +1,48 @@
+from datetime import date
+
+import pytest
+
+from core.employees import EmployeeStore
+
+@pytest.fixture
+def store(tmp_path):
+    return EmployeeStore(str(tmp_path / "employees.db"))
+
+def test_employee_is_found_by_any_email(store):
+    employee_id = store.upsert(" Asha@Example.com ", name="Asha Rao", official_email="asha@company.com",
+                               personal_email="asha.rao@mail.com", start_date=date(2025, 1, 6))
+    for email in ("asha@example.com", "ASHA@company.com", "asha.rao@mail.com"):
+        assert store.find_by_email(email)['id'] == employee_id
+    assert store.find_by_email("someone@example.com") is None
+    assert store.get(employee_id)['start_date'] == "2025-01-06"
+
+def test_blank_fields_keep_their_stored_value(store):
+    employee_id = store.upsert("asha@example.com", name="Asha Rao", position="Engineer")
+    assert store.upsert("asha@example.com", name="", position="Senior Engineer") == employee_id
+    employee = store.get(employee_id)
+    assert (employee['name'], employee['position']) == ("Asha Rao", "Senior Engineer")
+    assert store.count() == 1
+
+def test_upsert_needs_an_email(store):
+    with pytest.raises(ValueError):
+        store.upsert("  ", name="Nobody")
+
+def test_record_logs_phase_events(store):
+    store.record("asha@example.com", "offer", "sent", "offer letter", name="Asha Rao")
+    store.record_many([("asha@example.com", {}), ("ravi@example.com", {'name': "Ravi Kumar"})], "welcome", "sent")
+    employee = store.find_by_email("asha@example.com")
+    assert [(e['phase'], e['action']) for e in store.events(employee['id'])] == [("offer", "sent"), ("welcome", "sent")]
+    assert store.count() == 2
+
+def test_date_range_queries(store):
+    store.upsert("a@example.com", start_date="2025-01-06")
+    store.upsert("b@example.com", start_date="2025-03-01", exit_date="2025-06-30")
+    assert [e['email'] for e in store.joining_between(date(2025, 1, 1), date(2025, 1, 31))] == ["a@example.com"]
+    assert [e['email'] for e in store.exiting_between("2025-06-01", "2025-06-30")] == ["b@example.com"]
+
+def test_search_matches_name_and_email_prefixes(store):
+    store.upsert("asha@example.com", name="Asha Rao")
+    store.upsert("ravi@example.com", name="Ravi Kumar")
+    assert [e['email'] for e in store.search("ash")] == ["asha@example.com"]
+    assert [e['email'] for e in store.search("RAVI@")] == ["ravi@example.com"]
+    assert store.search("100%") == []
@@ -0,0 +1,69 @@
+import pytest
+
+from core.exits import LAPTOP_TYPES, ExitTracker
+
+@pytest.fixture
+def tracker(tmp_path):
+    tracker = ExitTracker(str(tmp_path / "exits.db"))
+    tracker.add_asset("mbp-001", "Macbook", holder_email="Asha@Example.com")
+    tracker.add_asset("MON-001", "Monitor", holder_email="asha@example.com")
+    tracker.add_asset("MON-002", "Monitor", holder_email="asha@example.com")
+    tracker.add_asset("WIN-001", "Windows Laptop", holder_email="ravi@example.com")
+    return tracker
+
+def test_starting_an_exit_makes_held_assets_due(tracker):
+    tracker.start("asha@example.com", "Asha Rao", "2025-06-30")
+    assert [a['serial'] for a in tracker.unreturned()] == ["MBP-001", "MON-001", "MON-002"]
+    assert [a['serial'] for a in tracker.unreturned(LAPTOP_TYPES)] == ["MBP-001"]
+    assert tracker.inventory_counts()['return_pending'] == 3
+    assert tracker.asset("win-001")['status'] == "assigned"
+
+def test_record_return_by_serial_settles_the_last_item(tracker):
+    tracker.start("asha@example.com")
+    asset, settled = tracker.record_return(serial=" mbp-001 ")
+    assert (asset['serial'], asset['status'], settled) == ("MBP-001", "returned", False)
+    tracker.record_return(serial="MON-001")
+    _, settled = tracker.record_return(serial="MON-002")
+    assert settled
+    assert tracker.get("asha@example.com")['assets_returned_at'] is not None
+    assert tracker.held_by("asha@example.com", outstanding_only=True) == []
+
+def test_record_return_by_holder_needs_a_unique_match(tracker):
+    tracker.start("asha@example.com")
+    with pytest.raises(ValueError, match="2 outstanding assets match"):
+        tracker.record_return(holder_email="asha@example.com", asset_type="Monitor")
+    asset, _ = tracker.record_return(holder_email="asha@example.com", asset_type="Macbook")
+    assert asset['serial'] == "MBP-001"
+    with pytest.raises(ValueError, match="No outstanding asset"):
+        tracker.record_return(holder_email="asha@example.com", asset_type="Macbook")
+    with pytest.raises(ValueError):
+        tracker.record_return()
+
+def test_record_returns_reports_each_scanned_serial(tracker):
+    results = tracker.record_returns(["WIN-001", "UNKNOWN"])
+    assert [(serial, error is None) for serial, _, _, error in results] == [("WIN-001", True), ("UNKNOWN", False)]
+    # Ravi has no exit in progress, so nothing is settled
+    assert results[0][2] is False and tracker.get("ravi@example.com") is None
+
+def test_a_lost_asset_counts_as_settled(tracker):
+    tracker.start("ravi@example.com")
+    assert tracker.mark_lost("WIN-001") is True
+    assert tracker.held_by("ravi@example.com")[0]['status'] == "lost"
+    assert tracker.pending("assets_returned") == []
+
+def test_an_exit_with_nothing_to_return_is_settled_at_start(tracker):
+    tracker.start("meera@example.com", last_working_day="2025-07-31")
+    assert tracker.get("meera@example.com")['assets_returned_at'] is not None
+    assert [e['employee_email'] for e in tracker.open_exits()] == ["meera@example.com"]
+    tracker.mark("meera@example.com", "certificate_issued")
+    assert tracker.open_exits() == []
+
+def test_assets_are_assigned_only_when_available(tracker):
+    with pytest.raises(ValueError, match="already in the inventory"):
+        tracker.add_asset("MBP-001", "Macbook")
+    with pytest.raises(ValueError, match="assigned"):
+        tracker.assign("MBP-001", "ravi@example.com")
+    tracker.record_return(serial="MBP-001")
+    assert tracker.assign("MBP-001", "ravi@example.com")['holder_email'] == "ravi@example.com"
+    with pytest.raises(ValueError, match="No asset"):
+        tracker.assign("NOPE", "ravi@example.com")
@@ -0,0 +1,67 @@
+import csv
+import io
+import zipfile
+
+import pytest
+
+from core.archive import LetterArchive
+from core.employees import EmployeeStore
+from core.errors import InvalidCandidateError
+from core.export import export_letters, select_employees, stream_export
+
+@pytest.fixture
+def employees(tmp_path):
+    store = EmployeeStore(str(tmp_path / "employees.db"))
+    store.upsert("asha@example.com", name="Asha Rao", position="Intern", employee_type="Intern",
+                 start_date="2025-01-06")
+    store.upsert("ravi@example.com", name="Ravi Kumar", position="Engineer", employee_type="Full-time Employee",
+                 start_date="2025-01-20", official_email="ravi@company.com")
+    store.upsert("meera@example.com", name="Meera Shah", employee_type="Contractor", start_date="2025-02-03")
+    store.upsert("kiran@example.com", name="Kiran Das", start_date="2025-04-01")
+    return store
+
+@pytest.fixture
+def archive(tmp_path):
+    archive = LetterArchive(str(tmp_path / "archive.db"), str(tmp_path / "archive"), storage="files")
+    archive.put(b"%PDF intern offer", "offer", "intern_letter_Asha_Rao", "asha@example.com")
+    archive.put(b"%PDF full-time offer", "offer", "full-time_employee_letter_Ravi_Kumar", "ravi@company.com")
+    return archive
+
+def manifest(zf):
+    return list(csv.DictReader(io.TextIOWrapper(zf.open("manifest.csv"), encoding="utf-8")))
+
+def test_select_employees_by_date_range_and_cohort(employees):
+    assert [e['name'] for e in select_employees(employees, "offer", "2025-01-01", "2025-03-31")] == [
+        "Asha Rao", "Ravi Kumar", "Meera Shah"]
+    assert [e['name'] for e in select_employees(employees, "offer", cohort="Intern")] == ["Asha Rao"]
+    assert select_employees(employees, "experience") == []
+    with pytest.raises(InvalidCandidateError):
+        select_employees(employees, "revision")
+    with pytest.raises(InvalidCandidateError):
+        select_employees(employees, "offer", cohort="Temp")
+
+def test_archived_letters_are_copied_and_the_rest_listed_in_the_manifest(employees, archive, tmp_path):
+    path = str(tmp_path / "offers.zip")
+    stats = export_letters(path, "offer", "2025-01-01", "2025-03-31", employees=employees, archive=archive)
+
+    assert (stats['employees'], stats['archived'], stats['skipped'], stats['failed']) == (3, 2, 0, 1)
+    with zipfile.ZipFile(path) as zf:
+        rows = manifest(zf)
+        assert [row['source'] for row in rows] == ["archived", "archived", "failed"]
+        assert zf.read(rows[1]['file']) == b"%PDF full-time offer"
+        assert rows[2]['name'] == "Meera Shah" and "position" in rows[2]['reason']
+        assert sorted(zf.namelist()) == sorted([rows[0]['file'], rows[1]['file'], "manifest.csv"])
+
+def test_full_time_offers_missing_from_the_archive_are_skipped(employees, tmp_path):
+    archive = LetterArchive(str(tmp_path / "empty.db"), str(tmp_path / "empty"), storage="files")
+    stats = export_letters(io.BytesIO(), "offer", cohort="Full-time Employee", employees=employees, archive=archive)
+    assert (stats['employees'], stats['skipped']) == (1, 1)
+
+def test_stream_export_yields_a_complete_zip(employees, archive):
+    data = b"".join(stream_export("offer", "2025-01-01", "2025-01-31", employees=employees, archive=archive))
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        assert [row['source'] for row in manifest(zf)] == ["archived", "archived"]
+
+def test_stream_export_raises_the_export_error(employees, archive):
+    with pytest.raises(InvalidCandidateError):
+        b"".join(stream_export("offer", "January", employees=employees, archive=archive))
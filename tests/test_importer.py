@@ -0,0 +1,60 @@
+import csv
+import io
+from datetime import datetime
+
+import pytest
+
+from core.employees import EmployeeStore
+from core.errors import ImportFileError
+from core.importer import run_import
+
+CSV = """\ufeffEmployee Name,Email Address,Joining Date,Type,Work Email
+Asha Rao,Asha@Example.com,06/01/2025,intern,asha@company.com
+,missing.name@example.com,06/01/2025,intern,
+Ravi Kumar,ravi@example.com,2025-02-30,intern,
+Meera Shah,meera@example.com,2025-03-01,temp,
+Kiran Das,not-an-email,2025-03-01,intern,
+Dev Patel,dev@example.com,01.04.2025,full time,dev@@company.com
+
+Neha Iyer,neha@example.com,2025-04-01,Contractor,
+"""
+
+@pytest.fixture
+def store(tmp_path):
+    return EmployeeStore(str(tmp_path / "employees.db"))
+
+def test_rejected_rows_are_reported_with_reasons(store):
+    report = io.StringIO()
+    stats = run_import(io.BytesIO(CSV.encode("utf-8")), store, batch_size=3, filename="hires.csv", report=report)
+
+    assert (stats['rows'], stats['imported'], stats['rejected'], stats['batches']) == (7, 2, 5, 3)
+    assert stats['reasons'] == {'name': 1, 'start_date': 1, 'employee_type': 1, 'email': 1, 'official_email': 1}
+
+    rows = list(csv.DictReader(io.StringIO(report.getvalue())))
+    assert [row['row'] for row in rows] == ["3", "4", "5", "6", "7"]
+    assert rows[0]['reason'] == "name: missing"
+    assert rows[1]['reason'].startswith("start_date: '2025-02-30'")
+    assert rows[3]['email'] == "not-an-email" and rows[3]['reason'].startswith("email: ")
+
+def test_valid_rows_are_upserted(store):
+    run_import(io.BytesIO(CSV.encode("utf-8")), store, filename="hires.csv")
+    asha = store.find_by_email("asha@company.com")
+    assert (asha['name'], asha['employee_type'], asha['start_date']) == ("Asha Rao", "Intern", "2025-01-06")
+    assert asha['personal_email'] == "asha@example.com"
+    assert store.events(asha['id'])[0]['detail'] == "hires.csv"
+    assert store.find_by_email("neha@example.com")['employee_type'] == "Contractor"
+
+def test_xlsx_rows_and_date_cells(store, tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    workbook = openpyxl.Workbook()
+    workbook.active.append(["Name", "Email", "DOJ"])
+    workbook.active.append(["Asha Rao", "asha@example.com", datetime(2025, 1, 6)])
+    path = str(tmp_path / "hires.xlsx")
+    workbook.save(path)
+
+    assert run_import(path, store)['imported'] == 1
+    assert store.find_by_email("asha@example.com")['start_date'] == "2025-01-06"
+
+def test_a_file_without_name_and_email_columns_is_refused(store):
+    with pytest.raises(ImportFileError):
+        run_import(io.BytesIO(b"first,last\nAsha,Rao\n"), store, filename="hires.csv")
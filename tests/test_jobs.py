@@ -0,0 +1,41 @@
+import time
+
+from core.jobs import DONE, FAILED, QUEUED, RUNNING, JobQueue
+
+def test_jobs_are_claimed_once_in_order(tmp_path):
+    jobs = JobQueue(str(tmp_path / "jobs.db"))
+    first = jobs.enqueue("send", {'to': "a@example.com"})
+    second, third = jobs.enqueue_many("send", [{'to': "b@example.com"}, {'to': "c@example.com"}])
+
+    claimed = [jobs.claim() for _ in range(4)]
+    assert [job['id'] for job in claimed[:3]] == [first, second, third]
+    assert claimed[0]['payload'] == {'to': "a@example.com"}
+    assert claimed[3] is None
+    assert jobs.get(first)['status'] == RUNNING
+
+def test_finish_records_the_outcome(tmp_path):
+    jobs = JobQueue(str(tmp_path / "jobs.db"))
+    ok, failed = jobs.enqueue_many("send", [{}, {}])
+    jobs.claim(), jobs.claim()
+    jobs.finish(ok, True, "sent")
+    jobs.finish(failed, False, "SMTP error")
+    assert (jobs.get(ok)['status'], jobs.get(ok)['message']) == (DONE, "sent")
+    assert (jobs.get(failed)['status'], jobs.get(failed)['message']) == (FAILED, "SMTP error")
+    assert jobs.get("missing") is None
+
+def test_scheduled_jobs_wait_until_due(tmp_path):
+    jobs = JobQueue(str(tmp_path / "jobs.db"))
+    jobs.enqueue("send", {}, run_at=time.time() + 3600)
+    assert jobs.claim() is None
+    due = jobs.enqueue("send", {}, run_at=time.time() - 1)
+    assert jobs.claim()['id'] == due
+
+def test_requeue_stale_returns_abandoned_jobs(tmp_path):
+    jobs = JobQueue(str(tmp_path / "jobs.db"))
+    job_id = jobs.enqueue("send", {})
+    jobs.claim()
+    assert jobs.requeue_stale(3600) == 0
+    assert jobs.requeue_stale(-1) == 1
+    assert jobs.get(job_id)['status'] == QUEUED
+    assert jobs.claim()['id'] == job_id
+    assert jobs.get(job_id)['attempts'] == 2
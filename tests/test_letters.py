@@ -0,0 +1,38 @@
+import pytest
+
+from core.errors import InvalidCandidateError
+from core.letters import build_letter, letter_email
+from core.validation import email_error, email_errors
+
+def test_build_letter_names_files_by_letter_type():
+    html, filename = build_letter({'letter': "appointment", 'name': "Asha Rao", 'position': "Engineer",
+                                   'start_date': "2025-01-06"})
+    assert filename == "appointment_letter_Asha_Rao"
+    assert "Asha Rao" in html
+
+    _, filename = build_letter({'letter': "offer", 'offer_type': "Intern", 'name': "Asha Rao",
+                                'position': "Intern", 'start_date': "2025-01-06"})
+    assert filename == "intern_letter_Asha_Rao"
+
+@pytest.mark.parametrize("candidate, message", [
+    ({'letter': "memo", 'name': "A", 'position': "B"}, "letter must be one of"),
+    ({'letter': "offer", 'position': "B", 'start_date': "2025-01-06"}, "name and position are required"),
+    ({'letter': "offer", 'name': "A", 'position': "B", 'start_date': "06/01/2025"}, "start_date"),
+    ({'letter': "offer", 'offer_type': "Temp", 'name': "A", 'position': "B", 'start_date': "2025-01-06"},
+     "offer_type must be one of"),
+    ({'letter': "experience", 'name': "A", 'position': "B", 'start_date': "2025-01-06",
+      'end_date': "2025-01-01"}, "end_date must be after start_date"),
+])
+def test_build_letter_rejects_invalid_candidates(candidate, message):
+    with pytest.raises(InvalidCandidateError, match=message):
+        build_letter(candidate)
+
+def test_letter_email_matches_the_letter():
+    subject, body = letter_email({'letter': "appointment", 'name': "Asha Rao"})
+    assert subject and "Asha Rao" in body
+
+def test_email_errors_match_single_address_checks():
+    emails = ["asha@example.com", "no-at-sign", "two..dots@example.com", "ravi@example.com"]
+    errors = email_errors(emails)
+    assert errors == [email_error(email) for email in emails]
+    assert errors[0] is None and errors[1] and errors[2] and errors[3] is None
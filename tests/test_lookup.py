@@ -0,0 +1,49 @@
+import pytest
+
+from core.employees import EmployeeStore
+from core.lookup import BULK_THRESHOLD, EmployeeLookup, normalize_key, record_keys
+
+@pytest.fixture
+def store(tmp_path):
+    store = EmployeeStore(str(tmp_path / "employees.db"))
+    store.upsert("jose@example.com", name="José  Dias", official_email="jose.dias@company.com")
+    store.upsert("asha@example.com", name="Asha Rao")
+    return store
+
+def emails(results):
+    return [e['email'] for e in results]
+
+def test_keys_are_normalized():
+    assert normalize_key("  José  D ") == "jose d"
+    assert record_keys({'name': "José Dias", 'email': "J@X.com", 'official_email': None}) == {
+        "jose dias", "jose", "dias", "j@x.com"}
+
+def test_lookup_matches_names_words_and_emails(store):
+    assert emails(store.lookup("jose d")) == ["jose@example.com"]
+    assert emails(store.lookup("DIAS")) == ["jose@example.com"]
+    assert emails(store.lookup("jose.dias@")) == ["jose@example.com"]
+    assert emails(store.lookup("rao")) == ["asha@example.com"]
+    assert store.lookup("  ") == [] and store.lookup("zed") == []
+
+def test_each_employee_is_returned_once(store):
+    store.upsert("ashok@example.com", name="Ashok Asharaf")
+    assert sorted(emails(store.lookup("ash"))) == ["asha@example.com", "ashok@example.com"]
+    assert len(store.lookup("ash", limit=1)) == 1
+
+def test_writes_through_the_store_update_the_index(store):
+    store.lookup("asha")
+    store.upsert("asha@example.com", name="Asha Menon")
+    assert store.lookup("rao") == []
+    assert emails(store.lookup("menon")) == ["asha@example.com"]
+
+def test_bulk_writes_rebuild_the_index(store):
+    store.lookup("asha")
+    entries = [(f"hire{i}@example.com", {'name': f"Hire {i}"}) for i in range(BULK_THRESHOLD + 1)]
+    store.record_many(entries, "Import", "imported")
+    assert len(store.lookup("hire", limit=1000)) == BULK_THRESHOLD + 1
+
+def test_writes_from_other_processes_are_picked_up(store):
+    lookup = EmployeeLookup(store, refresh_interval=0)
+    EmployeeStore(store.path).upsert("ravi@example.com", name="Ravi Kumar")
+    assert emails(lookup.search("ravi")) == ["ravi@example.com"]
+    assert len(lookup) == 3
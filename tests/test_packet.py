@@ -0,0 +1,71 @@
+import io
+from datetime import date, datetime
+
+import pytest
+
+import core.packet as packet_module
+from core.jobs import JobQueue
+from core.packet import (PACKET_LETTERS, build_packet, packet_schedule, schedule_packet, send_packet,
+                         stage_summary)
+
+CANDIDATE = {'name': "Asha Rao", 'position': "Engineer", 'start_date': "2030-01-06", 'letter': "intern"}
+
+@pytest.fixture
+def packet(monkeypatch, make_pdf):
+    # Stand in for the render pool: the offer letter has one page, the appointment letter two
+    rendered = []
+
+    def render_all(documents):
+        rendered.extend(documents)
+        return [(make_pdf(pages), 0.5) for pages in range(1, len(documents) + 1)]
+
+    monkeypatch.setattr(packet_module, "render_all", render_all)
+    result = build_packet(CANDIDATE, joining_form_url="https://forms.example.com/join")
+    result['rendered'] = rendered
+    return result
+
+def test_build_packet_renders_both_letters_together(packet):
+    assert [html for html, _ in packet['rendered']] == [packet['letters'][letter]['html']
+                                                        for letter in PACKET_LETTERS]
+    assert packet['letters']['offer']['record']['offer_type'] == "Full-time Employee"
+    assert packet['letters']['appointment']['filename'] == "appointment_letter_Asha_Rao.pdf"
+    assert "https://forms.example.com/join" in packet['welcome'][1]
+    assert set(packet['stages']) == {"html", "render"}
+
+def test_send_packet_merges_the_letters_into_one_email(packet, monkeypatch):
+    pypdf = pytest.importorskip("pypdf")
+    sent = []
+    monkeypatch.setattr(packet_module, "deliver_email", lambda *args, **kwargs: sent.append((args, kwargs)))
+
+    subject, body, filename = send_packet({}, packet, "asha@example.com", ["hr@example.com"], phase="packet")
+    [(args, kwargs)] = sent
+    assert args[1:4] == ("asha@example.com", ["hr@example.com"], subject)
+    assert filename == args[6] == "onboarding_packet_Asha_Rao.pdf"
+    assert len(pypdf.PdfReader(io.BytesIO(args[5])).pages) == 3
+    assert "Engineer" in subject and "January 06, 2030" in body
+    assert kwargs == {'phase': "packet"}
+    assert "combine" in stage_summary(packet) and "0.50s + 0.50s" in stage_summary(packet)
+
+def test_packet_schedule_staggers_the_stages():
+    now = datetime(2030, 1, 1, 12).timestamp()
+    schedule = packet_schedule(date(2030, 1, 6), now=now)
+    assert schedule['offer'] is None
+    assert schedule['appointment'] == now + 24 * 3600
+    assert schedule['welcome'] == datetime(2030, 1, 6, 9).timestamp()
+
+    # A start date before the appointment letter is due still sends the welcome email last
+    schedule = packet_schedule(date(2030, 1, 1), now=now)
+    assert schedule['welcome'] == schedule['appointment']
+
+def test_schedule_packet_queues_one_job_per_stage(packet, tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.db"))
+    scheduled = schedule_packet(queue, packet, "asha@example.com", [])
+    assert [item['stage'] for item in scheduled] == ["offer", "appointment", "welcome"]
+
+    offer = queue.claim()
+    assert offer['id'] == scheduled[0]['job_id'] and offer['kind'] == "send"
+    assert offer['payload']['candidate']['letter'] == "offer"
+    assert queue.claim() is None  # the appointment letter and welcome email are not due yet
+    welcome = queue.get(scheduled[2]['job_id'])
+    assert (welcome['kind'], welcome['run_at']) == ("welcome", scheduled[2]['run_at'])
+    assert scheduled[1]['run_at'] < scheduled[2]['run_at']
@@ -0,0 +1,92 @@
+import hashlib
+import io
+import os
+import threading
+
+import pytest
+
+from core.archive import LetterArchive
+from core.packstore import HEADER, PackStore, benchmark
+
+def blob(text):
+    data = text.encode() * 50
+    return hashlib.sha256(data).hexdigest(), data
+
+@pytest.fixture
+def store(tmp_path):
+    store = PackStore(str(tmp_path / "packs"), pack_max_bytes=4096)
+    yield store
+    store.close()
+
+def test_put_and_get(store):
+    digest, data = blob("offer")
+    assert store.put(digest, data) is True
+    assert store.put(digest, data) is False
+    assert store.get(digest) == data and digest in store
+    with store.open(digest) as f:
+        assert f.read() == data
+    assert store.get("0" * 64) is None
+    with pytest.raises(FileNotFoundError):
+        store.open("0" * 64)
+
+def test_file_objects_are_copied_into_the_pack(store):
+    digest, data = blob("streamed")
+    store.put(digest, io.BytesIO(data))
+    assert bytes(store.view(digest)) == data
+
+def test_full_packs_roll_over(store):
+    blobs = [blob(f"letter {i}") for i in range(10)]
+    for digest, data in blobs:
+        store.put(digest, data)
+    stats = store.stats()
+    assert stats['blobs'] == 10 and stats['packs'] > 1
+    assert stats['pack_bytes'] == sum(HEADER.size + len(data) for _, data in blobs)
+    assert list(store) == [digest for digest, _ in blobs]
+    assert {digest: bytes(view) for digest, view in store.scan()} == dict(blobs)
+
+def test_rebuild_index_recovers_from_the_packs_alone(store):
+    blobs = [blob(f"letter {i}") for i in range(6)]
+    for digest, data in blobs:
+        store.put(digest, data)
+    store.close()
+    os.remove(store.index_path)
+
+    rebuilt = PackStore(store.directory, pack_max_bytes=4096)
+    assert rebuilt.rebuild_index() == 6
+    assert all(rebuilt.get(digest) == data for digest, data in blobs)
+    rebuilt.close()
+
+def test_rebuild_index_stops_at_a_torn_write(store):
+    digest, data = blob("complete")
+    store.put(digest, data)
+    with open(os.path.join(store.directory, "pack-000001.pack"), "ab") as f:
+        f.write(b"RIPK" + b"\0" * 10)
+    assert store.rebuild_index() == 1
+    assert store.stats()['pack_bytes'] == HEADER.size + len(data)
+
+def test_close_releases_every_threads_connection(store):
+    digest, data = blob("threaded")
+    thread = threading.Thread(target=store.put, args=(digest, data))
+    thread.start()
+    thread.join()
+    assert store.get(digest) == data
+    store.close()
+    assert store._conns == []
+    assert store.get(digest) == data  # Reopened on next use
+
+def test_loose_files_move_into_packs(tmp_path):
+    files = LetterArchive(str(tmp_path / "archive.db"), str(tmp_path / "archive"), storage="files")
+    digest = files.put(b"%PDF offer", "offer", "offer_1")
+    archive = LetterArchive(str(tmp_path / "archive.db"), str(tmp_path / "archive"), storage="packs")
+    try:
+        assert archive.get(digest) == b"%PDF offer"
+        assert archive.packs.import_files(archive.files) == 1
+        assert digest not in archive.files and archive.get(digest) == b"%PDF offer"
+    finally:
+        archive.close()
+
+def test_benchmark_reports_both_layouts():
+    results = benchmark(count=20, size=1024, reads=10)
+    assert set(results) == {"files", "packs"}
+    assert results['packs']['corrupt'] == results['files']['corrupt'] == 0
+    assert results['packs']['files'] < results['files']['files']
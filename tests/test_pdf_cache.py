@@ -0,0 +1,81 @@
+import io
+import os
+
+import pytest
+
+import core.pdf_cache as pdf_cache
+from core.renderer import PAGE_BREAK, merge_pdfs, split_pages
+
+def letter(*pages):
+    return f"<html><head><style>p {{}}</style></head><body>{PAGE_BREAK.join(pages)}</body></html>"
+
+@pytest.fixture
+def renders(monkeypatch, make_pdf):
+    """Replace the PDF engine with one that records each HTML document it renders"""
+    rendered = []
+
+    def fake_render_pdf(html_content, output_path=None):
+        rendered.append(html_content)
+        pdf_bytes = make_pdf(title=html_content[-40:])
+        if output_path is None:
+            return pdf_bytes
+        with open(output_path, "wb") as f:
+            f.write(pdf_bytes)
+
+    monkeypatch.setattr(pdf_cache, "render_pdf", fake_render_pdf)
+    return rendered
+
+def page_count(pdf_bytes):
+    from pypdf import PdfReader
+
+    return len(PdfReader(io.BytesIO(pdf_bytes)).pages)
+
+def test_split_pages_keeps_head_and_tail():
+    pages = split_pages(letter("<p>one</p>", "<p>two</p>"))
+    assert pages == [letter("<p>one</p>"), letter("<p>two</p>")]
+    single = letter("<p>only</p>")
+    assert split_pages(single) == [single]
+    assert split_pages(f"<p>a</p>{PAGE_BREAK}<p>b</p>") == [f"<p>a</p>{PAGE_BREAK}<p>b</p>"]  # No body
+
+def test_merge_pdfs_concatenates_pages(make_pdf, tmp_path):
+    merged = merge_pdfs([make_pdf(2), make_pdf(1)])
+    assert page_count(merged) == 3
+    path = str(tmp_path / "merged.pdf")
+    assert merge_pdfs(iter([make_pdf(1), make_pdf(1)]), path) == path
+    with open(path, "rb") as f:
+        assert page_count(f.read()) == 2
+
+def test_identical_html_is_rendered_once(renders):
+    html = letter("<p>certificate</p>")
+    first = pdf_cache.render_pdf_cached(html)
+    assert pdf_cache.render_pdf_cached(html) == first
+    assert len(renders) == 1
+    pdf_cache.render_pdf_cached(html, "original")
+    assert len(renders) == 2  # The preset is part of the cache key
+
+def test_unchanged_pages_are_reused(renders):
+    pdf_bytes = pdf_cache.render_pdf_cached(letter("<p>terms</p>", "<p>salary 10</p>", "<p>signature</p>"))
+    assert page_count(pdf_bytes) == 3 and len(renders) == 3
+
+    pdf_bytes = pdf_cache.render_pdf_cached(letter("<p>terms</p>", "<p>salary 20</p>", "<p>signature</p>"))
+    assert page_count(pdf_bytes) == 3
+    assert len(renders) == 4 and "salary 20" in renders[-1]
+
+def test_spooled_and_cache_only_renders_match(renders):
+    html = letter("<p>offer</p>")
+    pdf_cache.cache_pdf(html)
+    pdf_cache.cache_pdf(html)
+    assert len(renders) == 1
+    with pdf_cache.render_pdf_spooled(html) as spool:
+        assert spool.read() == pdf_cache.render_pdf_cached(html)
+    assert len(renders) == 1
+    assert not [name for name in os.listdir(pdf_cache.cache_dir()) if name.endswith(".tmp")]
+
+def test_prune_drops_least_recently_used_entries(renders):
+    for i in range(3):
+        pdf_cache.render_pdf_cached(letter(f"<p>letter {i}</p>"))
+    pdf_cache.get_cached_pdf(letter("<p>letter 0</p>"))  # Now the most recently used
+    size = os.path.getsize(pdf_cache.cached_pdf_path(letter("<p>letter 0</p>")))
+    pdf_cache.prune(max_bytes=size)
+    assert pdf_cache.get_cached_pdf(letter("<p>letter 0</p>")) is not None
+    assert pdf_cache.get_cached_pdf(letter("<p>letter 2</p>")) is None
@@ -0,0 +1,70 @@
+import base64
+import io
+
+import pytest
+
+import config
+from core.pdf_size import (
+    letter_preset,
+    optimize_pdf,
+    optimize_pdf_file,
+    preset_fingerprint,
+    preset_options,
+    shrink_images,
+)
+
+def png_data_uri(width, height):
+    from PIL import Image
+
+    output = io.BytesIO()
+    Image.new("RGBA", (width, height), (200, 30, 30, 128)).save(output, "PNG")
+    return "data:image/png;base64," + base64.b64encode(output.getvalue()).decode()
+
+def image_size(data_uri):
+    from PIL import Image
+
+    return Image.open(io.BytesIO(base64.b64decode(data_uri.split(",", 1)[1]))).size
+
+def test_presets():
+    assert preset_options() == config.PDF_PRESETS[config.PDF_DEFAULT_PRESET]
+    assert preset_options("original") == {}
+    assert preset_fingerprint("standard") != preset_fingerprint("compact")
+    assert letter_preset("offer") == config.PDF_LETTER_PRESETS["offer"]
+    assert letter_preset("bundle") == config.PDF_DEFAULT_PRESET
+    with pytest.raises(KeyError):
+        preset_options("tiny")
+
+def test_shrink_images_scales_and_reencodes():
+    pytest.importorskip("PIL")
+    html = f'<img src="{png_data_uri(2400, 300)}">'
+    assert shrink_images(html, preset_options("original")) is html
+
+    png = shrink_images(html, {'image_max_width': 1200, 'image_format': "PNG"})
+    assert image_size(png[len('<img src="'):-2]) == (1200, 150)
+
+    jpeg = shrink_images(html, {'image_max_width': 600, 'image_format': "JPEG", 'jpeg_quality': 80})
+    assert jpeg.startswith('<img src="data:image/jpeg;base64,')
+    assert image_size(jpeg[len('<img src="'):-2]) == (600, 75)
+
+def test_images_that_would_grow_are_left_alone():
+    pytest.importorskip("PIL")
+    html = f'<img src="{png_data_uri(10, 10)}">'
+    assert shrink_images(html, {'image_max_width': 1200, 'image_format': "JPEG"}) == html
+
+def test_optimize_pdf_strips_metadata_and_never_grows(make_pdf):
+    from pypdf import PdfReader
+
+    pdf_bytes = make_pdf(pages=3, title="x" * 2000)
+    optimized = optimize_pdf(pdf_bytes, preset_options("standard"))
+    assert len(optimized) < len(pdf_bytes)
+    assert len(PdfReader(io.BytesIO(optimized)).pages) == 3
+    assert not (PdfReader(io.BytesIO(optimized)).metadata or {}).get("/Title")
+    assert optimize_pdf(pdf_bytes, preset_options("original")) is pdf_bytes
+
+def test_optimize_pdf_file_in_place(make_pdf, tmp_path):
+    path = tmp_path / "letter.pdf"
+    path.write_bytes(make_pdf(pages=2, title="x" * 2000))
+    before = path.stat().st_size
+    optimize_pdf_file(str(path), preset_options("standard"))
+    assert path.stat().st_size < before
+    assert [p.name for p in tmp_path.iterdir()] == ["letter.pdf"]
@@ -0,0 +1,65 @@
+import sqlite3
+import time
+
+import pytest
+
+from core.employees import EmployeeStore
+from core.pipeline import can_transition, stage_label
+
+@pytest.mark.parametrize("current, target, allowed", [
+    (None, "offer_sent", True),
+    ("docs_requested", "offer_sent", True),
+    ("offer_sent", "welcomed", True),         # Steps may be skipped
+    ("welcomed", "offer_sent", False),        # but never taken back
+    ("bgv_pending", "exit_initiated", True),  # Exit starts from any onboarding stage
+    ("exit_initiated", "assets_returned", True),
+    ("certificate_issued", "offer_sent", False),
+    ("offer_sent", "offer_sent", False),
+])
+def test_transitions(current, target, allowed):
+    assert can_transition(current, target) is allowed
+
+def test_stage_label():
+    assert stage_label("offer_sent") == "📄 Offer Sent"
+    assert stage_label(None) == "—"
+
+def test_record_applies_only_allowed_transitions(tmp_path):
+    store = EmployeeStore(str(tmp_path / "employees.db"))
+    assert store.record("asha@example.com", "offer", "sent", status="offer_sent") == "offer_sent"
+    assert store.record("asha@example.com", "docs", "sent", status="docs_requested") == "offer_sent"
+    assert store.record("asha@example.com", "welcome", "sent", status="welcomed") == "welcomed"
+
+def test_stage_counts_follow_inserts_updates_and_deletes(tmp_path):
+    path = str(tmp_path / "employees.db")
+    store = EmployeeStore(path)
+    store.upsert("a@example.com", status="offer_sent")
+    store.upsert("b@example.com", status="offer_sent")
+    store.upsert("c@example.com")
+    assert store.stage_counts() == {'offer_sent': 2}
+
+    store.upsert("a@example.com", status="welcomed")
+    store.upsert("c@example.com", status="docs_requested")
+    assert store.stage_counts() == {'offer_sent': 1, 'welcomed': 1, 'docs_requested': 1}
+
+    with sqlite3.connect(path) as conn:
+        conn.execute("DELETE FROM employees WHERE email = 'b@example.com'")
+    assert store.stage_counts() == {'welcomed': 1, 'docs_requested': 1}
+
+def test_stage_counts_are_backfilled_for_older_databases(tmp_path):
+    path = str(tmp_path / "employees.db")
+    store = EmployeeStore(path)
+    store.upsert("a@example.com", status="offer_sent")
+    store.upsert("b@example.com", status="welcomed")
+    with sqlite3.connect(path) as conn:
+        conn.execute("DROP TABLE stage_counts")
+    assert EmployeeStore(path).stage_counts() == {'offer_sent': 1, 'welcomed': 1}
+
+def test_by_status_and_stuck(tmp_path):
+    store = EmployeeStore(str(tmp_path / "employees.db"))
+    store.upsert("a@example.com", status="offer_sent")
+    store.upsert("b@example.com", status="offer_sent")
+    assert [e['email'] for e in store.by_status("offer_sent")] == ["a@example.com", "b@example.com"]
+    assert store.stuck("offer_sent", 3600) == (0, [])
+    time.sleep(0.01)
+    count, oldest = store.stuck("offer_sent", 0, limit=1)
+    assert count == 2 and [e['email'] for e in oldest] == ["a@example.com"]
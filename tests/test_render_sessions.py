@@ -0,0 +1,77 @@
+import pytest
+
+import core.batch as batch
+import core.renderer as renderer
+from core.errors import PdfRenderError
+
+@pytest.fixture
+def engines(monkeypatch):
+    """Fake both engine sessions and render_pdf; each records the documents it was given"""
+    calls = {'wkhtmltopdf': [], 'weasyprint': [], 'single': []}
+
+    def wkhtmltopdf_session(documents):
+        calls['wkhtmltopdf'].append(list(documents))
+        return [f"wk:{html}".encode() if "wk" in html else None for html in documents]
+
+    def weasyprint_session(documents):
+        calls['weasyprint'].append(list(documents))
+        return [f"wp:{html}".encode() if "wp" in html else None for html in documents]
+
+    def render_pdf(html_content):
+        calls['single'].append(html_content)
+        if "bad" in html_content:
+            raise PdfRenderError("Both PDF conversion methods failed")
+        return f"single:{html_content}".encode()
+
+    monkeypatch.setattr(renderer, "_render_wkhtmltopdf_session", wkhtmltopdf_session)
+    monkeypatch.setattr(renderer, "_render_weasyprint_session", weasyprint_session)
+    monkeypatch.setattr(renderer, "render_pdf", render_pdf)
+    return calls
+
+def test_documents_fall_back_session_by_session(engines):
+    results = renderer.render_pdfs(["wk 1", "wp 2", "plain 3", "bad 4", "wk wp 5"])
+    assert results[:3] == [b"wk:wk 1", b"wp:wp 2", b"single:plain 3"]
+    assert isinstance(results[3], PdfRenderError)
+    assert results[4] == b"wk:wk wp 5"
+    # Each session only sees what the previous one could not render
+    assert engines['wkhtmltopdf'] == [["wk 1", "wp 2", "plain 3", "bad 4", "wk wp 5"]]
+    assert engines['weasyprint'] == [["wp 2", "plain 3", "bad 4"]]
+    assert engines['single'] == ["plain 3", "bad 4"]
+
+def test_an_unavailable_engine_is_skipped(engines, monkeypatch):
+    def missing(documents):
+        raise FileNotFoundError("wkhtmltopdf")
+
+    monkeypatch.setattr(renderer, "_render_wkhtmltopdf_session", missing)
+    assert renderer.render_pdfs(["wp 1"]) == [b"wp:wp 1"]
+
+def test_no_session_is_started_once_everything_is_rendered(engines):
+    assert renderer.render_pdfs(["wk 1"]) == [b"wk:wk 1"]
+    assert engines['weasyprint'] == [] and engines['single'] == []
+    assert renderer.render_pdfs([]) == []
+
+def test_complete_needs_the_end_of_file_marker(tmp_path):
+    path = tmp_path / "letter.pdf"
+    assert not renderer._complete(str(path))
+    path.write_bytes(b"%PDF-1.4\n...")
+    assert not renderer._complete(str(path))
+    path.write_bytes(b"%PDF-1.4\n...\n%%EOF\n")
+    assert renderer._complete(str(path))
+
+def test_batch_chunks_render_in_one_session(monkeypatch, tmp_path, make_pdf):
+    sessions = []
+
+    def render_pdfs(documents):
+        documents = list(documents)
+        sessions.append(len(documents))
+        return [make_pdf() for _ in documents]
+
+    monkeypatch.setattr(batch, "render_pdfs", render_pdfs)
+    candidates = [{'letter': "appointment", 'name': f"Hire {i}", 'position': "Engineer", 'start_date': "2025-01-06"}
+                  for i in range(39)]
+    candidates.append({'letter': "appointment", 'name': "No Position", 'start_date': "2025-01-06"})
+    stats = batch.run_batch(candidates, str(tmp_path / "out"), workers=1)
+
+    assert stats['succeeded'] == 39 and len(stats['failed']) == 1
+    assert sessions == [10, 10, 10, 9]  # Chunks of a quarter of the jobs per worker
+    assert len(list((tmp_path / "out").iterdir())) == 39
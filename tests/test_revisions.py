@@ -0,0 +1,66 @@
+import io
+
+import pytest
+
+from core.errors import InvalidCandidateError
+from core.importer import iter_rows
+from core.jobs import JobQueue
+from core.letters import attach_salary_data, build_letter
+from core.revisions import normalize_revision_header, revision_candidate, run_revisions, send_payload
+from core.salary import build_salary_data, solve_ctc_one
+
+SHEET = b"""Employee Name,Work Email,Designation,With Effect From,Current CTC,Revised CTC,New Basic Salary
+Asha Rao,Asha@Example.com,Engineer,01/04/2025,"9,00,000",,60000
+Ravi Kumar,ravi@example.com,Analyst,2025-04-01,600000,720000,
+"""
+
+def rows(data):
+    return list(iter_rows(io.BytesIO(data), "pay.csv", normalize_revision_header))
+
+def test_spreadsheet_headers_map_to_revision_fields():
+    [(number, record), _] = rows(SHEET)
+    assert number == 2
+    assert record == {'name': "Asha Rao", 'email': "Asha@Example.com", 'position': "Engineer",
+                      'effective_date': "01/04/2025", 'old_ctc': "9,00,000", 'new_ctc': "",
+                      'new_basic_salary': "60000"}
+
+def test_revision_candidate_validates_email_and_date():
+    candidate = revision_candidate(rows(SHEET)[0][1])
+    assert (candidate['letter'], candidate['email'], candidate['effective_date']) == (
+        "revision", "asha@example.com", "2025-04-01")
+    assert "new_ctc" not in candidate
+    with pytest.raises(InvalidCandidateError, match="email"):
+        revision_candidate({'email': "not-an-email", 'effective_date': "2025-04-01"})
+    with pytest.raises(InvalidCandidateError, match="effective_date"):
+        revision_candidate({'email': "asha@example.com", 'effective_date': "April"})
+
+def test_both_sides_are_solved_in_one_pass():
+    asha, ravi = attach_salary_data([revision_candidate(record) for _, record in rows(SHEET)])
+    assert asha['old_salary_data'] == solve_ctc_one(900000)
+    assert asha['new_salary_data'] == build_salary_data({'basic_salary': 60000})
+    assert ravi['new_salary_data'] == solve_ctc_one(720000)
+
+    html, filename = build_letter(asha)
+    assert filename == "salary_revision_letter_Asha_Rao"
+    assert "Asha Rao" in html
+
+def test_a_side_without_compensation_is_an_error():
+    candidate = revision_candidate({'name': "A", 'position': "B", 'email': "a@example.com",
+                                    'effective_date': "2025-04-01", 'new_ctc': "720000"})
+    with pytest.raises(InvalidCandidateError, match="old_ctc"):
+        build_letter(candidate)
+
+def test_send_payload_leaves_out_the_breakdowns():
+    [candidate] = attach_salary_data([revision_candidate(rows(SHEET)[1][1])])
+    payload = send_payload(candidate, cc=["hr@example.com"])
+    assert payload['to'] == "ravi@example.com" and payload['cc'] == ["hr@example.com"]
+    assert not any(key.endswith("_salary_data") for key in payload['candidate'])
+
+def test_unreadable_rows_are_reported_without_rendering(tmp_path):
+    sheet = b"name,email,effective_date,old_ctc,new_ctc\nAsha,bad,2025-04-01,1,2\nRavi,ravi@example.com,soon,1,2\n"
+    queue = JobQueue(str(tmp_path / "jobs.db"))
+    stats = run_revisions(io.BytesIO(sheet), str(tmp_path / "out"), workers=1, send=True, filename="pay.csv",
+                          queue=queue)
+    assert (stats['total'], stats['succeeded'], stats['queued']) == (2, 0, 0)
+    assert [(r['row'], r['error'].split(":")[0]) for r in stats['failed']] == [(2, "email"), (3, "effective_date")]
+    assert queue.claim() is None
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from core.letters import attach_salary_data
+from core.salary import (
+    COMPONENT_NAMES,
+    SALARY_COMPONENTS,
+    benchmark,
+    build_salary_data,
+    monthly_arrays,
+    salary_rows,
+    salary_table,
+)
+
+def test_default_breakdown():
+    salary_data = build_salary_data()
+    assert salary_data['gross_ctc_monthly'] == sum(SALARY_COMPONENTS.values())
+    assert salary_data['total_ctc_annual'] == (sum(SALARY_COMPONENTS.values()) + 1800) * 12
+    assert salary_data['hra_annual'] == SALARY_COMPONENTS['hra'] * 12
+
+def test_salary_table_matches_build_salary_data():
+    records = [
+        {'basic_salary': 50000, 'hra': 25000, 'pf_contribution': 0},
+        {'special_allowance': "12000"},
+        {},
+    ]
+    monthly, pf = monthly_arrays(records)
+    assert monthly.shape == (3, len(COMPONENT_NAMES))
+    expected = [
+        build_salary_data({c: r[c] for c in SALARY_COMPONENTS if c in r}, r.get("pf_contribution", 1800))
+        for r in records
+    ]
+    rows = salary_rows(salary_table(monthly, pf))
+    assert rows == expected
+    assert all(type(value) is int for value in rows[0].values())
+
+def test_monthly_arrays_rejects_fractional_amounts():
+    with pytest.raises(ValueError):
+        monthly_arrays([{'basic_salary': "12000.50"}])
+
+def test_salary_table_of_no_candidates():
+    table = salary_table(np.zeros((0, len(COMPONENT_NAMES))), [])
+    assert salary_rows(table) == []
+
+def test_attach_salary_data_only_where_needed():
+    candidates = [
+        {'letter': "offer", 'basic_salary': "30000"},
+        {'letter': "offer", 'offer_type': "Intern"},
+        {'letter': "appointment"},
+        {'letter': "offer", 'basic_salary': "lots"},
+    ]
+    attached = attach_salary_data(candidates)
+    assert attached[0]['salary_data'] == build_salary_data({'basic_salary': 30000})
+    assert "salary_data" not in attached[1] and "salary_data" not in attached[2]
+    assert "salary_data" not in attached[3]  # build_letter reports the error for this one alone
+    assert "salary_data" not in candidates[0]  # The input records are not modified
+
+def test_benchmark_paths_agree():
+    assert benchmark(count=200)['identical']
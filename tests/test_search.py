@@ -0,0 +1,53 @@
+import pytest
+
+from core.search import SearchIndex, fts_query, html_to_text
+
+@pytest.fixture
+def index(tmp_path):
+    index = SearchIndex(str(tmp_path / "search.db"), flush_interval=0.01)
+    index.add("letter", "<html><head><style>p { color: red }</style></head><body>"
+                        "<p>Dear Priya,</p><p>You are relieved from your duties on 30 June.</p></body></html>",
+              ref="digest-1", letter_type="experience", name="Priya Nair", position="Software Engineer")
+    index.add("letter", "<p>We are pleased to offer you the role of Data Analyst.</p>",
+              ref="digest-2", letter_type="offer", name="Ravi Kumar", position="Data Analyst")
+    index.add("email", "<p>Please find your offer letter attached.</p>", subject="Offer letter for Priya",
+              name="Priya Nair", employee_email=" Priya@Example.com ")
+    index.flush()
+    return index
+
+def test_html_to_text_keeps_visible_paragraphs():
+    html = "<html><head><title>x</title><style>b {}</style></head><body><p>Dear  Asha,</p><div>Welcome &amp; " \
+           "congratulations</div></body></html>"
+    assert html_to_text(html) == "Dear Asha,\nWelcome & congratulations"
+    assert html_to_text("plain &amp; simple ") == "plain & simple"
+    assert html_to_text(None) == ""
+
+def test_fts_query_quotes_user_input():
+    assert fts_query('"relieved from" pri') == '"relieved from" "pri"*'
+    assert fts_query("NOT OR (") == '"NOT"* "OR"*'
+    assert fts_query("engineer", field="position") == 'position : ("engineer"*)'
+    assert fts_query('  "" - ') is None
+    with pytest.raises(ValueError):
+        fts_query("x", field="filename")
+
+def test_search_matches_prefixes_phrases_and_fields(index):
+    assert [d['ref'] for d in index.search('"relieved from" pri')] == ["digest-1"]
+    assert {d['name'] for d in index.search("priya")} == {"Priya Nair"}
+    assert [d['kind'] for d in index.search("priya", kind="email")] == ["email"]
+    assert [d['ref'] for d in index.search("analyst", field="position")] == ["digest-2"]
+    assert index.search("color") == []  # Style sheets are not indexed
+    assert "**relieved**" in index.search("relieved")[0]['snippet']
+
+def test_letters_are_indexed_once_per_digest(index):
+    index.add("letter", "<p>Duplicate</p>", ref="digest-1", letter_type="experience")
+    index.flush()
+    assert index.count() == {'letter': 2, 'email': 1}
+    assert index.search("duplicate") == []
+
+def test_documents_keep_their_metadata(index):
+    [email] = index.search("attached")
+    document = index.document(email['id'])
+    assert document['employee_email'] == "priya@example.com"
+    assert document['body'] == "Please find your offer letter attached."
+    with pytest.raises(ValueError):
+        index.add("memo", "<p>x</p>")
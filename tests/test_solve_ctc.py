@@ -0,0 +1,63 @@
+import pytest
+
+from core.errors import InvalidCandidateError
+from core.letters import build_letter, solve_hiring_plan
+from core.salary import salary_rows, solve_ctc, solve_ctc_one
+
+POLICY = {
+    "basic_percent_of_ctc": 48,
+    "hra_percent_of_basic": 50,
+    "fixed_monthly": {
+        "medical_allowance": 1250,
+        "books_periodical": 500,
+        "health_club": 1000,
+        "internet_telephone": 2500,
+    },
+    "pf_percent_of_basic": 12,
+    "pf_cap_monthly": 1800,
+}
+
+def test_breakdown_follows_the_policy():
+    salary_data = solve_ctc_one(1200000, POLICY)
+    assert salary_data['basic_salary_monthly'] == 48000
+    assert salary_data['hra_monthly'] == 24000
+    assert salary_data['pf_contribution_monthly'] == 1800  # 12% of Basic, capped
+    assert salary_data['medical_allowance_monthly'] == 1250
+    assert salary_data['special_allowance_monthly'] == 20950
+    assert salary_data['total_ctc_annual'] == 1200000
+
+def test_targets_are_met_to_within_the_monthly_rounding():
+    table = solve_ctc([1200000, 1200005, 987654], POLICY)
+    assert table['total_ctc_annual'].tolist() == [1200000, 1200000, 987648]
+    assert table['remainder_annual'].tolist() == [0, 5, 6]
+    assert table['feasible'].all()
+
+def test_low_targets_cut_the_fixed_reimbursements_last_first():
+    [salary_data] = salary_rows(solve_ctc([240000], POLICY))
+    assert salary_data['special_allowance_monthly'] == 0
+    assert salary_data['internet_telephone_monthly'] == 2500 - 802
+    assert salary_data['health_club_monthly'] == 1000
+    assert salary_data['total_ctc_annual'] == 240000
+
+def test_infeasible_targets():
+    policy = dict(POLICY, basic_percent_of_ctc=80)  # Basic + HRA alone exceed the CTC
+    assert not solve_ctc([600000], policy)['feasible'][0]
+    with pytest.raises(InvalidCandidateError, match="too low"):
+        solve_ctc_one(600000, policy)
+
+def test_unknown_fixed_components_are_refused():
+    with pytest.raises(ValueError, match="gym"):
+        solve_ctc([1200000], dict(POLICY, fixed_monthly={'gym': 100}))
+
+def test_solve_hiring_plan_reports_bad_rows():
+    rows = solve_hiring_plan([{'name': "A", 'ctc': "12,00,000"}, {'name': "B", 'ctc': ""},
+                              {'name': "C", 'ctc': "a lot"}, {'name': "D", 'ctc': "-5"}], POLICY)
+    assert (rows[0]['error'], rows[0]['basic_salary'], rows[0]['total_ctc_annual']) == ("", 48000, 1200000)
+    assert rows[1]['error'] == "ctc is required"
+    assert "amount in rupees" in rows[2]['error']
+    assert "positive" in rows[3]['error']
+
+def test_offer_letters_accept_a_target_ctc():
+    html, _ = build_letter({'letter': "offer", 'name': "Asha Rao", 'position': "Engineer",
+                            'start_date': "2025-01-06", 'ctc': "₹12,00,000"})
+    assert "1,200,000" in html
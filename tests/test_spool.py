@@ -0,0 +1,126 @@
+import email
+import hashlib
+import io
+import socket
+import threading
+
+import pytest
+
+import core.mailer as mailer
+from core.audit import EmailAuditLog
+from core.errors import EmailDeliveryError
+from core.search import SearchIndex
+from core.spool import copy_data, data_digest, iter_chunks, spooled_file
+
+ATTACHMENT = bytes(range(256)) * 400 + b"\n.line starting with a dot\n"
+
+def test_spooled_files_roll_over_to_the_data_directory(data_dir):
+    with spooled_file(max_size=10) as spool:
+        spool.write(b"small")
+        assert not spool._rolled
+        spool.write(b" but now past the limit")
+        assert spool._rolled
+        assert (data_dir / "spool").is_dir()
+
+def test_helpers_accept_bytes_or_files():
+    digest = hashlib.sha256(ATTACHMENT).hexdigest()
+    f = io.BytesIO(ATTACHMENT)
+    f.read(10)
+    assert data_digest(ATTACHMENT) == data_digest(f) == (digest, len(ATTACHMENT))
+    assert f.tell() == 0
+
+    out = io.BytesIO()
+    copy_data(f, out)
+    copy_data(ATTACHMENT, out)
+    assert out.getvalue() == ATTACHMENT * 2
+    assert b"".join(iter_chunks(io.BytesIO(ATTACHMENT), chunk_size=1000)) == ATTACHMENT
+
+def attachment_of(message_bytes):
+    message = email.message_from_bytes(message_bytes)
+    [part] = [p for p in message.walk() if p.get_content_type() == "application/octet-stream"]
+    return part.get_payload(decode=True), part['Content-Disposition']
+
+def test_write_message_matches_build_message():
+    built = mailer.build_message("hr@example.com", "asha@example.com", ["cc@example.com"], "Offer", "<p>Hi</p>",
+                                 ATTACHMENT, "offer.pdf").as_bytes()
+    out = io.BytesIO()
+    mailer.write_message(out, "hr@example.com", "asha@example.com", ["cc@example.com"], "Offer", "<p>Hi</p>",
+                         io.BytesIO(ATTACHMENT), "offer.pdf")
+    assert attachment_of(out.getvalue()) == attachment_of(built)
+    assert email.message_from_bytes(out.getvalue())['Cc'] == "cc@example.com"
+
+class SMTPServer:
+    """Just enough of an SMTP server on localhost to receive one message"""
+
+    def __init__(self):
+        self.sock = socket.socket()
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.listen(1)
+        self.port = self.sock.getsockname()[1]
+        self.recipients, self.data = [], None
+        self.thread = threading.Thread(target=self.serve, daemon=True)
+        self.thread.start()
+
+    def serve(self):
+        conn, _ = self.sock.accept()
+        with conn, conn.makefile("rb") as lines:
+            conn.sendall(b"220 test\r\n")
+            for line in lines:
+                command = line.decode().strip()
+                if command.upper().startswith("RCPT"):
+                    self.recipients.append(command.split(":", 1)[1].strip("<> "))
+                if command.upper() == "DATA":
+                    conn.sendall(b"354 go ahead\r\n")
+                    body = []
+                    for data_line in lines:
+                        if data_line == b".\r\n":
+                            break
+                        body.append(data_line[1:] if data_line.startswith(b".") else data_line)
+                    self.data = b"".join(body)
+                    conn.sendall(b"250 2.0.0 queued as 42\r\n")
+                elif command.upper() == "QUIT":
+                    conn.sendall(b"221 bye\r\n")
+                    break
+                else:
+                    conn.sendall(b"250 ok\r\n")
+        self.sock.close()
+
+@pytest.fixture
+def sinks(monkeypatch, tmp_path):
+    audit = EmailAuditLog(str(tmp_path / "audit.db"), flush_interval=0.01)
+    index = SearchIndex(str(tmp_path / "search.db"), flush_interval=0.01)
+    monkeypatch.setattr(mailer, "get_audit_log", lambda: audit)
+    monkeypatch.setattr(mailer, "get_search_index", lambda: index)
+    return audit, index
+
+def test_deliver_email_streams_a_spooled_message(sinks):
+    audit, index = sinks
+    server = SMTPServer()
+    config = {'smtp_server': "127.0.0.1", 'smtp_port': server.port, 'sender_email': "hr@example.com",
+              'sender_password': "", 'use_tls': False}
+    mailer.deliver_email(config, "asha@example.com", ["cc@example.com"], "Offer", "<p>Welcome aboard</p>",
+                         io.BytesIO(ATTACHMENT), "offer.pdf", phase="offer")
+    server.thread.join(timeout=5)
+
+    assert server.recipients == ["asha@example.com", "cc@example.com"]
+    assert attachment_of(server.data)[0] == ATTACHMENT
+    audit.flush()
+    [entry] = audit.query()
+    assert (entry['success'], entry['smtp_response'], entry['attachment_bytes']) == (
+        1, "250 2.0.0 queued as 42", len(ATTACHMENT))
+    assert entry['attachment_sha256'] == hashlib.sha256(ATTACHMENT).hexdigest()
+    index.flush()
+    assert [d['subject'] for d in index.search("welcome")] == ["Offer"]
+
+def test_failed_deliveries_are_audited(sinks):
+    audit, _ = sinks
+    with socket.socket() as unused:
+        unused.bind(("127.0.0.1", 0))
+        port = unused.getsockname()[1]
+    config = {'smtp_server': "127.0.0.1", 'smtp_port': port, 'sender_email': "hr@example.com",
+              'sender_password': "", 'use_tls': False}
+    with pytest.raises(EmailDeliveryError):
+        mailer.deliver_email(config, "asha@example.com", [], "Offer", "<p>Hi</p>")
+    audit.flush()
+    [entry] = audit.query()
+    assert entry['success'] == 0 and "ConnectionRefusedError" in entry['smtp_response']
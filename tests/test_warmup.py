@@ -0,0 +1,29 @@
+import time
+
+from core.warmup import StageFailed, prewarm_process, run_stages
+
+def test_run_stages_reports_every_stage_in_order():
+    def fails():
+        raise StageFailed("Missing image files: header.png")
+
+    def crashes():
+        raise KeyError("font")
+
+    results, elapsed = run_stages([("ok", lambda: "fine"), ("fails", fails), ("crashes", crashes)])
+    assert [(r['name'], r['ok'], r['detail']) for r in results] == [
+        ("ok", True, "fine"),
+        ("fails", False, "Missing image files: header.png"),
+        ("crashes", False, "KeyError: 'font'"),
+    ]
+    assert elapsed >= 0
+
+def test_run_stages_runs_stages_concurrently():
+    stages = [(str(i), lambda: time.sleep(0.2) or "slept") for i in range(4)]
+    results, elapsed = run_stages(stages)
+    assert all(r['ok'] for r in results)
+    assert elapsed < 0.6
+
+def test_prewarm_process_fills_in_memory_caches_only():
+    results = prewarm_process()
+    assert [r['name'] for r in results] == ["Asset cache", "Templates"]
+    assert all(r['ok'] for r in results), results
@@ -0,0 +1,124 @@
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+
+import pytest
+
+import core.pdf_cache as pdf_cache
+import core.workers as workers
+from core.errors import PdfRenderError, RenderCancelledError, RenderTimeoutError
+from core.workers import job_limits, render_cached, submit_render
+
+posix_only = pytest.mark.skipif(not hasattr(signal, "setitimer"), reason="job limits need POSIX signals")
+
+def wait_forever():
+    while True:
+        time.sleep(0.05)
+
+@posix_only
+def test_job_limits_stop_a_render_past_its_deadline():
+    previous = signal.getsignal(signal.SIGALRM)
+    with pytest.raises(RenderTimeoutError, match="longer than 0.3s"):
+        with job_limits(timeout=0.3):
+            wait_forever()
+    assert signal.getsignal(signal.SIGALRM) is previous
+    assert signal.getitimer(signal.ITIMER_REAL) == (0.0, 0.0)
+
+@posix_only
+def test_job_limits_stop_a_cancelled_render(tmp_path):
+    cancel_path = tmp_path / "job.cancel"
+    threading.Timer(0.2, cancel_path.touch).start()
+    with pytest.raises(RenderCancelledError):
+        with job_limits(timeout=30, cancel_path=str(cancel_path)):
+            wait_forever()
+
+def test_render_cached_reports_time_and_memory(monkeypatch, tmp_path):
+    monkeypatch.setattr(pdf_cache, "render_pdf_cached", lambda html, preset: b"%PDF " + html.encode())
+    cancel_path = tmp_path / "job.cancel"
+    cancel_path.touch()  # Left behind by a cancel that came too late
+    pdf_bytes, seconds, rss_bytes = render_cached("<p>Hi</p>", cancel_path=str(cancel_path))
+    assert pdf_bytes == b"%PDF <p>Hi</p>"
+    assert seconds >= 0 and rss_bytes > 0
+    assert not cancel_path.exists()
+
+def test_render_cached_reports_running_out_of_memory(monkeypatch):
+    def render(html, preset):
+        raise MemoryError
+
+    monkeypatch.setattr(pdf_cache, "render_pdf_cached", render)
+    with pytest.raises(PdfRenderError, match="MB of memory"):
+        render_cached("<p>Hi</p>")
+
+@pytest.fixture
+def pool(monkeypatch):
+    # A thread pool in place of the spawned worker processes, running a stand-in for render_cached
+    released = threading.Event()
+
+    def render(html, preset, cancel_path, timeout, cache_only):
+        while not released.is_set():
+            if html != "hang" and os.path.exists(cancel_path):
+                os.remove(cancel_path)
+                raise RenderCancelledError("PDF rendering was cancelled")
+            if html == "fast":
+                return (None if cache_only else b"%PDF fast"), 0.01, 1024
+            time.sleep(0.02)
+
+    executor = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(workers, "_pool", executor)
+    monkeypatch.setattr(workers, "render_cached", render)
+    yield executor
+    released.set()
+    executor.shutdown()
+
+def test_jobs_return_the_workers_pdf(pool):
+    job = submit_render("fast")
+    assert job.result() == b"%PDF fast" and job.seconds == 0.01
+    assert submit_render("fast", cache_only=True).result() is None
+
+def test_cancel_stops_running_and_waiting_jobs(pool):
+    running, waiting = submit_render("slow"), submit_render("slow")
+    waiting.cancel()
+    running.cancel()
+    for job in (running, waiting):
+        with pytest.raises(RenderCancelledError):
+            job.result()
+
+def test_unresponsive_workers_are_killed_with_their_pool(pool, monkeypatch):
+    monkeypatch.setattr(workers, "KILL_GRACE_SECONDS", 0)
+    job = submit_render("hang", timeout=0.2)
+    job.cancel()  # Ignored by a hung worker
+    with pytest.raises(RenderTimeoutError):
+        job.result()
+    assert workers._pool is None
+
+def test_pool_is_recycled_once_a_worker_grows_too_large(pool):
+    workers._job_finished(pool, 1024)
+    assert workers._pool is pool
+    workers._job_finished(pool, (workers.config.RENDER_WORKER_MAX_RSS_MB + 1) * 1024 * 1024)
+    assert workers._pool is None
+
+def test_result_can_be_polled(pool):
+    job = submit_render("slow")
+    with pytest.raises(FuturesTimeoutError):
+        job.result(timeout=0.05)
+    assert not job.done()
+    job.cancel()
+
+@pytest.mark.skipif(sys.platform == "win32", reason="resource limits are POSIX only")
+def test_limit_process_caps_soft_limits_at_the_hard_limit():
+    # Run in a child process, as limits cannot be raised again once lowered
+    script = (
+        "import resource\n"
+        "from core.renderer import limit_process\n"
+        "resource.setrlimit(resource.RLIMIT_CPU, (1000, 1000))\n"
+        "limit_process(cpu_seconds=5000, memory_mb=4096)\n"
+        "print(resource.getrlimit(resource.RLIMIT_CPU)[0], resource.getrlimit(resource.RLIMIT_DATA)[0])\n"
+    )
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.run([sys.executable, "-c", script], cwd=root, capture_output=True, text=True, check=True)
+    assert output.stdout.split() == ["1000", str(4096 * 1024 * 1024)]